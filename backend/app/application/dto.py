@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Optional, List, Dict, Any
 from app.domain.entities import Category
 
 class DirectJson(BaseModel):
@@ -17,6 +17,21 @@ class ClassifyResponse(BaseModel):
     completion_tokens: Optional[int] = None
     total_tokens: Optional[int] = None
     cost_usd: Optional[float] = None
+    latency_ms: Optional[float] = None
+    # orçamento de latência: quem respondeu (llm/rules/ml), se é provisória, quanto o LLM levou
+    hedge: Optional[Dict[str, Any]] = None
+    
+class BatchClassifyRequest(BaseModel):
+    items: List[DirectJson] = Field(min_length=1)
+
+class BatchItemResponse(BaseModel):
+    index: int
+    status: str
+    result: Optional[ClassifyResponse] = None
+    error: Optional[str] = None
+
+class BatchClassifyResponse(BaseModel):
+    results: List[BatchItemResponse]
     
 class LoginRequest(BaseModel):
     username: str
@@ -29,12 +29,20 @@ class FileFacade:
         raise BadRequest("Supported files: .pdf or .txt")
     
 
+import asyncio
+import threading
+import time
 from datetime import datetime
-from typing import Optional
-from app.domain.entities import Email, ClassificationResult
+from typing import Optional, List, Dict
+from app.domain.entities import Email, ClassificationResult, BatchItemResult, AnalyzedEmail, CompiledProfile
 from app.domain.errors import BadRequest
-from app.domain.ports import TokenizerPort, ClassifierPort, ReplySuggesterPort, ProfilePort, LogRepositoryPort
+from app.domain.ports import (
+    TokenizerPort, ClassifierPort, ReplySuggesterPort, ProfilePort, LogRepositoryPort, ResultCachePort,
+    PricingPort,
+)
 from app.domain.entities import ClassificationLog
+from app.metrics import LATENCY_BUCKETS, Spans, counter, histogram
+from app.profiling import profiler
 
 
 class FileFacade:
@@ -57,6 +65,59 @@ class FileFacade:
         raise BadRequest("Supported files: .pdf, .txt ou .eml")
 
 
+class _LateResult:
+    """
+    Liga a resposta atrasada do LLM ao log da resposta provisória: o
+    classificador pode concluir antes ou depois do `save` (com write-behind,
+    na thread do writer), então o que chegar primeiro espera pelo outro.
+    """
+
+    def __init__(self, uc: "ClassifyEmailUseCase", email: Email, analysis: AnalyzedEmail,
+                 cache_key: Optional[str], profile_id: str, source: str, file_name: Optional[str]):
+        self.uc, self.email, self.analysis, self.cache_key = uc, email, analysis, cache_key
+        self.profile_id, self.source, self.file_name = profile_id, source, file_name
+        self.log_id: Optional[int] = None
+        self.pending: Optional[ClassificationResult] = None
+        self.provisional: Optional[ClassificationResult] = None
+        self._lock = threading.Lock()
+
+    def bind(self, log_id: Optional[int], provisional: ClassificationResult) -> None:
+        with self._lock:
+            self.log_id, self.provisional = log_id, provisional
+            result, self.pending = self.pending, None
+        if result is not None:
+            self.apply(result)
+
+    async def aapply(self, result: ClassificationResult) -> None:
+        """`apply` fora do event loop: responder, cache e update do log são CPU/SQLite."""
+        if self.uc.offload is not None:
+            await self.uc.offload(self.apply, result, admit=False)
+        else:
+            await asyncio.to_thread(self.apply, result)
+
+    def apply(self, result: ClassificationResult) -> None:
+        with self._lock:
+            if self.log_id is None:
+                self.pending = result
+                return
+        uc = self.uc
+        final = uc._finalize(result, self.email, self.analysis)
+        # latência/tempos continuam os da resposta que o cliente recebeu; o custo passa a incluir o LLM
+        timings = (self.provisional.extra or {}).get("timings_ms")
+        final = type(final)(**{
+            **final.__dict__,
+            "cost_usd": uc._cost(final),
+            "latency_ms": self.provisional.latency_ms,
+            "extra": {**(final.extra or {}), "timings_ms": timings},
+        })
+        uc._count_usage(final)
+        if self.cache_key and uc._cacheable(final):
+            uc.cache.put(self.cache_key, final)
+        uc.log_repo.update_result(
+            self.log_id, uc._build_log(self.email, final, self.profile_id, self.source, self.file_name)
+        )
+
+
 class ClassifyEmailUseCase:
     def __init__(
         self,
@@ -66,6 +127,8 @@ class ClassifyEmailUseCase:
         responder: ReplySuggesterPort,
         profiles: ProfilePort,
         log_repo: LogRepositoryPort,
+        cache: Optional[ResultCachePort] = None,
+        prices: Optional[PricingPort] = None,
     ):
         self.file_facade = file_facade
         self.tokenizer = tokenizer
@@ -73,22 +136,45 @@ class ClassifyEmailUseCase:
         self.responder = responder
         self.profiles = profiles
         self.log_repo = log_repo
+        self.cache = cache
+        self.prices = prices
+        # `offload(fn, *args, admit=bool)` → awaitable: onde o caminho assíncrono roda as etapas de
+        # CPU/SQLite (o UseCaseExecutor liga aqui o `call` dele); None = na própria thread
+        self.offload = None
+
+    async def _offload(self, fn, *args, admit: bool = False, sample=None):
+        if sample is not None:
+            # requisição amostrada: a etapa roda sob cProfile na thread que a executa
+            fn, args = sample.run, (fn, *args)
+        if self.offload is None:
+            return fn(*args)
+        return await self.offload(fn, *args, admit=admit)
 
-    # >>> FALTAVA ESTE MÉTODO <<<
-    def _expand_priority(self, profile: dict) -> list[str]:
+    def _get_profile(self, profile_id: str) -> Optional[CompiledProfile]:
         """
-        Expande keywords + sinônimos do profile para melhorar o sinal:
-        - normaliza tudo para lowercase
-        - combina priority_keywords e keyword_synonyms (se existirem)
+        Perfil já expandido (keywords + sinônimos, lowercase). Stores com cache
+        compilam uma vez por versão do perfil; adapters que só expõem
+        `get_profile` caem na compilação padrão do ProfilePort.
         """
-        base = (profile.get("priority_keywords") or [])
-        syns = (profile.get("keyword_synonyms") or {})
-        expanded = set(map(str.lower, base))
-        for k, arr in syns.items():
-            expanded.add(str(k).lower())
-            for s in arr:
-                expanded.add(str(s).lower())
-        return list(expanded)
+        if hasattr(self.profiles, "get_compiled"):
+            return self.profiles.get_compiled(profile_id)
+        return ProfilePort.get_compiled(self.profiles, profile_id)
+
+    def _cache_key(self, email: Email, profile: CompiledProfile) -> Optional[str]:
+        # a versão do perfil entra na chave: editar o perfil invalida os resultados dele
+        return self.cache.key_for(email, f"{profile.id}@{profile.version}") if self.cache else None
+
+    def _profile_kwargs(self, profile: CompiledProfile) -> dict:
+        """mood/priority do perfil; a ordem/limiares da cascata só para classificadores em cascata."""
+        kwargs = {"mood": profile.mood, "priority": profile.priority}
+        if profile.cascade and getattr(self.classifier, "accepts_cascade", False):
+            kwargs["cascade"] = profile.cascade
+        return kwargs
+
+    @property
+    def prefers_async(self) -> bool:
+        """Classificador dominado por I/O (LLM): a rota aguarda `aexecute_*` no event loop."""
+        return bool(getattr(self.classifier, "prefers_async", False))
 
     def _classify_and_log(
         self,
@@ -96,26 +182,231 @@ class ClassifyEmailUseCase:
         profile_id: str,
         source: str,
         file_name: Optional[str] = None,
+        spans: Optional[Spans] = None,
     ) -> ClassificationResult:
-        profile = self.profiles.get_profile(profile_id)
-        if not profile:
-            raise BadRequest(f"Perfil '{profile_id}' não encontrado")
+        spans = spans or Spans()
+        with spans.span("lookup"):
+            profile, cache_key, hit = self._lookup(email, profile_id)
+        if hit is not None:
+            return self._log_hit(email, hit, profile_id, source, file_name, spans)
 
-        pre = self.tokenizer.preprocess(email.body)
-        tokens = self.tokenizer.tokenize(pre)
+        # idioma, normalização e tokens calculados uma única vez e repassados adiante
+        analysis = self._analyze(email, spans)
 
         # usa o profile expandido (keywords + sinônimos)
+        t0 = time.perf_counter()
         result = self.classifier.classify(
             email,
-            tokens,
-            mood=profile.get("mood"),
-            priority=self._expand_priority(profile),
+            analysis.tokens,
+            analysis=analysis,
+            **self._profile_kwargs(profile),
+        )
+        self._classify_spans(spans, result, time.perf_counter() - t0)
+        return self._complete(email, result, analysis, cache_key, profile_id, source, file_name, spans)
+
+    async def _aclassify_and_log(
+        self,
+        email: Email,
+        profile_id: str,
+        source: str,
+        file_name: Optional[str] = None,
+        budget_ms: Optional[float] = None,
+        spans: Optional[Spans] = None,
+        admit: bool = True,
+        sample=None,
+    ) -> ClassificationResult:
+        spans = spans or Spans()
+        # só o aclassify fica no event loop: lookup, análise, resposta e persistência vão para o executor,
+        # com a admissão (Overloaded) na primeira etapa — as seguintes não são recusadas com o LLM já pago
+        profile, cache_key, hit, analysis = await self._offload(
+            self._lookup_and_analyze, email, profile_id, spans, admit=admit, sample=sample
+        )
+        if hit is not None:
+            return await self._offload(
+                self._log_hit, email, hit, profile_id, source, file_name, spans, sample=sample
+            )
+
+        kwargs, late = self._profile_kwargs(profile), None
+        if budget_ms and getattr(self.classifier, "accepts_budget", False):
+            # LLM fora do orçamento: resposta provisória agora, log atualizado quando ele terminar
+            late = _LateResult(self, email, analysis, cache_key, profile_id, source, file_name)
+            kwargs.update(budget_s=budget_ms / 1000.0, on_late=late.aapply)
+        t0 = time.perf_counter()
+        result = await self.classifier.aclassify(
+            email,
+            analysis.tokens,
+            analysis=analysis,
+            **kwargs,
+        )
+        self._classify_spans(spans, result, time.perf_counter() - t0)
+        return await self._offload(
+            self._complete, email, result, analysis, cache_key, profile_id, source, file_name, spans, late,
+            sample=sample,
+        )
+
+    def _lookup_and_analyze(self, email: Email, profile_id: str, spans: Spans):
+        """`_lookup` e, se não houve hit no cache, `_analyze` → (perfil, chave, hit, análise)."""
+        with spans.span("lookup"):
+            profile, cache_key, hit = self._lookup(email, profile_id)
+        if hit is not None:
+            return profile, cache_key, hit, None
+        return profile, cache_key, None, self._analyze(email, spans)
+
+    def _lookup(self, email: Email, profile_id: str):
+        """Perfil + chave do cache + resultado em cache (ou None)."""
+        profile = self._get_profile(profile_id)
+        if not profile:
+            raise BadRequest(f"Perfil '{profile_id}' não encontrado")
+
+        cache_key = self._cache_key(email, profile)
+        if cache_key:
+            hit = self.cache.get(cache_key)
+            if hit is not None:
+                return profile, cache_key, self._as_cached(hit)
+        return profile, cache_key, None
+
+    def _analyze(self, email: Email, spans: Spans) -> AnalyzedEmail:
+        """`tokenizer.analyze` com o tempo de cada sub-etapa (preprocess/lang_detect/tokenize) quando ele informa."""
+        t0 = time.perf_counter()
+        analysis = self.tokenizer.analyze(email)
+        timings = getattr(analysis, "timings_ms", None)
+        if timings:
+            for stage, ms in timings.items():
+                spans.add(stage, ms / 1000.0)
+        else:
+            spans.add("analyze", time.perf_counter() - t0)
+        return analysis
+
+    def _classify_spans(self, spans: Spans, result: ClassificationResult, elapsed_s: float) -> None:
+        """Tempo total do classificador + o de cada etapa interna (rules/ml/llm) que ele registrou."""
+        spans.add("classify", elapsed_s)
+        extra = result.extra or {}
+        stages = extra.get("stage_ms") or (extra.get("cascade") or {}).get("timings_ms") or {}
+        for name, ms in stages.items():
+            spans.add(f"classify_{name}", ms / 1000.0)
+
+    def _log_hit(self, email, hit, profile_id, source, file_name, spans) -> ClassificationResult:
+        hit = self._measured(hit, spans)
+        self._persist(self._build_log(email, hit, profile_id, source, file_name), spans)
+        self._count(hit, source, spans)
+        return hit
+
+    def _complete(
+        self,
+        email: Email,
+        result: ClassificationResult,
+        analysis: AnalyzedEmail,
+        cache_key: Optional[str],
+        profile_id: str,
+        source: str,
+        file_name: Optional[str] = None,
+        spans: Optional[Spans] = None,
+        late: Optional[_LateResult] = None,
+    ) -> ClassificationResult:
+        spans = spans or Spans()
+        with spans.span("respond"):
+            final_result = self._finalize(result, email, analysis)
+        final_result = self._measured(final_result, spans)
+        if cache_key and self._cacheable(final_result):
+            self.cache.put(cache_key, final_result)
+        log = self._build_log(email, final_result, profile_id, source, file_name)
+        if late is not None and ((final_result.extra or {}).get("hedge") or {}).get("provisional"):
+            self._persist_provisional(log, final_result, late, spans)
+        else:
+            self._persist(log, spans)
+        self._count(final_result, source, spans)
+        return final_result
+
+    def _cost(self, result: ClassificationResult) -> float:
+        if self.prices is None:
+            return 0.0
+        return round(self.prices.cost(result.used_model, result.prompt_tokens, result.completion_tokens), 8)
+
+    def _measured(self, result: ClassificationResult, spans: Spans) -> ClassificationResult:
+        """Custo pela tabela de preços, latência até aqui e tempos por etapa (`extra["timings_ms"]`)."""
+        return type(result)(**{
+            **result.__dict__,
+            "cost_usd": self._cost(result),
+            "latency_ms": round(spans.elapsed_ms(), 3),
+            "extra": {**(result.extra or {}), "timings_ms": dict(spans.ms)},
+        })
+
+    def _persist(self, log: ClassificationLog, spans: Spans):
+        # o log já traz latency_ms: a própria escrita só entra nos histogramas
+        with spans.span("persist"):
+            return self.log_repo.save(log)
+
+    def _persist_provisional(self, log: ClassificationLog, result: ClassificationResult,
+                             late: _LateResult, spans: Spans) -> None:
+        """Salva a resposta provisória e liga o id do log à resposta atrasada do LLM."""
+        submit = getattr(self.log_repo, "submit", None)
+        if submit is None:
+            saved = self._persist(log, spans)
+            late.bind(getattr(saved, "id", None), result)
+            return
+        # write-behind: o id só existe depois do flush; o callback roda na thread do writer
+        with spans.span("persist"):
+            future = submit(log)
+        future.add_done_callback(
+            lambda f: late.bind(None if f.exception() else f.result().id, result)
         )
 
-        reply = self.responder.suggest(result, email)
-        final_result = type(result)(**{**result.__dict__, "suggested_reply": reply})
+    def _count(self, result: ClassificationResult, source: str, spans: Spans) -> None:
+        histogram(
+            "classify_latency_seconds", LATENCY_BUCKETS, help="Latência total do caso de uso de classificação",
+            labels={"source": source},
+        ).observe(spans.elapsed_ms() / 1000.0)
+        counter(
+            "classify_requests_total", help="Classificações por origem, categoria e modelo",
+            labels={"source": source, "category": result.category.value, "model": result.used_model or "-"},
+        ).inc()
+        self._count_usage(result)
+
+    def _count_usage(self, result: ClassificationResult) -> None:
+        if not result.total_tokens and not result.prompt_tokens:
+            return
+        model = result.used_model or "-"
+        for kind, tokens in (("prompt", result.prompt_tokens), ("completion", result.completion_tokens)):
+            if tokens:
+                counter(
+                    "llm_tokens_total", help="Tokens consumidos do LLM", labels={"model": model, "kind": kind},
+                ).inc(tokens)
+        if result.cost_usd:
+            counter(
+                "llm_cost_usd_total", help="Custo estimado do LLM (tabela de preços)", labels={"model": model},
+            ).inc(result.cost_usd)
+
+    def _cacheable(self, result: ClassificationResult) -> bool:
+        # falhas (ex.: ml_classifier_error, LLM fora do prazo) e respostas provisórias não devem ser reaproveitadas
+        extra = result.extra or {}
+        return not (extra.get("error") or extra.get("llm_error") or (extra.get("hedge") or {}).get("provisional"))
+
+    def _as_cached(self, result: ClassificationResult) -> ClassificationResult:
+        """Cópia de um resultado em cache: nenhum token foi gasto nesta requisição."""
+        return type(result)(**{
+            **result.__dict__,
+            "prompt_tokens": None,
+            "completion_tokens": None,
+            "total_tokens": None,
+            "cost_usd": None,
+            "extra": {**(result.extra or {}), "cached": True},
+        })
+
+    def _finalize(
+        self, result: ClassificationResult, email: Email, analysis: Optional[AnalyzedEmail] = None
+    ) -> ClassificationResult:
+        reply = self.responder.suggest(result, email, analysis=analysis)
+        return type(result)(**{**result.__dict__, "suggested_reply": reply})
 
-        log = ClassificationLog(
+    def _build_log(
+        self,
+        email: Email,
+        final_result: ClassificationResult,
+        profile_id: str,
+        source: str,
+        file_name: Optional[str] = None,
+    ) -> ClassificationLog:
+        return ClassificationLog(
             id=None,
             created_at=datetime.utcnow(),
             source=source,
@@ -132,14 +423,109 @@ class ClassifyEmailUseCase:
             prompt_tokens=final_result.prompt_tokens,
             completion_tokens=final_result.completion_tokens,
             total_tokens=final_result.total_tokens,
-            cost_usd=0.0,
-            latency_ms=None,
+            cost_usd=final_result.cost_usd or 0.0,
+            latency_ms=round(final_result.latency_ms) if final_result.latency_ms is not None else None,
             status="ok",
             error=None,
             extra=final_result.extra,
         )
-        self.log_repo.save(log)
-        return final_result
+
+    def _analyze_many(self, emails: List[Email], idxs: List[int], out: List[BatchItemResult]):
+        """analyze_batch (idioma em uma passada); se falhar, item a item para isolar o erro."""
+        try:
+            return idxs, self.tokenizer.analyze_batch([emails[i] for i in idxs])
+        except Exception:
+            pass
+        ok_idxs: List[int] = []
+        analyses: List[AnalyzedEmail] = []
+        for i in idxs:
+            try:
+                analyses.append(self.tokenizer.analyze(emails[i]))
+                ok_idxs.append(i)
+            except Exception as e:
+                out[i].error = str(e)
+        return ok_idxs, analyses
+
+    def classify_batch(
+        self,
+        emails: List[Email],
+        profile_ids: Optional[List[Optional[str]]] = None,
+        source: str = "json",
+    ) -> List[BatchItemResult]:
+        """
+        Classifica vários emails de uma vez:
+        - agrupa por perfil e faz uma chamada `classify_batch` por grupo
+        - persiste todos os logs numa única transação
+        - erros por item não derrubam o lote; a saída segue a ordem de entrada
+        - latência/tempos por etapa são os do lote inteiro (todos esperam por ele)
+        """
+        spans = Spans()
+        ids = list(profile_ids or [])
+        ids += [None] * (len(emails) - len(ids))
+        ids = [pid or "default" for pid in ids]
+
+        out = [BatchItemResult(index=i) for i in range(len(emails))]
+        keys: List[Optional[str]] = [None] * len(emails)
+
+        groups: Dict[str, List[int]] = {}
+        for i, pid in enumerate(ids):
+            groups.setdefault(pid, []).append(i)
+
+        for pid, idxs in groups.items():
+            profile = self._get_profile(pid)
+            if not profile:
+                for i in idxs:
+                    out[i].error = f"Perfil '{pid}' não encontrado"
+                continue
+
+            pending: List[int] = []
+            for i in idxs:
+                if self.cache:
+                    keys[i] = self._cache_key(emails[i], profile)
+                    hit = self.cache.get(keys[i])
+                    if hit is not None:
+                        out[i].result = self._as_cached(hit)
+                        continue
+                pending.append(i)
+            if not pending:
+                continue
+
+            with spans.span("analyze"):
+                batch_idxs, batch_analyses = self._analyze_many(emails, pending, out)
+            if not batch_idxs:
+                continue
+
+            try:
+                with spans.span("classify"):
+                    results = self.classifier.classify_batch(
+                        [emails[i] for i in batch_idxs],
+                        [a.tokens for a in batch_analyses],
+                        analyses=batch_analyses,
+                        **self._profile_kwargs(profile),
+                    )
+            except Exception as e:
+                for i in batch_idxs:
+                    out[i].error = str(e)
+                continue
+
+            with spans.span("respond"):
+                for i, result, analysis in zip(batch_idxs, results, batch_analyses):
+                    try:
+                        out[i].result = self._finalize(result, emails[i], analysis)
+                        if keys[i] and self._cacheable(out[i].result):
+                            self.cache.put(keys[i], out[i].result)
+                    except Exception as e:
+                        out[i].error = str(e)
+
+        done = [item for item in out if item.result is not None]
+        for item in done:
+            item.result = self._measured(item.result, spans)
+        logs = [self._build_log(emails[item.index], item.result, ids[item.index], source) for item in done]
+        with spans.span("persist"):
+            self.log_repo.save_many(logs)
+        for item in done:
+            self._count(item.result, source, spans)
+        return out
 
     def execute_from_text(
         self,
@@ -165,6 +551,59 @@ class ClassifyEmailUseCase:
     ) -> ClassificationResult:
         if not profile_id:
             profile_id = "default"
-        text = self.file_facade.from_upload(filename, raw)
+        spans = Spans()
+        with spans.span("extract"):
+            text = self.file_facade.from_upload(filename, raw)
         email = Email(subject=subject, body=text, sender=sender)
-        return self._classify_and_log(email, profile_id, source="file", file_name=filename)
+        return self._classify_and_log(email, profile_id, source="file", file_name=filename, spans=spans)
+
+    async def aexecute_from_text(
+        self,
+        subject: str,
+        body: str,
+        sender: Optional[str] = None,
+        profile_id: Optional[str] = None,
+        source: str = "json",
+        file_name: Optional[str] = None,
+        budget_ms: Optional[float] = None,
+        sampled: bool = False,
+    ) -> ClassificationResult:
+        if not profile_id:
+            profile_id = "default"
+        email = Email(subject=subject, body=body, sender=sender)
+        # amostrada: uma amostra "/classify" com as etapas offloaded, como no caminho síncrono
+        sample = profiler.parts("/classify", sampled)
+        try:
+            return await self._aclassify_and_log(
+                email, profile_id, source, file_name, budget_ms=budget_ms, sample=sample
+            )
+        finally:
+            if sample is not None:
+                sample.close()
+
+    async def aexecute_from_file(
+        self,
+        filename: str,
+        raw: bytes,
+        profile_id: Optional[str] = None,
+        subject: Optional[str] = None,
+        sender: Optional[str] = None,
+        budget_ms: Optional[float] = None,
+        sampled: bool = False,
+    ) -> ClassificationResult:
+        if not profile_id:
+            profile_id = "default"
+        sample = profiler.parts("/classify", sampled)
+        try:
+            # extração de PDF é CPU-bound: fora do event loop (e é ela que passa pela admissão)
+            spans = Spans()
+            with spans.span("extract"):
+                text = await self._offload(self.file_facade.from_upload, filename, raw, admit=True, sample=sample)
+            email = Email(subject=subject, body=text, sender=sender)
+            return await self._aclassify_and_log(
+                email, profile_id, source="file", file_name=filename, budget_ms=budget_ms, spans=spans,
+                admit=False, sample=sample,
+            )
+        finally:
+            if sample is not None:
+                sample.close()
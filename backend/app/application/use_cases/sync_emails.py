@@ -1,5 +1,9 @@
+from concurrent.futures import Future
+from datetime import datetime
+
 from app.domain.ports import EmailSourcePort, ClassifierPort, LogRepositoryPort
 from app.domain.entities import Category, ClassificationLog
+from app.profiling import profiler
 
 
 class SyncEmailsUseCase:
@@ -10,24 +14,40 @@ class SyncEmailsUseCase:
         repo: LogRepositoryPort,
         profile_id: str,
         tokenizer,
+        batch_size: int = 1,
     ):
         self.email_source = email_source
         self.classifier = classifier
         self.repo = repo
         self.profile_id = profile_id
         self.tokenizer = tokenizer
+        # emails classificados juntos via `classify_batch` (o LLM empacota vários por completion)
+        self.batch_size = max(1, batch_size)
 
+    @profiler.wrap("sync_emails.run")
     def run(self, stop_event=None):
         print("[DEBUG] Starting SyncEmailsUseCase.run()")
 
+        chunk = []
         for msg_id, email in self.email_source.fetch_unread():
             if stop_event and stop_event.is_set():
                 print("[DEBUG] Stopping processing due to stop_event")
                 return
 
             print(f"[DEBUG] Processing email {msg_id} - Subject: {email.subject}")
+            chunk.append((msg_id, email))
+            if len(chunk) >= self.batch_size:
+                self._process_chunk(chunk)
+                chunk = []
+
+        if chunk:
+            self._process_chunk(chunk)
+
+        print("[DEBUG] Finished SyncEmailsUseCase.run()")
 
-            result = self._classify_email(msg_id, email)
+    def _process_chunk(self, chunk):
+        moves = []
+        for (msg_id, email), result in zip(chunk, self._classify_chunk(chunk)):
             if not result:
                 continue
 
@@ -35,6 +55,7 @@ class SyncEmailsUseCase:
             result.extra = {**(result.extra or {}), "profile_id": self.profile_id, "moved_to": folder}
 
             log = ClassificationLog(
+                created_at=datetime.utcnow(),
                 profile_id=self.profile_id,
                 category=result.category,
                 reason=result.reason,
@@ -45,15 +66,38 @@ class SyncEmailsUseCase:
                 extra=result.extra,
             )
 
-            self._save_log(msg_id, log)
-            self._move_email(msg_id, folder)
+            saved = self._save_log(msg_id, log)
+            if saved is not None:
+                moves.append((msg_id, folder, saved))
 
-        print("[DEBUG] Finished SyncEmailsUseCase.run()")
+        # com write-behind o log ainda está na fila: só tira o email da caixa depois do commit
+        # (um por chunk), senão um crash perderia o log de um email que não volta a ser lido
+        if moves and not self._flush_logs():
+            print(f"[WARN] Logs not flushed, leaving {len(moves)} emails unread for the next sync")
+            return
+        for msg_id, folder, saved in moves:
+            if self._log_written(msg_id, saved):
+                self._move_email(msg_id, folder)
+
+    def _classify_chunk(self, chunk):
+        if len(chunk) == 1:
+            return [self._classify_email(*chunk[0])]
+        try:
+            emails = [email for _, email in chunk]
+            analyses = self.tokenizer.analyze_batch(emails)
+            results = self.classifier.classify_batch(
+                emails, [a.tokens for a in analyses], analyses=analyses
+            )
+            print(f"[DEBUG] Batch classification: {len(results)} emails")
+            return results
+        except Exception as e:
+            print(f"[ERROR] Failed to classify batch of {len(chunk)}, retrying one by one: {e}")
+            return [self._classify_email(msg_id, email) for msg_id, email in chunk]
 
     def _classify_email(self, msg_id, email):
         try:
-            tokens = self.tokenizer.tokenize(email.body or "")
-            result = self.classifier.classify(email, tokens=tokens)
+            analysis = self.tokenizer.analyze(email)
+            result = self.classifier.classify(email, tokens=analysis.tokens, analysis=analysis)
             print(f"[DEBUG] Classification: {result.category}")
             return result
         except Exception as e:
@@ -61,11 +105,42 @@ class SyncEmailsUseCase:
             return None
 
     def _save_log(self, msg_id, log: ClassificationLog):
+        """
+        Grava o log; com write-behind (`submit`) devolve o Future do commit.
+        None se a gravação já falhou aqui (o email fica na caixa).
+        """
         try:
+            submit = getattr(self.repo, "submit", None)
+            if submit is not None:
+                return submit(log)
             self.repo.save(log)
             print(f"[DEBUG] Log saved to repository for {msg_id}")
+            return True
         except Exception as e:
             print(f"[ERROR] Failed to save log to repository: {e}")
+            return None
+
+    def _log_written(self, msg_id, saved) -> bool:
+        """Depois do flush: o Future do write-behind tem de ter resolvido sem erro."""
+        if not isinstance(saved, Future):
+            return True
+        try:
+            saved.result(timeout=0)
+        except Exception as e:
+            print(f"[ERROR] Log for {msg_id} was not written, leaving it unread: {e!r}")
+            return False
+        print(f"[DEBUG] Log saved to repository for {msg_id}")
+        return True
+
+    def _flush_logs(self) -> bool:
+        flush = getattr(self.repo, "flush", None)
+        if flush is None:
+            return True
+        try:
+            return flush() is not False
+        except Exception as e:
+            print(f"[ERROR] Failed to flush logs: {e}")
+            return False
 
     def _move_email(self, msg_id, folder: str):
         try:
@@ -1,16 +1,33 @@
+from pathlib import Path
+
+import joblib
+
 from app.application.use_cases.classify_email import FileFacade, ClassifyEmailUseCase
+from app.domain.entities import CascadeStage
 from app.infrastructure.extractors.pdf_extractor import PdfExtractor
 from app.infrastructure.extractors.txt_extractor import TxtExtractor
 from app.infrastructure.extractors.eml_extractor import EmlExtractor
 from app.infrastructure.nlp.tokenizer_simple import SimpleTokenizer
+from app.infrastructure.nlp.lang_detect import default_identifier, SUPPORTED_LANGS
+from app.infrastructure.nlp.prompt_compactor import PromptCompactor, IdfTable
 from app.infrastructure.classifiers.rule_based import RuleBasedClassifier
-from app.infrastructure.classifiers.openai_llm import OpenAIClassifier
+from app.infrastructure.classifiers.openai_llm import OpenAIClassifier, PROMPT_VERSION
 from app.infrastructure.classifiers.ml_classifier import MLClassifier
+from app.infrastructure.classifiers.compiled_linear import CompiledLinearModel
 from app.infrastructure.classifiers.smart_classifier import SmartClassifier
+from app.infrastructure.classifiers.micro_batcher import MicroBatchingClassifier
+from app.infrastructure.classifiers.cascade import CascadeClassifier
 from app.infrastructure.responders.simple_templates import SimpleResponder
 from app.infrastructure.repositories.sql_log_repository import SqlLogRepository
-from app.infrastructure.profiles.profile_json import JsonProfileAdapter
-from app.infrastructure.db import init_db, get_session
+from app.infrastructure.repositories.write_behind_log_repository import WriteBehindLogRepository
+from app.infrastructure.profiles.profile_json import DATA_PATH as PROFILES_DATA_PATH
+from app.infrastructure.profiles.profile_store import CompiledProfileStore
+from app.infrastructure.db import init_db, SessionLocal
+from app.infrastructure.executor import UseCaseExecutor
+from app.infrastructure.http_client import PooledHttpClient, AsyncPooledHttpClient
+from app.infrastructure.cache.result_cache import LruTtlResultCache, classifier_fingerprint
+from app.infrastructure.cache.llm_cache import SqliteLlmResponseCache
+from app.infrastructure.pricing import PriceTable
 
 from app.config import settings
 
@@ -18,9 +35,7 @@ from app.config import settings
 def build_use_case():
     """Constrói o caso de uso para classificação via API HTTP"""
     init_db()
-    session = next(get_session())
-
-    log_repo = SqlLogRepository(session=session)
+    log_repo = build_log_repository()
 
     facade = FileFacade(
         pdf_extractor=PdfExtractor(),
@@ -28,10 +43,10 @@ def build_use_case():
         eml_extractor=EmlExtractor(),
     )
 
-    tokenizer = SimpleTokenizer(lang="auto")
+    tokenizer = build_tokenizer()
     classifier = build_classifier()
     responder = SimpleResponder()
-    profiles = JsonProfileAdapter()
+    profiles = build_profiles()
 
     return ClassifyEmailUseCase(
         file_facade=facade,
@@ -40,24 +55,200 @@ def build_use_case():
         responder=responder,
         profiles=profiles,
         log_repo=log_repo,
+        cache=build_result_cache(classifier),
+        prices=build_price_table(),
+    )
+
+
+def build_log_repository():
+    """SqlLogRepository (uma sessão do pool por operação), com write-behind em lote se LOG_WRITE_BEHIND"""
+    repo = SqlLogRepository(session_factory=SessionLocal)
+    if not settings.LOG_WRITE_BEHIND:
+        return repo
+    return WriteBehindLogRepository(
+        repo,
+        max_batch=settings.LOG_WRITER_MAX_BATCH,
+        max_wait_ms=settings.LOG_WRITER_MAX_WAIT_MS,
+        max_queue=settings.LOG_WRITER_MAX_QUEUE,
+    )
+
+
+def build_price_table():
+    """Preços por 1M tokens (padrões + LLM_PRICES) para o cost_usd dos logs"""
+    try:
+        return PriceTable.parse(settings.LLM_PRICES)
+    except ValueError as e:
+        print(f"Invalid LLM_PRICES, using default prices: {e}")
+        return PriceTable()
+
+
+def build_tokenizer():
+    """Tokenizer com identificação de idioma configurável (LANG_ID_*)"""
+    # o mesmo identificador do detect_lang padrão (regras, fallback): um único engine configurado
+    identifier = default_identifier()
+    return SimpleTokenizer(
+        lang="auto",
+        supported_langs=SUPPORTED_LANGS,
+        char_budget=settings.MAX_BODY_CHARS,
+        lang_identifier=identifier,
+        use_ngram_lang_id=identifier is not None,
+    )
+
+
+def build_profiles():
+    """Perfis compilados sob demanda, recarregados a quente (PROFILES_*)"""
+    return CompiledProfileStore(
+        path=settings.PROFILES_PATH or PROFILES_DATA_PATH,
+        watch=settings.PROFILES_WATCH,
+        check_interval_s=settings.PROFILES_CHECK_INTERVAL_S,
+        max_compiled=settings.PROFILES_MAX_COMPILED,
+    )
+
+
+def build_result_cache(classifier):
+    """Cache de resultados (memória LRU/TTL + SQLite opcional), ou None se desabilitado"""
+    if not getattr(settings, "RESULT_CACHE_ENABLED", False):
+        return None
+    return LruTtlResultCache(
+        classifier_version=classifier_fingerprint(classifier),
+        max_entries=settings.RESULT_CACHE_MAX_ENTRIES,
+        ttl_s=settings.RESULT_CACHE_TTL_S,
+        sqlite_path=settings.RESULT_CACHE_SQLITE_PATH or None,
+    )
+
+
+def build_executor(use_case):
+    """Executor (thread/process) para onde o HTTP despacha o caso de uso"""
+    workers = settings.EXECUTOR_WORKERS
+    executor = UseCaseExecutor(
+        use_case=use_case,
+        kind=settings.EXECUTOR_KIND,
+        workers=workers,
+        max_pending=settings.EXECUTOR_MAX_PENDING or 4 * workers,
     )
+    executor.warm_up()
+    # caminho assíncrono (LLM): as etapas de CPU/SQLite do caso de uso passam pelo mesmo executor
+    use_case.offload = executor.call
+    return executor
+
+
+def build_llm_http_client(async_: bool = False):
+    """Pool keep-alive para a API do LLM (OPENAI_BASE_URL, timeouts, retries)"""
+    cls = AsyncPooledHttpClient if async_ else PooledHttpClient
+    return cls(
+        settings.OPENAI_BASE_URL,
+        max_connections=settings.OPENAI_MAX_CONNECTIONS,
+        connect_timeout_s=settings.OPENAI_CONNECT_TIMEOUT_S,
+        read_timeout_s=settings.OPENAI_READ_TIMEOUT_S,
+        max_retries=settings.OPENAI_MAX_RETRIES,
+    )
+
+
+def build_llm_response_cache():
+    """Cache em SQLite das respostas do LLM, ou None se desabilitado (LLM_CACHE_*)"""
+    if not settings.LLM_CACHE_ENABLED:
+        return None
+    try:
+        return SqliteLlmResponseCache(
+            settings.LLM_CACHE_PATH,
+            schema_version=PROMPT_VERSION,
+            max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+            ttl_s=settings.LLM_CACHE_TTL_S,
+        )
+    except Exception as e:
+        print(f"Failed to open LLM response cache, continuing without it: {e}")
+        return None
+
+
+def build_prompt_compactor():
+    """Compactador do corpo para o LLM (LLM_PROMPT_TOKEN_BUDGET), com IDF do vetorizador do ML se houver"""
+    if settings.LLM_PROMPT_TOKEN_BUDGET <= 0:
+        return None
+    models_dir = Path(__file__).resolve().parent.parent / "models"
+    idf = None
+    compiled_path = settings.ML_COMPILED_PATH or str(models_dir / "compiled")
+    try:
+        if CompiledLinearModel.exists(compiled_path):
+            idf = IdfTable.from_compiled(CompiledLinearModel(compiled_path))
+        else:
+            idf = IdfTable.from_vectorizer(
+                joblib.load(settings.ML_VECTORIZER_PATH or models_dir / "tfidf_vectorizer.pkl")
+            )
+    except Exception as e:
+        print(f"TF-IDF vectorizer unavailable for prompt compaction, using in-email IDF: {e}")
+    return PromptCompactor(token_budget=settings.LLM_PROMPT_TOKEN_BUDGET, idf=idf)
+
+
+def build_ml_classifier():
+    """MLClassifier (compilado ou pickles), com micro-batching opcional; None se não carregar"""
+    try:
+        ml = MLClassifier(
+            model_path=settings.ML_MODEL_PATH,
+            vectorizer_path=settings.ML_VECTORIZER_PATH,
+            compiled_path=settings.ML_COMPILED_PATH,
+            use_compiled=settings.ML_USE_COMPILED,
+        )
+    except Exception as e:
+        print(f"Failed to load ML classifier: {e}")
+        return None
+    if getattr(settings, "MICROBATCH_ENABLED", False):
+        return MicroBatchingClassifier(
+            ml,
+            max_batch_size=settings.MICROBATCH_MAX_SIZE,
+            max_wait_ms=settings.MICROBATCH_MAX_WAIT_MS,
+            max_queue=settings.MICROBATCH_MAX_QUEUE,
+        )
+    return ml
+
+
+def build_llm_classifier():
+    """OpenAIClassifier com pool, prazo, single-flight, cache de respostas, lotes e compactação"""
+    return OpenAIClassifier(
+        http_client=build_llm_http_client(),
+        async_http_client=build_llm_http_client(async_=True),
+        max_concurrency=settings.LLM_MAX_CONCURRENCY,
+        deadline_s=settings.LLM_DEADLINE_S,
+        single_flight=settings.LLM_SINGLE_FLIGHT,
+        response_cache=build_llm_response_cache(),
+        batch_size=settings.LLM_BATCH_SIZE,
+        compactor=build_prompt_compactor(),
+    )
+
+
+def build_cascade_classifier(plan):
+    """Cascata rules → ml → llm (CLASSIFIER_CASCADE); ML/LLM entram se estão no plano ou habilitados"""
+    names = {s.name for s in plan}
+    stages = {"rules": RuleBasedClassifier()}
+    if "ml" in names or getattr(settings, "USE_ML_MODEL", False):
+        ml = build_ml_classifier()
+        if ml is not None:
+            stages["ml"] = ml
+    if "llm" in names or getattr(settings, "USE_OPENAI", False):
+        stages["llm"] = build_llm_classifier()
+    return CascadeClassifier(stages, default_plan=plan)
 
 
 def build_classifier():
-    """Retorna o classificador (ML, rule-based, ou opcional LLM)"""
-    # Priority 1: Use ML model if enabled
-    if getattr(settings, "USE_ML_MODEL", False):
+    """Retorna o classificador (cascata configurada, ML, rule-based, ou opcional LLM)"""
+    plan = CascadeStage.parse_plan(getattr(settings, "CLASSIFIER_CASCADE", ""))
+    if plan:
         try:
-            return MLClassifier()
+            return build_cascade_classifier(plan)
         except Exception as e:
-            print(f"Failed to load ML classifier, falling back to rule-based: {e}")
+            print(f"Failed to build classifier cascade, falling back: {e}")
+
+    # Priority 1: Use ML model if enabled
+    if getattr(settings, "USE_ML_MODEL", False):
+        ml = build_ml_classifier()
+        if ml is not None:
+            return ml
+        print("Failed to load ML classifier, falling back to rule-based")
     
     # Priority 2: Use OpenAI if enabled
     rule = RuleBasedClassifier()
     if getattr(settings, "USE_OPENAI", False):
-        llm = OpenAIClassifier()
         min_conf = getattr(settings, "RB_MIN_CONF", 0.70)
-        return SmartClassifier(rule_based=rule, llm=llm, min_conf=min_conf)
+        return SmartClassifier(rule_based=rule, llm=build_llm_classifier(), min_conf=min_conf)
     
     # Priority 3: Default to rule-based
     return rule
@@ -66,8 +257,7 @@ def build_classifier():
 def build_imap_deps():
     """Fornece classifier e log_repo para o serviço IMAP"""
     init_db()
-    session = next(get_session())
-    log_repo = SqlLogRepository(session=session)
+    log_repo = build_log_repository()
 
     classifier = build_classifier()
 
@@ -18,13 +18,99 @@ class Settings(BaseModel):
     USE_ML_MODEL: bool = os.getenv("USE_ML_MODEL", "true").strip().lower() == "true"
     ML_MODEL_PATH: Optional[str] = os.getenv("ML_MODEL_PATH")  # Optional custom path
     ML_VECTORIZER_PATH: Optional[str] = os.getenv("ML_VECTORIZER_PATH")  # Optional custom path
+    ML_COMPILED_PATH: Optional[str] = os.getenv("ML_COMPILED_PATH")  # Optional custom dir (scripts/compile_model.py)
+    ML_USE_COMPILED: bool = os.getenv("ML_USE_COMPILED", "true").strip().lower() == "true"
     
     # OpenAI settings (fallback)
     USE_OPENAI: bool = os.getenv("USE_OPENAI", "false").strip().lower() == "true"
     OPENAI_API_KEY: Optional[str] = os.getenv("OPENAI_API_KEY")
     OPENAI_MODEL: str = os.getenv("OPENAI_MODEL", "gpt-4.1-nano")
+    OPENAI_BASE_URL: str = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")  # ex.: servidor local de teste
+    OPENAI_MAX_CONNECTIONS: int = int(os.getenv("OPENAI_MAX_CONNECTIONS", "10"))
+    OPENAI_CONNECT_TIMEOUT_S: float = float(os.getenv("OPENAI_CONNECT_TIMEOUT_S", "5"))
+    OPENAI_READ_TIMEOUT_S: float = float(os.getenv("OPENAI_READ_TIMEOUT_S", "30"))
+    OPENAI_MAX_RETRIES: int = int(os.getenv("OPENAI_MAX_RETRIES", "2"))  # 429/5xx/falha de rede, backoff com jitter
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", "32"))  # chamadas assíncronas em voo
+    LLM_DEADLINE_S: float = float(os.getenv("LLM_DEADLINE_S", "20"))  # estourou → resposta do rule-based
+    # Orçamento de latência do /classify (header X-Latency-Budget-Ms sobrescreve; 0 = espera o LLM):
+    # LLM atrasado → resposta provisória do rules/ML e o log é atualizado quando o LLM terminar
+    LLM_LATENCY_BUDGET_MS: float = float(os.getenv("LLM_LATENCY_BUDGET_MS", "0"))
+    # Cache persistente de respostas do LLM (modelo + hash do prompt + versão do template/schema)
+    LLM_CACHE_ENABLED: bool = os.getenv("LLM_CACHE_ENABLED", "true").strip().lower() == "true"
+    LLM_CACHE_PATH: str = os.getenv("LLM_CACHE_PATH", "llm_cache.db")
+    LLM_CACHE_MAX_ENTRIES: int = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "50000"))
+    LLM_CACHE_TTL_S: float = float(os.getenv("LLM_CACHE_TTL_S", str(7 * 24 * 3600)))
+    LLM_SINGLE_FLIGHT: bool = os.getenv("LLM_SINGLE_FLIGHT", "true").strip().lower() == "true"  # prompts idênticos em voo → 1 chamada
+    # Compactação do corpo antes do LLM (opt-in): sem citações/avisos, frases mais informativas até o orçamento
+    # de tokens; 0 (padrão) = corte por caracteres
+    LLM_PROMPT_TOKEN_BUDGET: int = int(os.getenv("LLM_PROMPT_TOKEN_BUDGET", "0"))
+    # Preços (USD por 1M tokens entrada/saída) sobre a tabela padrão, ex.: "gpt-4.1-nano=0.10/0.40,meu-modelo=1/4"
+    LLM_PRICES: str = os.getenv("LLM_PRICES", "")
+    LLM_BATCH_SIZE: int = int(os.getenv("LLM_BATCH_SIZE", "8"))  # emails por completion no sync IMAP (1 = um por chamada)
 
     RB_MIN_CONF: float = float(os.getenv("RB_MIN_CONF", "0.70"))
+    # Cascata de classificadores, ex.: "rules:0.85,ml:0.9,llm" (etapa:confiança mínima para sair; vazio = modo antigo).
+    # Perfis podem sobrescrever com "cascade" no profiles.json.
+    CLASSIFIER_CASCADE: str = os.getenv("CLASSIFIER_CASCADE", "")
     MAX_BODY_CHARS: int = int(os.getenv("MAX_BODY_CHARS", "8000"))
 
+    # Identificação de idioma: n-gramas (NumPy) com langdetect como fallback de baixa confiança
+    LANG_ID_ENGINE: str = os.getenv("LANG_ID_ENGINE", "ngram").strip().lower()  # ngram | langdetect
+    LANG_ID_MIN_CONFIDENCE: float = float(os.getenv("LANG_ID_MIN_CONFIDENCE", "0.05"))
+    LANG_ID_PREFIX_CHARS: int = int(os.getenv("LANG_ID_PREFIX_CHARS", "1000"))
+
+    # Batch classification (/classify/batch)
+    MAX_BATCH_ITEMS: int = int(os.getenv("MAX_BATCH_ITEMS", "500"))
+
+    # Micro-batching de requisições concorrentes para o modelo ML
+    MICROBATCH_ENABLED: bool = os.getenv("MICROBATCH_ENABLED", "true").strip().lower() == "true"
+    MICROBATCH_MAX_SIZE: int = int(os.getenv("MICROBATCH_MAX_SIZE", "32"))
+    MICROBATCH_MAX_WAIT_MS: float = float(os.getenv("MICROBATCH_MAX_WAIT_MS", "5"))
+    MICROBATCH_MAX_QUEUE: int = int(os.getenv("MICROBATCH_MAX_QUEUE", "1024"))
+
+    # Cache de resultados (conteúdo normalizado + profile + versão do classificador)
+    RESULT_CACHE_ENABLED: bool = os.getenv("RESULT_CACHE_ENABLED", "true").strip().lower() == "true"
+    RESULT_CACHE_MAX_ENTRIES: int = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "10000"))
+    RESULT_CACHE_TTL_S: float = float(os.getenv("RESULT_CACHE_TTL_S", "3600"))
+    RESULT_CACHE_SQLITE_PATH: Optional[str] = os.getenv("RESULT_CACHE_SQLITE_PATH")  # vazio = só memória
+
+    # Perfis: compilados sob demanda (LRU) e recarregados quando profiles.json muda
+    PROFILES_PATH: Optional[str] = os.getenv("PROFILES_PATH")  # vazio = app/data/profiles.json
+    PROFILES_WATCH: bool = os.getenv("PROFILES_WATCH", "true").strip().lower() == "true"
+    PROFILES_CHECK_INTERVAL_S: float = float(os.getenv("PROFILES_CHECK_INTERVAL_S", "2"))
+    PROFILES_MAX_COMPILED: int = int(os.getenv("PROFILES_MAX_COMPILED", "10000"))
+
+    # Execução do caso de uso fora do event loop: inline | thread | process
+    EXECUTOR_KIND: str = os.getenv("EXECUTOR_KIND", "thread").strip().lower()
+    EXECUTOR_WORKERS: int = int(os.getenv("EXECUTOR_WORKERS", str(os.cpu_count() or 2)))
+    EXECUTOR_MAX_PENDING: int = int(os.getenv("EXECUTOR_MAX_PENDING", "0"))  # 0 = 4 × workers
+
+    # Banco de logs/usuários (SQLite): caminho ou URL, PRAGMAs aplicados a cada conexão e pool
+    DB_PATH: str = os.getenv("DB_PATH", "./data.db")
+    DB_WAL: bool = os.getenv("DB_WAL", "true").strip().lower() == "true"
+    DB_SYNCHRONOUS: str = os.getenv("DB_SYNCHRONOUS", "NORMAL").strip().upper()  # NORMAL | FULL | OFF
+    DB_MMAP_MB: int = int(os.getenv("DB_MMAP_MB", "256"))
+    DB_CACHE_MB: int = int(os.getenv("DB_CACHE_MB", "64"))
+    DB_BUSY_TIMEOUT_MS: int = int(os.getenv("DB_BUSY_TIMEOUT_MS", "5000"))
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "8"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "16"))
+
+    # Logs de classificação: fila + thread que grava em lote (uma transação por flush)
+    LOG_WRITE_BEHIND: bool = os.getenv("LOG_WRITE_BEHIND", "true").strip().lower() == "true"
+    LOG_WRITER_MAX_BATCH: int = int(os.getenv("LOG_WRITER_MAX_BATCH", "500"))
+    LOG_WRITER_MAX_WAIT_MS: float = float(os.getenv("LOG_WRITER_MAX_WAIT_MS", "200"))
+    LOG_WRITER_MAX_QUEUE: int = int(os.getenv("LOG_WRITER_MAX_QUEUE", "10000"))  # cheia = grava na thread do chamador
+    # Índice FTS5 dos logs (GET /logs/search), mantido por triggers; false = remove índice e triggers
+    LOG_SEARCH_FTS: bool = os.getenv("LOG_SEARCH_FTS", "true").strip().lower() == "true"
+    # só os N resultados mais recentes entram no ranking bm25 (limita termos muito comuns); 0 = todos
+    LOG_SEARCH_MAX_RANKED: int = int(os.getenv("LOG_SEARCH_MAX_RANKED", "10000"))
+
+    # Perfil (cProfile) por amostragem do /classify e do sync IMAP; desligado = custo de um if
+    PROFILING_ENABLED: bool = os.getenv("PROFILING_ENABLED", "false").strip().lower() == "true"
+    PROFILING_SAMPLE_RATE: float = float(os.getenv("PROFILING_SAMPLE_RATE", "0.01"))
+    PROFILING_ALLOW_HEADER: bool = os.getenv("PROFILING_ALLOW_HEADER", "false").strip().lower() == "true"  # X-Profile: 1
+    PROFILING_MAX_PROFILES: int = int(os.getenv("PROFILING_MAX_PROFILES", "64"))  # ring buffer em memória
+    PROFILING_DUMP_DIR: str = os.getenv("PROFILING_DUMP_DIR", "profiles")
+    PROFILING_ADMIN_TOKEN: str = os.getenv("PROFILING_ADMIN_TOKEN", "")  # X-Admin-Token dos endpoints de admin; vazio = fechados
+
 settings = Settings()
@@ -1,7 +1,9 @@
-from dataclasses import dataclass
+import hashlib
+import json
+from dataclasses import dataclass, field
 from enum import Enum
 from datetime import datetime 
-from typing import Optional, Dict , Any
+from typing import Optional, Dict , Any, List, FrozenSet, Sequence, Tuple, Union
 
 class Category(str, Enum):
     PRODUCTIVE = "productive"
@@ -13,6 +15,74 @@ class Email:
     body: str
     sender: Optional[str] = None
     
+@dataclass(frozen=True)
+class AnalyzedEmail:
+    """Análise de texto feita uma única vez por email e compartilhada pelo pipeline."""
+    lang: str
+    text: str                  # corpo normalizado (strip + lowercase)
+    tokens: List[str]          # sem stopwords do idioma
+    token_set: FrozenSet[str]
+    url_count: int
+    char_budget: int           # máximo de caracteres do corpo para etapas caras (ex.: prompt do LLM)
+    # ms gastos em preprocess/lang_detect/tokenize (instrumentação; fora de igualdade/hash)
+    timings_ms: Dict[str, float] = field(default_factory=dict, compare=False, hash=False)
+
+@dataclass(frozen=True)
+class CascadeStage:
+    """Etapa da cascata de classificação; `min_confidence` None = aceita sempre (etapa final)."""
+    name: str                  # "rules", "ml" ou "llm"
+    min_confidence: Optional[float] = None
+
+    @classmethod
+    def parse_plan(cls, spec: Union[str, Sequence[Any], None]) -> Tuple["CascadeStage", ...]:
+        """
+        "rules:0.85,ml:0.9,llm" ou lista de "rules:0.85" / {"stage": "rules",
+        "min_confidence": 0.85} → etapas na ordem dada.
+        """
+        if not spec:
+            return ()
+        items = spec.split(",") if isinstance(spec, str) else list(spec)
+        stages = []
+        for item in items:
+            if isinstance(item, dict):
+                name, conf = item.get("stage") or item.get("name"), item.get("min_confidence")
+            else:
+                name, _, conf = str(item).partition(":")
+            name = str(name or "").strip().lower()
+            if name:
+                conf = str(conf).strip() if conf is not None else ""
+                stages.append(cls(name=name, min_confidence=float(conf) if conf else None))
+        return tuple(stages)
+
+@dataclass(frozen=True)
+class CompiledProfile:
+    """Perfil pronto para classificar: keywords + sinônimos expandidos uma única vez."""
+    id: str
+    version: str               # hash do conteúdo; muda quando o perfil é editado
+    mood: Optional[str]
+    priority: Sequence[str]    # keywords + sinônimos em lowercase, sem repetição
+    cascade: Tuple[CascadeStage, ...] = ()  # ordem/limiares próprios do perfil; vazio = padrão do classificador
+    prompt_prefix: str = ""    # tom + keywords do prompt do LLM, montado na compilação pelo store
+    prompt_prefix_tokens: int = 0  # estimativa de tokens de `prompt_prefix`
+
+    @classmethod
+    def from_dict(cls, profile_id: str, profile: Dict[str, Any]) -> "CompiledProfile":
+        base = (profile.get("priority_keywords") or [])
+        syns = (profile.get("keyword_synonyms") or {})
+        expanded = set(map(str.lower, base))
+        for k, arr in syns.items():
+            expanded.add(str(k).lower())
+            for s in arr:
+                expanded.add(str(s).lower())
+        raw = json.dumps(profile, sort_keys=True, ensure_ascii=False, default=str)
+        return cls(
+            id=profile_id,
+            version=hashlib.sha256(raw.encode("utf-8")).hexdigest()[:12],
+            mood=profile.get("mood"),
+            priority=tuple(sorted(expanded)),
+            cascade=CascadeStage.parse_plan(profile.get("cascade")),
+        )
+
 @dataclass
 class ClassificationResult:
     category: Category
@@ -22,12 +92,20 @@ class ClassificationResult:
     prompt_tokens: Optional[int] = None
     completion_tokens: Optional[int] = None
     total_tokens: Optional[int] = None
-    extra: Optional[Dict[str, Any]] = None   
+    extra: Optional[Dict[str, Any]] = None
+    cost_usd: Optional[float] = None      # tabela de preços × tokens desta requisição
+    latency_ms: Optional[float] = None    # da entrada no caso de uso até o resultado final
     
+@dataclass
+class BatchItemResult:
+    index: int
+    result: Optional[ClassificationResult] = None
+    error: Optional[str] = None
+
 @dataclass
 class ClassificationLog:
     id: Optional[int] = None
-    created_at: datetime = datetime.utcnow()
+    created_at: datetime = field(default_factory=datetime.utcnow)
     source: str = "imap"
     subject: Optional[str] = None
     body_excerpt: Optional[str] = None
@@ -51,7 +129,93 @@ class ClassificationLog:
     error: Optional[str] = None
 
     extra: Optional[Dict[str, Any]] = None
-    
+
+
+# campos omitidos na projeção "summary" (listas/dashboards): os mais pesados por linha
+LOG_DETAIL_FIELDS = ("body_excerpt", "suggested_reply", "extra")
+LOG_FILTER_FIELDS = ("profile_id", "category", "source", "used_model")
+
+
+@dataclass(frozen=True)
+class LogQuery:
+    """
+    Página de logs, do mais recente para o mais antigo, por keyset em
+    (created_at, id): `after` é a chave do último item da página anterior,
+    então o custo não cresce com a profundidade (ao contrário de OFFSET).
+    """
+    limit: int = 50
+    after: Optional[Tuple[datetime, int]] = None
+    profile_id: Optional[str] = None
+    category: Optional[str] = None
+    source: Optional[str] = None
+    used_model: Optional[str] = None
+    since: Optional[datetime] = None
+    summary: bool = False  # sem LOG_DETAIL_FIELDS (ficam None)
+
+
+STATS_GRANULARITIES = ("hour", "day", "total")
+
+
+@dataclass(frozen=True)
+class StatsQuery:
+    """Agregados dos logs em [since, until), por `granularity` e pelas dimensões de `group_by`."""
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+    granularity: str = "hour"
+    group_by: Tuple[str, ...] = ()  # subconjunto de LOG_FILTER_FIELDS
+    profile_id: Optional[str] = None
+    category: Optional[str] = None
+    source: Optional[str] = None
+    used_model: Optional[str] = None
+
+    def __post_init__(self):
+        if self.granularity not in STATS_GRANULARITIES:
+            raise ValueError(f"granularity deve ser um de {STATS_GRANULARITIES}")
+        unknown = set(self.group_by) - set(LOG_FILTER_FIELDS)
+        if unknown:
+            raise ValueError(f"group_by aceita {LOG_FILTER_FIELDS}, não {sorted(unknown)}")
+
+
+@dataclass
+class LogPage:
+    items: List[ClassificationLog]
+    next_after: Optional[Tuple[datetime, int]] = None  # None = última página
+
+
+@dataclass(frozen=True)
+class LogSearchQuery:
+    """
+    Busca textual em subject, sender, body_excerpt e reason, do mais para o
+    menos relevante. Cada palavra de `text` precisa aparecer (a última também
+    como prefixo, se `prefix`); pontuação vira separador, sem operadores FTS.
+    Com `before_id`, a página é dos resultados mais antigos que a janela do
+    ranking: id < before_id, do mais recente ao mais antigo (`offset` ignorado).
+    """
+    text: str
+    limit: int = 20
+    offset: int = 0
+    before_id: Optional[int] = None
+    prefix: bool = True
+    profile_id: Optional[str] = None
+    category: Optional[str] = None
+    source: Optional[str] = None
+    used_model: Optional[str] = None
+    since: Optional[datetime] = None
+
+
+@dataclass
+class LogSearchHit:
+    log: ClassificationLog  # projeção "summary" (sem LOG_DETAIL_FIELDS)
+    score: float  # bm25 com sinal trocado: maior = mais relevante
+    snippet: str  # trecho da coluna que melhor casou, termos entre [ ]
+
+
+@dataclass
+class LogSearchPage:
+    items: List[LogSearchHit]
+    next_offset: Optional[int] = None  # próxima página dentro da janela do ranking
+    next_before_id: Optional[int] = None  # próxima página além da janela, por id; ambos None = última
+
 @dataclass
 class User:
     id: Optional[int]
@@ -1,2 +1,3 @@
 class UnsupportedFileType(Exception): ...
 class BadRequest(Exception): ...
+class Overloaded(Exception): ...
@@ -1,5 +1,6 @@
+import asyncio
 from typing import Protocol, List, Optional, Dict
-from .entities import Email, ClassificationResult
+from .entities import Email, ClassificationResult, AnalyzedEmail, CompiledProfile
 
 class TextExtractorPort(Protocol):
     def extract(self, raw_bytes: bytes) -> str: ...
@@ -7,6 +8,8 @@ class TextExtractorPort(Protocol):
 class TokenizerPort(Protocol):
     def preprocess(self, text: str) -> str: ...
     def tokenize(self, text: str) -> List[str]: ...
+    def analyze(self, email: Email) -> AnalyzedEmail: ...
+    def analyze_batch(self, emails: List[Email]) -> List[AnalyzedEmail]: ...
 
 class ClassifierPort(Protocol):
     def classify(
@@ -14,17 +17,64 @@ class ClassifierPort(Protocol):
         email: Email,
         tokens: List[str],
         mood: Optional[str] = None,
-        priority: Optional[list[str]] = None
+        priority: Optional[list[str]] = None,
+        analysis: Optional[AnalyzedEmail] = None
     ) -> ClassificationResult: ...
 
+    def classify_batch(
+        self,
+        emails: List[Email],
+        tokens: List[List[str]],
+        mood: Optional[str] = None,
+        priority: Optional[list[str]] = None,
+        analyses: Optional[List[AnalyzedEmail]] = None
+    ) -> List[ClassificationResult]:
+        """Classifica vários emails do mesmo perfil; resultados na ordem de entrada.
+
+        Implementação padrão chama `classify` item a item; adapters que
+        vetorizam a inferência (ex.: MLClassifier) sobrescrevem.
+        """
+        analyses = analyses or [None] * len(emails)
+        return [
+            self.classify(e, t, mood=mood, priority=priority, analysis=a)
+            for e, t, a in zip(emails, tokens, analyses)
+        ]
+
+    async def aclassify(
+        self,
+        email: Email,
+        tokens: List[str],
+        mood: Optional[str] = None,
+        priority: Optional[list[str]] = None,
+        analysis: Optional[AnalyzedEmail] = None
+    ) -> ClassificationResult:
+        """Versão assíncrona de `classify`.
+
+        Implementação padrão roda `classify` numa thread; adapters com I/O
+        (ex.: OpenAIClassifier) sobrescrevem com await nativo.
+        """
+        return await asyncio.to_thread(
+            self.classify, email, tokens, mood=mood, priority=priority, analysis=analysis
+        )
+
 class ReplySuggesterPort(Protocol):
-    def suggest(self, result: ClassificationResult, email: Email) -> str: ...
+    def suggest(
+        self, result: ClassificationResult, email: Email, analysis: Optional[AnalyzedEmail] = None
+    ) -> str: ...
 
 class ProfilePort(Protocol):
     def get_profile(self, profile_id: str) -> Optional[Dict]:
         ...
+
+    def get_compiled(self, profile_id: str) -> Optional[CompiledProfile]:
+        """Perfil com keywords expandidas; implementação padrão compila a cada chamada.
+
+        Adapters com cache (ex.: CompiledProfileStore) sobrescrevem.
+        """
+        profile = self.get_profile(profile_id)
+        return CompiledProfile.from_dict(profile_id, profile) if profile else None
         
-from .entities import ClassificationLog
+from .entities import ClassificationLog, LogPage, LogQuery, LogSearchPage, LogSearchQuery, StatsQuery
 
 class LogRepositoryPort(Protocol):
     """Porta para persistência de logs de classificação."""
@@ -33,13 +83,60 @@ class LogRepositoryPort(Protocol):
         """Salva um log de classificação no repositório."""
         ...
 
+    def save_many(self, logs: List[ClassificationLog]) -> List[ClassificationLog]:
+        """Salva vários logs numa única transação, preservando a ordem."""
+        ...
+
     def list_recent(self, limit: int = 50) -> List[ClassificationLog]:
         """Retorna os últimos logs de classificação."""
         ...
 
+    def list_page(self, query: LogQuery) -> LogPage:
+        """Página de logs filtrada, paginada por keyset (created_at, id) decrescente."""
+        ...
+
     def get_by_id(self, log_id: int) -> Optional[ClassificationLog]:
         """Busca um log específico pelo id."""
         ...
+
+    def update_result(self, log_id: int, log: ClassificationLog) -> Optional[ClassificationLog]:
+        """Substitui os campos de resultado de um log já salvo (ex.: LLM que chegou atrasado)."""
+        ...
+
+class LogStatsPort(Protocol):
+    """Agregados dos logs (contagens, tokens, custo, latência) sem varrer a tabela de logs."""
+
+    def stats(self, query: StatsQuery) -> List[Dict]:
+        """Uma linha por bucket × grupo, com count, tokens, cost_usd e avg_latency_ms."""
+        ...
+
+    def rebuild(self) -> int:
+        """Recalcula os agregados a partir dos logs (backfill); retorna quantas linhas gerou."""
+        ...
+
+class LogSearchPort(Protocol):
+    """Busca textual nos logs de classificação."""
+
+    def search(self, query: LogSearchQuery) -> LogSearchPage:
+        """Resultados por relevância, com trecho destacado de cada log."""
+        ...
+
+class ResultCachePort(Protocol):
+    """Cache de resultados de classificação endereçado pelo conteúdo do email."""
+
+    def key_for(self, email: Email, profile_id: str) -> str: ...
+
+    def get(self, key: str) -> Optional[ClassificationResult]: ...
+
+    def put(self, key: str, result: ClassificationResult) -> None: ...
+
+    def stats(self) -> Dict: ...
+
+class PricingPort(Protocol):
+    """Custo (USD) de uma chamada a partir do modelo e do uso de tokens."""
+
+    def cost(self, model: Optional[str], prompt_tokens: Optional[int], completion_tokens: Optional[int]) -> float: ...
+
 class EmailSourcePort(Protocol):
     def fetch_unread(self) -> list[Email]:
         """Busca emails não lidos da fonte (IMAP, Gmail API etc)."""
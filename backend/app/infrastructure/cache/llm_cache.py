@@ -0,0 +1,128 @@
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+
+class SqliteLlmResponseCache:
+    """
+    Cache persistente das respostas do LLM (argumentos já parseados do `emit` + usage).
+
+    - Chave: (modelo, hash do prompt, versão do schema). A versão é o hash do
+      template do prompt + tool schema (`openai_llm.PROMPT_VERSION`): ao abrir
+      o cache, entradas de outras versões são apagadas — mudar o template
+      invalida tudo sem passo manual.
+    - Expiração por `ttl_s`; tamanho limitado a `max_entries` (LRU por último
+      acesso), podado a cada 256 inserções.
+    - `get` só lê: último acesso e contagem de hits ficam em memória e vão
+      para o banco em lote, na transação do próximo `put` (ou a cada 256
+      chaves tocadas), nunca um UPDATE + commit por hit.
+    - Sobrevive a restarts e é compartilhado entre processos (WAL).
+    """
+
+    def __init__(
+        self,
+        path: str,
+        schema_version: str,
+        max_entries: int = 50_000,
+        ttl_s: float = 7 * 24 * 3600.0,
+    ):
+        self.path = path
+        self.schema_version = schema_version
+        self.max_entries = max(1, max_entries)
+        self.ttl_s = ttl_s
+        self._lock = threading.Lock()
+        self._puts_since_prune = 0
+        self._touched: Dict[Tuple[str, str], Tuple[float, int]] = {}  # (modelo, hash) → (último acesso, hits)
+        self._stats = {"hits": 0, "misses": 0, "puts": 0, "tokens_saved": 0, "invalidated": 0}
+
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            " model TEXT NOT NULL, prompt_hash TEXT NOT NULL, schema_version TEXT NOT NULL,"
+            " args TEXT NOT NULL, usage TEXT NOT NULL,"
+            " created_at REAL NOT NULL, expires_at REAL NOT NULL, accessed_at REAL NOT NULL,"
+            " hits INTEGER NOT NULL DEFAULT 0,"
+            " PRIMARY KEY (model, prompt_hash, schema_version))"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS ix_llm_cache_accessed ON llm_cache(accessed_at)")
+        cur = self._db.execute("DELETE FROM llm_cache WHERE schema_version != ?", (schema_version,))
+        self._stats["invalidated"] = cur.rowcount
+        self._db.commit()
+
+    def get(self, model: str, prompt_hash: str) -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """(argumentos do emit, usage original) ou None."""
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT args, usage, expires_at FROM llm_cache"
+                " WHERE model = ? AND prompt_hash = ? AND schema_version = ?",
+                (model, prompt_hash, self.schema_version),
+            ).fetchone()
+            if row is None or row[2] <= now:
+                self._stats["misses"] += 1
+                return None
+            _, hits = self._touched.get((model, prompt_hash), (now, 0))
+            self._touched[(model, prompt_hash)] = (now, hits + 1)
+            if len(self._touched) >= 256:
+                self._flush_touched()
+                self._db.commit()
+            args, usage = json.loads(row[0]), json.loads(row[1])
+            self._stats["hits"] += 1
+            self._stats["tokens_saved"] += int(usage.get("total_tokens") or 0)
+        return args, usage
+
+    def put(self, model: str, prompt_hash: str, args: Dict[str, Any], usage: Dict[str, Any]) -> None:
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO llm_cache"
+                " (model, prompt_hash, schema_version, args, usage, created_at, expires_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (model, prompt_hash, self.schema_version, json.dumps(args, ensure_ascii=False),
+                 json.dumps(usage or {}), now, now + self.ttl_s, now),
+            )
+            self._touched.pop((model, prompt_hash), None)
+            self._stats["puts"] += 1
+            self._puts_since_prune += 1
+            self._flush_touched()
+            if self._puts_since_prune >= 256:
+                self._puts_since_prune = 0
+                self._prune(now)
+            self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out = dict(self._stats)
+            out["size"] = self._db.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        lookups = out["hits"] + out["misses"]
+        out["hit_ratio"] = (out["hits"] / lookups) if lookups else 0.0
+        out["schema_version"] = self.schema_version
+        return out
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM llm_cache")
+            self._db.commit()
+
+    def _flush_touched(self) -> None:
+        if not self._touched:
+            return
+        self._db.executemany(
+            "UPDATE llm_cache SET accessed_at = max(accessed_at, ?), hits = hits + ?"
+            " WHERE model = ? AND prompt_hash = ? AND schema_version = ?",
+            [(at, n, model, prompt_hash, self.schema_version)
+             for (model, prompt_hash), (at, n) in self._touched.items()],
+        )
+        self._touched.clear()
+
+    def _prune(self, now: float) -> None:
+        self._db.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (now,))
+        self._db.execute(
+            "DELETE FROM llm_cache WHERE rowid IN ("
+            " SELECT rowid FROM llm_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
@@ -0,0 +1,206 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Optional, Dict, Any
+
+from app.domain.entities import Email, ClassificationResult, Category
+from app.domain.ports import ResultCachePort
+
+
+def classifier_fingerprint(classifier) -> str:
+    """
+    Versão do classificador para compor a chave do cache: tipos encadeados
+    (wrappers como MicroBatchingClassifier/SmartClassifier), modelo LLM e
+    identidade do artefato ML (caminho + mtime), quando existirem.
+    """
+    parts = []
+    seen = set()
+    stack = [classifier]
+    while stack:
+        c = stack.pop()
+        if c is None or id(c) in seen:
+            continue
+        seen.add(id(c))
+        parts.append(type(c).__name__)
+        for attr in ("default_model", "escalation_model"):
+            if getattr(c, attr, None):
+                parts.append(f"{attr}={getattr(c, attr)}")
+        compiled = getattr(c, "compiled", None)
+        path = getattr(compiled, "path", None) if compiled is not None else getattr(c, "model_path", None)
+        if path:
+            probe = os.path.join(path, "meta.json") if compiled is not None else path
+            try:
+                parts.append(f"{path}@{os.stat(probe).st_mtime_ns}")
+            except OSError:
+                parts.append(str(path))
+        plan = getattr(c, "default_plan", None)
+        if plan:
+            parts.append("plan=" + ",".join(f"{s.name}:{s.min_confidence}" for s in plan))
+        stack.extend(getattr(c, a, None) for a in ("inner", "rule_based", "llm"))
+        stack.extend((getattr(c, "stages", None) or {}).values())
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+def _norm(text: Optional[str]) -> str:
+    return " ".join(unicodedata.normalize("NFC", text or "").split())
+
+
+def _to_json(result: ClassificationResult) -> str:
+    d = dict(result.__dict__)
+    d["category"] = result.category.value
+    return json.dumps(d, ensure_ascii=False, default=str)
+
+
+def _from_json(raw: str) -> ClassificationResult:
+    d = json.loads(raw)
+    d["category"] = Category(d["category"])
+    return ClassificationResult(**d)
+
+
+class LruTtlResultCache(ResultCachePort):
+    """
+    Cache de resultados endereçado por conteúdo.
+
+    - Chave: sha256(subject, body, sender normalizados + profile_id + versão do classificador)
+    - Memória: LRU limitado a `max_entries`, expiração por `ttl_s`
+    - Disco (opcional): SQLite em `sqlite_path`, sobrevive a restarts e é
+      compartilhado entre workers de processo; consultado só em miss de memória
+    """
+
+    def __init__(
+        self,
+        classifier_version: str,
+        max_entries: int = 10_000,
+        ttl_s: float = 3600.0,
+        sqlite_path: Optional[str] = None,
+        max_disk_entries: int = 200_000,
+    ):
+        self.classifier_version = classifier_version
+        self.max_entries = max(1, max_entries)
+        self.ttl_s = ttl_s
+        self.max_disk_entries = max_disk_entries
+        self._mem: "OrderedDict[str, tuple[float, ClassificationResult]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "disk_hits": 0, "evictions": 0, "expired": 0}
+
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._puts_since_prune = 0
+        if sqlite_path:
+            self._db = sqlite3.connect(sqlite_path, check_same_thread=False, timeout=5.0)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS result_cache ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+                " expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS ix_result_cache_accessed ON result_cache(accessed_at)")
+            self._db.commit()
+
+    def key_for(self, email: Email, profile_id: str) -> str:
+        h = hashlib.sha256()
+        for part in (
+            _norm(email.subject),
+            _norm(email.body),
+            _norm(email.sender).lower(),
+            profile_id or "",
+            self.classifier_version,
+        ):
+            h.update(part.encode("utf-8"))
+            h.update(b"\x1f")
+        return h.hexdigest()
+
+    def get(self, key: str) -> Optional[ClassificationResult]:
+        now = time.time()
+        with self._lock:
+            entry = self._mem.get(key)
+            if entry is not None:
+                expires_at, result = entry
+                if expires_at > now:
+                    self._mem.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return result
+                del self._mem[key]
+                self._stats["expired"] += 1
+
+        result = self._disk_get(key, now)
+        with self._lock:
+            if result is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats["hits"] += 1
+            self._stats["disk_hits"] += 1
+        self._mem_put(key, result, now)
+        return result
+
+    def put(self, key: str, result: ClassificationResult) -> None:
+        now = time.time()
+        self._mem_put(key, result, now)
+        self._disk_put(key, result, now)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out = dict(self._stats)
+            out["size"] = len(self._mem)
+        lookups = out["hits"] + out["misses"]
+        out["hit_ratio"] = (out["hits"] / lookups) if lookups else 0.0
+        out["disk"] = self._db is not None
+        return out
+
+    def clear(self) -> None:
+        with self._lock:
+            self._mem.clear()
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("DELETE FROM result_cache")
+                self._db.commit()
+
+    # --- memória ---
+    def _mem_put(self, key: str, result: ClassificationResult, now: float) -> None:
+        with self._lock:
+            self._mem[key] = (now + self.ttl_s, result)
+            self._mem.move_to_end(key)
+            while len(self._mem) > self.max_entries:
+                self._mem.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    # --- disco ---
+    def _disk_get(self, key: str, now: float) -> Optional[ClassificationResult]:
+        if self._db is None:
+            return None
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT value, expires_at FROM result_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[1] <= now:
+                return None
+            self._db.execute("UPDATE result_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self._db.commit()
+        try:
+            return _from_json(row[0])
+        except Exception:
+            return None
+
+    def _disk_put(self, key: str, result: ClassificationResult, now: float) -> None:
+        if self._db is None:
+            return
+        with self._db_lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO result_cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, _to_json(result), now + self.ttl_s, now),
+            )
+            self._puts_since_prune += 1
+            if self._puts_since_prune >= 256:
+                self._puts_since_prune = 0
+                self._db.execute("DELETE FROM result_cache WHERE expires_at <= ?", (now,))
+                self._db.execute(
+                    "DELETE FROM result_cache WHERE key IN ("
+                    " SELECT key FROM result_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_disk_entries,),
+                )
+            self._db.commit()
@@ -0,0 +1,219 @@
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.domain.entities import Email, ClassificationResult, AnalyzedEmail, CascadeStage
+from app.domain.ports import ClassifierPort
+from app.infrastructure.classifiers.hedge import hedge
+
+
+class CascadeClassifier(ClassifierPort):
+    """
+    Cascata de classificadores em etapas (ex.: rules → ml → llm):
+    - cada etapa roda só se as anteriores não decidiram; sai cedo quando a
+      confiança atinge o `min_confidence` da etapa (a última aceita sempre)
+    - spam detectado encerra a cascata (etapas caras não mudam a decisão)
+    - etapas recebem o trabalho das anteriores: o LLM reusa o rule-based já
+      calculado em vez de refazê-lo
+    - ordem e limiares vêm do perfil (`cascade` no profiles.json) ou do padrão
+    - o resultado registra em `extra["cascade"]` as etapas que rodaram, onde
+      saiu, a confiança e o tempo (ms) de cada uma
+    - com orçamento de latência (`budget_s`, rota assíncrona), a etapa de I/O
+      que atrasar cede à anterior (provisória) e termina em segundo plano
+    """
+
+    accepts_cascade = True
+    accepts_budget = True
+
+    def __init__(self, stages: Dict[str, ClassifierPort], default_plan: Sequence[CascadeStage]):
+        self.stages = dict(stages)
+        self.default_plan = tuple(s for s in default_plan if s.name in self.stages)
+        if not self.default_plan:
+            raise ValueError(f"Cascata sem etapas disponíveis (configuradas: {sorted(self.stages)})")
+        self._warned: set = set()
+
+    @property
+    def prefers_async(self) -> bool:
+        return any(getattr(self.stages[s.name], "prefers_async", False) for s in self.default_plan)
+
+    def plan_for(self, cascade: Optional[Sequence[CascadeStage]] = None) -> Tuple[CascadeStage, ...]:
+        """Plano do perfil sem as etapas indisponíveis; vazio → plano padrão."""
+        if not cascade:
+            return self.default_plan
+        plan = []
+        for stage in cascade:
+            if stage.name in self.stages:
+                plan.append(stage)
+            elif stage.name not in self._warned:
+                self._warned.add(stage.name)
+                print(f"[WARN] Etapa de cascata '{stage.name}' não configurada; ignorada")
+        return tuple(plan) or self.default_plan
+
+    def classify(
+        self,
+        email: Email,
+        tokens: List[str],
+        mood: Optional[str] = None,
+        priority: Optional[list[str]] = None,
+        analysis: Optional[AnalyzedEmail] = None,
+        cascade: Optional[Sequence[CascadeStage]] = None,
+    ) -> ClassificationResult:
+        plan = self.plan_for(cascade)
+        prior: Dict[str, ClassificationResult] = {}
+        trace: List[dict] = []
+        for n, stage in enumerate(plan):
+            t0 = time.perf_counter()
+            res = self.stages[stage.name].classify(
+                email, tokens, mood=mood, priority=priority, analysis=analysis,
+                **self._reuse(stage, prior),
+            )
+            if self._record(stage, res, time.perf_counter() - t0, n == len(plan) - 1, prior, trace):
+                break
+        return self._final(prior, trace)
+
+    async def aclassify(
+        self,
+        email: Email,
+        tokens: List[str],
+        mood: Optional[str] = None,
+        priority: Optional[list[str]] = None,
+        analysis: Optional[AnalyzedEmail] = None,
+        cascade: Optional[Sequence[CascadeStage]] = None,
+        budget_s: Optional[float] = None,
+        on_late: Optional[Callable[[ClassificationResult], Any]] = None,
+    ) -> ClassificationResult:
+        started = time.perf_counter()
+        plan = self.plan_for(cascade)
+        prior: Dict[str, ClassificationResult] = {}
+        trace: List[dict] = []
+        kwargs = dict(mood=mood, priority=priority, analysis=analysis)
+        for n, stage in enumerate(plan):
+            if budget_s is not None and prior and getattr(self.stages[stage.name], "prefers_async", False):
+                # etapa de I/O (LLM) com orçamento: se atrasar, a etapa anterior responde provisoriamente
+                return await hedge(
+                    self._final(prior, trace),
+                    self._arun(plan, n, email, tokens, kwargs, prior, trace),
+                    budget_s,
+                    answered_by=trace[-1]["stage"],
+                    on_late=on_late,
+                    started=started,
+                )
+            if await self._astep(plan, n, email, tokens, kwargs, prior, trace):
+                break
+        return self._final(prior, trace)
+
+    async def _arun(self, plan, start, email, tokens, kwargs, prior, trace) -> ClassificationResult:
+        for n in range(start, len(plan)):
+            if await self._astep(plan, n, email, tokens, kwargs, prior, trace):
+                break
+        return self._final(prior, trace)
+
+    async def _astep(self, plan, n, email, tokens, kwargs, prior, trace) -> bool:
+        stage = plan[n]
+        clf = self.stages[stage.name]
+        t0 = time.perf_counter()
+        if stage.name == "rules":
+            res = clf.classify(email, tokens, **kwargs)  # uma varredura: roda no loop
+        else:
+            res = await clf.aclassify(email, tokens, **kwargs, **self._reuse(stage, prior))
+        return self._record(stage, res, time.perf_counter() - t0, n == len(plan) - 1, prior, trace)
+
+    def classify_batch(
+        self,
+        emails: List[Email],
+        tokens: List[List[str]],
+        mood: Optional[str] = None,
+        priority: Optional[list[str]] = None,
+        analyses: Optional[List[AnalyzedEmail]] = None,
+        cascade: Optional[Sequence[CascadeStage]] = None,
+    ) -> List[ClassificationResult]:
+        """Uma `classify_batch` por etapa só com os emails ainda indecisos; tempo por email é o do lote rateado."""
+        plan = self.plan_for(cascade)
+        analyses = analyses or [None] * len(emails)
+        priors: List[Dict[str, ClassificationResult]] = [{} for _ in emails]
+        traces: List[List[dict]] = [[] for _ in emails]
+        results: List[Optional[ClassificationResult]] = [None] * len(emails)
+        pending = list(range(len(emails)))
+        for n, stage in enumerate(plan):
+            if not pending:
+                break
+            clf = self.stages[stage.name]
+            reuse = {}
+            if stage.name != "rules" and getattr(clf, "accepts_rule_result", False):
+                reuse = {"rule_results": [priors[i].get("rules") for i in pending]}
+            t0 = time.perf_counter()
+            batch = clf.classify_batch(
+                [emails[i] for i in pending],
+                [tokens[i] for i in pending],
+                mood=mood,
+                priority=priority,
+                analyses=[analyses[i] for i in pending],
+                **reuse,
+            )
+            each = (time.perf_counter() - t0) / len(pending)
+            still = []
+            for i, res in zip(pending, batch):
+                if self._record(stage, res, each, n == len(plan) - 1, priors[i], traces[i]):
+                    results[i] = self._final(priors[i], traces[i])
+                else:
+                    still.append(i)
+            pending = still
+        return results
+
+    def _reuse(self, stage: CascadeStage, prior: Dict[str, ClassificationResult]) -> dict:
+        # etapas que aceitam o rule-based pronto (OpenAIClassifier) não o recalculam
+        if stage.name != "rules" and "rules" in prior and getattr(self.stages[stage.name], "accepts_rule_result", False):
+            return {"rule_result": prior["rules"]}
+        return {}
+
+    def _record(
+        self,
+        stage: CascadeStage,
+        res: ClassificationResult,
+        elapsed_s: float,
+        last: bool,
+        prior: Dict[str, ClassificationResult],
+        trace: List[dict],
+    ) -> bool:
+        """Guarda o resultado da etapa e diz se a cascata para aqui."""
+        extra = res.extra or {}
+        failed = self._failed(res)
+        confidence = extra.get("confidence")
+        if last or extra.get("is_spam"):
+            accepted = True
+        elif failed:
+            accepted = False
+        else:
+            accepted = stage.min_confidence is None or float(confidence or 0.0) >= stage.min_confidence
+        prior[stage.name] = res
+        trace.append({
+            "stage": stage.name,
+            "ms": round(elapsed_s * 1000, 3),
+            "confidence": confidence,
+            "accepted": accepted,
+        })
+        return accepted
+
+    @staticmethod
+    def _failed(res: ClassificationResult) -> bool:
+        # o LLM falha "com resposta": devolve o rule-based marcado com `llm_error`
+        extra = res.extra or {}
+        return bool(extra.get("error") or extra.get("llm_error"))
+
+    @classmethod
+    def _final(cls, prior: Dict[str, ClassificationResult], trace: List[dict]) -> ClassificationResult:
+        res = prior[trace[-1]["stage"]]
+        extra = dict(res.extra or {})
+        if cls._failed(res):
+            # última etapa falhou: fica a etapa anterior mais recente que funcionou
+            for step in reversed(trace[:-1]):
+                earlier = prior[step["stage"]]
+                if not cls._failed(earlier):
+                    res, extra = earlier, {**(earlier.extra or {}), "cascade_error": trace[-1]["stage"]}
+                    break
+        extra["cascade"] = {
+            "ran": [t["stage"] for t in trace],
+            "exit": trace[-1]["stage"],
+            "timings_ms": {t["stage"]: t["ms"] for t in trace},
+            "stages": list(trace),
+        }
+        return type(res)(**{**res.__dict__, "extra": extra})
@@ -0,0 +1,205 @@
+"""
+Artefato compilado (NumPy puro) para TF-IDF + modelo linear.
+
+Formato em disco (diretório, ex.: models/compiled/):
+- meta.json          → parâmetros do analisador, tipo de modelo, classes, intercept
+- vocab_hash.npy     → uint64 ordenado: hash blake2b-64 de cada termo do vocabulário
+- vocab_index.npy    → int32: coluna da feature correspondente a cada hash
+- idf.npy            → float64 (n_features,)
+- coef.npy           → float64 (n_rows, n_features)
+
+Os .npy são abertos com mmap_mode="r": workers uvicorn no mesmo host
+compartilham as páginas via page cache em vez de cada um ter sua cópia
+de um dict Python com o vocabulário.
+"""
+import hashlib
+import json
+import math
+import re
+from pathlib import Path
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+FORMAT_VERSION = 1
+
+KIND_DECISION = "decision"   # LinearSVC & cia: confiança = |decision|
+KIND_LOGISTIC = "logistic"   # LogisticRegression/SGD(log): confiança = max(sigmoid)
+KIND_NB = "nb"               # MultinomialNB/ComplementNB: softmax do joint log-likelihood
+
+
+def term_hash(term: str) -> int:
+    return int.from_bytes(hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def compile_from_sklearn(model, vectorizer, out_dir) -> Path:
+    """
+    Exporta um TfidfVectorizer + modelo linear binário já treinados.
+    Só lê atributos dos objetos; não importa scikit-learn.
+    """
+    if getattr(vectorizer, "analyzer", "word") != "word" or callable(getattr(vectorizer, "tokenizer", None)):
+        raise ValueError("Só vetorizadores com analyzer='word' e tokenizer padrão são suportados")
+    if getattr(vectorizer, "strip_accents", None) or callable(getattr(vectorizer, "preprocessor", None)):
+        raise ValueError("strip_accents/preprocessor customizados não são suportados")
+
+    classes = [c.item() if hasattr(c, "item") else c for c in model.classes_]
+    if len(classes) != 2:
+        raise ValueError("Só modelos binários são suportados")
+
+    if hasattr(model, "feature_log_prob_"):
+        kind = KIND_NB
+        coef = np.asarray(model.feature_log_prob_, dtype=np.float64)
+        intercept = [float(x) for x in model.class_log_prior_]
+    elif hasattr(model, "coef_"):
+        kind = KIND_LOGISTIC if hasattr(model, "predict_proba") else KIND_DECISION
+        coef = np.asarray(model.coef_, dtype=np.float64).reshape(1, -1)
+        intercept = [float(np.ravel(model.intercept_)[0])]
+    else:
+        raise ValueError(f"Modelo {type(model).__name__} não é linear")
+
+    vocab = vectorizer.vocabulary_
+    terms = list(vocab.keys())
+    hashes = np.fromiter((term_hash(t) for t in terms), dtype=np.uint64, count=len(terms))
+    index = np.fromiter((vocab[t] for t in terms), dtype=np.int32, count=len(terms))
+    order = np.argsort(hashes)
+    hashes, index = hashes[order], index[order]
+    if len(hashes) > 1 and np.any(hashes[1:] == hashes[:-1]):
+        raise ValueError("Colisão de hash no vocabulário")
+
+    idf = np.asarray(getattr(vectorizer, "idf_", np.ones(len(vocab))), dtype=np.float64)
+    stop = vectorizer.get_stop_words()
+
+    meta = {
+        "format_version": FORMAT_VERSION,
+        "kind": kind,
+        "model_type": type(model).__name__,
+        "classes": classes,
+        "intercept": intercept,
+        "n_features": int(coef.shape[1]),
+        "lowercase": bool(vectorizer.lowercase),
+        "token_pattern": vectorizer.token_pattern,
+        "ngram_range": list(vectorizer.ngram_range),
+        "stop_words": sorted(stop) if stop else [],
+        "use_idf": bool(getattr(vectorizer, "use_idf", True)),
+        "sublinear_tf": bool(getattr(vectorizer, "sublinear_tf", False)),
+        "norm": getattr(vectorizer, "norm", "l2"),
+        "binary": bool(getattr(vectorizer, "binary", False)),
+    }
+
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    np.save(out / "vocab_hash.npy", hashes)
+    np.save(out / "vocab_index.npy", index)
+    np.save(out / "idf.npy", idf)
+    np.save(out / "coef.npy", np.ascontiguousarray(coef))
+    with open(out / "meta.json", "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    return out
+
+
+class CompiledLinearModel:
+    """Scorer NumPy-only equivalente a vectorizer.transform + model.predict(_proba)."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path / "meta.json", "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Versão de artefato não suportada: {meta.get('format_version')}")
+
+        self.meta = meta
+        self.kind = meta["kind"]
+        self.model_type = meta["model_type"]
+        self.classes = np.asarray(meta["classes"])
+        self.intercept = np.asarray(meta["intercept"], dtype=np.float64)
+        self.lowercase = meta["lowercase"]
+        self.token_re = re.compile(meta["token_pattern"])
+        self.min_n, self.max_n = meta["ngram_range"]
+        self.stop_words = frozenset(meta["stop_words"])
+        self.use_idf = meta["use_idf"]
+        self.sublinear_tf = meta["sublinear_tf"]
+        self.norm = meta["norm"]
+        self.binary = meta["binary"]
+
+        self.vocab_hash = np.load(self.path / "vocab_hash.npy", mmap_mode="r")
+        self.vocab_index = np.load(self.path / "vocab_index.npy", mmap_mode="r")
+        self.idf = np.load(self.path / "idf.npy", mmap_mode="r")
+        self.coef = np.load(self.path / "coef.npy", mmap_mode="r")
+
+    @classmethod
+    def exists(cls, path) -> bool:
+        return path is not None and (Path(path) / "meta.json").is_file()
+
+    def _terms(self, text: str) -> List[str]:
+        if self.lowercase:
+            text = text.lower()
+        tokens = [t for t in self.token_re.findall(text) if t not in self.stop_words]
+        terms = list(tokens) if self.min_n == 1 else []
+        for n in range(max(2, self.min_n), min(self.max_n, len(tokens)) + 1):
+            terms.extend(" ".join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+        return terms
+
+    def _features(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Retorna (colunas, pesos tf-idf normalizados) de um documento."""
+        terms = self._terms(text)
+        if not terms:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float64)
+
+        h = np.fromiter((term_hash(t) for t in terms), dtype=np.uint64, count=len(terms))
+        pos = np.searchsorted(self.vocab_hash, h)
+        pos[pos >= len(self.vocab_hash)] = 0
+        known = self.vocab_hash[pos] == h
+        cols, tf = np.unique(self.vocab_index[pos[known]], return_counts=True)
+
+        w = tf.astype(np.float64)
+        if self.binary:
+            w[:] = 1.0
+        elif self.sublinear_tf:
+            w = 1.0 + np.log(w)
+        if self.use_idf:
+            w *= self.idf[cols]
+        if self.norm == "l2":
+            n = math.sqrt(float(w @ w))
+        elif self.norm == "l1":
+            n = float(np.abs(w).sum())
+        else:
+            n = 0.0
+        if n > 0:
+            w /= n
+        return cols, w
+
+    def term_idf(self, terms: Sequence[str]) -> np.ndarray:
+        """IDF de cada termo (NaN para termos fora do vocabulário)."""
+        out = np.full(len(terms), np.nan, dtype=np.float64)
+        if not len(terms) or not len(self.vocab_hash):
+            return out
+        h = np.fromiter((term_hash(t) for t in terms), dtype=np.uint64, count=len(terms))
+        pos = np.searchsorted(self.vocab_hash, h)
+        pos[pos >= len(self.vocab_hash)] = 0
+        known = self.vocab_hash[pos] == h
+        out[known] = self.idf[self.vocab_index[pos[known]]]
+        return out
+
+    def decision(self, texts: Sequence[str]) -> np.ndarray:
+        """Scores lineares (n_docs, n_rows) = X·coefᵀ + intercept."""
+        out = np.empty((len(texts), self.coef.shape[0]), dtype=np.float64)
+        for i, text in enumerate(texts):
+            cols, w = self._features(text)
+            out[i] = self.coef[:, cols] @ w if len(cols) else 0.0
+        return out + self.intercept
+
+    def predict(self, texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Retorna (predições, confianças) com a mesma semântica do MLClassifier."""
+        scores = self.decision(texts)
+        if self.kind == KIND_NB:
+            jll = scores - scores.max(axis=1, keepdims=True)
+            proba = np.exp(jll)
+            proba /= proba.sum(axis=1, keepdims=True)
+            return self.classes[proba.argmax(axis=1)], proba.max(axis=1)
+
+        d = scores[:, 0]
+        positive = (d > 0).astype(int)
+        if self.kind == KIND_LOGISTIC:
+            p1 = 1.0 / (1.0 + np.exp(-d))
+            return self.classes[positive], np.maximum(p1, 1.0 - p1)
+        return self.classes[positive], np.abs(d)
@@ -0,0 +1,95 @@
+import asyncio
+import inspect
+import time
+from typing import Any, Awaitable, Callable, Optional, Set
+
+from app.domain.entities import ClassificationResult
+
+# tarefas do LLM que seguem em segundo plano após a resposta provisória
+# (referência forte: o event loop só guarda referências fracas)
+_background: Set[asyncio.Task] = set()
+
+
+def _with_hedge(result: ClassificationResult, info: dict) -> ClassificationResult:
+    return type(result)(**{**result.__dict__, "extra": {**(result.extra or {}), "hedge": info}})
+
+
+async def hedge(
+    fast: ClassificationResult,
+    slow: Awaitable[ClassificationResult],
+    budget_s: float,
+    answered_by: str,
+    on_late: Optional[Callable[[ClassificationResult], Any]] = None,
+    started: Optional[float] = None,
+) -> ClassificationResult:
+    """
+    Aguarda `slow` (LLM) até `budget_s` contado desde `started` (perf_counter
+    do início da requisição; padrão = agora):
+    - terminou no prazo → resultado do LLM
+    - estourou → `fast` marcado como provisório, na hora; o LLM segue em
+      segundo plano e, ao terminar, `on_late` recebe o resultado definitivo
+      (com o atraso além do orçamento em `extra["hedge"]["llm_late_ms"]`);
+      se `on_late` devolver um awaitable, ele é aguardado na mesma tarefa
+      de segundo plano (e `drain()` espera por ele)
+    Falha/`llm_error` do LLM atrasado mantém a resposta provisória.
+    """
+    budget_ms = round(budget_s * 1000, 3)
+    started = time.perf_counter() if started is None else started
+    t0 = time.perf_counter()
+    task = asyncio.ensure_future(slow)
+    done, _ = await asyncio.wait({task}, timeout=max(0.0, budget_s - (t0 - started)))
+    if done:
+        return _with_hedge(task.result(), {
+            "answered_by": "llm",
+            "provisional": False,
+            "budget_ms": budget_ms,
+            "llm_ms": round((time.perf_counter() - t0) * 1000, 3),
+        })
+
+    provisional = _with_hedge(fast, {
+        "answered_by": answered_by,
+        "provisional": True,
+        "budget_ms": budget_ms,
+        "llm_pending": True,
+    })
+
+    async def finish():
+        try:
+            res, error = await task, None
+        except Exception as e:
+            res, error = None, str(e) or type(e).__name__
+        now = time.perf_counter()
+        llm_ms = round((now - t0) * 1000, 3)
+        if res is not None and (res.extra or {}).get("llm_error"):
+            error = res.extra["llm_error"]
+        info = {
+            "budget_ms": budget_ms,
+            "llm_ms": llm_ms,
+            "llm_late_ms": round((now - started) * 1000 - budget_ms, 3),
+            "late": True,
+            "provisional": False,
+            "provisional_category": fast.category.value,
+            "provisional_model": fast.used_model,
+        }
+        if error:
+            final = _with_hedge(fast, {**info, "answered_by": answered_by, "llm_error": error})
+        else:
+            final = _with_hedge(res, {**info, "answered_by": "llm"})
+        if on_late is not None:
+            try:
+                applied = on_late(final)
+                if inspect.isawaitable(applied):
+                    await applied
+            except Exception as e:
+                print(f"[WARN] Falha ao aplicar resultado atrasado do LLM: {e}")
+
+    bg = asyncio.ensure_future(finish())
+    _background.add(bg)
+    bg.add_done_callback(_background.discard)
+    return provisional
+
+
+async def drain() -> None:
+    """Aguarda as conclusões pendentes em segundo plano (testes/desligamento)."""
+    while _background:
+        await asyncio.gather(*list(_background), return_exceptions=True)
@@ -0,0 +1,165 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from app.domain.entities import Email, ClassificationResult, AnalyzedEmail
+from app.domain.errors import Overloaded
+from app.domain.ports import ClassifierPort
+from app.metrics import histogram
+
+
+BATCH_SIZE = histogram(
+    "classifier_microbatch_size",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256),
+    help="Emails por chamada classify_batch do micro-batcher",
+)
+QUEUE_WAIT = histogram(
+    "classifier_microbatch_queue_wait_seconds",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25),
+    help="Tempo entre o enfileiramento e o início da inferência",
+)
+
+
+@dataclass
+class _Pending:
+    email: Email
+    tokens: List[str]
+    mood: Optional[str]
+    priority: Optional[list[str]]
+    analysis: Optional[AnalyzedEmail] = None
+    future: Future = field(default_factory=Future)
+    enqueued_at: float = field(default_factory=time.perf_counter)
+
+
+class MicroBatchingClassifier(ClassifierPort):
+    """
+    Agrupa chamadas concorrentes de `classify` numa única `classify_batch`
+    do classificador interno (ex.: MLClassifier).
+
+    - Uma thread consome a fila e dispara o lote quando atinge `max_batch_size`
+      ou quando `max_wait_ms` expira desde o primeiro item.
+    - Só espera (linger) se o lote anterior teve mais de um item: em baixa
+      carga a requisição segue imediatamente, sem somar latência.
+    - Fila limitada em `max_queue`; cheia → `Overloaded`.
+    """
+
+    def __init__(
+        self,
+        inner: ClassifierPort,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+        max_queue: int = 1024,
+    ):
+        self.inner = inner
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._queue: "queue.Queue[Optional[_Pending]]" = queue.Queue(maxsize=max(1, max_queue))
+        self._linger = False
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def classify(
+        self,
+        email: Email,
+        tokens: List[str],
+        mood: Optional[str] = None,
+        priority: Optional[list[str]] = None,
+        analysis: Optional[AnalyzedEmail] = None
+    ) -> ClassificationResult:
+        item = _Pending(email=email, tokens=tokens, mood=mood, priority=priority, analysis=analysis)
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            raise Overloaded("Fila de classificação cheia, tente novamente.")
+        return item.future.result()
+
+    def classify_batch(
+        self,
+        emails: List[Email],
+        tokens: List[List[str]],
+        mood: Optional[str] = None,
+        priority: Optional[list[str]] = None,
+        analyses: Optional[List[AnalyzedEmail]] = None
+    ) -> List[ClassificationResult]:
+        # já é um lote: vai direto, sem passar pela fila
+        return self.inner.classify_batch(emails, tokens, mood=mood, priority=priority, analyses=analyses)
+
+    def close(self) -> None:
+        if self._thread and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        self._thread = None
+
+    def _ensure_worker(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if not self._thread or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._worker, daemon=True)
+                self._thread.start()
+
+    def _collect(self, first: _Pending) -> List[_Pending]:
+        batch = [first]
+        deadline = first.enqueued_at + self.max_wait if self._linger else None
+        while len(batch) < self.max_batch_size:
+            try:
+                nxt = self._queue.get_nowait()
+            except queue.Empty:
+                if deadline is None:
+                    break
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    nxt = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            if nxt is None:
+                self._queue.put(None)  # repassa o sinal de parada para o loop principal
+                break
+            batch.append(nxt)
+        return batch
+
+    def _worker(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = self._collect(first)
+            self._linger = len(batch) > 1
+
+            started = time.perf_counter()
+            BATCH_SIZE.observe(len(batch))
+            for p in batch:
+                QUEUE_WAIT.observe(started - p.enqueued_at)
+
+            # mood/priority fazem parte da assinatura: um classify_batch por perfil
+            groups: dict = {}
+            for p in batch:
+                key = (p.mood, getattr(p.priority, "key", None) or frozenset(p.priority or ()))
+                groups.setdefault(key, []).append(p)
+
+            for items in groups.values():
+                try:
+                    results = self.inner.classify_batch(
+                        [p.email for p in items],
+                        [p.tokens for p in items],
+                        mood=items[0].mood,
+                        priority=items[0].priority,
+                        analyses=[p.analysis for p in items],
+                    )
+                    if len(results) != len(items):
+                        # zip truncaria em silêncio e os futures sem resultado nunca resolveriam
+                        raise RuntimeError(
+                            f"classify_batch returned {len(results)} results for {len(items)} emails"
+                        )
+                    for p, r in zip(items, results):
+                        p.future.set_result(r)
+                except Exception as e:
+                    for p in items:
+                        if not p.future.done():
+                            p.future.set_exception(e)
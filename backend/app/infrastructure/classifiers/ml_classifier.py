@@ -1,30 +1,54 @@
 import os
 import joblib
-from typing import List, Optional
+from typing import Any, List, Optional
 from pathlib import Path
 
-from app.domain.entities import Email, ClassificationResult, Category
+from app.domain.entities import Email, ClassificationResult, Category, AnalyzedEmail
 from app.domain.ports import ClassifierPort
+from app.infrastructure.classifiers.compiled_linear import CompiledLinearModel
 
 
 class MLClassifier(ClassifierPort):
     """
     Machine Learning classifier using pre-trained scikit-learn model.
     Uses the phishing detection model trained on email data.
+
+    When a compiled artifact (scripts/compile_model.py) is available it is
+    preferred: NumPy-only scoring from memory-mapped arrays, no unpickling.
     """
+
+    compiled: Optional[CompiledLinearModel] = None
     
-    def __init__(self, model_path: str = None, vectorizer_path: str = None):
+    def __init__(
+        self,
+        model_path: str = None,
+        vectorizer_path: str = None,
+        compiled_path: str = None,
+        use_compiled: bool = True,
+    ):
         """
         Initialize the ML classifier with trained model and vectorizer.
         
         Args:
             model_path: Path to the trained model .pkl file
             vectorizer_path: Path to the TF-IDF vectorizer .pkl file
+            compiled_path: Directory with the compiled artifact (meta.json + .npy)
+            use_compiled: Prefer the compiled artifact when it exists
         """
         # Default paths relative to backend root
         backend_root = Path(__file__).parent.parent.parent.parent
         self.model_path = model_path or os.path.join(backend_root, "models", "best_phishing_model.pkl")
         self.vectorizer_path = vectorizer_path or os.path.join(backend_root, "models", "tfidf_vectorizer.pkl")
+        self.compiled_path = compiled_path or os.path.join(backend_root, "models", "compiled")
+
+        if use_compiled and CompiledLinearModel.exists(self.compiled_path):
+            try:
+                self.compiled = CompiledLinearModel(self.compiled_path)
+                self.model = self.vectorizer = None
+                print(f"✓ Compiled ML model loaded from {self.compiled_path}")
+                return
+            except Exception as e:
+                print(f"✗ Failed to load compiled ML model, using pickles: {e}")
         
         # Load model and vectorizer
         try:
@@ -40,7 +64,8 @@ class MLClassifier(ClassifierPort):
         email: Email,
         tokens: List[str],
         mood: Optional[str] = None,
-        priority: Optional[list[str]] = None
+        priority: Optional[list[str]] = None,
+        analysis: Optional[AnalyzedEmail] = None
     ) -> ClassificationResult:
         """
         Classify email using the trained ML model.
@@ -50,72 +75,141 @@ class MLClassifier(ClassifierPort):
             tokens: Preprocessed tokens (not used directly by this classifier)
             mood: Optional mood for reply generation
             priority: Optional priority keywords (not used by this classifier)
+            analysis: Shared text analysis (not used by this classifier)
             
         Returns:
             ClassificationResult with category, reason, and suggested reply
         """
-        try:
+        return self.classify_batch([email], [tokens], mood=mood, priority=priority)[0]
+
+    def classify_batch(
+        self,
+        emails: List[Email],
+        tokens: List[List[str]],
+        mood: Optional[str] = None,
+        priority: Optional[list[str]] = None,
+        analyses: Optional[List[AnalyzedEmail]] = None
+    ) -> List[ClassificationResult]:
+        """
+        Classify several emails with a single TF-IDF transform and a single
+        model call over the whole sparse matrix.
+        
+        Args:
+            emails: Email objects, all from the same profile
+            tokens: Preprocessed tokens per email (not used by this classifier)
+            mood: Optional mood for reply generation
+            priority: Optional priority keywords (not used by this classifier)
+            analyses: Shared text analyses (not used by this classifier)
+            
+        Returns:
+            One ClassificationResult per email, in input order
+        """
+        results: List[Optional[ClassificationResult]] = [None] * len(emails)
+        texts: List[str] = []
+        positions: List[int] = []
+
+        for i, email in enumerate(emails):
             # Combine subject and body for classification
             email_text = f"{email.subject or ''} {email.body or ''}".strip().lower()
-            
             if not email_text:
-                return ClassificationResult(
+                results[i] = ClassificationResult(
                     category=Category.UNPRODUCTIVE,
                     reason="Empty email content",
                     suggested_reply="",
                     used_model="ml_classifier",
                     extra={"confidence": 0.0, "ml_prediction": "unknown"}
                 )
-            
-            # Transform text using TF-IDF vectorizer
-            text_vectorized = self.vectorizer.transform([email_text])
-            
-            # Get prediction
-            prediction = self.model.predict(text_vectorized)[0]
-            
-            # Get confidence score if available
-            confidence = 0.0
-            if hasattr(self.model, 'predict_proba'):
-                proba = self.model.predict_proba(text_vectorized)[0]
-                confidence = float(max(proba))
-            elif hasattr(self.model, 'decision_function'):
-                # For SVM
-                decision = self.model.decision_function(text_vectorized)[0]
-                confidence = float(abs(decision))
-            
-            # Map prediction to category
-            # Assuming 1 = phishing/unproductive, 0 = ham/productive
-            if prediction == 1:
-                category = Category.UNPRODUCTIVE
-                reason = f"ML model detected potential phishing/spam content (confidence: {confidence:.2f})"
-                suggested_reply = ""
+                continue
+            texts.append(email_text)
+            positions.append(i)
+
+        if not texts:
+            return results
+
+        try:
+            if self.compiled is not None:
+                predictions, confidences = self.compiled.predict(texts)
             else:
-                category = Category.PRODUCTIVE
-                reason = f"ML model classified as legitimate email (confidence: {confidence:.2f})"
-                # Generate simple reply based on mood
-                suggested_reply = self._generate_reply(email, mood)
-            
-            return ClassificationResult(
-                category=category,
-                reason=reason,
-                suggested_reply=suggested_reply,
-                used_model="ml_classifier",
-                extra={
-                    "confidence": confidence,
-                    "ml_prediction": int(prediction),
-                    "model_type": type(self.model).__name__
-                }
-            )
-            
+                # Transform all texts at once (sparse matrix, one row per email)
+                text_vectorized = self.vectorizer.transform(texts)
+                predictions, confidences = self._predict(text_vectorized)
         except Exception as e:
             # Fallback to unproductive if classification fails
-            return ClassificationResult(
-                category=Category.UNPRODUCTIVE,
-                reason=f"ML classification error: {str(e)}",
-                suggested_reply="",
-                used_model="ml_classifier_error",
-                extra={"error": str(e)}
-            )
+            for i in positions:
+                results[i] = self._error_result(e)
+            return results
+
+        model_type = self.compiled.model_type if self.compiled is not None else type(self.model).__name__
+        for i, prediction, confidence in zip(positions, predictions, confidences):
+            try:
+                results[i] = self._build_result(
+                    emails[i], prediction, float(confidence), model_type, mood
+                )
+            except Exception as e:
+                # e.g. a model trained with non-integer class labels
+                results[i] = self._error_result(e)
+        return results
+
+    def _predict(self, text_vectorized):
+        """
+        Run the model once over the vectorized batch.
+        
+        Returns:
+            Tuple (predictions, confidences) aligned with the matrix rows
+        """
+        classes = getattr(self.model, "classes_", None)
+        if hasattr(self.model, 'predict_proba') and classes is not None:
+            proba = self.model.predict_proba(text_vectorized)
+            best = proba.argmax(axis=1)
+            return classes[best], proba.max(axis=1)
+        if hasattr(self.model, 'decision_function') and classes is not None and len(classes) == 2:
+            # For SVM
+            decision = self.model.decision_function(text_vectorized)
+            return classes[(decision > 0).astype(int)], abs(decision)
+
+        predictions = self.model.predict(text_vectorized)
+        return predictions, [0.0] * len(predictions)
+
+    def _build_result(
+        self,
+        email: Email,
+        prediction: Any,
+        confidence: float,
+        model_type: str,
+        mood: Optional[str] = None
+    ) -> ClassificationResult:
+        # Map prediction to category
+        # Assuming 1 = phishing/unproductive, 0 = ham/productive
+        if prediction == 1:
+            category = Category.UNPRODUCTIVE
+            reason = f"ML model detected potential phishing/spam content (confidence: {confidence:.2f})"
+            suggested_reply = ""
+        else:
+            category = Category.PRODUCTIVE
+            reason = f"ML model classified as legitimate email (confidence: {confidence:.2f})"
+            # Generate simple reply based on mood
+            suggested_reply = self._generate_reply(email, mood)
+
+        return ClassificationResult(
+            category=category,
+            reason=reason,
+            suggested_reply=suggested_reply,
+            used_model="ml_classifier",
+            extra={
+                "confidence": confidence,
+                "ml_prediction": int(prediction),
+                "model_type": model_type
+            }
+        )
+
+    def _error_result(self, e: Exception) -> ClassificationResult:
+        return ClassificationResult(
+            category=Category.UNPRODUCTIVE,
+            reason=f"ML classification error: {str(e)}",
+            suggested_reply="",
+            used_model="ml_classifier_error",
+            extra={"error": str(e)}
+        )
     
     def _generate_reply(self, email: Email, mood: Optional[str] = None) -> str:
         """
@@ -1,12 +1,21 @@
 import os
 import json
 import re
-import http.client
-from typing import List, Optional
+import asyncio
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
 
-from app.domain.entities import Email, ClassificationResult, Category
+from app.domain.entities import Email, ClassificationResult, Category, AnalyzedEmail
 from app.domain.ports import ClassifierPort
 from app.infrastructure.classifiers.rule_based import RuleBasedClassifier
+from app.infrastructure.http_client import PooledHttpClient, AsyncPooledHttpClient
+from app.infrastructure.single_flight import SingleFlight
+from app.infrastructure.cache.llm_cache import SqliteLlmResponseCache
+from app.infrastructure.nlp.prompt_compactor import PromptCompactor, estimate_tokens
 
 
 TOOL_SCHEMA = [{
@@ -31,19 +40,235 @@ TOOL_SCHEMA = [{
 }]
 
 
-def _strip_signatures(text: str) -> str:
+def _strip_signatures(text: str, limit: int = 6000) -> str:
     if not text:
         return ""
     text = re.split(
         r"(?i)\n--\s*$|\nAtenciosamente,|\nKind regards,|\nBest regards,|\nEnviado do meu",
         text
     )[0]
-    return text[:6000]
+    return text[:limit]
+
+
+SYSTEM_MSG = (
+    "Você é um classificador de emails para priorização operacional. "
+    "Siga estritamente o schema solicitado e não adicione campos extras."
+)
+
+# Layout do prompt, do mais estável ao mais volátil, para o cache de prefixo do provedor:
+#   tools + system (regras estáticas) → prefixo do perfil (tom + keywords) → sufixo do email.
+# Emails do mesmo perfil compartilham tudo até o sufixo.
+STATIC_RULES = """
+Responda **exclusivamente** via chamada de função 'emit'.
+
+Regras:
+- "category" deve ser "productive" OU "unproductive".
+- Se for promocional/newsletter/spam: "category" = "unproductive" e "reply" = "".
+- "reason" deve ser curto e citar quando usar uma palavra de prioridade.
+- "reply" (quando existir) deve estar no idioma indicado no email.
+""".strip()
+
+SYSTEM_PROMPT = SYSTEM_MSG + "\n\n" + STATIC_RULES
+
+PROFILE_PREFIX_TEMPLATE = """
+{mood_instruction}Lista de palavras-chave prioritárias (com sinônimos). A presença delas é INDICADOR FORTE de que é produtivo:
+priority_keywords = {priority_json}
+""".strip()
+
+EMAIL_SUFFIX_TEMPLATE = """
+Email:
+- idioma: {lang}
+- hits rule-based: {hits_list}
+- confiança rule-based: {rb_conf:.2f}
+- Subject: {subject}
+- Sender: {sender}
+- Body (sem assinatura): {body_clip}
+""".strip()
+
+# Modo em lote: vários emails do mesmo perfil numa única completion. Regras e
+# palavras-chave vão uma vez só; cada email traz seu id e seus sinais.
+BATCH_TOOL_SCHEMA = [{
+    "type": "function",
+    "function": {
+        "name": "emit_batch",
+        "description": "Retorne a classificação de cada e-mail, identificada pelo id.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "results": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "id": {"type": "string"},
+                            "category": {
+                                "type": "string",
+                                "enum": ["productive", "unproductive"]
+                            },
+                            "reason": {"type": "string"},
+                            "reply": {"type": "string", "description": "Vazio se unproductive/spam"}
+                        },
+                        "required": ["id", "category", "reason", "reply"],
+                        "additionalProperties": False
+                    }
+                }
+            },
+            "required": ["results"],
+            "additionalProperties": False
+        }
+    }
+}]
+
+BATCH_RULES = """
+Responda **exclusivamente** via chamada de função 'emit_batch', com exatamente um item em "results" para CADA email, repetindo o seu "id".
+
+Regras (por email):
+- "category" deve ser "productive" OU "unproductive".
+- Se for promocional/newsletter/spam: "category" = "unproductive" e "reply" = "".
+- "reason" deve ser curto e citar quando usar uma palavra de prioridade.
+- "reply" (quando existir) deve estar no idioma indicado no email.
+""".strip()
+
+BATCH_SYSTEM_PROMPT = SYSTEM_MSG + "\n\n" + BATCH_RULES
+
+EMAIL_BLOCK_TEMPLATE = """
+### Email id={id}
+- idioma: {lang}
+- hits rule-based: {hits_list}
+- confiança rule-based: {rb_conf:.2f}
+- Subject: {subject}
+- Sender: {sender}
+- Body (sem assinatura): {body_clip}
+""".strip()
+
+# muda sozinho quando o template, o system message ou o schema mudam → invalida o cache de respostas
+PROMPT_VERSION = hashlib.sha256(
+    (
+        SYSTEM_PROMPT + PROFILE_PREFIX_TEMPLATE + EMAIL_SUFFIX_TEMPLATE + BATCH_SYSTEM_PROMPT + EMAIL_BLOCK_TEMPLATE
+        + json.dumps(TOOL_SCHEMA, sort_keys=True) + json.dumps(BATCH_TOOL_SCHEMA, sort_keys=True)
+    ).encode("utf-8")
+).hexdigest()[:12]
+
+# tools + system: idênticos em toda chamada
+STATIC_PREFIX_TOKENS = estimate_tokens(json.dumps(TOOL_SCHEMA, ensure_ascii=False) + SYSTEM_PROMPT)
+
+_profile_prefixes: "OrderedDict[tuple, str]" = OrderedDict()
+_profile_prefixes_lock = threading.Lock()
+_PROFILE_PREFIXES_SIZE = 256
+
+
+@dataclass(frozen=True)
+class ProfilePrompt:
+    """Prefixo do prompt de um perfil compilado, montado (e estimado em tokens) uma vez na compilação."""
+    profile_id: str
+    mood: Optional[str]
+    prefix: str
+    tokens: int
+
+
+def _format_profile_prefix(priority: Optional[Sequence[str]], mood: Optional[str]) -> str:
+    return PROFILE_PREFIX_TEMPLATE.format(
+        mood_instruction=f"O tom das respostas deve ser {mood}.\n\n" if mood else "",
+        priority_json=json.dumps(list(priority or []), ensure_ascii=False),
+    )
+
+
+def compile_profile_prompt(profile_id: str, priority: Optional[Sequence[str]], mood: Optional[str]) -> ProfilePrompt:
+    """Chamado pelo store de perfis ao compilar um perfil: o prefixo fica pronto antes do primeiro email."""
+    prefix = _format_profile_prefix(priority, mood)
+    tokens = estimate_tokens(prefix)
+    print(
+        f"[DEBUG] Prefixo do prompt do perfil {profile_id} ({len(priority or [])} keywords, tom={mood or '-'}): "
+        f"{STATIC_PREFIX_TOKENS} tokens estáticos + {tokens} do perfil (estimados)"
+    )
+    return ProfilePrompt(profile_id=profile_id, mood=mood, prefix=prefix, tokens=tokens)
+
+
+def profile_prompt_for(priority: Optional[Sequence[str]], mood: Optional[str]) -> Optional[ProfilePrompt]:
+    """Prefixo pré-compilado que veio junto das keywords do perfil (KeywordSet do store), se o tom bate."""
+    prompt = getattr(priority, "prompt", None)
+    if isinstance(prompt, ProfilePrompt) and prompt.mood == mood:
+        return prompt
+    return None
+
+
+def profile_prompt_prefix(priority: Optional[Sequence[str]], mood: Optional[str]) -> str:
+    """
+    Parte do prompt que só depende do perfil (tom + keywords em JSON).
+    Perfis do store já trazem o prefixo montado na compilação; listas avulsas
+    caem num LRU por (keywords, tom): o `json.dumps` roda uma vez por perfil,
+    não por email.
+    """
+    prompt = profile_prompt_for(priority, mood)
+    if prompt is not None:
+        return prompt.prefix
+    kw_key = getattr(priority, "key", None) or tuple(priority or ())
+    key = (kw_key, mood)
+    with _profile_prefixes_lock:
+        prefix = _profile_prefixes.get(key)
+        if prefix is not None:
+            _profile_prefixes.move_to_end(key)
+            return prefix
+    prefix = _format_profile_prefix(priority, mood)
+    with _profile_prefixes_lock:
+        _profile_prefixes[key] = prefix
+        while len(_profile_prefixes) > _PROFILE_PREFIXES_SIZE:
+            _profile_prefixes.popitem(last=False)
+    return prefix
+
+
+@dataclass
+class _LLMRequest:
+    model: str
+    payload: dict
+    headers: dict
+    hits: List[str]
+    rb_conf: float
+    key: str               # hash de modelo + mensagens + schema: prompts idênticos compartilham a chamada
+    prompt_hash: str       # hash só das mensagens (chave do cache de respostas, junto com modelo e versão)
+    fields: dict           # campos do template por email (reaproveitados no modo em lote)
+    compaction: Optional[dict] = None  # tokens do corpo antes/depois da compactação
 
 
 class OpenAIClassifier(ClassifierPort):
-    def __init__(self):
+    # a rota assíncrona aguarda `aclassify` direto no event loop
+    prefers_async = True
+    # classify/aclassify/classify_batch aceitam o rule-based já calculado (SmartClassifier, cascata)
+    accepts_rule_result = True
+
+    def __init__(
+        self,
+        http_client: Optional[PooledHttpClient] = None,
+        async_http_client: Optional[AsyncPooledHttpClient] = None,
+        max_concurrency: Optional[int] = None,
+        deadline_s: Optional[float] = None,
+        single_flight: Optional[bool] = None,
+        response_cache: Optional[SqliteLlmResponseCache] = None,
+        batch_size: Optional[int] = None,
+        compactor: Optional[PromptCompactor] = None,
+    ):
         self.api_key = os.getenv("OPENAI_API_KEY")
+        base_url = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
+        # pool keep-alive compartilhado entre threads: sem handshake TCP/TLS por email
+        self.http = http_client or PooledHttpClient(base_url)
+        self.ahttp = async_http_client or AsyncPooledHttpClient(base_url)
+        # no caminho assíncrono: no máximo `max_concurrency` chamadas em voo, cada uma com prazo
+        self.max_concurrency = max(1, max_concurrency or int(os.getenv("LLM_MAX_CONCURRENCY", "32")))
+        self.deadline_s = deadline_s if deadline_s is not None else float(os.getenv("LLM_DEADLINE_S", "20"))
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._slots_loop = None
+        # rajadas de emails idênticos (newsletters) na zona cinza → uma única chamada paga
+        if single_flight is None:
+            single_flight = os.getenv("LLM_SINGLE_FLIGHT", "true").strip().lower() == "true"
+        self.flights = SingleFlight() if single_flight else None
+        self.response_cache = response_cache
+        # `classify_batch`: até `batch_size` emails por completion (1 = um por chamada)
+        self.batch_size = max(1, batch_size or int(os.getenv("LLM_BATCH_SIZE", "8")))
+        # sem compactador: corpo cortado em caracteres (`_strip_signatures`)
+        self.compactor = compactor
+        self._prompt_lock = threading.Lock()
+        self._prompt_stats = {"builds": 0, "build_s": 0.0, "prefix_chars": 0, "prompt_chars": 0}
+        self._profile_prefix_tokens: "OrderedDict[str, int]" = OrderedDict()  # perfil → tokens do prefixo
         self.default_model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
         self.escalation_model = os.getenv("OPENAI_MODEL_ESCALATE", "gpt-4.1-mini")
         self.rule_based = RuleBasedClassifier()
@@ -55,12 +280,232 @@ class OpenAIClassifier(ClassifierPort):
         email: Email,
         tokens: List[str],
         mood: Optional[str] = None,
-        priority: Optional[list[str]] = None
+        priority: Optional[list[str]] = None,
+        analysis: Optional[AnalyzedEmail] = None,
+        rule_result: Optional[ClassificationResult] = None,
     ) -> ClassificationResult:
+        """`rule_result`: rule-based já calculado por quem chama (cascata), não é refeito."""
+        rb, req = self._prepare(email, tokens, mood, priority, analysis, rule_result)
+        if req is None:
+            return rb
+        return self._complete(rb, req, priority)
 
-        rb = self.rule_based.classify(email, tokens, mood=mood, priority=priority)
-        if not self.api_key or (rb.extra or {}).get("is_spam"):
+    def classify_batch(
+        self,
+        emails: List[Email],
+        tokens: List[List[str]],
+        mood: Optional[str] = None,
+        priority: Optional[list[str]] = None,
+        analyses: Optional[List[AnalyzedEmail]] = None,
+        rule_results: Optional[List[ClassificationResult]] = None,
+    ) -> List[ClassificationResult]:
+        """Empacota até `batch_size` emails por completion (tool `emit_batch`).
+
+        Ids que não voltam na resposta (ou voltam inválidos) caem para a
+        chamada individual; falha da chamada em lote idem, para o lote todo.
+        """
+        analyses = analyses or [None] * len(emails)
+        rule_results = rule_results or [None] * len(emails)
+        results: List[Optional[ClassificationResult]] = [None] * len(emails)
+        pending = {}  # modelo → [(índice, rb, req)]
+        for i, (email, toks, analysis) in enumerate(zip(emails, tokens, analyses)):
+            rb, req = self._prepare(email, toks, mood, priority, analysis, rule_results[i])
+            if req is None:
+                results[i] = rb
+                continue
+            cached = self._cached(rb, req, priority)
+            if cached is not None:
+                results[i] = cached
+                continue
+            pending.setdefault(req.model, []).append((i, rb, req))
+
+        for model, items in pending.items():
+            for start in range(0, len(items), self.batch_size):
+                chunk = items[start:start + self.batch_size]
+                if len(chunk) == 1:
+                    i, rb, req = chunk[0]
+                    results[i] = self._complete(rb, req, priority, lookup=False)
+                    continue
+                for i, res in self._complete_batch(model, chunk, mood, priority):
+                    results[i] = res
+        return results
+
+    async def aclassify(
+        self,
+        email: Email,
+        tokens: List[str],
+        mood: Optional[str] = None,
+        priority: Optional[list[str]] = None,
+        analysis: Optional[AnalyzedEmail] = None,
+        rule_result: Optional[ClassificationResult] = None,
+    ) -> ClassificationResult:
+        if self.compactor is not None:
+            # compactação (split de frases + TF-IDF) é CPU: fora do event loop, como o cache
+            rb, req = await asyncio.to_thread(self._prepare, email, tokens, mood, priority, analysis, rule_result)
+        else:
+            rb, req = self._prepare(email, tokens, mood, priority, analysis, rule_result)
+        if req is None:
             return rb
+        if self.response_cache is not None:
+            # SQLite (lock + timeout de 5 s): consulta fora do event loop
+            cached = await asyncio.to_thread(self._cached, rb, req, priority)
+            if cached is not None:
+                return cached
+        try:
+            # o prazo cobre a espera pelo semáforo + retries + leitura da resposta
+            parsed, shared = await asyncio.wait_for(self._apost(req), self.deadline_s)
+        except asyncio.TimeoutError:
+            return self._fallback(rb, "deadline")
+        except Exception as e:
+            return self._fallback(rb, type(e).__name__)
+        if self.response_cache is not None:
+            # _parse grava a resposta no cache (INSERT + commit): também fora do loop
+            return await asyncio.to_thread(self._parse, rb, parsed, req, priority, shared)
+        return self._parse(rb, parsed, req, priority, shared=shared)
+
+    def _complete(
+        self, rb: ClassificationResult, req: _LLMRequest, priority: Optional[list[str]], lookup: bool = True
+    ) -> ClassificationResult:
+        cached = self._cached(rb, req, priority) if lookup else None
+        if cached is not None:
+            return cached
+        try:
+            parsed, shared = self._post(req)
+        except Exception as e:
+            return self._fallback(rb, type(e).__name__)
+        return self._parse(rb, parsed, req, priority, shared=shared)
+
+    def _complete_batch(self, model: str, chunk, mood: Optional[str], priority: Optional[list[str]]):
+        """Uma completion para o lote; devolve [(índice, resultado)] na ordem do lote."""
+        ids = [f"e{n}" for n in range(1, len(chunk) + 1)]
+        blocks = "\n\n".join(
+            EMAIL_BLOCK_TEMPLATE.format(id=id_, **req.fields) for id_, (_, _, req) in zip(ids, chunk)
+        )
+        payload = {
+            "model": model,
+            "messages": [
+                {"role": "system", "content": BATCH_SYSTEM_PROMPT},
+                {"role": "user", "content": profile_prompt_prefix(priority, mood) + "\n\n" + blocks},
+            ],
+            "tools": BATCH_TOOL_SCHEMA,
+            "tool_choice": {"type": "function", "function": {"name": "emit_batch"}},
+            "temperature": 0.0,
+            "max_tokens": 220 * len(chunk),
+        }
+        answers, usage = {}, {}
+        try:
+            _, parsed = self.http.post_json("/chat/completions", payload, chunk[0][2].headers)
+            answers, usage = self._parse_batch(parsed, set(ids))
+        except Exception as e:
+            print(f"[DEBUG] Chamada em lote ao LLM falhou ({type(e).__name__}); caindo para chamadas individuais")
+
+        # tokens do lote rateados entre os emails respondidos
+        share = {
+            k: (usage.get(k) // len(answers) if isinstance(usage.get(k), int) and answers else None)
+            for k in ("prompt_tokens", "completion_tokens", "total_tokens")
+        }
+        out = []
+        for id_, (i, rb, req) in zip(ids, chunk):
+            js = answers.get(id_)
+            if js is None:
+                out.append((i, self._complete(rb, req, priority, lookup=False)))
+                continue
+            if self.response_cache is not None:
+                try:
+                    self.response_cache.put(req.model, req.prompt_hash, js, share)
+                except Exception as e:
+                    print(f"[DEBUG] Falha ao gravar no cache de respostas do LLM: {e}")
+            res = self._build(rb, js, share, req, priority)
+            res.extra.update({"llm_batch_size": len(chunk), "llm_batch_id": id_})
+            out.append((i, res))
+        missing = len(chunk) - len(answers)
+        if missing:
+            print(f"[DEBUG] Lote LLM: {missing}/{len(chunk)} ids sem resposta válida → chamadas individuais")
+        return out
+
+    @staticmethod
+    def _parse_batch(parsed, expected: set) -> Tuple[dict, dict]:
+        """({id: argumentos no formato do `emit`}, usage); ignora ids desconhecidos ou itens inválidos."""
+        if not isinstance(parsed, dict) or "error" in parsed:
+            return {}, {}
+        msg = ((parsed.get("choices") or [{}])[0].get("message") or {})
+        try:
+            args = json.loads(msg["tool_calls"][0]["function"]["arguments"])
+        except Exception:
+            return {}, {}
+        answers = {}
+        for item in (args.get("results") if isinstance(args, dict) else None) or []:
+            if not isinstance(item, dict):
+                continue
+            id_ = str(item.get("id", "")).strip()
+            if id_ not in expected or id_ in answers:
+                continue
+            if str(item.get("category", "")).strip().lower() not in ("productive", "produtivo", "unproductive", "improdutivo"):
+                continue
+            answers[id_] = {k: item.get(k) for k in ("category", "reason", "reply")}
+        return answers, parsed.get("usage") or {}
+
+    def _post(self, req: _LLMRequest):
+        """(resposta, shared); shared = resposta de outra chamada idêntica em voo (single-flight)."""
+        def call():
+            return self.http.post_json("/chat/completions", req.payload, req.headers)[1]
+        return self.flights.do(req.key, call) if self.flights else (call(), False)
+
+    async def _apost(self, req: _LLMRequest):
+        loop = asyncio.get_running_loop()
+        if self._slots_loop is not loop:
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+            self._slots_loop = loop
+
+        async def call():
+            async with self._slots:
+                _, parsed = await self.ahttp.post_json("/chat/completions", req.payload, req.headers)
+            return parsed
+        if self.flights:
+            return await self.flights.ado(req.key, call)
+        return await call(), False
+
+    def stats(self) -> dict:
+        return {
+            "single_flight": self.flights.stats() if self.flights else None,
+            "response_cache": self.response_cache.stats() if self.response_cache else None,
+            "http": self.http.stats(),
+            "async_http": self.ahttp.stats(),
+            "prompt": self.prompt_stats(),
+        }
+
+    def prompt_stats(self) -> dict:
+        """Custo médio de montagem do prompt e fração (em caracteres) que é prefixo estático + perfil."""
+        with self._prompt_lock:
+            st = dict(self._prompt_stats)
+            per_profile = dict(self._profile_prefix_tokens)
+        builds = st["builds"]
+        return {
+            "builds": builds,
+            "avg_build_us": (st["build_s"] * 1e6 / builds) if builds else 0.0,
+            "cacheable_prefix_ratio": (st["prefix_chars"] / st["prompt_chars"]) if st["prompt_chars"] else 0.0,
+            "static_prefix_tokens": STATIC_PREFIX_TOKENS,
+            # tokens estimados do prefixo de cada perfil (compilados pelo store) visto nos últimos prompts
+            "profile_prefix_tokens": per_profile,
+        }
+
+    def _fallback(self, rb: ClassificationResult, reason: str) -> ClassificationResult:
+        """Resultado do rule-based quando o LLM falha; marcado para não ir ao cache."""
+        return type(rb)(**{**rb.__dict__, "extra": {**(rb.extra or {}), "llm_error": reason}})
+
+    def _prepare(
+        self,
+        email: Email,
+        tokens: List[str],
+        mood: Optional[str],
+        priority: Optional[list[str]],
+        analysis: Optional[AnalyzedEmail],
+        rule_result: Optional[ClassificationResult] = None,
+    ) -> Tuple[ClassificationResult, Optional[_LLMRequest]]:
+        """Rule-based (se não veio pronto) + montagem do prompt; sem request quando o LLM não é necessário."""
+        rb = rule_result or self.rule_based.classify(email, tokens, mood=mood, priority=priority, analysis=analysis)
+        if not self.api_key or (rb.extra or {}).get("is_spam"):
+            return rb, None
 
         lang = (rb.extra or {}).get("lang", "pt")
         hits = (rb.extra or {}).get("profile_hits") or []
@@ -71,44 +516,33 @@ class OpenAIClassifier(ClassifierPort):
         if self.gray_low <= rb_conf <= self.gray_high:
             model = self.escalation_model
 
-        mood_instruction = f"- O tom da resposta deve ser {mood}." if mood else ""
-        body_clip = _strip_signatures(email.body or "")
-
-        priority_json = json.dumps(priority or [], ensure_ascii=False)
-        hits_list = ", ".join(hits[:20]) if hits else "nenhum"
-
-        system_msg = (
-            "Você é um classificador de emails para priorização operacional. "
-            "Siga estritamente o schema solicitado e não adicione campos extras."
-        )
-
-        user_prompt = f"""
-Responda **exclusivamente** via chamada de função 'emit'.
-
-Regras:
-- "category" deve ser "productive" OU "unproductive".
-- Se for promocional/newsletter/spam: "category" = "unproductive" e "reply" = "".
-- "reason" deve ser curto e citar quando usar uma palavra de prioridade.
-- "reply" (quando existir) deve estar no idioma: {lang}.
-{mood_instruction}
-
-Lista de palavras-chave prioritárias (com sinônimos). A presença delas é INDICADOR FORTE de que é produtivo:
-priority_keywords = {priority_json}
-
-Sinais do pré-processamento rule-based:
-- hits: {hits_list}
-- confiança rule-based: {rb_conf:.2f}
+        t0 = time.perf_counter()
+        limit = min(6000, analysis.char_budget) if analysis is not None else 6000
+        compaction = None
+        if self.compactor is not None:
+            # sem histórico citado/avisos; frases mais informativas até o orçamento de tokens
+            comp = self.compactor.compact(email.body or "", keywords=priority)
+            body_clip, compaction = comp.text[:limit], comp.as_dict()
+        else:
+            body_clip = _strip_signatures(email.body or "", limit=limit)
 
-Email:
-- Subject: {email.subject or ""}
-- Sender: {email.sender or ""}
-- Body (sem assinatura): {body_clip}
-""".strip()
+        fields = {
+            "lang": lang,
+            "hits_list": ", ".join(hits[:20]) if hits else "nenhum",
+            "rb_conf": rb_conf,
+            "subject": email.subject or "",
+            "sender": email.sender or "",
+            "body_clip": body_clip,
+        }
+        # prefixo do perfil vem pronto (compilado com o perfil); só o sufixo do email é formatado por chamada
+        profile_prompt = profile_prompt_for(priority, mood)
+        prefix = profile_prompt.prefix if profile_prompt is not None else profile_prompt_prefix(priority, mood)
+        user_prompt = prefix + "\n\n" + EMAIL_SUFFIX_TEMPLATE.format(**fields)
 
         payload = {
             "model": model,
             "messages": [
-                {"role": "system", "content": system_msg},
+                {"role": "system", "content": SYSTEM_PROMPT},
                 {"role": "user", "content": user_prompt},
             ],
             "tools": TOOL_SCHEMA,
@@ -117,21 +551,59 @@ Email:
             "max_tokens": 220,
         }
         headers = {
-            "Content-Type": "application/json",
             "Authorization": f"Bearer {self.api_key}"
         }
+        prompt_hash = hashlib.sha256(
+            (SYSTEM_PROMPT + "\x1f" + user_prompt).encode("utf-8")
+        ).hexdigest()
+        req = _LLMRequest(
+            model=model, payload=payload, headers=headers, hits=hits, rb_conf=rb_conf,
+            # tools fixas por versão do prompt: modelo + mensagens identificam a chamada
+            key=f"{model}:{prompt_hash}",
+            prompt_hash=prompt_hash,
+            fields=fields,
+            compaction=compaction,
+        )
+        elapsed = time.perf_counter() - t0
+        with self._prompt_lock:
+            st = self._prompt_stats
+            st["builds"] += 1
+            st["build_s"] += elapsed
+            st["prefix_chars"] += len(SYSTEM_PROMPT) + len(prefix)
+            st["prompt_chars"] += len(SYSTEM_PROMPT) + len(user_prompt)
+            if profile_prompt is not None:
+                per_profile = self._profile_prefix_tokens
+                per_profile[profile_prompt.profile_id] = profile_prompt.tokens
+                per_profile.move_to_end(profile_prompt.profile_id)
+                while len(per_profile) > _PROFILE_PREFIXES_SIZE:
+                    per_profile.popitem(last=False)
+        return rb, req
 
+    def _cached(
+        self, rb: ClassificationResult, req: _LLMRequest, priority: Optional[list[str]]
+    ) -> Optional[ClassificationResult]:
+        if self.response_cache is None:
+            return None
         try:
-            conn = http.client.HTTPSConnection("api.openai.com")
-            conn.request("POST", "/v1/chat/completions", json.dumps(payload), headers)
-            res = conn.getresponse()
-            data = res.read().decode("utf-8")
-            parsed = json.loads(data)
-        except Exception:
-            return rb
+            hit = self.response_cache.get(req.model, req.prompt_hash)
+        except Exception as e:
+            print(f"[DEBUG] Cache de respostas do LLM indisponível: {e}")
+            return None
+        if hit is None:
+            return None
+        args, usage = hit
+        return self._build(rb, args, usage, req, priority, cached=True)
 
-        if "error" in parsed:
-            return rb
+    def _parse(
+        self,
+        rb: ClassificationResult,
+        parsed,
+        req: _LLMRequest,
+        priority: Optional[list[str]],
+        shared: bool = False,
+    ) -> ClassificationResult:
+        if not isinstance(parsed, dict) or "error" in parsed:
+            return self._fallback(rb, "api_error")
 
         usage = parsed.get("usage", {})
 
@@ -160,8 +632,26 @@ Email:
                     js = None
 
         if not isinstance(js, dict):
-            return rb
+            return self._fallback(rb, "invalid_response")
 
+        if self.response_cache is not None and not shared:
+            try:
+                self.response_cache.put(req.model, req.prompt_hash, js, usage)
+            except Exception as e:
+                print(f"[DEBUG] Falha ao gravar no cache de respostas do LLM: {e}")
+        return self._build(rb, js, usage, req, priority, shared=shared)
+
+    def _build(
+        self,
+        rb: ClassificationResult,
+        js: dict,
+        usage: dict,
+        req: _LLMRequest,
+        priority: Optional[list[str]],
+        cached: bool = False,
+        shared: bool = False,
+    ) -> ClassificationResult:
+        model, hits, rb_conf = req.model, req.hits, req.rb_conf
         # normalização
         cat_raw = str(js.get("category", "")).strip().lower()
         category = Category.PRODUCTIVE if cat_raw in ("productive", "produtivo") else Category.UNPRODUCTIVE
@@ -172,7 +662,8 @@ Email:
 
         extra = dict(rb.extra or {})
         # boost na confiança se prioridade bateu
-        if any(p.lower() in (email.body or "").lower() for p in (priority or [])):
+        # hits vêm do matcher Aho-Corasick do rule-based (limites de palavra, uma varredura)
+        if priority and hits:
             extra["priority_boost"] = True
             rb_conf = min(1.0, rb_conf + 0.15)
 
@@ -182,6 +673,16 @@ Email:
             "hits": hits[:20],
             "model_effective": model,
         })
+        if req.compaction:
+            extra["prompt_compaction"] = req.compaction
+        if cached:
+            # resposta do cache em disco: nenhum token gasto nesta chamada
+            extra.update({"llm_cached": True, "llm_tokens_saved": usage.get("total_tokens") or 0})
+            usage = {}
+        elif shared:
+            # carona numa chamada idêntica em voo (single-flight): os tokens já foram contados no líder
+            extra.update({"llm_coalesced": True, "llm_tokens_saved": usage.get("total_tokens") or 0})
+            usage = {}
 
         return ClassificationResult(
             category=category,
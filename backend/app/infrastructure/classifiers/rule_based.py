@@ -1,33 +1,10 @@
 from typing import List, Optional, Set
 import re
 
-from app.domain.entities import Email, ClassificationResult, Category
+from app.domain.entities import Email, ClassificationResult, Category, AnalyzedEmail
 from app.domain.ports import ClassifierPort
-
-# --- detecção de idioma (pt/en/es) ----
-try:
-    from langdetect import detect, DetectorFactory
-    DetectorFactory.seed = 0
-except Exception:  # fallback se lib não estiver instalada
-    detect = None
-
-def detect_lang(text: str) -> str:
-    if detect:
-        try:
-            lang = detect((text or "")[:4000])
-            if lang in ("pt", "en", "es"):
-                return lang
-        except Exception:
-            pass
-    # heurística leve de fallback
-    t = (text or "").lower()
-    if any(w in t for w in (" você ", " obrigado", " nota fiscal", "prazo")):
-        return "pt"
-    if any(w in t for w in (" you ", " thanks", " invoice", "deadline", "meeting")):
-        return "en"
-    if any(w in t for w in (" usted ", " gracias", " factura", "plazo", "reunión")):
-        return "es"
-    return "pt"
+from app.infrastructure.nlp.lang_detect import detect_lang
+from app.infrastructure.nlp.keyword_matcher import matcher_for
 
 # --- léxicos por idioma (genéricos) ---
 PROD_PT: Set[str] = {
@@ -55,6 +32,13 @@ SPAM_EN: Set[str] = {"promotion","discount","offer","newsletter","spam","subscri
 SPAM_ES: Set[str] = {"promoción","descuento","oferta","boletín","spam","suscríbase","gane","cupón",
                      "marketing","envío","gratis","clic","comprar","rebaja","ofertas"}
 
+# vocabulário de spam por idioma, montado uma vez (antes: união a cada email)
+SPAM_BY_LANG = {
+    "pt": frozenset(SPAM_COMMON | SPAM_PT),
+    "en": frozenset(SPAM_COMMON | SPAM_EN),
+    "es": frozenset(SPAM_COMMON | SPAM_ES),
+}
+
 _URL_RE = re.compile(r"https?://", re.I)
 
 REASON_STRINGS = {
@@ -91,19 +75,24 @@ class RuleBasedClassifier(ClassifierPort):
         tokens: List[str],
         mood: Optional[str] = None,
         priority: Optional[list[str]] = None,
+        analysis: Optional[AnalyzedEmail] = None,
     ) -> ClassificationResult:
 
         body = email.body or ""
-        lang = detect_lang((email.subject or "") + "\n" + body)
+        if analysis is not None:
+            # idioma, tokens e links já calculados uma única vez pelo tokenizer
+            lang = analysis.lang
+            tok_set = analysis.token_set
+            link_count = analysis.url_count
+        else:
+            lang = detect_lang((email.subject or "") + "\n" + body)
+            tok_set = set((t or "").lower() for t in tokens)
+            link_count = len(_URL_RE.findall(body))
         reasons = REASON_STRINGS.get(lang, REASON_STRINGS["pt"])
 
-        # normaliza tokens
-        tok_set = set((t or "").lower() for t in tokens)
-
         # --- SPAM / anúncio ---
-        spam_vocab = SPAM_COMMON | (SPAM_PT if lang == "pt" else SPAM_EN if lang == "en" else SPAM_ES)
+        spam_vocab = SPAM_BY_LANG.get(lang, SPAM_BY_LANG["es"])
         spam_hits = tok_set.intersection(spam_vocab)
-        link_count = len(_URL_RE.findall(body))
 
         if len(spam_hits) >= 2 or (len(spam_hits) >= 1 and link_count >= 2):
             reason = f"{reasons['spam']} (hits={len(spam_hits)}, links={link_count})"
@@ -123,10 +112,14 @@ class RuleBasedClassifier(ClassifierPort):
 
         # --- Produtivo por perfil (priority inclui sinônimos, vindo do use case) ---
         gen_prod = PROD_PT if lang == "pt" else PROD_EN if lang == "en" else PROD_ES
-        prof_set = set(p.lower() for p in (priority or []))
-        lexicon = prof_set if prof_set else gen_prod
-
-        prod_hits = tok_set.intersection(lexicon)
+        hit_counts = {}
+        matcher = matcher_for(priority)
+        if matcher is not None and len(matcher):
+            # Aho-Corasick: keywords de várias palavras ("nota fiscal") também casam
+            hit_counts = matcher.find(analysis.text if analysis is not None else body)
+            prod_hits = set(hit_counts)
+        else:
+            prod_hits = tok_set.intersection(gen_prod)
         if prod_hits:
             conf = 0.55 + 0.1 * min(4, len(prod_hits))  # 0.55..0.95
             reason = f"{reasons['profile_hits']}: {', '.join(sorted(prod_hits))}"
@@ -139,6 +132,7 @@ class RuleBasedClassifier(ClassifierPort):
                     "lang": lang,
                     "is_spam": False,
                     "profile_hits": sorted(prod_hits),
+                    "profile_hit_counts": hit_counts or {h: 1 for h in prod_hits},
                     "confidence": min(conf, 0.9),
                 },
             )
@@ -1,6 +1,8 @@
-from typing import List, Optional
-from app.domain.entities import Email, ClassificationResult
+import time
+from typing import Any, Callable, List, Optional
+from app.domain.entities import Email, ClassificationResult, AnalyzedEmail
 from app.domain.ports import ClassifierPort
+from app.infrastructure.classifiers.hedge import hedge
 
 class SmartClassifier(ClassifierPort):
     """
@@ -8,40 +10,142 @@ class SmartClassifier(ClassifierPort):
     - Se for spam → retorna rule-based (sem LLM).
     - Se confiança do rule-based >= min_conf → retorna rule-based.
     - Caso contrário, chama LLM com contexto do perfil/keywords e highlights.
+    - Com orçamento de latência (`budget_s`, rota assíncrona): LLM fora do
+      prazo → rule-based provisório na hora; o LLM termina em segundo plano
+      e entrega o definitivo a `on_late`.
     """
+    accepts_budget = True
+
     def __init__(self, rule_based: ClassifierPort, llm: Optional[ClassifierPort], min_conf: float = 0.7):
         self.rule_based = rule_based
         self.llm = llm
         self.min_conf = min_conf
 
+    # I/O-bound quando há LLM: a rota assíncrona aguarda `aclassify` direto no event loop
+    @property
+    def prefers_async(self) -> bool:
+        return self.llm is not None
+
     def classify(
         self,
         email: Email,
         tokens: List[str],
         mood: Optional[str] = None,
-        priority: Optional[list[str]] = None
+        priority: Optional[list[str]] = None,
+        analysis: Optional[AnalyzedEmail] = None
     ) -> ClassificationResult:
-        rb = self.rule_based.classify(email, tokens, mood=mood, priority=priority)
-        extra = rb.extra or {}
-        if extra.get("is_spam"):
-            return rb  # sem LLM, economiza tokens
-
-        if (extra.get("confidence") or 0.0) >= self.min_conf or self.llm is None:
+        t0 = time.perf_counter()
+        rb = self.rule_based.classify(email, tokens, mood=mood, priority=priority, analysis=analysis)
+        rb = self._timed(rb, rules=time.perf_counter() - t0)
+        if not self._needs_llm(rb):
             return rb
 
-        # constrói um "highlight" simples para enriquecer o contexto do LLM
-        tok_set = set(t.lower() for t in tokens)
-        prof_set = set(p.lower() for p in (priority or []))
-        hits = sorted(tok_set.intersection(prof_set))[:20]
-
         # Chama o LLM com as mesmas entradas + perfil expandido
+        t1 = time.perf_counter()
         llm_res = self.llm.classify(
             email=email,
             tokens=tokens,
             mood=mood,
-            priority=list(prof_set) if prof_set else None
+            priority=priority or None,
+            analysis=analysis,
+            **self._reuse(rb),
         )
+        return self._timed(self._merge(rb, llm_res, priority), llm=time.perf_counter() - t1)
+
+    def classify_batch(
+        self,
+        emails: List[Email],
+        tokens: List[List[str]],
+        mood: Optional[str] = None,
+        priority: Optional[list[str]] = None,
+        analyses: Optional[List[AnalyzedEmail]] = None
+    ) -> List[ClassificationResult]:
+        # só os emails que escalam vão ao LLM, juntos (ele empacota vários por completion)
+        analyses = analyses or [None] * len(emails)
+        results = [
+            self.rule_based.classify(e, t, mood=mood, priority=priority, analysis=a)
+            for e, t, a in zip(emails, tokens, analyses)
+        ]
+        escalate = [i for i, rb in enumerate(results) if self._needs_llm(rb)]
+        if not escalate:
+            return results
+
+        reuse = {"rule_results": [results[i] for i in escalate]} if self._reuses_rules else {}
+        llm_results = self.llm.classify_batch(
+            [emails[i] for i in escalate],
+            [tokens[i] for i in escalate],
+            mood=mood,
+            priority=priority or None,
+            analyses=[analyses[i] for i in escalate],
+            **reuse,
+        )
+        for i, llm_res in zip(escalate, llm_results):
+            results[i] = self._merge(results[i], llm_res, priority)
+        return results
+
+    async def aclassify(
+        self,
+        email: Email,
+        tokens: List[str],
+        mood: Optional[str] = None,
+        priority: Optional[list[str]] = None,
+        analysis: Optional[AnalyzedEmail] = None,
+        budget_s: Optional[float] = None,
+        on_late: Optional[Callable[[ClassificationResult], Any]] = None,
+    ) -> ClassificationResult:
+        # rule-based é barato (uma varredura): roda no loop; só o LLM é aguardado
+        t0 = time.perf_counter()
+        rb = self.rule_based.classify(email, tokens, mood=mood, priority=priority, analysis=analysis)
+        rb = self._timed(rb, rules=time.perf_counter() - t0)
+        if not self._needs_llm(rb):
+            return rb
+
+        async def escalate() -> ClassificationResult:
+            t1 = time.perf_counter()
+            llm_res = await self.llm.aclassify(
+                email=email,
+                tokens=tokens,
+                mood=mood,
+                priority=priority or None,
+                analysis=analysis,
+                **self._reuse(rb),
+            )
+            return self._timed(self._merge(rb, llm_res, priority), llm=time.perf_counter() - t1)
+
+        if budget_s is None:
+            return await escalate()
+        return await hedge(rb, escalate(), budget_s, answered_by="rules", on_late=on_late, started=t0)
+
+    @staticmethod
+    def _timed(res: ClassificationResult, **elapsed_s: float) -> ClassificationResult:
+        """Acumula o tempo (ms) de cada etapa em `extra["stage_ms"]`."""
+        extra = dict(res.extra or {})
+        extra["stage_ms"] = {**extra.get("stage_ms", {}), **{k: round(v * 1000, 3) for k, v in elapsed_s.items()}}
+        return type(res)(**{**res.__dict__, "extra": extra})
+
+    @property
+    def _reuses_rules(self) -> bool:
+        # o OpenAIClassifier aceita o rule-based pronto em vez de recalculá-lo
+        return getattr(self.llm, "accepts_rule_result", False)
+
+    def _reuse(self, rb: ClassificationResult) -> dict:
+        return {"rule_result": rb} if self._reuses_rules else {}
+
+    def _needs_llm(self, rb: ClassificationResult) -> bool:
+        extra = rb.extra or {}
+        if extra.get("is_spam"):
+            return False  # sem LLM, economiza tokens
+        return (extra.get("confidence") or 0.0) < self.min_conf and self.llm is not None
+
+    def _merge(
+        self, rb: ClassificationResult, llm_res: ClassificationResult, priority: Optional[list[str]]
+    ) -> ClassificationResult:
+        extra = rb.extra or {}
+        # highlights do perfil já encontrados pelo matcher do rule-based (sem nova varredura)
+        hits = list(extra.get("profile_hits") or [])[:20] if priority else []
 
         # mescla informações úteis do rule-based
         merged_extra = {**(llm_res.extra or {}), "rb_hits": hits, "rb_confidence": extra.get("confidence")}
+        if "stage_ms" in extra:
+            merged_extra["stage_ms"] = dict(extra["stage_ms"])
         return type(llm_res)(**{**llm_res.__dict__, "extra": merged_extra})
@@ -1,12 +1,104 @@
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
 from sqlmodel import SQLModel, create_engine, Session
 
-DATABASE_URL = "sqlite:///./data.db"
+from app.config import settings
+from app.infrastructure.repositories.sql_log_search_repository import init_log_search
+
+
+def database_url(path: str) -> str:
+    """DB_PATH aceita um caminho de arquivo SQLite ou uma URL SQLAlchemy completa."""
+    return path if "://" in path else f"sqlite:///{path}"
+
+
+def sqlite_pragmas(
+    wal: bool = True,
+    synchronous: str = "NORMAL",
+    mmap_mb: int = 256,
+    cache_mb: int = 64,
+    busy_timeout_ms: int = 5000,
+) -> list:
+    pragmas = [
+        f"PRAGMA busy_timeout={int(busy_timeout_ms)}",
+        f"PRAGMA synchronous={synchronous}",
+        f"PRAGMA mmap_size={int(mmap_mb) * 1024 * 1024}",
+        f"PRAGMA cache_size={-int(cache_mb) * 1024}",  # negativo = KiB
+        "PRAGMA temp_store=MEMORY",
+    ]
+    if wal:
+        # WAL: leitores não bloqueiam o escritor (e vice-versa); com synchronous=NORMAL
+        # o commit não faz fsync (só o checkpoint), e um crash do SO perde no máximo os últimos commits
+        pragmas.insert(0, "PRAGMA journal_mode=WAL")
+    return pragmas
+
+
+def build_engine(
+    path: Optional[str] = None,
+    wal: Optional[bool] = None,
+    synchronous: Optional[str] = None,
+    mmap_mb: Optional[int] = None,
+    cache_mb: Optional[int] = None,
+    busy_timeout_ms: Optional[int] = None,
+    pool_size: Optional[int] = None,
+    max_overflow: Optional[int] = None,
+):
+    """Engine do banco de logs/usuários (DB_* por padrão); em SQLite aplica os PRAGMAs a cada conexão nova."""
+    url = database_url(path or settings.DB_PATH)
+    if not url.startswith("sqlite"):
+        return create_engine(url, echo=False)
+
+    kwargs = {}
+    if ":memory:" not in url and url != "sqlite://":
+        # arquivo: pool de conexões reaproveitadas entre threads (uma por unidade de trabalho)
+        kwargs.update(
+            pool_size=settings.DB_POOL_SIZE if pool_size is None else pool_size,
+            max_overflow=settings.DB_MAX_OVERFLOW if max_overflow is None else max_overflow,
+        )
+    engine = create_engine(url, echo=False, connect_args={"check_same_thread": False}, **kwargs)
+
+    pragmas = sqlite_pragmas(
+        wal=settings.DB_WAL if wal is None else wal,
+        synchronous=synchronous or settings.DB_SYNCHRONOUS,
+        mmap_mb=settings.DB_MMAP_MB if mmap_mb is None else mmap_mb,
+        cache_mb=settings.DB_CACHE_MB if cache_mb is None else cache_mb,
+        busy_timeout_ms=settings.DB_BUSY_TIMEOUT_MS if busy_timeout_ms is None else busy_timeout_ms,
+    )
+
+    @event.listens_for(engine, "connect")
+    def _apply_pragmas(dbapi_conn, _record):
+        cursor = dbapi_conn.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+    return engine
+
+
+def session_factory(bind) -> sessionmaker:
+    # expire_on_commit=False: entidades convertidas depois do commit não disparam novo SELECT
+    return sessionmaker(bind=bind, class_=Session, expire_on_commit=False)
+
+
+engine = build_engine()
+SessionLocal = session_factory(engine)
+
 
-engine = create_engine(DATABASE_URL, echo=False, connect_args={"check_same_thread": False})
+def init_db(bind=None, log_search: Optional[bool] = None):
+    bind = bind or engine
+    SQLModel.metadata.create_all(bind)
+    # create_all não cria índices novos em tabelas que já existem (bancos de versões anteriores)
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind, checkfirst=True)
+    # FTS5 + triggers ficam fora do metadata (tabela virtual)
+    init_log_search(bind, settings.LOG_SEARCH_FTS if log_search is None else log_search)
 
-def init_db():
-    SQLModel.metadata.create_all(engine)
 
 def get_session():
-    with Session(engine) as session:
+    """Sessão por requisição (dependência do FastAPI); a conexão volta ao pool no fim."""
+    with SessionLocal() as session:
         yield session
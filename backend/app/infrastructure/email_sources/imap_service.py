@@ -1,15 +1,17 @@
 import threading
 from app.application.use_cases.sync_emails import SyncEmailsUseCase
 from app.infrastructure.nlp.tokenizer_simple import SimpleTokenizer
+from app.config import settings
 
 
 class ImapService:
-    def __init__(self, source, classifier, repo, profile_id, interval=60):
+    def __init__(self, source, classifier, repo, profile_id, interval=60, batch_size=None):
         self.source = source
         self.classifier = classifier
         self.repo = repo
         self.profile_id = profile_id
         self.interval = interval
+        self.batch_size = batch_size or settings.LLM_BATCH_SIZE
         self._stop_event = threading.Event()
         self._thread: threading.Thread | None = None
         self.tokenizer = SimpleTokenizer(lang="auto")
@@ -34,6 +36,7 @@ class ImapService:
             repo=self.repo,
             profile_id=self.profile_id,
             tokenizer=self.tokenizer,
+            batch_size=self.batch_size,
         )
 
         while not self._stop_event.is_set():
@@ -0,0 +1,143 @@
+import asyncio
+import functools
+import importlib
+import multiprocessing
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from app.domain.errors import Overloaded
+from app.profiling import capture
+
+# --- lado do worker (processo) ----
+# Cada processo constrói o próprio ClassifyEmailUseCase uma única vez (modelos,
+# profiles e sessão carregados no initializer) e reaproveita entre chamadas.
+_worker_uc = None
+
+
+def _load_factory(path: str) -> Callable[[], Any]:
+    module, _, attr = path.partition(":")
+    return getattr(importlib.import_module(module), attr)
+
+
+def _init_worker(factory_path: str) -> None:
+    global _worker_uc
+    _worker_uc = _load_factory(factory_path)()
+
+
+def _call_worker(method: str, args: tuple, kwargs: dict):
+    return getattr(_worker_uc, method)(*args, **kwargs)
+
+
+def _call_worker_profiled(method: str, args: tuple, kwargs: dict):
+    # stats do cProfile são um dict serializável: voltam ao processo pai junto com o resultado
+    return capture(getattr(_worker_uc, method), *args, **kwargs)
+
+
+def _ping() -> bool:
+    return _worker_uc is not None
+
+
+class UseCaseExecutor:
+    """
+    Despacha métodos do ClassifyEmailUseCase para fora do event loop.
+
+    - kind="inline"  → executa no próprio loop (comportamento antigo, p/ debug)
+    - kind="thread"  → ThreadPoolExecutor sobre o `use_case` recebido
+    - kind="process" → ProcessPoolExecutor; cada worker monta seu use case via
+                       `factory` ("modulo:funcao") no initializer
+    Backpressure: no máximo `max_pending` chamadas em voo; acima disso `Overloaded`.
+    `call` roda etapas avulsas (caminho assíncrono do caso de uso) nas mesmas threads.
+    """
+
+    def __init__(
+        self,
+        use_case=None,
+        kind: str = "thread",
+        workers: int = 4,
+        max_pending: int = 16,
+        factory: str = "app.bootstrap:build_use_case",
+    ):
+        if kind not in ("inline", "thread", "process"):
+            raise ValueError(f"EXECUTOR_KIND inválido: {kind}")
+        if kind != "process" and use_case is None:
+            raise ValueError("use_case é obrigatório para executor inline/thread")
+
+        self.kind = kind
+        self.workers = max(1, workers)
+        self.max_pending = max(1, max_pending)
+        self._uc = use_case
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._pool: Optional[Executor] = None
+
+        if kind == "thread":
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="classify")
+        elif kind == "process":
+            # spawn: não herda threads (micro-batcher, IMAP) nem a sessão SQLite do processo pai
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(factory,),
+            )
+
+    def warm_up(self) -> None:
+        """Força a criação dos workers (e o carregamento dos modelos) antes do 1º request."""
+        if self.kind == "process":
+            futures = [self._pool.submit(_ping) for _ in range(self.workers)]
+            for f in futures:
+                f.result()
+
+    async def run(self, method: str, *args, **kwargs):
+        if not self._slots.acquire(blocking=False):
+            raise Overloaded("Servidor ocupado, tente novamente em instantes.")
+        try:
+            if self.kind == "inline":
+                return getattr(self._uc, method)(*args, **kwargs)
+
+            loop = asyncio.get_running_loop()
+            if self.kind == "thread":
+                fn = getattr(self._uc, method)
+                return await loop.run_in_executor(self._pool, lambda: fn(*args, **kwargs))
+            return await loop.run_in_executor(self._pool, _call_worker, method, args, kwargs)
+        finally:
+            self._slots.release()
+
+    async def run_profiled(self, method: str, *args, **kwargs):
+        """Como `run`, sob cProfile no worker que executa → (resultado, stats, ms)."""
+        if not self._slots.acquire(blocking=False):
+            raise Overloaded("Servidor ocupado, tente novamente em instantes.")
+        try:
+            if self.kind == "inline":
+                return capture(getattr(self._uc, method), *args, **kwargs)
+
+            loop = asyncio.get_running_loop()
+            if self.kind == "thread":
+                fn = getattr(self._uc, method)
+                return await loop.run_in_executor(self._pool, lambda: capture(fn, *args, **kwargs))
+            return await loop.run_in_executor(self._pool, _call_worker_profiled, method, args, kwargs)
+        finally:
+            self._slots.release()
+
+    async def call(self, fn: Callable, *args, admit: bool = True, **kwargs):
+        """
+        Roda `fn` numa thread do pool. Com `admit`, passa pela mesma admissão de
+        `run` (Overloaded se cheio); sem, só entra na fila do pool. Com
+        kind="process" o caminho assíncrono usa o use case deste processo:
+        `fn` roda nas threads padrão do loop.
+        """
+        if admit and not self._slots.acquire(blocking=False):
+            raise Overloaded("Servidor ocupado, tente novamente em instantes.")
+        try:
+            if self.kind == "inline":
+                return fn(*args, **kwargs)
+            pool = self._pool if self.kind == "thread" else None
+            return await asyncio.get_running_loop().run_in_executor(pool, functools.partial(fn, *args, **kwargs))
+        finally:
+            if admit:
+                self._slots.release()
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
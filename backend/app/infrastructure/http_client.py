@@ -0,0 +1,370 @@
+import asyncio
+import http.client
+import json
+import random
+import ssl
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import h11
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+# o servidor recusou sem processar: as únicas respostas que um POST pode repetir sem risco de cobrança dupla
+UNPROCESSED_STATUSES = frozenset({429, 503})
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+# falhas de uma conexão keep-alive que o servidor já fechou: refaz com conexão nova
+_STALE_ERRORS = (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError, http.client.BadStatusLine)
+
+
+class HttpClientError(Exception):
+    """Falha de transporte depois de esgotar as tentativas (timeout, conexão recusada, pool cheio)."""
+
+
+class _ConnectError(OSError):
+    """Falha ao abrir a conexão (TCP/TLS): nada foi enviado, sempre seguro repetir."""
+
+
+class _PoolConfig:
+    """Configuração, backoff e contadores comuns aos clientes síncrono e assíncrono."""
+
+    def __init__(
+        self,
+        base_url: str,
+        max_connections: int = 10,
+        connect_timeout_s: float = 5.0,
+        read_timeout_s: float = 30.0,
+        max_retries: int = 2,
+        backoff_base_s: float = 0.25,
+        backoff_max_s: float = 4.0,
+        pool_timeout_s: Optional[float] = None,
+        ssl_context: Optional[ssl.SSLContext] = None,
+    ):
+        parts = urlsplit(base_url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"base_url inválida: {base_url!r}")
+        self.base_url = base_url.rstrip("/")
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port
+        self.prefix = parts.path.rstrip("/")
+        self.max_connections = max(1, max_connections)
+        self.connect_timeout_s = connect_timeout_s
+        self.read_timeout_s = read_timeout_s
+        self.max_retries = max(0, max_retries)
+        self.backoff_base_s = backoff_base_s
+        self.backoff_max_s = backoff_max_s
+        self.pool_timeout_s = pool_timeout_s if pool_timeout_s is not None else connect_timeout_s + read_timeout_s
+        self.ssl_context = ssl_context
+
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "connections_opened": 0, "reused": 0, "retries": 0, "stale": 0}
+
+    def _url(self, path: str) -> str:
+        return self.prefix + (path if path.startswith("/") else "/" + path)
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self._stats[key] += 1
+
+    def _retryable_error(self, method: str, error: BaseException) -> bool:
+        # depois de enviado, um timeout de leitura não diz se o servidor processou (e cobrou) o pedido
+        return isinstance(error, _ConnectError) or method.upper() in IDEMPOTENT_METHODS
+
+    def _retryable_status(self, method: str, status: int) -> bool:
+        statuses = RETRY_STATUSES if method.upper() in IDEMPOTENT_METHODS else UNPROCESSED_STATUSES
+        return status in statuses
+
+    def _backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        if retry_after:
+            try:
+                return min(self.backoff_max_s, max(0.0, float(retry_after)))
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.backoff_max_s, self.backoff_base_s * (2 ** attempt)))
+
+
+class PooledHttpClient(_PoolConfig):
+    """
+    Cliente HTTP(S) thread-safe com pool de conexões keep-alive (http.client).
+
+    - Conexões ociosas são reaproveitadas (LIFO); no máximo `max_connections`
+      em uso ao mesmo tempo — quem passar disso espera até `pool_timeout_s`.
+    - Timeouts separados: `connect_timeout_s` para TCP/TLS, `read_timeout_s`
+      para cada leitura da resposta.
+    - Repete até `max_retries` vezes, com backoff exponencial com jitter ("full
+      jitter") e respeitando Retry-After: falhas de conexão sempre; 429/503
+      sempre; demais 5xx e falhas depois do envio (ex.: timeout de leitura)
+      só em métodos idempotentes — um POST ao LLM não é cobrado duas vezes.
+    - `base_url` inclui esquema, host e prefixo (ex.: https://api.openai.com/v1),
+      o que permite apontar testes/benchmarks para um servidor local.
+    """
+
+    def __init__(self, base_url: str, **kwargs):
+        super().__init__(base_url, **kwargs)
+        self._idle: List[http.client.HTTPConnection] = []
+        self._slots = threading.BoundedSemaphore(self.max_connections)
+
+    # --- API ---
+    def request(
+        self,
+        method: str,
+        path: str,
+        body: Optional[bytes] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Tuple[int, Dict[str, str], bytes]:
+        """Envia a requisição (com retries) e devolve (status, headers, corpo)."""
+        url = self._url(path)
+        attempt = 0
+        while True:
+            try:
+                status, resp_headers, data = self._send(method, url, body, headers or {})
+            except (OSError, http.client.HTTPException) as e:
+                if attempt >= self.max_retries or not self._retryable_error(method, e):
+                    raise HttpClientError(f"{method} {self.base_url}{path}: {e}") from e
+                delay = self._backoff(attempt)
+            else:
+                if not self._retryable_status(method, status) or attempt >= self.max_retries:
+                    return status, resp_headers, data
+                delay = self._backoff(attempt, resp_headers.get("retry-after"))
+            attempt += 1
+            self._count("retries")
+            time.sleep(delay)
+
+    def post_json(self, path: str, payload: Any, headers: Optional[Dict[str, str]] = None) -> Tuple[int, Any]:
+        body = json.dumps(payload).encode("utf-8")
+        h = {"Content-Type": "application/json", **(headers or {})}
+        status, _, data = self.request("POST", path, body, h)
+        return status, json.loads(data.decode("utf-8"))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._stats, "idle": len(self._idle), "max_connections": self.max_connections}
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+    # --- internos ---
+    def _send(self, method: str, url: str, body: Optional[bytes], headers: Dict[str, str]):
+        if not self._slots.acquire(timeout=self.pool_timeout_s):
+            raise HttpClientError(f"Pool HTTP esgotado ({self.max_connections} conexões em uso)")
+        try:
+            conn, reused = self._checkout()
+            try:
+                res = self._roundtrip(conn, method, url, body, headers)
+            except _STALE_ERRORS:
+                conn.close()
+                if not reused:
+                    raise
+                # o servidor fechou a conexão ociosa: uma nova tentativa imediata, sem backoff
+                self._count("stale")
+                conn = self._open()
+                try:
+                    res = self._roundtrip(conn, method, url, body, headers)
+                except BaseException:
+                    conn.close()
+                    raise
+            except BaseException:
+                conn.close()
+                raise
+
+            try:
+                data = res.read()
+            except BaseException:
+                conn.close()
+                raise
+            resp_headers = {k.lower(): v for k, v in res.getheaders()}
+            if res.will_close:
+                conn.close()
+            else:
+                with self._lock:
+                    self._idle.append(conn)
+            return res.status, resp_headers, data
+        finally:
+            self._slots.release()
+
+    def _roundtrip(self, conn, method, url, body, headers) -> http.client.HTTPResponse:
+        self._count("requests")
+        conn.request(method, url, body=body, headers=headers)
+        return conn.getresponse()
+
+    def _checkout(self) -> Tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            if self._idle:
+                self._stats["reused"] += 1
+                return self._idle.pop(), True
+        return self._open(), False
+
+    def _open(self) -> http.client.HTTPConnection:
+        if self.scheme == "https":
+            conn = http.client.HTTPSConnection(
+                self.host, self.port, timeout=self.connect_timeout_s, context=self.ssl_context
+            )
+        else:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=self.connect_timeout_s)
+        try:
+            conn.connect()
+        except OSError as e:
+            conn.close()
+            raise _ConnectError(f"conexão com {self.host} falhou: {e}") from e
+        conn.sock.settimeout(self.read_timeout_s)
+        self._count("connections_opened")
+        return conn
+
+
+class _AsyncConn:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.h11 = h11.Connection(our_role=h11.CLIENT)
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class AsyncPooledHttpClient(_PoolConfig):
+    """
+    Versão asyncio do PooledHttpClient (streams do asyncio + h11 para o HTTP/1.1):
+    mesmas regras de pool keep-alive, timeouts, retries e Retry-After, sem
+    ocupar uma thread por requisição em voo. Pertence a um único event loop;
+    se usado de outro loop, o pool é descartado e recriado.
+    """
+
+    def __init__(self, base_url: str, **kwargs):
+        super().__init__(base_url, **kwargs)
+        self._idle: List[_AsyncConn] = []
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    # --- API ---
+    async def request(
+        self,
+        method: str,
+        path: str,
+        body: Optional[bytes] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Tuple[int, Dict[str, str], bytes]:
+        url = self._url(path)
+        attempt = 0
+        while True:
+            try:
+                status, resp_headers, data = await self._send(method, url, body or b"", headers or {})
+            except (OSError, asyncio.TimeoutError, h11.ProtocolError) as e:
+                if attempt >= self.max_retries or not self._retryable_error(method, e):
+                    raise HttpClientError(f"{method} {self.base_url}{path}: {e!r}") from e
+                delay = self._backoff(attempt)
+            else:
+                if not self._retryable_status(method, status) or attempt >= self.max_retries:
+                    return status, resp_headers, data
+                delay = self._backoff(attempt, resp_headers.get("retry-after"))
+            attempt += 1
+            self._count("retries")
+            await asyncio.sleep(delay)
+
+    async def post_json(self, path: str, payload: Any, headers: Optional[Dict[str, str]] = None) -> Tuple[int, Any]:
+        body = json.dumps(payload).encode("utf-8")
+        h = {"Content-Type": "application/json", **(headers or {})}
+        status, _, data = await self.request("POST", path, body, h)
+        return status, json.loads(data.decode("utf-8"))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._stats, "idle": len(self._idle), "max_connections": self.max_connections}
+
+    async def aclose(self) -> None:
+        idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+    # --- internos ---
+    def _bind_loop(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            for conn in self._idle:
+                conn.writer.transport.abort()
+            self._idle = []
+            self._slots = asyncio.Semaphore(self.max_connections)
+            self._loop = loop
+        return self._slots
+
+    async def _send(self, method: str, url: str, body: bytes, headers: Dict[str, str]):
+        slots = self._bind_loop()
+        try:
+            await asyncio.wait_for(slots.acquire(), self.pool_timeout_s)
+        except asyncio.TimeoutError:
+            raise HttpClientError(f"Pool HTTP esgotado ({self.max_connections} conexões em uso)")
+        try:
+            reused = bool(self._idle)
+            if reused:
+                conn = self._idle.pop()
+                self._count("reused")
+            else:
+                conn = await self._open()
+            try:
+                result = await self._roundtrip(conn, method, url, body, headers)
+            except (ConnectionError, h11.RemoteProtocolError, asyncio.IncompleteReadError):
+                conn.close()
+                if not reused:
+                    raise
+                # o servidor fechou a conexão ociosa: uma nova tentativa imediata, sem backoff
+                self._count("stale")
+                conn = await self._open()
+                try:
+                    result = await self._roundtrip(conn, method, url, body, headers)
+                except BaseException:
+                    conn.close()
+                    raise
+            except BaseException:
+                conn.close()
+                raise
+
+            if conn.h11.our_state is h11.DONE and conn.h11.their_state is h11.DONE:
+                conn.h11.start_next_cycle()
+                self._idle.append(conn)
+            else:
+                conn.close()
+            return result
+        finally:
+            slots.release()
+
+    async def _roundtrip(self, conn: _AsyncConn, method: str, url: str, body: bytes, headers: Dict[str, str]):
+        self._count("requests")
+        host = self.host if self.port is None else f"{self.host}:{self.port}"
+        req_headers = [("Host", host), ("Content-Length", str(len(body)))] + list(headers.items())
+        conn.writer.write(conn.h11.send(h11.Request(method=method, target=url, headers=req_headers)))
+        conn.writer.write(conn.h11.send(h11.Data(data=body)))
+        conn.writer.write(conn.h11.send(h11.EndOfMessage()))
+        await conn.writer.drain()
+
+        status, resp_headers, chunks = 0, {}, []
+        while True:
+            event = conn.h11.next_event()
+            if event is h11.NEED_DATA:
+                data = await asyncio.wait_for(conn.reader.read(65536), self.read_timeout_s)
+                if not data and not chunks and status == 0:
+                    raise ConnectionResetError("conexão fechada pelo servidor")
+                conn.h11.receive_data(data)
+            elif isinstance(event, h11.Response):
+                status = event.status_code
+                resp_headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in event.headers}
+            elif isinstance(event, h11.Data):
+                chunks.append(bytes(event.data))
+            elif isinstance(event, (h11.EndOfMessage, h11.ConnectionClosed)):
+                return status, resp_headers, b"".join(chunks)
+
+    async def _open(self) -> _AsyncConn:
+        port = self.port or (443 if self.scheme == "https" else 80)
+        ssl_ctx = (self.ssl_context or ssl.create_default_context()) if self.scheme == "https" else None
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(self.host, port, ssl=ssl_ctx), self.connect_timeout_s
+            )
+        except (OSError, asyncio.TimeoutError) as e:
+            raise _ConnectError(f"conexão com {self.host} falhou: {e!r}") from e
+        self._count("connections_opened")
+        return _AsyncConn(reader, writer)
@@ -1,15 +1,24 @@
 from datetime import datetime
 from typing import Optional, Dict, Any
-from sqlmodel import SQLModel, Field, Column, JSON
+from sqlmodel import SQLModel, Field, Column, JSON, Index
 
 
 class ClassificationLogModel(SQLModel, table=True):
     __tablename__ = "classification_logs"
+    # filtro + chave do keyset (created_at, id): o filtro vira um intervalo do índice já na
+    # ordem da paginação, sem ordenar nem varrer linhas de outros perfis/categorias
+    __table_args__ = (
+        Index("ix_logs_profile_created_id", "profile_id", "created_at", "id"),
+        Index("ix_logs_category_created_id", "category", "created_at", "id"),
+        Index("ix_logs_source_created_id", "source", "created_at", "id"),
+        Index("ix_logs_model_created_id", "used_model", "created_at", "id"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
+    # sem filtro: (created_at, rowid) — no SQLite o rowid (= id) já vem no fim de todo índice
     created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
 
-    source: str = Field(index=True)  
+    source: str
     subject: Optional[str] = None
     body_excerpt: Optional[str] = None
     sender: Optional[str] = None
@@ -63,6 +72,29 @@ class ClassificationLogModel(SQLModel, table=True):
     def from_entity(cls, log_entity):
         return cls(**log_entity.__dict__)
 
+class ClassificationRollupModel(SQLModel, table=True):
+    """
+    Agregados por hora × perfil × categoria × origem × modelo, mantidos na
+    mesma transação que grava/atualiza os logs. Dimensões ausentes viram ""
+    (NULL não casa no ON CONFLICT da chave).
+    """
+    __tablename__ = "classification_rollups_hourly"
+
+    bucket: datetime = Field(primary_key=True)  # início da hora (UTC)
+    profile_id: str = Field(default="", primary_key=True)
+    category: str = Field(default="", primary_key=True)
+    source: str = Field(default="", primary_key=True)
+    used_model: str = Field(default="", primary_key=True)
+
+    count: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    total_tokens: int = 0
+    cost_usd: float = 0.0
+    latency_ms_sum: int = 0
+    latency_count: int = 0  # logs com latency_ms (média = soma / latency_count)
+
+
 class UserModel(SQLModel, table=True):
     __tablename__ = "users"
 
@@ -0,0 +1,138 @@
+"""
+Matcher multi-padrão (Aho-Corasick) para keywords/sinônimos de perfil.
+
+O autômato trabalha sobre palavras (\\w+) do texto normalizado, não sobre
+caracteres: limites de palavra ficam garantidos por construção ("nf" não
+casa dentro de "informação") e keywords com várias palavras ("nota fiscal",
+"conteúdo textual") casam numa única varredura linear, com contagem.
+"""
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from functools import cached_property
+from typing import Dict, Iterable, List, Optional
+
+_WORD_RE = re.compile(r"\w+", flags=re.UNICODE)
+
+
+def normalize_keyword(keyword: str) -> str:
+    return " ".join(_WORD_RE.findall(str(keyword).lower()))
+
+
+class KeywordMatcher:
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords: List[str] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+
+        seen = set()
+        for kw in keywords:
+            norm = normalize_keyword(kw)
+            if not norm or norm in seen:
+                continue
+            seen.add(norm)
+            self._insert(norm.split(" "), len(self.keywords))
+            self.keywords.append(norm)
+        self._build_links()
+
+    def __len__(self) -> int:
+        return len(self.keywords)
+
+    def _insert(self, words: List[str], kw_id: int) -> None:
+        s = 0
+        for w in words:
+            nxt = self._goto[s].get(w)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[s][w] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            s = nxt
+        self._out[s].append(kw_id)
+
+    def _build_links(self) -> None:
+        queue = list(self._goto[0].values())
+        head = 0
+        while head < len(queue):
+            s = queue[head]
+            head += 1
+            for w, t in self._goto[s].items():
+                queue.append(t)
+                f = self._fail[s]
+                while f and w not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[t] = self._goto[f].get(w, 0)
+                # saídas do sufixo mais longo também terminam aqui ("nota" dentro de "nota fiscal")
+                self._out[t] = self._out[t] + self._out[self._fail[t]]
+
+    def find_words(self, words: Iterable[str]) -> Dict[str, int]:
+        """Palavras já normalizadas (lowercase) → {keyword: ocorrências}."""
+        goto, fail, out = self._goto, self._fail, self._out
+        counts: Dict[int, int] = {}
+        s = 0
+        for w in words:
+            while s and w not in goto[s]:
+                s = fail[s]
+            s = goto[s].get(w, 0)
+            for k in out[s]:
+                counts[k] = counts.get(k, 0) + 1
+        return {self.keywords[k]: c for k, c in counts.items()}
+
+    def find(self, text: str) -> Dict[str, int]:
+        """Texto livre → {keyword: ocorrências}, numa única varredura."""
+        if not self.keywords or not text:
+            return {}
+        return self.find_words(_WORD_RE.findall(text.lower()))
+
+
+class KeywordSet(tuple):
+    """
+    Keywords de um perfil (ordenadas, sem repetição) com o matcher compilado
+    sob demanda e uma chave estável: passa pelo pipeline como `priority` sem
+    custo O(keywords) por requisição.
+    """
+
+    prompt = None  # prefixo do prompt do LLM do perfil; preenchido pelo store de perfis na compilação
+
+    def __new__(cls, keywords: Iterable[str]):
+        return super().__new__(cls, sorted(set(keywords)))
+
+    @cached_property
+    def matcher(self) -> KeywordMatcher:
+        return KeywordMatcher(self)
+
+    @cached_property
+    def key(self) -> str:
+        return hashlib.sha256("\x1f".join(self).encode("utf-8")).hexdigest()[:16]
+
+
+_cache: "OrderedDict[frozenset, KeywordMatcher]" = OrderedDict()
+_cache_lock = threading.Lock()
+_CACHE_SIZE = 256
+
+
+def matcher_for(keywords: Optional[Iterable[str]]) -> Optional[KeywordMatcher]:
+    """
+    Matcher compilado para um conjunto de keywords, memoizado (LRU) pelo
+    conjunto: cada perfil é compilado uma vez e compartilhado entre classificadores.
+    """
+    if not keywords:
+        return None
+    matcher = getattr(keywords, "matcher", None)
+    if isinstance(matcher, KeywordMatcher):
+        return matcher
+    key = keywords if isinstance(keywords, frozenset) else frozenset(keywords)
+    with _cache_lock:
+        m = _cache.get(key)
+        if m is not None:
+            _cache.move_to_end(key)
+            return m
+    m = KeywordMatcher(key)
+    with _cache_lock:
+        _cache[key] = m
+        while len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+    return m
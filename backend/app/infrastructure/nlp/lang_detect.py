@@ -0,0 +1,80 @@
+# --- detecção de idioma (pt/en/es) ----
+# 1) identificador por n-gramas (NumPy, rápido) → 2) langdetect se a confiança
+# for baixa e a lib estiver instalada → 3) palpite do n-grama / heurística leve.
+import threading
+from typing import Optional
+
+try:
+    from langdetect import detect, DetectorFactory
+    DetectorFactory.seed = 0  # reproducibilidade
+except Exception:  # fallback se lib não estiver instalada
+    detect = None
+
+from app.config import settings
+from app.infrastructure.nlp.lang_id import NgramLanguageIdentifier
+
+SUPPORTED_LANGS = ("pt", "en", "es")
+LANG_PREFIX_CHARS = 4000
+
+_default_identifier: Optional[NgramLanguageIdentifier] = None
+_default_lock = threading.Lock()
+DEFAULT = object()  # sentinela: usa o identificador compartilhado; None desliga o n-grama
+
+
+def default_identifier() -> Optional[NgramLanguageIdentifier]:
+    """
+    Identificador compartilhado conforme LANG_ID_* (carregado uma vez); None se
+    LANG_ID_ENGINE não for "ngram" ou se as tabelas faltarem.
+    """
+    global _default_identifier
+    if _default_identifier is None:
+        with _default_lock:
+            if _default_identifier is None:
+                if settings.LANG_ID_ENGINE != "ngram":
+                    _default_identifier = False
+                    return None
+                try:
+                    _default_identifier = NgramLanguageIdentifier(
+                        SUPPORTED_LANGS,
+                        prefix_chars=settings.LANG_ID_PREFIX_CHARS,
+                        min_confidence=settings.LANG_ID_MIN_CONFIDENCE,
+                    )
+                except Exception as e:
+                    print(f"[WARN] Identificador de idioma por n-gramas indisponível: {e}")
+                    _default_identifier = False
+    return _default_identifier or None
+
+
+def detect_lang(
+    text: str,
+    supported_langs=SUPPORTED_LANGS,
+    default: str = "pt",
+    identifier=DEFAULT,
+) -> str:
+    if identifier is DEFAULT:
+        identifier = default_identifier()
+    guess = None
+    if identifier is not None:
+        guess, confidence = identifier.identify(text)
+        if guess in supported_langs and identifier.is_confident(confidence):
+            return guess
+
+    if detect:
+        try:
+            lang = detect((text or "")[:LANG_PREFIX_CHARS])
+            if lang in supported_langs:
+                return lang
+        except Exception:
+            pass
+    if guess in supported_langs:
+        return guess
+
+    # heurística leve de fallback
+    t = (text or "").lower()
+    if any(w in t for w in (" você ", " obrigado", " nota fiscal", "prazo")):
+        return "pt"
+    if any(w in t for w in (" you ", " thanks", " invoice", "deadline", "meeting")):
+        return "en"
+    if any(w in t for w in (" usted ", " gracias", " factura", "plazo", "reunión")):
+        return "es"
+    return default
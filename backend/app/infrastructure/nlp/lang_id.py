@@ -0,0 +1,128 @@
+"""
+Identificador de idioma por n-gramas de caracteres (1..3), só com NumPy.
+
+As tabelas de frequência ficam em app/data/lang_ngrams.npz (geradas por
+scripts/build_lang_tables.py a partir dos perfis do langdetect). Em tempo de
+execução o texto é mapeado para um alfabeto pequeno (espaço + a-z + acentos
+de pt/es), os n-gramas viram índices inteiros e o score de cada idioma é uma
+soma de log-probabilidades indexadas — sem dicts nem loops por caractere.
+"""
+import os
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), "../../data/lang_ngrams.npz")
+
+ALPHABET = " abcdefghijklmnopqrstuvwxyzáàâãéèêíóôõúüçñ"
+A = len(ALPHABET)
+ORDERS = (1, 2, 3)
+
+# codepoint → índice no alfabeto (0 = espaço/qualquer outro caractere)
+_LUT = np.zeros(0x250, dtype=np.int64)
+for _i, _ch in enumerate(ALPHABET):
+    _LUT[ord(_ch)] = _i
+
+
+def encode(text: str) -> np.ndarray:
+    """Texto → índices do alfabeto, com espaços colapsados e bordas acolchoadas."""
+    cp = np.frombuffer(text.lower().encode("utf-32-le"), dtype=np.uint32)
+    codes = np.where(cp < _LUT.size, _LUT[np.minimum(cp, _LUT.size - 1)], 0)
+    codes = np.concatenate(([0], codes, [0]))
+    keep = np.ones(codes.size, dtype=bool)
+    keep[1:] = (codes[1:] != 0) | (codes[:-1] != 0)
+    return codes[keep]
+
+
+def ngram_ids(codes: np.ndarray, n: int) -> np.ndarray:
+    if codes.size < n:
+        return np.empty(0, dtype=np.int64)
+    ids = np.zeros(codes.size - n + 1, dtype=np.int64)
+    for k in range(n):
+        ids = ids * A + codes[k:codes.size - n + 1 + k]
+    if n == 1:
+        ids = ids[ids != 0]  # espaço isolado não é sinal
+    return ids
+
+
+class NgramLanguageIdentifier:
+    """
+    - `identify(text)` → (idioma, confiança) usando só os `prefix_chars` iniciais
+    - `identify_batch(texts)` → mesma coisa para vários textos numa passada
+    Confiança = margem média de log-verossimilhança (nats por n-grama) entre o
+    melhor e o segundo idioma; abaixo de `min_confidence` o chamador decide o
+    fallback (langdetect).
+    """
+
+    def __init__(
+        self,
+        supported_langs: Sequence[str] = ("pt", "en", "es"),
+        prefix_chars: int = 1000,
+        min_confidence: float = 0.05,
+        path: str = DATA_PATH,
+    ):
+        data = np.load(path, allow_pickle=False)
+        if str(data["alphabet"]) != ALPHABET:
+            raise ValueError("lang_ngrams.npz foi gerado com outro alfabeto")
+
+        available = [str(x) for x in data["langs"]]
+        self.langs = [l for l in supported_langs if l in available]
+        if not self.langs:
+            raise ValueError(f"Nenhum idioma suportado em {path}: {list(supported_langs)}")
+        self.prefix_chars = prefix_chars
+        self.min_confidence = min_confidence
+
+        # tabelas densas de log-prob: (n_langs, A**n), suavização add-one
+        self.tables = {}
+        for n in ORDERS:
+            table = np.empty((len(self.langs), A ** n), dtype=np.float32)
+            for row, lang in enumerate(self.langs):
+                ids = data[f"{lang}_{n}_ids"]
+                counts = data[f"{lang}_{n}_counts"]
+                total = float(data[f"{lang}_{n}_total"])
+                denom = total + A ** n
+                table[row, :] = np.log(1.0 / denom)
+                table[row, ids] = np.log((counts + 1.0) / denom)
+            self.tables[n] = table
+
+    def _scores(self, text: str) -> Tuple[np.ndarray, int]:
+        codes = encode((text or "")[: self.prefix_chars])
+        scores = np.zeros(len(self.langs), dtype=np.float64)
+        count = 0
+        for n in ORDERS:
+            ids = ngram_ids(codes, n)
+            if ids.size:
+                scores += self.tables[n][:, ids].sum(axis=1)
+                count += ids.size
+        return scores, count
+
+    def _decide(self, scores: np.ndarray, count: int) -> Tuple[Optional[str], float]:
+        if count == 0:
+            return None, 0.0
+        order = np.argsort(scores)[::-1]
+        if len(order) == 1:
+            return self.langs[order[0]], float("inf")
+        margin = float(scores[order[0]] - scores[order[1]]) / count
+        return self.langs[order[0]], margin
+
+    def identify(self, text: str) -> Tuple[Optional[str], float]:
+        return self._decide(*self._scores(text))
+
+    def identify_batch(self, texts: Sequence[str]) -> List[Tuple[Optional[str], float]]:
+        encoded = [encode((t or "")[: self.prefix_chars]) for t in texts]
+        scores = np.zeros((len(texts), len(self.langs)), dtype=np.float64)
+        counts = np.zeros(len(texts), dtype=np.int64)
+        for n in ORDERS:
+            per_doc = [ngram_ids(c, n) for c in encoded]
+            sizes = np.array([p.size for p in per_doc], dtype=np.int64)
+            counts += sizes
+            if not sizes.sum():
+                continue
+            flat = self.tables[n][:, np.concatenate(per_doc)]          # (n_langs, total)
+            ends = np.cumsum(sizes)
+            csum = np.concatenate((np.zeros((len(self.langs), 1)), np.cumsum(flat, axis=1)), axis=1)
+            scores += (csum[:, ends] - csum[:, ends - sizes]).T
+        return [self._decide(scores[i], int(counts[i])) for i in range(len(texts))]
+
+    def is_confident(self, confidence: float) -> bool:
+        return confidence >= self.min_confidence
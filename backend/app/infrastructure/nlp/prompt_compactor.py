@@ -0,0 +1,195 @@
+"""
+Compactação do corpo do email antes de escalar para o LLM.
+
+1. Remove respostas citadas (linhas "> ...", "Em ... escreveu:", "-----Original
+   Message-----", cabeçalhos De:/Enviado: do Outlook), assinaturas e avisos
+   padrão (confidencialidade, "antes de imprimir", "Enviado do meu ...").
+2. Se ainda passar do orçamento de tokens, mantém as frases mais informativas:
+   score = peso × hits de keywords do perfil + soma do IDF dos termos / √termos.
+   O IDF vem do vetorizador TF-IDF do modelo de ML quando disponível; sem ele,
+   cada frase conta como um documento (IDF interno ao email).
+3. As frases escolhidas voltam na ordem original; lacunas viram " … ".
+
+Tokens são estimados localmente (`estimate_tokens`), sem tokenizer do provedor.
+"""
+import math
+import re
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+from app.infrastructure.nlp.keyword_matcher import matcher_for
+
+_PIECE_RE = re.compile(r"\w+|[^\w\s]", flags=re.UNICODE)
+_TERM_RE = re.compile(r"(?u)\b\w\w+\b")  # token_pattern padrão do TfidfVectorizer
+_SENTENCE_RE = re.compile(r"(?<=[.!?…])\s+|\n+")
+
+# daqui para baixo é histórico citado ou assinatura: corta o resto do texto
+_CUT_RE = re.compile(
+    r"(?im)^\s*("
+    r"(on|em|el)\b[^\n]{0,200}\n?[^\n]{0,200}\b(wrote|escreveu|escribió)\s*:\s*$"
+    r"|-{2,}\s*(original message|mensagem original|mensaje original|forwarded message|mensagem encaminhada|mensaje reenviado)\s*-*\s*$"
+    r"|(from|de)\s*:[^\n]*\n\s*(sent|enviado|enviada|date|data|fecha)\s*:"
+    r"|--\s*$"
+    r"|(atenciosamente|att|kind regards|best regards|saludos cordiales|abraços)\s*,?\s*$"
+    r"|(enviado do meu|sent from my|enviado desde mi|obtenha o outlook|get outlook for)\b"
+    r")"
+)
+# parágrafos de aviso padrão (começam a linha): removidos até a próxima linha em branco.
+# "unsubscribe"/descadastro fica: é sinal útil de newsletter para a classificação.
+_BOILERPLATE_RE = re.compile(
+    r"(?i)^(\W*(aviso de confidencialidade|confidentiality notice|disclaimer)\b"
+    r"|this (e-?mail|message) (and any attachments )?(is|may contain|contains)"
+    r"|esta mensagem (e seus anexos )?(pode conter|é confidencial|contém)"
+    r"|este (correo|mensaje) (y sus anexos )?(puede contener|es confidencial)"
+    r"|antes de imprimir|please consider the environment|por favor, considere o meio ambiente)"
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimativa offline de tokens BPE: palavras ASCII ~4 caracteres por token,
+    palavras com acentos ~3, pontuação 1 token cada.
+    """
+    total = 0
+    for piece in _PIECE_RE.findall(text or ""):
+        if piece[0].isalnum() or piece[0] == "_":
+            total += math.ceil(len(piece) / (4 if piece.isascii() else 3))
+        else:
+            total += 1
+    return total
+
+
+def strip_quoted(text: str) -> str:
+    """Remove histórico citado, assinatura e parágrafos de aviso padrão."""
+    if not text:
+        return ""
+    match = _CUT_RE.search(text)
+    if match and text[:match.start()].strip():
+        text = text[:match.start()]
+    kept: List[str] = []
+    skipping = False
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not stripped:
+            skipping = False
+            kept.append("")
+            continue
+        if skipping or stripped.startswith(">"):
+            continue
+        if _BOILERPLATE_RE.search(stripped):
+            skipping = True
+            continue
+        kept.append(stripped)
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(kept)).strip()
+
+
+def split_sentences(text: str) -> List[str]:
+    return [s.strip() for s in _SENTENCE_RE.split(text or "") if s and s.strip()]
+
+
+class IdfTable:
+    """IDF por termo tirado de um vetorizador treinado; termos desconhecidos recebem a mediana."""
+
+    def __init__(self, lookup: Callable[[Sequence[str]], List[Optional[float]]], default: float):
+        self._lookup = lookup
+        self.default = default
+
+    def weights(self, terms: Sequence[str]) -> List[float]:
+        return [self.default if w is None or w != w else float(w) for w in self._lookup(terms)]
+
+    @classmethod
+    def from_compiled(cls, model) -> "IdfTable":
+        """A partir de um CompiledLinearModel (idf.npy + hashes do vocabulário, mmap)."""
+        import numpy as np
+        return cls(lambda terms: list(model.term_idf(list(terms))), float(np.median(model.idf)))
+
+    @classmethod
+    def from_vectorizer(cls, vectorizer) -> "IdfTable":
+        """A partir de um TfidfVectorizer do scikit-learn já treinado."""
+        idf = list(map(float, vectorizer.idf_))
+        table = {t: idf[i] for t, i in vectorizer.vocabulary_.items() if " " not in t}
+        return cls(lambda terms: [table.get(t) for t in terms], sorted(idf)[len(idf) // 2])
+
+
+@dataclass
+class Compaction:
+    text: str
+    tokens_before: int         # corpo bruto
+    tokens_after: int          # corpo enviado ao LLM
+    sentences_total: int
+    sentences_kept: int
+    quoted_removed: bool       # histórico/assinatura/avisos removidos
+
+    def as_dict(self) -> Dict[str, int]:
+        return {
+            "tokens_before": self.tokens_before,
+            "tokens_after": self.tokens_after,
+            "sentences_total": self.sentences_total,
+            "sentences_kept": self.sentences_kept,
+            "quoted_removed": self.quoted_removed,
+        }
+
+
+class PromptCompactor:
+    def __init__(self, token_budget: int = 400, idf: Optional[IdfTable] = None, keyword_weight: float = 3.0):
+        self.token_budget = max(1, token_budget)
+        self.idf = idf
+        self.keyword_weight = keyword_weight
+
+    def compact(self, text: str, keywords: Optional[Iterable[str]] = None) -> Compaction:
+        raw = text or ""
+        before = estimate_tokens(raw)
+        cleaned = strip_quoted(raw) or raw.strip()
+        sentences = split_sentences(cleaned)
+        tokens = estimate_tokens(cleaned)
+        if tokens <= self.token_budget:
+            return Compaction(cleaned, before, tokens, len(sentences), len(sentences), cleaned != raw.strip())
+
+        # +1 por frase (e 1 reservado): cada lacuna vira um " … " no texto final
+        costs = [estimate_tokens(s) + 1 for s in sentences]
+        scores = self._scores(sentences, keywords)
+        chosen, left = set(), self.token_budget - 1
+        for i in sorted(range(len(sentences)), key=lambda i: (-scores[i], i)):
+            if costs[i] <= left:
+                chosen.add(i)
+                left -= costs[i]
+
+        if not chosen:
+            # nenhuma frase cabe sozinha: corta a mais informativa no orçamento (~4 caracteres/token)
+            best = max(range(len(sentences)), key=lambda i: (scores[i], -i)) if sentences else None
+            body = sentences[best][: self.token_budget * 4] if best is not None else cleaned[: self.token_budget * 4]
+            return Compaction(body, before, estimate_tokens(body), len(sentences), 1 if sentences else 0, True)
+
+        parts, prev = [], -1
+        for i in sorted(chosen):
+            if i != prev + 1:
+                parts.append("…")
+            parts.append(sentences[i])
+            prev = i
+        if prev != len(sentences) - 1:
+            parts.append("…")
+        body = " ".join(parts)
+        return Compaction(body, before, estimate_tokens(body), len(sentences), len(chosen), True)
+
+    def _scores(self, sentences: List[str], keywords: Optional[Iterable[str]]) -> List[float]:
+        terms = [_TERM_RE.findall(s.lower()) for s in sentences]
+        if self.idf is not None:
+            vocab = sorted({t for ts in terms for t in ts})
+            idf = dict(zip(vocab, self.idf.weights(vocab)))
+        else:
+            # sem vetorizador: IDF suavizado com cada frase como documento
+            df: Dict[str, int] = {}
+            for ts in terms:
+                for t in set(ts):
+                    df[t] = df.get(t, 0) + 1
+            n = len(sentences)
+            idf = {t: math.log((1 + n) / (1 + d)) + 1.0 for t, d in df.items()}
+
+        matcher = matcher_for(keywords)
+        scores = []
+        for sentence, ts in zip(sentences, terms):
+            uniq = set(ts)
+            tfidf = sum(idf[t] for t in uniq) / math.sqrt(len(uniq)) if uniq else 0.0
+            hits = sum(matcher.find(sentence).values()) if matcher is not None else 0
+            scores.append(self.keyword_weight * hits + tfidf)
+        return scores
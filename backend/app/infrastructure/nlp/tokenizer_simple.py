@@ -1,28 +1,80 @@
 import re
-from langdetect import detect, DetectorFactory
-DetectorFactory.seed = 0  # reproducibilidade
+import time
+from typing import List
+from app.domain.entities import Email, AnalyzedEmail
+from app.infrastructure.nlp.lang_detect import detect_lang, default_identifier
 
 STOP_PT = {"de","da","do","a","o","e","que","em","para","com","um","uma","por","no","na","os","as"}
 STOP_EN = {"the","a","an","and","of","to","in","for","on","with","is","are","be","this","that"}
 STOP_ES = {"de","la","el","y","que","en","para","con","un","una","por","los","las","es","son"}
 
+_TOKEN_RE = re.compile(r"\b\w+\b", flags=re.UNICODE)
+_URL_RE = re.compile(r"https?://", re.I)
+
+
 class SimpleTokenizer:
-    def __init__(self, lang: str = "pt", supported_langs=("pt","en","es")):
+    def __init__(
+        self,
+        lang: str = "pt",
+        supported_langs=("pt","en","es"),
+        char_budget: int = 6000,
+        lang_identifier=None,
+        use_ngram_lang_id: bool = True,
+    ):
         self.lang = lang
         self.supported_langs = supported_langs
+        self.char_budget = char_budget
+        # identificador rápido por n-gramas; langdetect fica como fallback de baixa confiança
+        self.lang_identifier = lang_identifier or (default_identifier() if use_ngram_lang_id else None)
 
     def preprocess(self, text: str) -> str:
         return (text or "").strip().lower()
 
-    def tokenize(self, text: str):
-        lang = self.lang
-        if self.lang == "auto":
-            try:
-                guess = detect(text or "")
-                lang = guess if guess in self.supported_langs else "pt"
-            except Exception:
-                lang = "pt"
-
-        tokens = re.findall(r"\b\w+\b", text or "", flags=re.UNICODE)
+    def _resolve_lang(self, text: str) -> str:
+        if self.lang != "auto":
+            return self.lang
+        return detect_lang(text, supported_langs=self.supported_langs, identifier=self.lang_identifier)
+
+    def _tokens(self, text: str, lang: str):
         stop = STOP_PT if lang == "pt" else STOP_EN if lang == "en" else STOP_ES
-        return [t for t in tokens if t not in stop]
+        return [t for t in _TOKEN_RE.findall(text or "") if t not in stop]
+
+    def tokenize(self, text: str):
+        return self._tokens(text, self._resolve_lang(text))
+
+    def analyze(self, email: Email, lang: str = None) -> AnalyzedEmail:
+        """Idioma, normalização, tokens e contagem de links calculados uma única vez."""
+        body = email.body or ""
+        t0 = time.perf_counter()
+        text = self.preprocess(body)
+        t1 = time.perf_counter()
+        lang = lang or self._resolve_lang((email.subject or "") + "\n" + body)
+        t2 = time.perf_counter()
+        tokens = self._tokens(text, lang)
+        t3 = time.perf_counter()
+        return AnalyzedEmail(
+            lang=lang,
+            text=text,
+            tokens=tokens,
+            token_set=frozenset(tokens),
+            url_count=len(_URL_RE.findall(body)),
+            char_budget=self.char_budget,
+            timings_ms={
+                "preprocess": (t1 - t0) * 1000,
+                "lang_detect": (t2 - t1) * 1000,
+                "tokenize": (t3 - t2) * 1000,
+            },
+        )
+
+    def analyze_batch(self, emails: List[Email]) -> List[AnalyzedEmail]:
+        """Como `analyze`, mas identifica o idioma de todos os emails numa passada."""
+        langs: List[str] = [None] * len(emails)
+        if self.lang != "auto":
+            langs = [self.lang] * len(emails)
+        elif self.lang_identifier is not None:
+            texts = [(e.subject or "") + "\n" + (e.body or "") for e in emails]
+            for i, (guess, conf) in enumerate(self.lang_identifier.identify_batch(texts)):
+                if guess in self.supported_langs and self.lang_identifier.is_confident(conf):
+                    langs[i] = guess
+        # quem ficou sem idioma confiável segue o caminho individual (com fallback)
+        return [self.analyze(e, lang=l) for e, l in zip(emails, langs)]
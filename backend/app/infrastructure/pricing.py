@@ -0,0 +1,52 @@
+from typing import Dict, Optional, Tuple
+
+# USD por 1M tokens (entrada, saída); LLM_PRICES sobrescreve/estende
+DEFAULT_PRICES: Dict[str, Tuple[float, float]] = {
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1-nano": (0.10, 0.40),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+}
+
+
+class PriceTable:
+    """
+    Custo de uma chamada a partir do uso de tokens. Modelo desconhecido custa 0
+    (rule-based/ML); nomes com sufixo de versão ("gpt-4.1-nano-2025-04-14")
+    usam o prefixo mais longo cadastrado.
+    """
+
+    def __init__(self, prices: Optional[Dict[str, Tuple[float, float]]] = None):
+        self.prices = dict(DEFAULT_PRICES if prices is None else prices)
+        self._resolved: Dict[str, Optional[Tuple[float, float]]] = {}
+
+    @classmethod
+    def parse(cls, spec: str, base: Optional[Dict[str, Tuple[float, float]]] = None) -> "PriceTable":
+        """"gpt-4.1-nano=0.10/0.40,meu-modelo=1/2" (USD por 1M tokens entrada/saída) sobre `base`."""
+        prices = dict(DEFAULT_PRICES if base is None else base)
+        for item in (spec or "").split(","):
+            item = item.strip()
+            if not item:
+                continue
+            try:
+                model, rates = item.split("=", 1)
+                prompt, completion = rates.split("/", 1)
+                prices[model.strip()] = (float(prompt), float(completion))
+            except ValueError:
+                raise ValueError(f"Preço inválido '{item}' (use modelo=entrada/saída)")
+        return cls(prices)
+
+    def price_for(self, model: Optional[str]) -> Optional[Tuple[float, float]]:
+        if not model:
+            return None
+        if model not in self._resolved:
+            matches = [m for m in self.prices if model == m or model.startswith(m + "-")]
+            self._resolved[model] = self.prices[max(matches, key=len)] if matches else None
+        return self._resolved[model]
+
+    def cost(self, model: Optional[str], prompt_tokens: Optional[int], completion_tokens: Optional[int]) -> float:
+        price = self.price_for(model)
+        if price is None:
+            return 0.0
+        return ((prompt_tokens or 0) * price[0] + (completion_tokens or 0) * price[1]) / 1_000_000
@@ -0,0 +1,158 @@
+"""
+Store de perfis pré-compilados e recarregáveis a quente.
+
+- O JSON é lido uma vez por versão do arquivo; cada perfil só é compilado
+  (keywords + sinônimos → KeywordSet com matcher Aho-Corasick e o prefixo do
+  prompt do LLM) no primeiro uso
+  e fica num LRU limitado a `max_compiled` — escala para dezenas de milhares
+  de perfis de tenants sem compilar tudo no boot.
+- Recarga por mtime (checado no máximo a cada `check_interval_s`) ou explícita
+  via `reload()`. A checagem por mtime (stat + releitura do JSON) roda numa
+  thread em segundo plano; o snapshot pronto entra por troca atômica da
+  referência: leitores em andamento terminam com o snapshot antigo, nenhuma
+  requisição espera pela recarga.
+- JSON inválido numa recarga mantém o snapshot anterior (erro em `stats()`).
+"""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import replace
+from typing import Any, Dict, Optional
+
+from app.domain.entities import CompiledProfile
+from app.domain.ports import ProfilePort
+from app.infrastructure.classifiers.openai_llm import compile_profile_prompt
+from app.infrastructure.nlp.keyword_matcher import KeywordSet
+from app.infrastructure.profiles.profile_json import DATA_PATH
+
+
+class _Snapshot:
+    def __init__(self, raw: Dict[str, Dict], mtime_ns: int):
+        self.raw = raw
+        self.mtime_ns = mtime_ns
+        self.loaded_at = time.time()
+        self.compiled: "OrderedDict[str, CompiledProfile]" = OrderedDict()
+        self.lock = threading.Lock()
+
+
+class CompiledProfileStore(ProfilePort):
+    def __init__(
+        self,
+        path: str = DATA_PATH,
+        watch: bool = True,
+        check_interval_s: float = 2.0,
+        max_compiled: int = 10_000,
+    ):
+        self.path = path
+        self.watch = watch
+        self.check_interval_s = max(0.0, check_interval_s)
+        self.max_compiled = max(1, max_compiled)
+        self._reload_lock = threading.Lock()
+        self._next_check = 0.0
+        self._stats = {"reloads": 0, "reload_errors": 0, "compiles": 0, "evictions": 0}
+        self._last_error: Optional[str] = None
+        self._snapshot = self._load()
+
+    # --- ProfilePort ---
+    def get_profile(self, profile_id: str) -> Optional[Dict]:
+        return self._current().raw.get(profile_id)
+
+    def get_compiled(self, profile_id: str) -> Optional[CompiledProfile]:
+        snap = self._current()
+        compiled = snap.compiled.get(profile_id)
+        if compiled is not None:
+            with snap.lock:
+                if profile_id in snap.compiled:
+                    snap.compiled.move_to_end(profile_id)
+            return compiled
+
+        raw = snap.raw.get(profile_id)
+        if not raw:
+            return None
+        base = CompiledProfile.from_dict(profile_id, raw)
+        priority = KeywordSet(base.priority)
+        priority.matcher  # compila o autômato agora, fora do caminho dos classificadores
+        # prefixo do prompt do LLM (tom + keywords) também sai pronto; viaja com as keywords até o classificador
+        priority.prompt = compile_profile_prompt(profile_id, priority, base.mood)
+        compiled = replace(
+            base, priority=priority,
+            prompt_prefix=priority.prompt.prefix, prompt_prefix_tokens=priority.prompt.tokens,
+        )
+
+        with snap.lock:
+            current = snap.compiled.get(profile_id)
+            if current is not None:
+                return current  # outra thread compilou primeiro
+            snap.compiled[profile_id] = compiled
+            self._stats["compiles"] += 1
+            while len(snap.compiled) > self.max_compiled:
+                snap.compiled.popitem(last=False)
+                self._stats["evictions"] += 1
+        return compiled
+
+    # --- recarga ---
+    def reload(self, force: bool = True) -> Dict[str, Any]:
+        """Relê o arquivo (se mudou, ou sempre com `force`) e troca o snapshot."""
+        with self._reload_lock:
+            self._swap_if_changed(force)
+        return self.stats()
+
+    def stats(self) -> Dict[str, Any]:
+        snap = self._snapshot
+        return {
+            **self._stats,
+            "path": self.path,
+            "profiles": len(snap.raw),
+            "compiled": len(snap.compiled),
+            "max_compiled": self.max_compiled,
+            "loaded_at": snap.loaded_at,
+            "last_error": self._last_error,
+        }
+
+    def _current(self) -> _Snapshot:
+        if self.watch and time.monotonic() >= self._next_check:
+            # uma checagem por vez, fora da requisição: o leitor segue com o snapshot atual
+            if self._reload_lock.acquire(blocking=False):
+                self._next_check = time.monotonic() + self.check_interval_s
+                try:
+                    threading.Thread(target=self._check_in_background, name="profile-store-reload", daemon=True).start()
+                except BaseException:
+                    self._reload_lock.release()
+                    raise
+        return self._snapshot
+
+    def _check_in_background(self) -> None:
+        try:
+            self._swap_if_changed(force=False)
+        finally:
+            self._reload_lock.release()
+
+    def _swap_if_changed(self, force: bool) -> None:
+        try:
+            mtime_ns = os.stat(self.path).st_mtime_ns
+        except OSError as e:
+            self._last_error = str(e)
+            return
+        if not force and mtime_ns == self._snapshot.mtime_ns:
+            return
+        try:
+            snap = self._load()
+        except Exception as e:
+            self._stats["reload_errors"] += 1
+            self._last_error = str(e)
+            print(f"✗ Falha ao recarregar perfis de {self.path}, mantendo versão anterior: {e}")
+            return
+        self._snapshot = snap
+        self._stats["reloads"] += 1
+        self._last_error = None
+        print(f"✓ Perfis recarregados de {self.path} ({len(snap.raw)} perfis)")
+
+    def _load(self) -> _Snapshot:
+        mtime_ns = os.stat(self.path).st_mtime_ns
+        with open(self.path, "r", encoding="utf-8") as f:
+            raw = json.load(f)
+        if not isinstance(raw, dict):
+            raise ValueError("profiles.json deve ser um objeto {profile_id: perfil}")
+        return _Snapshot(raw, mtime_ns)
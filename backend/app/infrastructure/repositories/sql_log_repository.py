@@ -1,31 +1,134 @@
-from typing import List, Optional
-from sqlmodel import Session, select
+import threading
+from contextlib import contextmanager
+from dataclasses import replace
+from typing import Callable, Iterator, List, Optional
+from sqlalchemy import insert, select as sa_select, tuple_
+from sqlmodel import Session
 
-from app.domain.entities import ClassificationLog
+from app.domain.entities import ClassificationLog, LogPage, LogQuery, LOG_DETAIL_FIELDS, LOG_FILTER_FIELDS
 from app.domain.ports import LogRepositoryPort
 from app.infrastructure.models import ClassificationLogModel
+from app.infrastructure.repositories.sql_rollup_repository import apply_rollups, rollup_deltas
+
+# campos que mudam quando o resultado definitivo substitui o provisório
+RESULT_FIELDS = (
+    "category", "reason", "suggested_reply", "used_model", "provider",
+    "prompt_tokens", "completion_tokens", "total_tokens", "cost_usd", "latency_ms",
+    "status", "error", "extra",
+)
 
 
 class SqlLogRepository(LogRepositoryPort):
-    """Implementação de LogRepositoryPort com SQLModel."""
+    """
+    Implementação de LogRepositoryPort com SQLModel.
+
+    - `session_factory`: cada operação é uma unidade de trabalho com sessão
+      própria (conexão do pool); API, thread IMAP e write-behind não disputam
+      uma Session, e com WAL as leituras não esperam as escritas
+    - `session`: todas as operações numa Session compartilhada, serializadas
+      por um lock (ex.: sessão por requisição do FastAPI, testes)
+    - `rollups`: mantém `classification_rollups_hourly` na mesma transação
+      dos inserts/updates (ver SqlRollupRepository)
+    """
 
-    def __init__(self, session: Session):
+    def __init__(
+        self,
+        session: Optional[Session] = None,
+        session_factory: Optional[Callable[[], Session]] = None,
+        rollups: bool = True,
+    ):
+        if session is None and session_factory is None:
+            raise ValueError("SqlLogRepository precisa de session ou session_factory")
         self.session = session
+        self.session_factory = session_factory
+        self.rollups = rollups
+        # a mesma Session pode ser usada pelo threadpool da API e pela thread IMAP
+        self._lock = threading.RLock()
+        # SQLite tem um escritor por vez: serializar aqui evita o backoff do busy_timeout
+        # (esperas de até 100 ms) entre escritores do mesmo processo; leitores não passam por ele
+        self._write_lock = threading.Lock()
+
+    @contextmanager
+    def _unit(self, write: bool = False) -> Iterator[Session]:
+        if self.session_factory is None:
+            with self._lock:
+                yield self.session
+        elif write:
+            with self._write_lock, self.session_factory() as session:
+                yield session
+        else:
+            with self.session_factory() as session:
+                yield session
 
     def save(self, log: ClassificationLog) -> ClassificationLog:
-        db_obj = ClassificationLogModel.from_entity(log)
-        self.session.add(db_obj)
-        self.session.commit()
-        self.session.refresh(db_obj)
-        return db_obj.to_entity()
+        return self._insert([log])[0]
+
+    def save_many(self, logs: List[ClassificationLog]) -> List[ClassificationLog]:
+        return self._insert(logs) if logs else []
+
+    def _insert(self, logs: List[ClassificationLog]) -> List[ClassificationLog]:
+        # insert no Core: sem montar um ClassificationLogModel (pydantic) por linha nem
+        # refresh depois do commit; RETURNING ordenado devolve os ids na ordem dos logs
+        table = ClassificationLogModel.__table__
+        rows = [{k: v for k, v in log.__dict__.items() if k != "id"} for log in logs]
+        stmt = insert(table).returning(table.c.id, sort_by_parameter_order=True)
+        with self._unit(write=True) as session:
+            try:
+                ids = session.execute(stmt, rows).scalars().all()
+                if self.rollups:
+                    apply_rollups(session, rollup_deltas((log, 1) for log in logs))
+                session.commit()
+            except Exception:
+                session.rollback()
+                raise
+        return [replace(log, id=log_id) for log, log_id in zip(logs, ids)]
 
     def list_recent(self, limit: int = 50) -> List[ClassificationLog]:
-        stmt = select(ClassificationLogModel).order_by(
-            ClassificationLogModel.created_at.desc()
-        ).limit(limit)
-        results = self.session.exec(stmt).all()
-        return [obj.to_entity() for obj in results]
+        return self.list_page(LogQuery(limit=limit)).items
+
+    def list_page(self, query: LogQuery) -> LogPage:
+        table = ClassificationLogModel.__table__
+        c = table.c
+        columns = [col for col in table.columns if not (query.summary and col.name in LOG_DETAIL_FIELDS)]
+        # uma linha a mais diz se existe próxima página sem um COUNT
+        stmt = sa_select(*columns).order_by(c.created_at.desc(), c.id.desc()).limit(query.limit + 1)
+        for name in LOG_FILTER_FIELDS:
+            value = getattr(query, name)
+            if value is not None:
+                stmt = stmt.where(c[name] == value)
+        if query.since is not None:
+            stmt = stmt.where(c.created_at >= query.since)
+        if query.after is not None:
+            # row value (created_at, id) < (?, ?): o SQLite resolve como busca no índice
+            stmt = stmt.where(tuple_(c.created_at, c.id) < tuple_(*query.after))
+        with self._unit() as session:
+            # Core + mappings: sem hidratar um ClassificationLogModel (pydantic) por linha
+            rows = session.execute(stmt).mappings().all()
+        items = [ClassificationLog(**row) for row in rows[:query.limit]]
+        next_after = (items[-1].created_at, items[-1].id) if len(rows) > query.limit else None
+        return LogPage(items=items, next_after=next_after)
 
     def get_by_id(self, log_id: int) -> Optional[ClassificationLog]:
-        db_obj = self.session.get(ClassificationLogModel, log_id)
-        return db_obj.to_entity() if db_obj else None
+        with self._unit() as session:
+            db_obj = session.get(ClassificationLogModel, log_id)
+            return db_obj.to_entity() if db_obj else None
+
+    def update_result(self, log_id: int, log: ClassificationLog) -> Optional[ClassificationLog]:
+        with self._unit(write=True) as session:
+            db_obj = session.get(ClassificationLogModel, log_id)
+            if db_obj is None:
+                return None
+            before = db_obj.to_entity()
+            for field in RESULT_FIELDS:
+                setattr(db_obj, field, getattr(log, field))
+            try:
+                session.add(db_obj)
+                if self.rollups:
+                    # tira o provisório e soma o definitivo (a categoria/modelo podem mudar de chave)
+                    apply_rollups(session, rollup_deltas([(before, -1), (db_obj.to_entity(), 1)]))
+                session.commit()
+            except Exception:
+                session.rollback()
+                raise
+            session.refresh(db_obj)
+            return db_obj.to_entity()
@@ -0,0 +1,210 @@
+import re
+from typing import List
+
+from sqlalchemy import DateTime, Float, String, bindparam, column, text
+from sqlmodel import Session
+
+from app.domain.entities import (
+    ClassificationLog, LogSearchHit, LogSearchPage, LogSearchQuery, LOG_DETAIL_FIELDS, LOG_FILTER_FIELDS,
+)
+from app.domain.errors import BadRequest
+from app.domain.ports import LogSearchPort
+from app.infrastructure.models import ClassificationLogModel
+
+LOGS = ClassificationLogModel.__tablename__
+FTS_TABLE = f"{LOGS}_fts"
+FTS_SOURCE = f"{LOGS}_fts_src"
+# ordem das colunas = ordem dos pesos do bm25 (assunto e remetente valem mais que o corpo);
+# `tags` não pontua: guarda um token por filtro, para filtrar dentro do índice em vez de um JOIN por resultado
+FTS_COLUMNS = ("subject", "sender", "body_excerpt", "reason", "tags")
+FTS_WEIGHTS = (10.0, 5.0, 1.0, 3.0, 0.0)
+TAG_PREFIXES = {"profile_id": "pid", "category": "cat", "source": "src", "used_model": "mdl"}
+HIGHLIGHT = ("[", "]")
+
+
+def _tags_sql(row: str) -> str:
+    # hex(): qualquer valor vira um único token alfanumérico ("pid" || hex('p7') → pid7037)
+    return " || ' ' || ".join(
+        f"'{tag}' || hex(coalesce({row}{name}, ''))" for name, tag in TAG_PREFIXES.items()
+    )
+
+
+def filter_token(name: str, value: str) -> str:
+    """Token de `tags` para um filtro, igual ao que `_tags_sql` gera (o tokenizer põe em minúsculas)."""
+    return TAG_PREFIXES[name] + value.encode().hex()
+
+
+_cols = ", ".join(FTS_COLUMNS)
+_text = FTS_COLUMNS[:-1]
+_new = ", ".join([f"new.{c}" for c in _text] + [_tags_sql("new.")])
+_old = ", ".join([f"old.{c}" for c in _text] + [_tags_sql("old.")])
+# external content: o índice guarda só os tokens, o texto continua em classification_logs (a view
+# só acrescenta `tags`, lida pelo 'rebuild'); remove_diacritics: "reuniao" acha "reunião"
+FTS_DDL = [
+    f"CREATE VIEW IF NOT EXISTS {FTS_SOURCE} AS SELECT id, {', '.join(_text)}, {_tags_sql('')} AS tags FROM {LOGS}",
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    f"{_cols}, content='{FTS_SOURCE}', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON {LOGS} BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, {_cols}) VALUES (new.id, {_new}); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON {LOGS} BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_cols}) VALUES ('delete', old.id, {_old}); END",
+    # só quando um campo indexado muda (ex.: reason/category/used_model no update_result do hedging)
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF {', '.join(_text + tuple(TAG_PREFIXES))} "
+    f"ON {LOGS} BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_cols}) VALUES ('delete', old.id, {_old}); "
+    f"INSERT INTO {FTS_TABLE}(rowid, {_cols}) VALUES (new.id, {_new}); END",
+]
+_DROP = [f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{t}" for t in ("ai", "ad", "au")] + [
+    f"DROP TABLE IF EXISTS {FTS_TABLE}", f"DROP VIEW IF EXISTS {FTS_SOURCE}",
+]
+
+_WORD = re.compile(r"\w+")
+
+
+def init_log_search(bind, enabled: bool = True) -> None:
+    """
+    Cria (e, num banco que já tem logs, preenche) o índice FTS5 e os triggers;
+    `enabled=False` remove os dois, para não deixar um índice desatualizado.
+    Só SQLite.
+    """
+    if bind.dialect.name != "sqlite":
+        if enabled:
+            print(f"[WARN] Log search: FTS5 requires SQLite, /logs/search disabled on {bind.dialect.name}")
+        return
+    with bind.begin() as conn:
+        if not enabled:
+            for stmt in _DROP:
+                conn.exec_driver_sql(stmt)
+            return
+        exists = conn.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (FTS_TABLE,)
+        ).first()
+        for stmt in FTS_DDL:
+            conn.exec_driver_sql(stmt)
+        if not exists and conn.exec_driver_sql(f"SELECT 1 FROM {LOGS} LIMIT 1").first():
+            print(f"[WARN] Log search: indexing existing logs into {FTS_TABLE}, this may take a while")
+            rebuild_log_search(conn)
+
+
+def rebuild_log_search(conn) -> None:
+    """Reindexa tudo a partir de classification_logs (backfill ou reparo)."""
+    conn.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def match_expression(raw: str, prefix: bool = True) -> str:
+    """
+    Texto livre → expressão FTS5 segura: cada palavra (separada por espaço)
+    vira uma frase entre aspas, todas obrigatórias. "joao@acme.com" vira a
+    frase "joao acme com", como o tokenizer a indexou.
+    """
+    phrases = [" ".join(_WORD.findall(word)) for word in raw.split()]
+    phrases = [p for p in phrases if p]
+    if not phrases:
+        raise BadRequest("busca vazia")
+    terms = [f'"{p}"' for p in phrases]
+    if prefix:
+        terms[-1] += "*"
+    return " ".join(terms)
+
+
+class SqlLogSearchRepository(LogSearchPort):
+    """
+    Busca em `classification_logs_fts` (FTS5). Os filtros de dimensão são
+    termos da coluna `tags` (interseção de listas dentro do índice); só
+    `since` precisa de JOIN na tabela de logs. Ordenar por bm25 pontua todos
+    os resultados do MATCH (~2 µs cada): com `max_ranked`, só os N mais
+    recentes que casam entram no ranking, e um termo comum num banco grande
+    não vira uma varredura de centenas de milhares de linhas (0 = todos).
+    A paginação é por offset dentro dessa janela e, depois dela, por id
+    decrescente (`before_id`, sem ranking): nenhum resultado fica
+    inalcançável. Colunas do log e snippet() saem só para a página.
+    """
+
+    def __init__(self, session: Session, max_ranked: int = 10_000):
+        self.session = session
+        self.max_ranked = max(0, max_ranked)
+
+    def search(self, query: LogSearchQuery) -> LogSearchPage:
+        table = ClassificationLogModel.__table__
+        columns = [c for c in table.columns if c.name not in LOG_DETAIL_FIELDS]
+        text_match = match_expression(query.text, query.prefix)
+        tags = [
+            f'tags : "{filter_token(name, getattr(query, name))}"'
+            for name in LOG_FILTER_FIELDS if getattr(query, name) is not None
+        ]
+        # snippet usa só os termos do texto; os filtros casariam a coluna tags
+        params = {"text_match": text_match, "match": " ".join([text_match] + tags)}
+        where = [f"f.{FTS_TABLE} MATCH :match"]
+        if query.since is not None:
+            where.append("l.created_at >= :since")
+        source = f"{FTS_TABLE} AS f" + (f" JOIN {LOGS} AS l ON l.id = f.rowid" if query.since is not None else "")
+
+        def stmt(sql: str):
+            clause = text(sql)
+            if query.since is not None:
+                # bind tipado: o datetime vai no mesmo formato texto gravado em created_at
+                clause = clause.bindparams(bindparam("since", query.since, type_=DateTime()))
+            return clause
+
+        floor = None
+        if query.before_id is not None:
+            keyset = True
+            where.append("f.rowid < :before_id")
+            params["before_id"] = query.before_id
+        else:
+            if self.max_ranked:
+                # rowid do N-ésimo resultado mais recente (e se há um N+1-ésimo): o FTS5 percorre a
+                # doclist em ordem de rowid, sem pontuar
+                edge = self.session.execute(
+                    stmt(f"SELECT f.rowid FROM {source} WHERE {' AND '.join(where)} "
+                         f"ORDER BY f.rowid DESC LIMIT 2 OFFSET :nth"),
+                    {**params, "nth": self.max_ranked - 1},
+                ).scalars().all()
+                if len(edge) == 2:
+                    floor = edge[0]
+                    where.append("f.rowid >= :floor")
+                    params["floor"] = floor
+            # um offset que passou da janela continua pelos mais antigos que ela
+            keyset = floor is not None and query.offset >= self.max_ranked
+            if keyset:
+                where[-1] = "f.rowid < :floor"
+
+        weights = ", ".join(str(w) for w in FTS_WEIGHTS)
+        mark_open, mark_close = HIGHLIGHT
+        # além da janela, ordem por rowid: o FTS5 para depois de `limit` linhas e só pontua essas
+        order = "f.rowid DESC" if keyset else "rank, f.rowid"
+        page_order = "hits.id DESC" if keyset else "hits.rank, hits.id"
+        ranked = stmt(
+            f"WITH hits AS MATERIALIZED ("
+            f"SELECT f.rowid AS id, bm25(f.{FTS_TABLE}, {weights}) AS rank FROM {source} "
+            f"WHERE {' AND '.join(where)} ORDER BY {order} LIMIT :limit OFFSET :offset) "
+            f"SELECT {', '.join('l.' + c.name for c in columns)}, hits.rank AS rank, "
+            f"snippet(s.{FTS_TABLE}, -1, '{mark_open}', '{mark_close}', '…', 12) AS snippet "
+            # snippet() precisa de um MATCH: uma única varredura limitada ao intervalo de rowids da página
+            # (um MATCH por rowid expandiria o prefixo "termo*" de novo a cada linha); CROSS JOIN fixa a
+            # ordem para o logs/snippet só rodarem nas linhas da página
+            f"FROM {FTS_TABLE} AS s CROSS JOIN hits CROSS JOIN {LOGS} AS l "
+            f"WHERE s.{FTS_TABLE} MATCH :text_match "
+            f"AND s.rowid BETWEEN (SELECT min(id) FROM hits) AND (SELECT max(id) FROM hits) "
+            f"AND s.rowid = hits.id AND l.id = hits.id ORDER BY {page_order}"
+        ).columns(*columns, column("rank", Float), column("snippet", String))
+        # uma a mais diz se existe próxima página
+        params.update(limit=query.limit + 1, offset=0 if keyset else query.offset)
+
+        rows = self.session.execute(ranked, params).mappings().all()
+        items: List[LogSearchHit] = [
+            LogSearchHit(
+                log=ClassificationLog(**{c.name: row[c.name] for c in columns}),
+                score=round(-row["rank"], 4),
+                snippet=row["snippet"] or "",
+            )
+            for row in rows[:query.limit]
+        ]
+        more = len(rows) > query.limit
+        if keyset:
+            return LogSearchPage(items=items, next_before_id=items[-1].log.id if more else None)
+        next_offset = query.offset + query.limit
+        if more and not (floor is not None and next_offset >= self.max_ranked):
+            return LogSearchPage(items=items, next_offset=next_offset)
+        # fim da janela do ranking: se há resultados mais antigos, seguem por id
+        return LogSearchPage(items=items, next_before_id=floor)
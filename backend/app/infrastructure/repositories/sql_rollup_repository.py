@@ -0,0 +1,160 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Tuple
+
+from sqlalchemy import DateTime, bindparam, delete, func, insert, literal_column, select, text
+from sqlmodel import Session
+
+from app.domain.entities import ClassificationLog, StatsQuery, LOG_FILTER_FIELDS
+from app.domain.ports import LogStatsPort
+from app.infrastructure.models import ClassificationLogModel, ClassificationRollupModel
+
+ROLLUP_KEYS = ("bucket",) + LOG_FILTER_FIELDS
+ROLLUP_SUMS = (
+    "count", "prompt_tokens", "completion_tokens", "total_tokens", "cost_usd", "latency_ms_sum", "latency_count",
+)
+# mesmo texto que o tipo DateTime do SQLAlchemy grava no SQLite: a chave do rebuild casa com a do incremental
+_SQLITE_HOUR = "%Y-%m-%d %H:00:00.000000"
+# texto fixo: o on_conflict_do_update do SQLAlchemy não tem chave de cache e era recompilado a
+# cada insert (mais caro que o próprio insert); a sintaxe é a mesma no SQLite (3.24+) e no PostgreSQL
+_UPSERT_SQL = text(
+    f"INSERT INTO {ClassificationRollupModel.__tablename__} ({', '.join(ROLLUP_KEYS + ROLLUP_SUMS)}) "
+    f"VALUES ({', '.join(':' + c for c in ROLLUP_KEYS + ROLLUP_SUMS)}) "
+    f"ON CONFLICT ({', '.join(ROLLUP_KEYS)}) DO UPDATE SET "
+    + ", ".join(f"{c} = {ClassificationRollupModel.__tablename__}.{c} + excluded.{c}" for c in ROLLUP_SUMS)
+).bindparams(bindparam("bucket", type_=DateTime()))
+
+
+def hour_bucket(ts: datetime) -> datetime:
+    return ts.replace(minute=0, second=0, microsecond=0)
+
+
+def rollup_deltas(signed: Iterable[Tuple[ClassificationLog, int]]) -> List[Dict[str, Any]]:
+    """Soma (sinal +1 ao gravar, -1 ao desfazer) por chave de rollup; uma linha por chave."""
+    acc: Dict[tuple, Dict[str, Any]] = {}
+    for log, sign in signed:
+        key = (hour_bucket(log.created_at),) + tuple(getattr(log, f) or "" for f in LOG_FILTER_FIELDS)
+        row = acc.get(key)
+        if row is None:
+            row = acc[key] = {**dict(zip(ROLLUP_KEYS, key)), **{s: 0 for s in ROLLUP_SUMS}}
+        row["count"] += sign
+        row["prompt_tokens"] += sign * (log.prompt_tokens or 0)
+        row["completion_tokens"] += sign * (log.completion_tokens or 0)
+        row["total_tokens"] += sign * (log.total_tokens or 0)
+        row["cost_usd"] += sign * (log.cost_usd or 0.0)
+        if log.latency_ms is not None:
+            row["latency_ms_sum"] += sign * int(log.latency_ms)
+            row["latency_count"] += sign
+    return list(acc.values())
+
+
+def apply_rollups(session: Session, deltas: List[Dict[str, Any]]) -> None:
+    """Upsert dos deltas na transação corrente (quem chama faz o commit junto com os logs)."""
+    if not deltas:
+        return
+    session.execute(_UPSERT_SQL, deltas)
+
+
+def _hour_of(col, dialect: str):
+    if dialect == "sqlite":
+        return func.strftime(_SQLITE_HOUR, col)
+    return func.date_trunc("hour", col)
+
+
+class SqlRollupRepository(LogStatsPort):
+    """
+    Estatísticas a partir de `classification_rollups_hourly`: o custo depende
+    do número de horas × combinações no intervalo, não do tamanho de
+    `classification_logs`. Granularidade mínima: 1 hora (`since` é truncado).
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def stats(self, query: StatsQuery) -> List[Dict[str, Any]]:
+        t = ClassificationRollupModel.__table__.c
+        if query.granularity == "hour":
+            bucket = t.bucket
+        elif query.granularity == "day":
+            bucket = func.date(t.bucket)
+        else:
+            bucket = None
+
+        keys = ([bucket.label("bucket")] if bucket is not None else []) + [t[d] for d in query.group_by]
+        stmt = select(*keys, *[func.sum(t[s]).label(s) for s in ROLLUP_SUMS])
+        if query.since is not None:
+            stmt = stmt.where(t.bucket >= hour_bucket(query.since))
+        if query.until is not None:
+            stmt = stmt.where(t.bucket < query.until)
+        for name in LOG_FILTER_FIELDS:
+            value = getattr(query, name)
+            if value is not None:
+                stmt = stmt.where(t[name] == value)
+        if keys:
+            stmt = stmt.group_by(*keys).order_by(*keys)
+        # linhas zeradas por um update_result que moveu o log para outra chave
+        stmt = stmt.having(func.sum(t.count) > 0)
+
+        out = []
+        for row in self.session.execute(stmt).mappings():
+            item: Dict[str, Any] = {}
+            if bucket is not None:
+                value = row["bucket"]
+                item["bucket"] = value.isoformat() if isinstance(value, datetime) else str(value)
+            for d in query.group_by:
+                item[d] = row[d] or None
+            item.update(
+                count=row["count"],
+                prompt_tokens=row["prompt_tokens"],
+                completion_tokens=row["completion_tokens"],
+                total_tokens=row["total_tokens"],
+                cost_usd=round(row["cost_usd"] or 0.0, 8),
+                avg_latency_ms=round(row["latency_ms_sum"] / row["latency_count"], 1) if row["latency_count"] else None,
+            )
+            out.append(item)
+        return out
+
+    def rebuild(self, chunk: timedelta = timedelta(days=1)) -> int:
+        """
+        Backfill: recalcula os rollups a partir dos logs, um dia por transação
+        (a API segue gravando entre os pedaços). Retorna quantas linhas gerou.
+        """
+        logs = ClassificationLogModel.__table__.c
+        rollups = ClassificationRollupModel.__table__
+        first, last = self.session.execute(select(func.min(logs.created_at), func.max(logs.created_at))).one()
+        if first is None:
+            self.session.execute(delete(rollups))
+            self.session.commit()
+            return 0
+
+        dialect = self.session.get_bind().dialect.name
+        dims = [func.coalesce(logs[d], literal_column("''")) for d in LOG_FILTER_FIELDS]
+        sums = [
+            func.count(),
+            func.coalesce(func.sum(logs.prompt_tokens), 0),
+            func.coalesce(func.sum(logs.completion_tokens), 0),
+            func.coalesce(func.sum(logs.total_tokens), 0),
+            func.coalesce(func.sum(logs.cost_usd), 0.0),
+            func.coalesce(func.sum(logs.latency_ms), 0),
+            func.count(logs.latency_ms),
+        ]
+        hour = _hour_of(logs.created_at, dialect)
+
+        start = first.replace(hour=0, minute=0, second=0, microsecond=0)
+        # rollups fora do intervalo dos logs (logs apagados) também saem
+        self.session.execute(delete(rollups).where(rollups.c.bucket < start))
+        total = 0
+        while start <= last:
+            stop = start + chunk
+            self.session.execute(delete(rollups).where(rollups.c.bucket >= start, rollups.c.bucket < stop))
+            grouped = (
+                select(hour, *dims, *sums)
+                .where(logs.created_at >= start, logs.created_at < stop)
+                .group_by(hour, *dims)
+            )
+            result = self.session.execute(insert(rollups).from_select(list(ROLLUP_KEYS + ROLLUP_SUMS), grouped))
+            self.session.commit()
+            total += max(result.rowcount or 0, 0)
+            start = stop
+        self.session.execute(delete(rollups).where(rollups.c.bucket >= start))
+        self.session.commit()
+        return total
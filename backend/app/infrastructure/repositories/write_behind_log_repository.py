@@ -0,0 +1,338 @@
+import atexit
+import os
+import queue
+import threading
+import time
+import weakref
+from concurrent.futures import Future
+from multiprocessing import util as mp_util
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.domain.entities import ClassificationLog, LogPage, LogQuery
+from app.domain.ports import LogRepositoryPort
+from app.metrics import LATENCY_BUCKETS, counter, histogram
+
+
+FLUSH_SIZE = histogram(
+    "log_writer_batch_size",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024),
+    help="Logs gravados por transação do write-behind",
+)
+FLUSH_SECONDS = histogram(
+    "log_writer_flush_seconds", LATENCY_BUCKETS, help="Duração de cada flush (insert em lote + commit)",
+)
+QUEUE_WAIT = histogram(
+    "log_writer_queue_wait_seconds", LATENCY_BUCKETS, help="Tempo entre o enfileiramento e o commit do log",
+)
+SYNC_FALLBACK = counter(
+    "log_writer_sync_fallback_total", help="Logs gravados na thread do chamador porque a fila estava cheia",
+)
+FAILED = counter("log_writer_failed_total", help="Logs que não puderam ser gravados")
+
+
+class _Item:
+    __slots__ = ("log", "future", "enqueued_at")
+
+    def __init__(self, log: ClassificationLog, future: Optional[Future] = None):
+        self.log = log
+        self.future = future
+        self.enqueued_at = time.perf_counter()
+
+
+class _Update:
+    """`update_result` na fila: aplicado na ordem, depois dos inserts enfileirados antes dele."""
+
+    __slots__ = ("log_id", "log")
+
+    def __init__(self, log_id: int, log: ClassificationLog):
+        self.log_id = log_id
+        self.log = log
+
+
+class _Barrier:
+    """Marcador na fila: o writer o sinaliza depois de gravar tudo que veio antes."""
+
+    __slots__ = ("event",)
+
+    def __init__(self):
+        self.event = threading.Event()
+
+
+class WriteBehindLogRepository(LogRepositoryPort):
+    """
+    LogRepositoryPort com escrita adiada (write-behind) sobre outro repositório
+    (ex.: SqlLogRepository):
+
+    - `save`/`save_many` só enfileiram e devolvem o próprio log, ainda sem id
+      (o id é preenchido no objeto quando o lote é gravado); `submit` devolve
+      um Future com o log salvo, para quem precisa do id
+    - uma thread consome a fila e grava com um único `save_many` (uma
+      transação) quando o lote atinge `max_batch` ou `max_wait_ms` expira
+      desde o primeiro item
+    - fila limitada em `max_queue`; cheia → grava na thread do chamador
+      (backpressure sem perder o log)
+    - `update_result` também entra na fila (aplicado em ordem, depois do
+      insert do mesmo log): quem chama não espera o commit
+    - leituras fazem `flush()` antes se há algo pendente (lê o que escreveu)
+    - `close()` grava o que falta; `close_all()` roda no shutdown da API e
+      na saída do processo (atexit / finalizers do multiprocessing)
+    Logs na fila se perdem só se o processo morrer sem shutdown (kill -9).
+    """
+
+    def __init__(
+        self,
+        inner: LogRepositoryPort,
+        max_batch: int = 500,
+        max_wait_ms: float = 200.0,
+        max_queue: int = 10_000,
+    ):
+        self.inner = inner
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max(1, max_queue))
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._closed = False
+        self._lock = threading.Lock()  # contadores: alterados pelo writer e pelas threads dos chamadores
+        self._pending = 0  # enfileirados e ainda não gravados (itens e updates)
+        self._written = 0
+        self._batches = 0
+        self._fallbacks = 0
+        self._failed = 0
+        _track(self)
+
+    # --- escrita ---
+
+    def save(self, log: ClassificationLog) -> ClassificationLog:
+        self._enqueue(_Item(log))
+        return log
+
+    def save_many(self, logs: List[ClassificationLog]) -> List[ClassificationLog]:
+        for log in logs:
+            self._enqueue(_Item(log))
+        return logs
+
+    def submit(self, log: ClassificationLog) -> "Future[ClassificationLog]":
+        """Como `save`, mas o Future resolve com o log salvo (com id) após o commit."""
+        item = _Item(log, Future())
+        self._enqueue(item)
+        return item.future
+
+    def update_result(self, log_id: int, log: ClassificationLog) -> Optional[ClassificationLog]:
+        """Enfileira a atualização e devolve o log com o id (o commit vem depois, em ordem)."""
+        if not self._closed:
+            self._ensure_worker()
+            self._add(_pending=1)
+            try:
+                self._queue.put_nowait(_Update(log_id, log))
+                log.id = log_id
+                return log
+            except queue.Full:
+                self._add(_pending=-1, _fallbacks=1)
+                SYNC_FALLBACK.inc()
+                # fila cheia: o insert do log pode estar nela, então grava o que veio antes
+                self.flush()
+        return self.inner.update_result(log_id, log)
+
+    # --- leitura: sempre depois de gravar o que está na fila ---
+
+    def list_recent(self, limit: int = 50) -> List[ClassificationLog]:
+        self.flush()
+        return self.inner.list_recent(limit=limit)
+
+    def list_page(self, query: LogQuery) -> LogPage:
+        self.flush()
+        return self.inner.list_page(query)
+
+    def get_by_id(self, log_id: int) -> Optional[ClassificationLog]:
+        self.flush()
+        return self.inner.get_by_id(log_id)
+
+    # --- controle ---
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Bloqueia até tudo que foi enfileirado antes desta chamada estar commitado."""
+        thread = self._thread
+        if thread is None or not thread.is_alive() or threading.current_thread() is thread:
+            # sem writer não há fila; na própria thread (callbacks de Future) o lote já foi gravado
+            return True
+        with self._lock:
+            if not self._pending:
+                return True  # nada em voo: leitura sem ida e volta pela fila
+        barrier = _Barrier()
+        self._queue.put(barrier)
+        return barrier.event.wait(timeout)
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Grava o que falta e encerra a thread; depois disso as escritas são síncronas."""
+        self._closed = True
+        thread = self._thread
+        if thread and thread.is_alive() and threading.current_thread() is not thread:
+            self._queue.put(None)
+            thread.join(timeout)
+            if thread.is_alive():
+                return  # timeout: o writer segue gravando em segundo plano
+        # o que entrou na fila depois do sinal de parada (corrida com close) é gravado aqui
+        leftovers = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(item, _Item):
+                leftovers.append(item)
+                continue
+            if leftovers:
+                self._write(leftovers)
+                leftovers = []
+            if isinstance(item, _Update):
+                self._apply_update(item)
+            elif isinstance(item, _Barrier):
+                item.event.set()
+        if leftovers:
+            self._write(leftovers)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            written, batches, fallbacks, failed = self._written, self._batches, self._fallbacks, self._failed
+        return {
+            "pending": self._queue.qsize(),
+            "written": written,
+            "batches": batches,
+            "avg_batch": round(written / batches, 2) if batches else 0.0,
+            "sync_fallbacks": fallbacks,
+            "failed": failed,
+            "max_batch": self.max_batch,
+            "max_wait_ms": self.max_wait * 1000,
+            "max_queue": self._queue.maxsize,
+        }
+
+    def _add(self, **deltas: int) -> None:
+        with self._lock:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
+
+    def _enqueue(self, item: _Item) -> None:
+        if self._closed:
+            self._write_each([item], queued=False)
+            return
+        self._ensure_worker()
+        self._add(_pending=1)
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self._add(_pending=-1, _fallbacks=1)
+            SYNC_FALLBACK.inc()
+            self._write_each([item], queued=False)
+
+    def _ensure_worker(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if not self._thread or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._worker, name="log-writer", daemon=True)
+                self._thread.start()
+
+    def _collect(self, first: _Item) -> Tuple[List[_Item], Any]:
+        """Lote a partir de `first` + o marcador (barreira/parada) que o encerrou, se houver."""
+        batch = [first]
+        deadline = first.enqueued_at + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                nxt = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if not isinstance(nxt, _Item):
+                return batch, nxt
+            batch.append(nxt)
+        return batch, False
+
+    def _worker(self) -> None:
+        while True:
+            first = self._queue.get()
+            if isinstance(first, _Item):
+                batch, marker = self._collect(first)
+                self._write(batch)
+            else:
+                marker = first
+            if isinstance(marker, _Update):
+                self._apply_update(marker)
+            elif isinstance(marker, _Barrier):
+                marker.event.set()
+            elif marker is None:
+                return
+
+    def _write(self, batch: List[_Item]) -> None:
+        t0 = time.perf_counter()
+        try:
+            saved = self.inner.save_many([item.log for item in batch])
+        except Exception as e:
+            # um log inválido não derruba o lote: regrava um a um para isolar o erro
+            print(f"[WARN] Log writer: batch of {len(batch)} failed ({e}), retrying one by one")
+            self._write_each(batch)
+            return
+        self._add(_batches=1)
+        FLUSH_SIZE.observe(len(batch))
+        FLUSH_SECONDS.observe(time.perf_counter() - t0)
+        self._resolve(batch, saved)
+
+    def _write_each(self, items: List[_Item], queued: bool = True) -> None:
+        for item in items:
+            try:
+                saved = self.inner.save(item.log)
+            except Exception as e:
+                self._add(_failed=1, _pending=-1 if queued else 0)
+                FAILED.inc()
+                print(f"[ERROR] Log writer: failed to save log: {e}")
+                if item.future is not None:
+                    item.future.set_exception(e)
+                continue
+            self._resolve([item], [saved], queued)
+
+    def _apply_update(self, update: _Update) -> None:
+        try:
+            self.inner.update_result(update.log_id, update.log)
+        except Exception as e:
+            self._add(_failed=1)
+            FAILED.inc()
+            print(f"[ERROR] Log writer: failed to update log {update.log_id}: {e}")
+        finally:
+            self._add(_pending=-1)
+
+    def _resolve(self, items: List[_Item], saved: List[ClassificationLog], queued: bool = True) -> None:
+        now = time.perf_counter()
+        self._add(_written=len(items), _pending=-len(items) if queued else 0)
+        for item, log in zip(items, saved):
+            item.log.id = log.id
+            QUEUE_WAIT.observe(now - item.enqueued_at)
+            if item.future is not None:
+                item.future.set_result(log)
+
+
+_open: "weakref.WeakSet[WriteBehindLogRepository]" = weakref.WeakSet()
+_finalizer_pid: Optional[int] = None
+
+
+def _track(writer: WriteBehindLogRepository) -> None:
+    global _finalizer_pid
+    _open.add(writer)
+    if _finalizer_pid != os.getpid():
+        _finalizer_pid = os.getpid()
+        # workers do ProcessPoolExecutor saem via os._exit: atexit não roda, os finalizers do multiprocessing sim
+        mp_util.Finalize(None, close_all, exitpriority=10)
+
+
+def flush_all(timeout: Optional[float] = None) -> None:
+    """Flush de todos os writers deste processo (ex.: antes de ler logs com outra sessão)."""
+    for writer in list(_open):
+        writer.flush(timeout)
+
+
+def close_all(timeout: Optional[float] = 10.0) -> None:
+    """Grava as filas de todos os writers deste processo e encerra as threads."""
+    for writer in list(_open):
+        writer.close(timeout)
+
+
+atexit.register(close_all)
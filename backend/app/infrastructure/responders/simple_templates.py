@@ -1,15 +1,18 @@
-from app.domain.entities import ClassificationResult, Email, Category
+from typing import Optional
+from app.domain.entities import ClassificationResult, Email, Category, AnalyzedEmail
 from app.domain.ports import ReplySuggesterPort
 
 class SimpleResponder(ReplySuggesterPort):
-    def suggest(self, result: ClassificationResult, email: Email) -> str:
+    def suggest(
+        self, result: ClassificationResult, email: Email, analysis: Optional[AnalyzedEmail] = None
+    ) -> str:
         if (result.suggested_reply or "").strip():
             return result.suggested_reply
 
         if result.category == Category.UNPRODUCTIVE:
             return ""
 
-        lang = ((result.extra or {}).get("lang") or "pt").lower()
+        lang = ((result.extra or {}).get("lang") or (analysis.lang if analysis else None) or "pt").lower()
 
         if lang == "en":
             return ("Hi! Thanks for reaching out. We received your message and will proceed with the next steps. "
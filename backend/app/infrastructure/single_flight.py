@@ -0,0 +1,79 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+
+class SingleFlight:
+    """
+    Coalescência de chamadas idênticas em voo: enquanto a primeira chamada com
+    uma chave não termina, as demais com a mesma chave esperam e recebem o
+    mesmo resultado (ou a mesma exceção) em vez de repetir o trabalho.
+
+    - `do(key, fn)`   → versão para threads
+    - `ado(key, fn)`  → versão asyncio; `fn` devolve a corrotina. O trabalho
+      compartilhado roda numa task protegida (shield): o cancelamento de um
+      chamador (ex.: prazo estourado) não derruba os demais.
+    Ambas devolvem `(resultado, shared)`: `shared` é True para quem só esperou
+    o líder — o custo do trabalho (ex.: tokens) já foi contado por ele.
+    Não é cache: terminada a chamada, a chave é esquecida.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+        self._tasks: Dict[Tuple[int, str], asyncio.Task] = {}
+        self._stats = {"leaders": 0, "coalesced": 0}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        with self._lock:
+            fut = self._calls.get(key)
+            leader = fut is None
+            if leader:
+                fut = self._calls[key] = Future()
+                self._stats["leaders"] += 1
+            else:
+                self._stats["coalesced"] += 1
+        if not leader:
+            return fut.result(), True
+
+        try:
+            result = fn()
+        except BaseException as e:
+            fut.set_exception(e)
+            raise
+        else:
+            fut.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    async def ado(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        loop = asyncio.get_running_loop()
+        task_key = (id(loop), key)
+        with self._lock:
+            task = self._tasks.get(task_key)
+            shared = task is not None
+            if not shared:
+                task = loop.create_task(fn())
+                self._tasks[task_key] = task
+                task.add_done_callback(lambda t: self._forget(task_key, t))
+                self._stats["leaders"] += 1
+            else:
+                self._stats["coalesced"] += 1
+        return await asyncio.shield(task), shared
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out = dict(self._stats)
+            out["in_flight"] = len(self._calls) + len(self._tasks)
+        total = out["leaders"] + out["coalesced"]
+        out["coalesced_ratio"] = (out["coalesced"] / total) if total else 0.0
+        return out
+
+    def _forget(self, task_key: Tuple[int, str], task: asyncio.Task) -> None:
+        with self._lock:
+            self._tasks.pop(task_key, None)
+        if not task.cancelled():
+            task.exception()  # marca como lida mesmo se todos os chamadores desistiram
@@ -1,20 +1,85 @@
 # app/interfaces/http/api_router.py
+import base64
+import hmac
+from datetime import datetime, timezone
+from typing import Literal, Optional
+
 from fastapi import (
-    APIRouter, UploadFile, File, Request,
-    HTTPException, Depends
+    APIRouter, UploadFile, File, Request, Response,
+    HTTPException, Depends, Query
 )
+from fastapi.responses import PlainTextResponse
 from sqlmodel import Session
 
-from app.bootstrap import build_use_case
-from app.application.dto import DirectJson, ClassifyResponse
-from app.domain.errors import BadRequest
+from app.bootstrap import build_use_case, build_executor
+from app.application.dto import (
+    DirectJson, ClassifyResponse,
+    BatchClassifyRequest, BatchClassifyResponse, BatchItemResponse,
+)
+from app.config import settings
+from app.metrics import snapshot_all, render_prometheus
+from app.profiling import profiler
+from app.domain.errors import BadRequest, Overloaded
 from app.ratelimiting import limiter
 from app.infrastructure.db import get_session
 from app.infrastructure.repositories.sql_log_repository import SqlLogRepository
-from app.domain.entities import ClassificationLog
+from app.infrastructure.repositories.sql_log_search_repository import SqlLogSearchRepository
+from app.infrastructure.repositories.sql_rollup_repository import SqlRollupRepository
+from app.infrastructure.repositories.write_behind_log_repository import flush_all as flush_log_writers
+from app.domain.entities import ClassificationLog, Email, LogQuery, LogSearchHit, LogSearchQuery, StatsQuery
 
 router = APIRouter()
 uc = build_use_case()
+executor = build_executor(uc)
+
+BUDGET_HEADER = "X-Latency-Budget-Ms"
+PROFILE_HEADER = "X-Profile"
+ADMIN_TOKEN_HEADER = "X-Admin-Token"
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+MAX_LOGS_PAGE = 1000
+MAX_SEARCH_PAGE = 100
+
+
+def _latency_budget_ms(request: Request):
+    """Orçamento de latência da requisição (header ou LLM_LATENCY_BUDGET_MS); None = sem orçamento."""
+    raw = request.headers.get(BUDGET_HEADER)
+    if raw is None:
+        budget = settings.LLM_LATENCY_BUDGET_MS
+    else:
+        try:
+            budget = float(raw)
+        except ValueError:
+            raise BadRequest(f"{BUDGET_HEADER} deve ser um número de milissegundos")
+    return budget if budget > 0 else None
+
+
+def _sampled(request: Request) -> bool:
+    """Perfilar esta requisição? (amostragem ou X-Profile: 1, se PROFILING_ALLOW_HEADER)"""
+    forced = request.headers.get(PROFILE_HEADER, "").strip().lower() in ("1", "true")
+    return profiler.should_sample(forced)
+
+
+async def _dispatch(sampled: bool, method: str, *args, **kwargs):
+    """executor.run; se amostrada, sob cProfile no worker que executa o caso de uso."""
+    if not sampled:
+        return await executor.run(method, *args, **kwargs)
+    result, stats, ms = await executor.run_profiled(method, *args, **kwargs)
+    profiler.record("/classify", stats, ms)
+    return result
+
+
+def _require_admin(request: Request) -> None:
+    token = settings.PROFILING_ADMIN_TOKEN
+    if not token:
+        # sem PROFILING_ADMIN_TOKEN os endpoints de administração ficam fechados
+        raise HTTPException(status_code=404, detail="Not Found")
+    given = request.headers.get(ADMIN_TOKEN_HEADER, "")
+    if not hmac.compare_digest(given.encode(), token.encode()):
+        raise HTTPException(status_code=403, detail="Token de administração inválido")
+
+
+def _response(r) -> ClassifyResponse:
+    return ClassifyResponse(**r.__dict__, hedge=(r.extra or {}).get("hedge"))
 
 
 @router.get("/health")
@@ -33,19 +98,37 @@ async def classify(
     file: UploadFile | None = File(None),
 ):
     ctype = request.headers.get("content-type", "").lower()
+    sampled = _sampled(request)
     try:
         if "application/json" in ctype:
             data = await request.json()
             payload = DirectJson(**data)
             profile_id = payload.profile_id
 
-            r = uc.execute_from_text(
+            if uc.prefers_async:
+                # LLM no caminho: I/O aguardado no event loop (semáforo + prazo no classificador);
+                # amostrada, perfila só as etapas que vão para o executor (nos awaits o cProfile
+                # da thread do loop veria as outras requisições)
+                r = await uc.aexecute_from_text(
+                    payload.subject,
+                    payload.body,
+                    payload.sender,
+                    profile_id=profile_id,
+                    budget_ms=_latency_budget_ms(request),
+                    sampled=sampled,
+                )
+                return _response(r)
+
+            # fora do event loop (thread/process): extração, langdetect e sklearn são CPU-bound
+            r = await _dispatch(
+                sampled,
+                "execute_from_text",
                 payload.subject,
                 payload.body,
                 payload.sender,
                 profile_id=profile_id
             )
-            return ClassifyResponse(**r.__dict__)
+            return _response(r)
 
         if "multipart/form-data" in ctype:
             if not file:
@@ -54,27 +137,300 @@ async def classify(
             raw = await file.read()
             profile_id = request.query_params.get("profile_id")
 
-            r = uc.execute_from_file(
-                file.filename,
-                raw,
-                profile_id=profile_id,
-            )
-            return ClassifyResponse(**r.__dict__)
+            if uc.prefers_async:
+                r = await uc.aexecute_from_file(
+                    file.filename, raw, profile_id=profile_id, budget_ms=_latency_budget_ms(request),
+                    sampled=sampled,
+                )
+            else:
+                r = await _dispatch(
+                    sampled,
+                    "execute_from_file",
+                    file.filename,
+                    raw,
+                    profile_id=profile_id,
+                )
+            return _response(r)
 
         raise BadRequest("Use JSON ou multipart/form-data.")
 
     except BadRequest as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except Overloaded as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+@router.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    summary="Histogramas e contadores no formato texto do Prometheus"
+)
+def metrics():
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@router.get(
+    "/admin/profiles",
+    summary="Perfis amostrados (cProfile) somados, ordenados por cumulative/tottime/ncalls/name"
+)
+def profiles_merged(request: Request, sort: str = "cumulative", limit: int = 50, name: str | None = None):
+    _require_admin(request)
+    try:
+        return {**profiler.stats(), **profiler.merged(sort=sort, limit=limit, name=name)}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post(
+    "/admin/profiles/dump",
+    summary="Grava as amostras (e a soma) como .pstats em PROFILING_DUMP_DIR"
+)
+def profiles_dump(request: Request, name: str | None = None, clear: bool = False):
+    _require_admin(request)
+    paths = profiler.dump(name=name)
+    if clear:
+        profiler.clear()
+    return {"files": paths}
+
+
+@router.delete(
+    "/admin/profiles",
+    summary="Esvazia o ring buffer de perfis"
+)
+def profiles_clear(request: Request):
+    _require_admin(request)
+    return {"cleared": profiler.clear()}
+
+
+@router.get(
+    "/classify/batcher/stats",
+    summary="Histogramas do micro-batcher (tamanho do lote e espera na fila)"
+)
+def batcher_stats():
+    return snapshot_all(prefix="classifier_microbatch_")
+
+
+@router.get(
+    "/classify/cache/stats",
+    summary="Contadores do cache de resultados (hits/misses/evictions)"
+)
+def cache_stats():
+    if not uc.cache:
+        return {"enabled": False}
+    return {"enabled": True, **uc.cache.stats()}
+
+
+@router.get(
+    "/classify/llm/stats",
+    summary="Cliente do LLM: coalescência (single-flight) e pools de conexão"
+)
+def llm_stats():
+    llm = getattr(uc.classifier, "llm", None)
+    if llm is None or not hasattr(llm, "stats"):
+        return {"enabled": False}
+    return {"enabled": True, **llm.stats()}
+
+
+@router.post(
+    "/profiles/reload",
+    summary="Relê profiles.json e troca atomicamente os perfis compilados (X-Admin-Token)"
+)
+def profiles_reload(request: Request):
+    _require_admin(request)
+    # com EXECUTOR_KIND=process cada worker tem seu store e recarrega pelo mtime (PROFILES_WATCH)
+    if not hasattr(uc.profiles, "reload"):
+        raise HTTPException(status_code=501, detail="Store de perfis não suporta recarga")
+    return uc.profiles.reload()
+
+
+@router.get(
+    "/profiles/stats",
+    summary="Perfis carregados/compilados, recargas e último erro"
+)
+def profiles_stats():
+    if not hasattr(uc.profiles, "stats"):
+        return {"compiled_store": False}
+    return {"compiled_store": True, **uc.profiles.stats()}
+
+
+@router.post(
+    "/classify/batch",
+    response_model=BatchClassifyResponse,
+    summary="Classifica uma lista de emails JSON numa única chamada (resultados na ordem de entrada)"
+)
+@limiter.limit("5/minute")
+async def classify_batch(request: Request, payload: BatchClassifyRequest):
+    if len(payload.items) > settings.MAX_BATCH_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Máximo de {settings.MAX_BATCH_ITEMS} emails por lote.",
+        )
+
+    emails = [Email(subject=it.subject, body=it.body, sender=it.sender) for it in payload.items]
+    try:
+        items = await executor.run(
+            "classify_batch", emails, [it.profile_id for it in payload.items]
+        )
+    except Overloaded as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    return BatchClassifyResponse(results=[
+        BatchItemResponse(
+            index=item.index,
+            status="ok" if item.result is not None else "error",
+            result=ClassifyResponse(**item.result.__dict__) if item.result is not None else None,
+            error=item.error,
+        )
+        for item in items
+    ])
+
+
+def _encode_cursor(after) -> str:
+    created_at, log_id = after
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{log_id}".encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, log_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(log_id)
+    except ValueError:
+        raise BadRequest("cursor inválido")
+
+
+def _encode_search_cursor(page) -> str:
+    # offset dentro da janela do ranking; "<id" depois dela (mais antigos, por id)
+    raw = str(page.next_offset) if page.next_offset is not None else f"<{page.next_before_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_search_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        if raw.startswith("<"):
+            return 0, int(raw[1:])
+        return int(raw), None
+    except ValueError:
+        raise BadRequest("cursor inválido")
+
+
+def _naive_utc(ts: Optional[datetime]) -> Optional[datetime]:
+    # created_at é gravado em UTC sem fuso
+    return ts.astimezone(timezone.utc).replace(tzinfo=None) if ts and ts.tzinfo else ts
 
 
 @router.get(
     "/logs",
     response_model=list[ClassificationLog],
-    summary="Lista os últimos logs de classificações"
+    summary="Logs de classificações, do mais recente ao mais antigo (keyset; próxima página em X-Next-Cursor)"
 )
 def list_logs(
-    limit: int = 50,
+    response: Response,
+    limit: int = Query(50, ge=1, le=MAX_LOGS_PAGE),
+    cursor: Optional[str] = None,
+    profile_id: Optional[str] = None,
+    category: Optional[str] = None,
+    source: Optional[str] = None,
+    used_model: Optional[str] = None,
+    since: Optional[datetime] = None,
+    fields: Literal["full", "summary"] = "full",
+    session: Session = Depends(get_session),
+):
+    try:
+        query = LogQuery(
+            limit=limit,
+            after=_decode_cursor(cursor) if cursor else None,
+            profile_id=profile_id,
+            category=category,
+            source=source,
+            used_model=used_model,
+            since=_naive_utc(since),
+            summary=fields == "summary",
+        )
+    except BadRequest as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # logs ainda na fila do write-behind precisam estar no banco antes da leitura
+    flush_log_writers()
+    page = SqlLogRepository(session).list_page(query)
+    if page.next_after is not None:
+        response.headers[NEXT_CURSOR_HEADER] = _encode_cursor(page.next_after)
+    return page.items
+
+
+@router.get(
+    "/logs/search",
+    response_model=list[LogSearchHit],
+    summary=(
+        "Busca textual nos logs (assunto, remetente, corpo, motivo) por relevância entre os "
+        "LOG_SEARCH_MAX_RANKED mais recentes, depois os mais antigos por data; próxima página em X-Next-Cursor"
+    )
+)
+def search_logs(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=500),
+    limit: int = Query(20, ge=1, le=MAX_SEARCH_PAGE),
+    cursor: Optional[str] = None,
+    prefix: bool = True,
+    profile_id: Optional[str] = None,
+    category: Optional[str] = None,
+    source: Optional[str] = None,
+    used_model: Optional[str] = None,
+    since: Optional[datetime] = None,
     session: Session = Depends(get_session),
 ):
-    repo = SqlLogRepository(session)
-    return repo.list_recent(limit=limit)
+    if not settings.LOG_SEARCH_FTS:
+        raise HTTPException(status_code=503, detail="Busca desativada (LOG_SEARCH_FTS=false)")
+    try:
+        offset, before_id = _decode_search_cursor(cursor) if cursor else (0, None)
+        query = LogSearchQuery(
+            text=q,
+            limit=limit,
+            offset=max(0, offset),
+            before_id=before_id,
+            prefix=prefix,
+            profile_id=profile_id,
+            category=category,
+            source=source,
+            used_model=used_model,
+            since=_naive_utc(since),
+        )
+        flush_log_writers()
+        page = SqlLogSearchRepository(session, settings.LOG_SEARCH_MAX_RANKED).search(query)
+    except BadRequest as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if page.next_offset is not None or page.next_before_id is not None:
+        response.headers[NEXT_CURSOR_HEADER] = _encode_search_cursor(page)
+    return page.items
+
+@router.get(
+    "/stats",
+    summary="Contagens, tokens, custo e latência média por hora/dia (rollups horários; não varre os logs)"
+)
+def stats(
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    granularity: Literal["hour", "day", "total"] = "hour",
+    group_by: str = Query("", description="Dimensões separadas por vírgula: profile_id,category,source,used_model"),
+    profile_id: Optional[str] = None,
+    category: Optional[str] = None,
+    source: Optional[str] = None,
+    used_model: Optional[str] = None,
+    session: Session = Depends(get_session),
+):
+    try:
+        query = StatsQuery(
+            since=_naive_utc(since),
+            until=_naive_utc(until),
+            granularity=granularity,
+            group_by=tuple(d.strip() for d in group_by.split(",") if d.strip()),
+            profile_id=profile_id,
+            category=category,
+            source=source,
+            used_model=used_model,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # os rollups são atualizados no commit dos logs: a fila do write-behind entra antes
+    flush_log_writers()
+    return SqlRollupRepository(session).stats(query)
@@ -2,9 +2,11 @@ import os
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.interfaces.http.routers import router
+from app.interfaces.http.routers import router, executor
 from app.ratelimiting import init_rate_limit
 from app.interfaces.http.imap_router import router as imap_router
+from app.infrastructure.repositories.write_behind_log_repository import close_all as close_log_writers
+from app.infrastructure.classifiers.hedge import drain as drain_hedges
 
 
 app = FastAPI(
@@ -20,6 +22,15 @@ app.include_router(router)
 app.include_router(imap_router)
 
 
+@app.on_event("shutdown")
+async def _shutdown():
+    # respostas atrasadas do LLM (hedge) ainda atualizam logs pelo executor: primeiro elas
+    await drain_hedges()
+    executor.shutdown()
+    # depois do executor: nenhuma requisição em andamento enfileira mais logs
+    close_log_writers()
+
+
 raw_origins = os.getenv("ALLOW_ORIGINS", "")
 origins = [o.strip() for o in raw_origins.split(",") if o.strip()]
 
@@ -29,5 +40,6 @@ app.add_middleware(
     allow_credentials=False,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # paginação do /logs
 )
 
@@ -0,0 +1,199 @@
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, Optional, Sequence, Tuple
+
+Labels = Tuple[Tuple[str, str], ...]
+
+# segundos: de sub-milissegundo (rules/tokenização) até chamadas lentas ao LLM
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _labels(labels: Optional[Dict[str, str]]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in (labels or {}).items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt_labels(labels: Labels, extra: Labels = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _fmt_value(v: float) -> str:
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+
+class Histogram:
+    """Histograma cumulativo (estilo Prometheus) seguro para threads."""
+
+    def __init__(self, name: str, buckets: Sequence[float], help: str = "", labels: Labels = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)  # último = +Inf
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[i] += 1
+            self._sum += value
+            self._count += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counts = list(self._counts)
+            total, count = self._sum, self._count
+        cumulative, acc = {}, 0
+        for le, c in zip(self.buckets, counts):
+            acc += c
+            cumulative[str(le)] = acc
+        cumulative["+Inf"] = count
+        return {"buckets": cumulative, "count": count, "sum": total}
+
+    def exposition(self) -> list:
+        snap = self.snapshot()
+        lines = [
+            f"{self.name}_bucket{_fmt_labels(self.labels, (('le', le),))} {c}"
+            for le, c in snap["buckets"].items()
+        ]
+        lines.append(f"{self.name}_sum{_fmt_labels(self.labels)} {_fmt_value(snap['sum'])}")
+        lines.append(f"{self.name}_count{_fmt_labels(self.labels)} {snap['count']}")
+        return lines
+
+
+class Counter:
+    """Contador monotônico seguro para threads."""
+
+    def __init__(self, name: str, help: str = "", labels: Labels = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> float:
+        with self._lock:
+            return self._value
+
+    def exposition(self) -> list:
+        return [f"{self.name}{_fmt_labels(self.labels)} {_fmt_value(self.value)}"]
+
+
+# série = nome + rótulos; séries do mesmo nome saem juntas sob um único HELP/TYPE
+_registry: Dict[Tuple[str, Labels], Histogram] = {}
+_counters: Dict[Tuple[str, Labels], Counter] = {}
+_registry_lock = threading.Lock()
+
+
+def histogram(
+    name: str, buckets: Sequence[float], help: str = "", labels: Optional[Dict[str, str]] = None
+) -> Histogram:
+    """Retorna o histograma registrado com esse nome/rótulos (cria na primeira chamada)."""
+    key = (name, _labels(labels))
+    with _registry_lock:
+        h = _registry.get(key)
+        if h is None:
+            h = _registry[key] = Histogram(name, buckets, help, key[1])
+        return h
+
+
+def counter(name: str, help: str = "", labels: Optional[Dict[str, str]] = None) -> Counter:
+    """Retorna o contador registrado com esse nome/rótulos (cria na primeira chamada)."""
+    key = (name, _labels(labels))
+    with _registry_lock:
+        c = _counters.get(key)
+        if c is None:
+            c = _counters[key] = Counter(name, help, key[1])
+        return c
+
+
+def snapshot_all(prefix: str = "") -> Dict[str, dict]:
+    with _registry_lock:
+        items = [(n + _fmt_labels(l), h) for (n, l), h in _registry.items() if n.startswith(prefix)]
+    return {n: h.snapshot() for n, h in items}
+
+
+def render_prometheus() -> str:
+    """Todas as métricas no formato texto do Prometheus (exposition format 0.0.4)."""
+    with _registry_lock:
+        series = [(k, "histogram", h) for k, h in _registry.items()]
+        series += [(k, "counter", c) for k, c in _counters.items()]
+    series.sort(key=lambda s: s[0])
+    lines, seen = [], set()
+    for (name, _), kind, metric in series:
+        if name not in seen:
+            seen.add(name)
+            if metric.help:
+                lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {kind}")
+        lines.extend(metric.exposition())
+    return "\n".join(lines) + "\n"
+
+
+STAGE_SECONDS_NAME = "classify_stage_seconds"
+
+
+class Spans:
+    """
+    Cronômetro por etapa de uma requisição: `with spans.span("tokenize"):`
+    acumula ms em `spans.ms` e observa `classify_stage_seconds{stage=...}`.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.ms: Dict[str, float] = {}
+
+    def span(self, stage: str) -> "_Span":
+        return _Span(self, stage)
+
+    def add(self, stage: str, elapsed_s: float, observe: bool = True) -> None:
+        self.ms[stage] = round(self.ms.get(stage, 0.0) + elapsed_s * 1000, 3)
+        if observe:
+            stage_histogram(stage).observe(elapsed_s)
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+
+class _Span:
+    # context manager em classe: ~metade do custo do @contextmanager por span
+    __slots__ = ("spans", "stage", "t0")
+
+    def __init__(self, spans: Spans, stage: str):
+        self.spans, self.stage = spans, stage
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.spans.add(self.stage, time.perf_counter() - self.t0)
+        return False
+
+
+_stage_histograms: Dict[str, Histogram] = {}
+
+
+def stage_histogram(stage: str) -> Histogram:
+    # memo por etapa: evita ordenar rótulos e pegar o lock do registro a cada span
+    h = _stage_histograms.get(stage)
+    if h is None:
+        h = _stage_histograms[stage] = histogram(
+            STAGE_SECONDS_NAME, LATENCY_BUCKETS, help="Tempo por etapa do pipeline de classificação",
+            labels={"stage": stage},
+        )
+    return h
@@ -0,0 +1,280 @@
+import cProfile
+import functools
+import os
+import pstats
+import random
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.config import settings
+
+_NULL = nullcontext()
+SORT_KEYS = ("cumulative", "tottime", "ncalls", "name")
+# perfil ativo nesta thread: no 3.11 um segundo enable() não falha, corrompe as duas amostras
+_active = threading.local()
+
+
+def _enable(prof: cProfile.Profile) -> bool:
+    """Liga `prof` se nenhum outro perfil desta aplicação está ativo na thread."""
+    if getattr(_active, "on", False):
+        return False
+    try:
+        prof.enable()
+    except ValueError:  # 3.12+: outro profiler (ex.: um depurador) já ativo
+        return False
+    _active.on = True
+    return True
+
+
+def _disable(prof: cProfile.Profile) -> None:
+    prof.disable()
+    _active.on = False
+
+
+class _Snapshot:
+    """Stats já coletadas no formato que `pstats.Stats`/`.add` aceitam."""
+
+    def __init__(self, stats: dict):
+        # cópia rasa: pstats toma posse do dict e o altera em `add`
+        self.stats = dict(stats)
+
+    def create_stats(self):
+        pass
+
+
+def capture(fn: Callable, *args, **kwargs) -> Tuple[Any, Optional[dict], float]:
+    """
+    Roda `fn` sob cProfile nesta thread → (resultado, stats, ms). Stats é
+    um dict serializável (volta de workers em processo). Se outro perfil
+    já estiver ativo na thread, roda sem perfil e stats = None.
+    """
+    prof = cProfile.Profile()
+    t0 = time.perf_counter()
+    if not _enable(prof):
+        return fn(*args, **kwargs), None, (time.perf_counter() - t0) * 1000
+    try:
+        result = fn(*args, **kwargs)
+    finally:
+        _disable(prof)
+    ms = (time.perf_counter() - t0) * 1000
+    prof.create_stats()
+    return result, prof.stats, ms
+
+
+class _Profiled:
+    def __init__(self, owner: "SamplingProfiler", name: str):
+        self.owner, self.name = owner, name
+        self.prof = cProfile.Profile()
+        self.active = False
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        # outro perfil ativo na thread: esta amostra é descartada
+        self.active = _enable(self.prof)
+        return self
+
+    def __exit__(self, *exc):
+        if self.active:
+            _disable(self.prof)
+            self.prof.create_stats()
+            self.owner.record(self.name, self.prof.stats, (time.perf_counter() - self.t0) * 1000)
+        return False
+
+
+class _Parts:
+    """
+    Uma amostra montada em partes: cada etapa síncrona roda sob `capture` na
+    thread onde executa (worker do executor) e as stats são somadas; os
+    awaits entre as etapas (LLM) ficam fora do perfil, só na duração.
+    """
+
+    def __init__(self, owner: "SamplingProfiler", name: str):
+        self.owner, self.name = owner, name
+        self.stats: Optional[dict] = None
+        self._lock = threading.Lock()
+        self.t0 = time.perf_counter()
+
+    def run(self, fn: Callable, *args, **kwargs):
+        result, stats, _ = capture(fn, *args, **kwargs)
+        if stats is not None:
+            with self._lock:
+                if self.stats is None:
+                    self.stats = stats
+                else:
+                    merged = pstats.Stats(_Snapshot(self.stats))
+                    merged.add(_Snapshot(stats))
+                    self.stats = merged.stats
+        return result
+
+    def close(self) -> None:
+        """Grava a amostra (uma por requisição) com a duração total, awaits incluídos."""
+        self.owner.record(self.name, self.stats, (time.perf_counter() - self.t0) * 1000)
+
+
+class SamplingProfiler:
+    """
+    Perfil (cProfile) de uma fração das requisições/execuções:
+    - `enabled` + `sample_rate` sorteiam quem é perfilado; `forced` (header
+      X-Profile, se `allow_forced`) perfila mesmo com a amostragem desligada
+    - as amostras ficam num ring buffer de `max_profiles` (memória limitada)
+    - `merged()` soma as amostras e ordena (cumulative/tottime/...);
+      `dump()` grava `.pstats` para snakeviz/pstats
+    Desligado, `maybe()` devolve um contexto nulo compartilhado (custo de um if).
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        sample_rate: float = 0.01,
+        max_profiles: int = 64,
+        allow_forced: bool = False,
+        dump_dir: str = "profiles",
+    ):
+        self.enabled = enabled
+        self.sample_rate = max(0.0, min(1.0, sample_rate))
+        self.allow_forced = allow_forced
+        self.dump_dir = dump_dir
+        self._samples: deque = deque(maxlen=max(1, max_profiles))
+        self._lock = threading.Lock()
+        self._seen = 0
+        self._taken = 0
+
+    @classmethod
+    def from_settings(cls) -> "SamplingProfiler":
+        return cls(
+            enabled=settings.PROFILING_ENABLED,
+            sample_rate=settings.PROFILING_SAMPLE_RATE,
+            max_profiles=settings.PROFILING_MAX_PROFILES,
+            allow_forced=settings.PROFILING_ALLOW_HEADER,
+            dump_dir=settings.PROFILING_DUMP_DIR,
+        )
+
+    def should_sample(self, forced: bool = False) -> bool:
+        if forced and self.allow_forced:
+            return True
+        if not self.enabled:
+            return False
+        self._seen += 1  # contagem aproximada (sem lock): só para o relatório
+        return random.random() < self.sample_rate
+
+    def block(self, name: str, sampled: bool):
+        """Contexto que perfila o bloco (nesta thread) se `sampled`; senão, nulo."""
+        return _Profiled(self, name) if sampled else _NULL
+
+    def parts(self, name: str, sampled: bool) -> Optional[_Parts]:
+        """Amostra em partes (caminho assíncrono) se `sampled`; senão None."""
+        return _Parts(self, name) if sampled else None
+
+    def maybe(self, name: str, forced: bool = False):
+        """Como `block`, sorteando aqui."""
+        if not (self.enabled or forced):
+            return _NULL
+        return self.block(name, self.should_sample(forced))
+
+    def wrap(self, name: str):
+        """Decorator: cada chamada é sorteada como em `maybe`."""
+        def deco(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                with self.maybe(name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return deco
+
+    def record(self, name: str, stats: Optional[dict], duration_ms: float) -> None:
+        if stats is None:
+            return
+        with self._lock:
+            self._taken += 1
+            self._samples.append({
+                "name": name,
+                "at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+                "duration_ms": round(duration_ms, 3),
+                "stats": stats,
+            })
+
+    def samples(self, name: Optional[str] = None) -> List[dict]:
+        with self._lock:
+            items = list(self._samples)
+        return [s for s in items if name is None or s["name"] == name]
+
+    def _stats(self, samples: List[dict]) -> Optional[pstats.Stats]:
+        if not samples:
+            return None
+        merged = pstats.Stats(_Snapshot(samples[0]["stats"]))
+        for s in samples[1:]:
+            merged.add(_Snapshot(s["stats"]))
+        return merged
+
+    def merged(self, sort: str = "cumulative", limit: int = 50, name: Optional[str] = None) -> dict:
+        """Amostras somadas: as `limit` funções mais caras pelo critério `sort`."""
+        if sort not in SORT_KEYS:
+            raise ValueError(f"sort deve ser um de {SORT_KEYS}")
+        samples = self.samples(name)
+        merged = self._stats(samples)
+        rows = []
+        if merged is not None:
+            merged.sort_stats(sort)
+            for func in merged.fcn_list[:limit]:
+                cc, nc, tt, ct, _ = merged.stats[func]
+                filename, line, fn = func
+                rows.append({
+                    "function": f"{filename}:{line}({fn})",
+                    "ncalls": nc,
+                    "primitive_calls": cc,
+                    "tottime_ms": round(tt * 1000, 3),
+                    "cumtime_ms": round(ct * 1000, 3),
+                })
+        return {
+            "samples": len(samples),
+            "total_ms": round(sum(s["duration_ms"] for s in samples), 3),
+            "names": sorted({s["name"] for s in samples}),
+            "sort": sort,
+            "functions": rows,
+        }
+
+    def dump(self, directory: Optional[str] = None, name: Optional[str] = None) -> List[str]:
+        """Grava `merged.pstats` + um `.pstats` por amostra; retorna os caminhos."""
+        samples = self.samples(name)
+        if not samples:
+            return []
+        directory = directory or self.dump_dir
+        os.makedirs(directory, exist_ok=True)
+        stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+        paths = []
+        merged_path = os.path.join(directory, f"{stamp}-merged.pstats")
+        self._stats(samples).dump_stats(merged_path)
+        paths.append(merged_path)
+        for i, s in enumerate(samples):
+            path = os.path.join(directory, f"{stamp}-{i:03d}-{s['name'].replace('/', '_')}.pstats")
+            pstats.Stats(_Snapshot(s["stats"])).dump_stats(path)
+            paths.append(path)
+        return paths
+
+    def clear(self) -> int:
+        with self._lock:
+            n = len(self._samples)
+            self._samples.clear()
+            return n
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            buffered, taken = len(self._samples), self._taken
+        return {
+            "enabled": self.enabled,
+            "sample_rate": self.sample_rate,
+            "allow_header": self.allow_forced,
+            "seen": self._seen,
+            "sampled": taken,
+            "buffered": buffered,
+            "capacity": self._samples.maxlen,
+        }
+
+
+profiler = SamplingProfiler.from_settings()
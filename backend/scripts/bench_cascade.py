@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Cascata rules → ml → llm vs SmartClassifier (rules → llm): chamadas ao LLM,
+latência por email e tempo por etapa.
+
+    python -m scripts.bench_cascade [--emails 200] [--latency-ms 300] [--plan rules:0.85,ml:0.9,llm]
+
+ML sintético (ou os pickles reais, se presentes) de `load_or_train_ml`; o
+mock do LLM responde com latência fixa e sempre "productive", então o
+acerto mede sobretudo quanto do corpus cada estratégia decide sem o LLM.
+"""
+import argparse
+import os
+import time
+from collections import Counter
+
+from app.domain.entities import Email, CascadeStage
+from app.infrastructure.classifiers.cascade import CascadeClassifier
+from app.infrastructure.classifiers.openai_llm import OpenAIClassifier
+from app.infrastructure.classifiers.rule_based import RuleBasedClassifier
+from app.infrastructure.classifiers.smart_classifier import SmartClassifier
+from app.infrastructure.http_client import PooledHttpClient
+from scripts.bench_common import load_or_train_ml, make_ml_classifier, synthetic_corpus
+from scripts.mock_llm_server import MockLLMServer
+
+PRIORITY = ["reunião", "contrato", "proposta", "orçamento", "prazo", "fatura"]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--emails", type=int, default=200)
+    ap.add_argument("--latency-ms", type=float, default=300.0)
+    ap.add_argument("--plan", default="rules:0.85,ml:0.9,llm")
+    args = ap.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+    corpus = synthetic_corpus(args.emails, seed=13, words=60)
+    emails = [Email(subject=f"Pedido {i}", body=t) for i, (t, _) in enumerate(corpus)]
+    model, vectorizer, origin = load_or_train_ml()
+    ml = make_ml_classifier(model, vectorizer)
+    print(f"{len(emails)} emails, ML {origin}, LLM mock {args.latency_ms:.0f} ms")
+
+    with MockLLMServer(latency_ms=args.latency_ms) as srv:
+        def llm():
+            return OpenAIClassifier(http_client=PooledHttpClient(srv.base_url), single_flight=False)
+
+        runs = [
+            ("smart (rules→llm)", SmartClassifier(RuleBasedClassifier(), llm(), min_conf=0.85)),
+            (f"cascata {args.plan}", CascadeClassifier(
+                {"rules": RuleBasedClassifier(), "ml": ml, "llm": llm()}, CascadeStage.parse_plan(args.plan),
+            )),
+        ]
+        for label, clf in runs:
+            before = srv.requests
+            t0 = time.perf_counter()
+            results = [clf.classify(e, [], priority=PRIORITY) for e in emails]
+            ms = (time.perf_counter() - t0) * 1000 / len(emails)
+            cats = [r.category for r in results]
+            acc = sum((c.value == "unproductive") == bool(y) for c, (_, y) in zip(cats, corpus)) / len(cats)
+            print(f"{label:32s} llm={srv.requests - before:4d} chamadas  {ms:7.1f} ms/email  acerto={acc:6.1%}")
+
+            steps = [s for r in results for s in (r.extra or {}).get("cascade", {}).get("stages", [])]
+            if steps:
+                exits = Counter(r.extra["cascade"]["exit"] for r in results)
+                for name in dict.fromkeys(s["stage"] for s in steps):
+                    mine = [s["ms"] for s in steps if s["stage"] == name]
+                    print(f"    {name:6s} rodou={len(mine):4d}  saiu={exits[name]:4d}  "
+                          f"média={sum(mine) / len(mine):8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
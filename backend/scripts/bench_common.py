@@ -0,0 +1,81 @@
+"""Utilidades compartilhadas pelos scripts de benchmark (scripts/bench_*.py)."""
+import random
+import statistics
+import time
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parent.parent
+MODELS_DIR = BACKEND_ROOT / "models"
+
+_HAM = ("meeting agenda contract proposal invoice payment deadline delivery report budget "
+        "reunião contrato proposta fatura boleto prazo entrega orçamento pedido suporte").split()
+_SPAM = ("click win free prize offer discount unsubscribe password verify account urgent "
+         "promoção desconto oferta grátis clique ganhe cupom aproveite compre").split()
+_FILLER = ("the of and to in for on with please team hello regards thanks "
+           "de da do para com por uma olá equipe obrigado").split()
+
+
+def synthetic_corpus(n: int, seed: int = 42, words: int = 80):
+    """Gera (texto, rótulo) sintéticos; 1 = spam/improdutivo, 0 = produtivo."""
+    rnd = random.Random(seed)
+    out = []
+    for _ in range(n):
+        label = rnd.random() < 0.5
+        vocab = _SPAM if label else _HAM
+        toks = [rnd.choice(vocab) if rnd.random() < 0.3 else rnd.choice(_FILLER) for _ in range(words)]
+        out.append((" ".join(toks), int(label)))
+    return out
+
+
+def load_or_train_ml(train_size: int = 4000):
+    """
+    Carrega os pickles reais de models/ quando disponíveis; caso contrário
+    (ex.: checkout sem git-lfs) treina um TF-IDF + LinearSVC sintético.
+    Retorna (model, vectorizer, origem).
+    """
+    import joblib
+    try:
+        model = joblib.load(MODELS_DIR / "best_phishing_model.pkl")
+        vectorizer = joblib.load(MODELS_DIR / "tfidf_vectorizer.pkl")
+        return model, vectorizer, "pickle"
+    except Exception:
+        pass
+
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.svm import LinearSVC
+
+    data = synthetic_corpus(train_size, seed=7)
+    vectorizer = TfidfVectorizer(stop_words="english", ngram_range=(1, 2))
+    X = vectorizer.fit_transform([t for t, _ in data])
+    model = LinearSVC().fit(X, [y for _, y in data])
+    return model, vectorizer, "synthetic"
+
+
+def make_ml_classifier(model, vectorizer):
+    """Instancia MLClassifier com objetos já carregados (sem joblib.load)."""
+    from app.infrastructure.classifiers.ml_classifier import MLClassifier
+    clf = MLClassifier.__new__(MLClassifier)
+    clf.model, clf.vectorizer = model, vectorizer
+    clf.model_path = clf.vectorizer_path = "<memory>"
+    return clf
+
+
+def percentiles(samples_ms):
+    s = sorted(samples_ms)
+    if not s:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "mean": 0.0}
+    pick = lambda q: s[min(len(s) - 1, int(q * len(s)))]
+    return {"p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99), "mean": statistics.fmean(s)}
+
+
+def fmt(stats: dict) -> str:
+    return " ".join(f"{k}={v:.3f}" for k, v in stats.items())
+
+
+class Timer:
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.ms = (time.perf_counter() - self.t0) * 1000.0
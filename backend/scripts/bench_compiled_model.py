@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Compara o caminho pickle (joblib + sklearn) com o artefato compilado (NumPy + mmap):
+tempo de startup, RSS do processo e latência de um documento.
+
+    python -m scripts.bench_compiled_model [--docs 500]
+
+Cada caminho roda num subprocesso novo para medir startup/RSS como um worker uvicorn.
+Sem os pickles reais (git-lfs), usa um modelo sintético salvo num diretório temporário.
+"""
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import joblib
+
+from app.infrastructure.classifiers.compiled_linear import compile_from_sklearn
+from scripts.bench_common import BACKEND_ROOT, load_or_train_ml, synthetic_corpus, percentiles, fmt
+
+CHILD = r"""
+import json, sys, time
+t0 = time.perf_counter()
+from app.domain.entities import Email
+from app.infrastructure.classifiers.ml_classifier import MLClassifier
+mode, model_path, vec_path, compiled_path, docs_path = sys.argv[1:6]
+clf = MLClassifier(model_path=model_path, vectorizer_path=vec_path,
+                   compiled_path=compiled_path, use_compiled=(mode == "compiled"))
+startup = (time.perf_counter() - t0) * 1000.0
+texts = json.load(open(docs_path))
+lat, preds = [], []
+for t in texts:
+    t1 = time.perf_counter()
+    r = clf.classify(Email(subject=None, body=t), [])
+    lat.append((time.perf_counter() - t1) * 1000.0)
+    preds.append(r.category.value)
+rss_kb = 0
+for line in open("/proc/self/status"):
+    if line.startswith("VmRSS:"):
+        rss_kb = int(line.split()[1])
+print(json.dumps({"startup_ms": startup, "rss_mb": rss_kb / 1024.0, "lat_ms": lat, "preds": preds}))
+"""
+
+
+def run_child(mode, model_path, vec_path, compiled_path, docs_path):
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD, mode, str(model_path), str(vec_path), str(compiled_path), str(docs_path)],
+        cwd=BACKEND_ROOT, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--docs", type=int, default=500)
+    args = ap.parse_args()
+
+    model, vectorizer, origin = load_or_train_ml()
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        model_path, vec_path = tmp / "model.pkl", tmp / "vectorizer.pkl"
+        joblib.dump(model, model_path)
+        joblib.dump(vectorizer, vec_path)
+        compiled_path = compile_from_sklearn(model, vectorizer, tmp / "compiled")
+        docs_path = tmp / "docs.json"
+        docs_path.write_text(json.dumps([t for t, _ in synthetic_corpus(args.docs, seed=5)]))
+
+        print(f"modelo: {origin} ({type(model).__name__}, {len(vectorizer.vocabulary_)} termos)")
+        results = {}
+        for mode in ("pickle", "compiled"):
+            r = results[mode] = run_child(mode, model_path, vec_path, compiled_path, docs_path)
+            print(f"[{mode:8s}] startup={r['startup_ms']:.1f}ms rss={r['rss_mb']:.1f}MB "
+                  f"latência/doc: {fmt(percentiles(r['lat_ms']))}")
+
+        agree = sum(a == b for a, b in zip(results["pickle"]["preds"], results["compiled"]["preds"]))
+        print(f"concordância: {agree}/{len(results['pickle']['preds'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Carga mista de leitura/escrita no banco de logs, por `--seconds`:
+`--writers` threads gravando (SqlLogRepository.save, um commit por log) e
+`--readers` threads lendo (list_recent(50), como o GET /logs).
+
+- legacy: engine padrão (journal de rollback, synchronous=FULL) e uma única
+  Session compartilhada, como antes (operações serializadas por lock)
+- tuned:  build_engine (WAL, synchronous=NORMAL, mmap, cache) e uma sessão do
+  pool por operação
+
+    python -m scripts.bench_db_concurrency --writers 4 --readers 4 --seconds 5
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from sqlmodel import Session, SQLModel, create_engine
+
+from app.domain.entities import ClassificationLog
+from app.infrastructure.db import build_engine, session_factory
+from app.infrastructure.models import ClassificationLogModel  # noqa: F401 (registra a tabela)
+from app.infrastructure.repositories.sql_log_repository import SqlLogRepository
+from scripts.bench_common import fmt, percentiles
+
+
+def _log(i: int) -> ClassificationLog:
+    return ClassificationLog(
+        created_at=datetime.utcnow(), source="bench", subject=f"email {i}", body_excerpt="x" * 400,
+        profile_id="default", category="productive", reason="bench", used_model="rule-based",
+        status="ok", extra={"timings_ms": {"classify": 1.0}},
+    )
+
+
+def legacy(path: str):
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    SQLModel.metadata.create_all(engine)
+    return engine, SqlLogRepository(session=Session(engine))
+
+
+def tuned(path: str):
+    engine = build_engine(path)
+    SQLModel.metadata.create_all(engine)
+    return engine, SqlLogRepository(session_factory=session_factory(engine))
+
+
+def run(setup, seed_rows: int, writers: int, readers: int, seconds: float):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine, repo = setup(os.path.join(tmp, "bench.db"))
+        for start in range(0, seed_rows, 1000):
+            repo.save_many([_log(i) for i in range(start, min(seed_rows, start + 1000))])
+
+        stop = threading.Event()
+        lock = threading.Lock()
+        lat = {"write": [], "read": []}
+
+        def loop(kind, op):
+            local = []
+            while not stop.is_set():
+                t0 = time.perf_counter()
+                op()
+                local.append((time.perf_counter() - t0) * 1000.0)
+            with lock:
+                lat[kind].extend(local)
+
+        counter = iter(range(seed_rows, 10**12))
+        threads = [threading.Thread(target=loop, args=("write", lambda: repo.save(_log(next(counter)))))
+                   for _ in range(writers)]
+        threads += [threading.Thread(target=loop, args=("read", lambda: repo.list_recent(limit=50)))
+                    for _ in range(readers)]
+        for t in threads:
+            t.start()
+        time.sleep(seconds)
+        stop.set()
+        for t in threads:
+            t.join()
+        if repo.session is not None:
+            repo.session.close()
+        engine.dispose()
+    return {kind: (len(ms) / seconds, percentiles(ms)) for kind, ms in lat.items()}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--seed-rows", type=int, default=50_000)
+    ap.add_argument("--writers", type=int, default=4)
+    ap.add_argument("--readers", type=int, default=4)
+    ap.add_argument("--seconds", type=float, default=5.0)
+    args = ap.parse_args()
+
+    for name, setup in (("legacy", legacy), ("tuned ", tuned)):
+        res = run(setup, args.seed_rows, args.writers, args.readers, args.seconds)
+        for kind, (rate, st) in res.items():
+            print(f"[{name}] {kind:5s} ops/s={rate:8.1f} ms: {fmt(st)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Throughput concorrente do ClassifyEmailUseCase via UseCaseExecutor (inline/thread/process).
+
+    python -m scripts.bench_executor --workers 1 2 4 --requests 400
+
+O caso de uso do benchmark usa tokenizer auto (langdetect), rule-based e um
+repositório em memória, para medir só o trabalho CPU-bound e não o SQLite.
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from app.application.use_cases.classify_email import ClassifyEmailUseCase, FileFacade
+from app.infrastructure.classifiers.rule_based import RuleBasedClassifier
+from app.infrastructure.executor import UseCaseExecutor
+from app.infrastructure.extractors.eml_extractor import EmlExtractor
+from app.infrastructure.extractors.pdf_extractor import PdfExtractor
+from app.infrastructure.extractors.txt_extractor import TxtExtractor
+from app.infrastructure.nlp.tokenizer_simple import SimpleTokenizer
+from app.infrastructure.profiles.profile_json import JsonProfileAdapter
+from app.infrastructure.responders.simple_templates import SimpleResponder
+from scripts.bench_common import synthetic_corpus
+
+
+class MemoryLogRepository:
+    def save(self, log):
+        return log
+
+    def save_many(self, logs):
+        return logs
+
+
+def build_bench_use_case():
+    return ClassifyEmailUseCase(
+        file_facade=FileFacade(PdfExtractor(), TxtExtractor(), EmlExtractor()),
+        tokenizer=SimpleTokenizer(lang="auto"),
+        classifier=RuleBasedClassifier(),
+        responder=SimpleResponder(),
+        profiles=JsonProfileAdapter(),
+        log_repo=MemoryLogRepository(),
+    )
+
+
+async def drive(executor: UseCaseExecutor, bodies):
+    async def one(body):
+        return await executor.run("execute_from_text", "bench", body, None, profile_id="default")
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one(b) for b in bodies))
+    return len(bodies) / (time.perf_counter() - t0)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--requests", type=int, default=400)
+    ap.add_argument("--words", type=int, default=1500, help="tamanho de cada corpo (palavras)")
+    ap.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    ap.add_argument("--kinds", nargs="+", default=["inline", "thread", "process"])
+    args = ap.parse_args()
+
+    bodies = [t for t, _ in synthetic_corpus(args.requests, seed=9, words=args.words)]
+    print(f"cpus={os.cpu_count()} requests={args.requests} palavras/email={args.words}")
+
+    for kind in args.kinds:
+        for w in ([1] if kind == "inline" else args.workers):
+            uc = build_bench_use_case() if kind != "process" else None
+            ex = UseCaseExecutor(
+                use_case=uc, kind=kind, workers=w, max_pending=args.requests,
+                factory="scripts.bench_executor:build_bench_use_case",
+            )
+            ex.warm_up()
+            rps = asyncio.run(drive(ex, bodies))
+            ex.shutdown()
+            print(f"[{kind:7s}] workers={w:2d} throughput={rps:8.1f} req/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Latência do /classify com e sem orçamento (hedging) contra um LLM de cauda longa.
+
+    python -m scripts.bench_hedging [--emails 200] [--budget-ms 400] [--concurrency 16]
+
+O mock sorteia a latência de cada chamada (seed fixa): maioria rápida
+(--fast-ms) e uma fração --slow-frac lenta (--slow-ms). Mede a latência
+percebida pelo cliente (p50/p95/p99), a fração de respostas provisórias e
+quanto o LLM atrasou além do orçamento nas conclusões em segundo plano.
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+
+from app.domain.entities import Email
+from app.infrastructure.classifiers.hedge import drain
+from app.infrastructure.classifiers.openai_llm import OpenAIClassifier
+from app.infrastructure.classifiers.rule_based import RuleBasedClassifier
+from app.infrastructure.classifiers.smart_classifier import SmartClassifier
+from app.infrastructure.http_client import AsyncPooledHttpClient
+from scripts.bench_common import percentiles, synthetic_corpus
+from scripts.mock_llm_server import MockLLMServer, default_responder
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--emails", type=int, default=200)
+    ap.add_argument("--budget-ms", type=float, default=400.0)
+    ap.add_argument("--concurrency", type=int, default=16)
+    ap.add_argument("--fast-ms", type=float, default=150.0)
+    ap.add_argument("--slow-ms", type=float, default=2000.0)
+    ap.add_argument("--slow-frac", type=float, default=0.1)
+    args = ap.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+    emails = [Email(subject=f"Pedido {i}", body=t) for i, (t, _) in
+              enumerate(synthetic_corpus(args.emails, seed=21, words=60))]
+
+    def responder(payload):
+        rnd = random.Random(payload["messages"][-1]["content"])  # mesma latência para o mesmo email nas duas rodadas
+        time.sleep((args.slow_ms if rnd.random() < args.slow_frac else args.fast_ms) / 1000)
+        return default_responder(payload)
+
+    with MockLLMServer(responder=responder) as srv:
+        for budget_ms in (None, args.budget_ms):
+            llm = OpenAIClassifier(
+                async_http_client=AsyncPooledHttpClient(srv.base_url, max_connections=args.concurrency * 2),
+                max_concurrency=args.concurrency * 2, single_flight=False, response_cache=None,
+            )
+            smart = SmartClassifier(RuleBasedClassifier(), llm, min_conf=1.01)  # sempre escala
+            late = []
+
+            async def run():
+                sem = asyncio.Semaphore(args.concurrency)
+                lat = []
+
+                async def one(e):
+                    async with sem:
+                        t0 = time.perf_counter()
+                        kwargs = {"budget_s": budget_ms / 1000, "on_late": late.append} if budget_ms else {}
+                        res = await smart.aclassify(e, [], **kwargs)
+                        lat.append((time.perf_counter() - t0) * 1000)
+                        return res
+
+                results = await asyncio.gather(*[one(e) for e in emails])
+                await drain()
+                return results, lat
+
+            results, lat = asyncio.run(run())
+            p = percentiles(lat)
+            provisional = sum(bool((r.extra or {}).get("hedge", {}).get("provisional")) for r in results)
+            label = f"orçamento={budget_ms:.0f} ms" if budget_ms else "sem orçamento"
+            line = (f"{label:20s} p50={p['p50']:7.1f}  p95={p['p95']:7.1f}  p99={p['p99']:7.1f} ms  "
+                    f"provisórias={provisional / len(results):6.1%}")
+            if late:
+                late_ms = percentiles([r.extra["hedge"]["llm_late_ms"] for r in late])
+                line += f"  LLM atrasado p50={late_ms['p50']:.0f} ms (concluídas {len(late)}/{provisional})"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
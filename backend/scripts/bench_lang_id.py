@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Acurácia e velocidade: NgramLanguageIdentifier × langdetect (pt/en/es).
+
+    python -m scripts.bench_lang_id [--repeat 20]
+
+Corpus fixo de frases curtas/médias no estilo de emails (assuntos e corpos),
+incluindo textos curtos, que são o pior caso para ambos.
+"""
+import argparse
+import time
+
+from app.infrastructure.nlp.lang_detect import detect_lang
+from app.infrastructure.nlp.lang_id import NgramLanguageIdentifier
+
+CORPUS = {
+    "pt": [
+        "Olá, segue em anexo a proposta comercial revisada com os novos valores.",
+        "Reunião de alinhamento amanhã às 10h na sala de conferências.",
+        "Precisamos do boleto atualizado para efetuar o pagamento ainda hoje.",
+        "Você poderia confirmar o recebimento da nota fiscal do mês passado?",
+        "Obrigado pelo retorno, vamos analisar o contrato e respondemos até sexta.",
+        "Atenção: o prazo de entrega do projeto foi prorrogado para o dia 20.",
+        "Promoção imperdível! Aproveite descontos de até 70% em toda a loja.",
+        "Gostaria de agendar uma entrevista para a vaga de analista de dados.",
+        "Não consegui acessar o sistema, poderiam verificar meu usuário?",
+        "Segue o relatório de vendas do trimestre com os principais indicadores.",
+        "Bom dia! O pedido 4521 já foi enviado e chega em três dias úteis.",
+        "Fatura em aberto",
+        "Cotação de preços para material de escritório",
+        "Estamos à disposição para esclarecer qualquer dúvida sobre o orçamento.",
+        "A mineralogia é a ciência que estuda os minerais, como são formados e onde ocorrem.",
+        "Lembrete: a assembleia dos acionistas será realizada na próxima semana.",
+    ],
+    "en": [
+        "Hi, please find attached the revised commercial proposal with the new prices.",
+        "Alignment meeting tomorrow at 10am in the conference room.",
+        "We need the updated invoice to process the payment today.",
+        "Could you confirm that you received last month's purchase order?",
+        "Thanks for getting back to us, we will review the contract by Friday.",
+        "Heads up: the project delivery deadline has been moved to the 20th.",
+        "Huge sale! Get up to 70% off everything in the store this weekend only.",
+        "I would like to schedule an interview for the data analyst position.",
+        "I couldn't log into the system, could you check my account please?",
+        "Attached is the quarterly sales report with the key metrics.",
+        "Good morning! Order 4521 has shipped and should arrive in three business days.",
+        "Outstanding invoice",
+        "Price quote for office supplies",
+        "Let us know if you have any questions about the budget.",
+        "Mineralogy is the science that studies minerals, how they form and where they occur.",
+        "Reminder: the shareholders meeting will take place next week.",
+    ],
+    "es": [
+        "Hola, adjunto la propuesta comercial revisada con los nuevos precios.",
+        "Reunión de alineación mañana a las 10 en la sala de conferencias.",
+        "Necesitamos la factura actualizada para realizar el pago hoy mismo.",
+        "¿Podría confirmar la recepción de la orden de compra del mes pasado?",
+        "Gracias por su respuesta, revisaremos el contrato antes del viernes.",
+        "Atención: el plazo de entrega del proyecto se ha prorrogado hasta el día 20.",
+        "¡Rebajas increíbles! Aprovecha descuentos de hasta el 70% en toda la tienda.",
+        "Me gustaría programar una entrevista para la vacante de analista de datos.",
+        "No pude acceder al sistema, ¿podrían revisar mi usuario por favor?",
+        "Adjunto el informe de ventas del trimestre con los principales indicadores.",
+        "¡Buenos días! El pedido 4521 ya fue enviado y llegará en tres días hábiles.",
+        "Factura pendiente de pago",
+        "Cotización de precios para material de oficina",
+        "Quedamos a su disposición para aclarar cualquier duda sobre el presupuesto.",
+        "La mineralogía es la ciencia que estudia los minerales, cómo se forman y dónde se encuentran.",
+        "Recordatorio: la junta de accionistas se celebrará la próxima semana.",
+    ],
+}
+
+
+def langdetect_only(text):
+    from langdetect import detect
+    try:
+        return detect(text)
+    except Exception:
+        return None
+
+
+def evaluate(name, fn, samples, repeat):
+    correct = sum(fn(t) == lang for lang, t in samples)
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for _, t in samples:
+            fn(t)
+    us = (time.perf_counter() - t0) / (repeat * len(samples)) * 1e6
+    print(f"{name:24s} acurácia={correct}/{len(samples)} ({correct / len(samples):.1%})  {us:9.1f} µs/texto")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=20)
+    args = ap.parse_args()
+
+    samples = [(lang, t) for lang, texts in CORPUS.items() for t in texts]
+    ngram = NgramLanguageIdentifier()
+
+    evaluate("langdetect", langdetect_only, samples, max(1, args.repeat // 4))
+    evaluate("ngram", lambda t: ngram.identify(t)[0], samples, args.repeat)
+    evaluate("ngram + fallback", lambda t: detect_lang(t, identifier=ngram), samples, args.repeat)
+
+    texts = [t for _, t in samples]
+    t0 = time.perf_counter()
+    for _ in range(args.repeat):
+        batch = ngram.identify_batch(texts)
+    us = (time.perf_counter() - t0) / (args.repeat * len(texts)) * 1e6
+    correct = sum(r[0] == lang for r, (lang, _) in zip(batch, samples))
+    print(f"{'ngram (batch)':24s} acurácia={correct}/{len(samples)} ({correct / len(samples):.1%})  {us:9.1f} µs/texto")
+
+    low = [(lang, t, c) for (lang, t), (g, c) in zip(samples, batch) if not ngram.is_confident(c)]
+    print(f"baixa confiança (→ langdetect): {len(low)}/{len(samples)}")
+    for lang, t, c in low:
+        print(f"  [{lang}] conf={c:.3f} {t[:60]}")
+
+
+if __name__ == "__main__":
+    main()
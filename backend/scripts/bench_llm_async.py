@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Escalonamentos ao LLM: worker bloqueado (executor em threads) × await nativo (aclassify).
+
+    python -m scripts.bench_llm_async [--requests 64] [--latency-ms 300] [--workers 4] [--max-concurrency 32]
+
+Todo email é escalado (SmartClassifier com min_conf > 1) para o mock local
+(scripts/mock_llm_server.py). No caminho síncrono cada chamada prende uma
+thread do UseCaseExecutor; no assíncrono a rota aguarda `aexecute_from_text`
+e as chamadas se sobrepõem até o limite do semáforo.
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from app.application.use_cases.classify_email import ClassifyEmailUseCase, FileFacade
+from app.infrastructure.classifiers.openai_llm import OpenAIClassifier
+from app.infrastructure.classifiers.rule_based import RuleBasedClassifier
+from app.infrastructure.classifiers.smart_classifier import SmartClassifier
+from app.infrastructure.executor import UseCaseExecutor
+from app.infrastructure.extractors.pdf_extractor import PdfExtractor
+from app.infrastructure.extractors.txt_extractor import TxtExtractor
+from app.infrastructure.http_client import PooledHttpClient, AsyncPooledHttpClient
+from app.infrastructure.nlp.tokenizer_simple import SimpleTokenizer
+from app.infrastructure.profiles.profile_json import JsonProfileAdapter
+from app.infrastructure.responders.simple_templates import SimpleResponder
+from scripts.bench_common import percentiles, fmt, synthetic_corpus
+from scripts.bench_executor import MemoryLogRepository
+from scripts.mock_llm_server import MockLLMServer
+
+
+def build(base_url: str, max_concurrency: int, connections: int):
+    llm = OpenAIClassifier(
+        http_client=PooledHttpClient(base_url, max_connections=connections),
+        async_http_client=AsyncPooledHttpClient(base_url, max_connections=connections),
+        max_concurrency=max_concurrency,
+    )
+    return ClassifyEmailUseCase(
+        file_facade=FileFacade(PdfExtractor(), TxtExtractor()),
+        tokenizer=SimpleTokenizer(lang="auto"),
+        classifier=SmartClassifier(rule_based=RuleBasedClassifier(), llm=llm, min_conf=1.01),
+        responder=SimpleResponder(),
+        profiles=JsonProfileAdapter(),
+        log_repo=MemoryLogRepository(),
+    )
+
+
+async def drive(call, bodies):
+    lat = []
+
+    async def one(body):
+        t0 = time.perf_counter()
+        await call(body)
+        lat.append((time.perf_counter() - t0) * 1000)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one(b) for b in bodies))
+    return time.perf_counter() - t0, percentiles(lat)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--requests", type=int, default=64)
+    ap.add_argument("--latency-ms", type=float, default=300.0)
+    ap.add_argument("--workers", type=int, default=4, help="threads do executor no caminho síncrono")
+    ap.add_argument("--max-concurrency", type=int, default=32)
+    args = ap.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+    # só emails "produtivos": os de spam o rule-based resolve sem LLM
+    bodies = [t for t, y in synthetic_corpus(args.requests * 3, seed=21, words=120) if y == 0][:args.requests]
+
+    with MockLLMServer(latency_ms=args.latency_ms) as srv:
+        uc = build(srv.base_url, args.max_concurrency, connections=max(args.workers, args.max_concurrency))
+        ex = UseCaseExecutor(use_case=uc, kind="thread", workers=args.workers, max_pending=args.requests)
+        wall, stats = asyncio.run(drive(
+            lambda b: ex.run("execute_from_text", "bench", b, None, profile_id="default"), bodies
+        ))
+        ex.shutdown()
+        print(f"[sync  executor workers={args.workers:2d}] {args.requests} escalonamentos em {wall:6.2f} s  {fmt(stats)}")
+
+        uc = build(srv.base_url, args.max_concurrency, connections=args.max_concurrency)
+        wall, stats = asyncio.run(drive(
+            lambda b: uc.aexecute_from_text("bench", b, None, profile_id="default"), bodies
+        ))
+        print(f"[async semáforo={args.max_concurrency:3d}    ] {args.requests} escalonamentos em {wall:6.2f} s  {fmt(stats)}")
+        print(f"requisições ao mock: {srv.requests}, conexões: {srv.connections}")
+
+
+if __name__ == "__main__":
+    main()
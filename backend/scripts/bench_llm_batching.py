@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Tokens e latência por email: uma completion por email vs vários emails por completion.
+
+    python -m scripts.bench_llm_batching [--emails 64] [--latency-ms 300] [--batch-sizes 1,4,8,16]
+
+O mock cobra tokens proporcionais ao tamanho do prompt (~4 caracteres/token)
+e 30 tokens de saída por email, então a economia vem só do que o lote deixa
+de repetir (system message, regras, palavras-chave e tool schema).
+"""
+import argparse
+import os
+import time
+
+from app.domain.entities import Email
+from app.infrastructure.classifiers.openai_llm import OpenAIClassifier
+from app.infrastructure.http_client import PooledHttpClient
+from scripts.bench_common import synthetic_corpus
+from scripts.mock_llm_server import MockLLMServer, metered_responder
+
+PRIORITY = ["reunião", "contrato", "proposta", "orçamento", "prazo", "fatura", "suporte", "urgente"]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--emails", type=int, default=64)
+    ap.add_argument("--latency-ms", type=float, default=300.0)
+    ap.add_argument("--batch-sizes", default="1,4,8,16")
+    args = ap.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+    emails = [Email(subject=f"Pedido {i}", body=t) for i, (t, y) in
+              enumerate(synthetic_corpus(args.emails * 3, seed=5, words=80)) if y == 0][:args.emails]
+
+    with MockLLMServer(latency_ms=args.latency_ms, responder=metered_responder) as srv:
+        for size in (int(s) for s in args.batch_sizes.split(",")):
+            clf = OpenAIClassifier(http_client=PooledHttpClient(srv.base_url), batch_size=size)
+            before = srv.requests
+            t0 = time.perf_counter()
+            if size == 1:
+                results = [clf.classify(e, [], priority=PRIORITY) for e in emails]
+            else:
+                results = clf.classify_batch(emails, [[] for _ in emails], priority=PRIORITY)
+            ms = (time.perf_counter() - t0) * 1000 / len(emails)
+            prompt = sum(r.prompt_tokens or 0 for r in results) / len(emails)
+            total = sum(r.total_tokens or 0 for r in results) / len(emails)
+            print(f"batch={size:3d}  chamadas={srv.requests - before:4d}  prompt={prompt:6.0f} tok/email  "
+                  f"total={total:6.0f} tok/email  {ms:7.2f} ms/email")
+
+
+if __name__ == "__main__":
+    main()
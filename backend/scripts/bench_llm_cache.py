@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Re-sync de uma caixa: tokens e latência do LLM com e sem o cache em SQLite.
+
+    python -m scripts.bench_llm_cache [--emails 100] [--latency-ms 300]
+
+Classifica os mesmos emails duas vezes (segunda passada = restart + re-sync,
+com uma nova instância do classificador apontando para o mesmo arquivo).
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from app.domain.entities import Email
+from app.infrastructure.cache.llm_cache import SqliteLlmResponseCache
+from app.infrastructure.classifiers.openai_llm import OpenAIClassifier, PROMPT_VERSION
+from app.infrastructure.http_client import PooledHttpClient
+from scripts.bench_common import synthetic_corpus
+from scripts.mock_llm_server import MockLLMServer
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--emails", type=int, default=100)
+    ap.add_argument("--latency-ms", type=float, default=300.0)
+    args = ap.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+    emails = [Email(subject=f"Pedido {i}", body=t) for i, (t, y) in
+              enumerate(synthetic_corpus(args.emails * 3, seed=4, words=100)) if y == 0][:args.emails]
+
+    with tempfile.TemporaryDirectory() as tmp, MockLLMServer(latency_ms=args.latency_ms) as srv:
+        path = os.path.join(tmp, "llm_cache.db")
+        for label in ("1ª passada", "re-sync"):
+            clf = OpenAIClassifier(
+                http_client=PooledHttpClient(srv.base_url),
+                response_cache=SqliteLlmResponseCache(path, schema_version=PROMPT_VERSION),
+            )
+            before = srv.requests
+            t0 = time.perf_counter()
+            results = [clf.classify(e, []) for e in emails]
+            ms = (time.perf_counter() - t0) * 1000 / len(emails)
+            spent = sum(r.total_tokens or 0 for r in results)
+            saved = sum((r.extra or {}).get("llm_tokens_saved", 0) for r in results)
+            print(f"{label:10s} chamadas={srv.requests - before:4d}  tokens gastos={spent:6d}  "
+                  f"economizados={saved:6d}  {ms:7.2f} ms/email")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Cliente do LLM: conexão nova por chamada (comportamento antigo) × PooledHttpClient.
+
+    python -m scripts.bench_llm_client [--calls 200] [--latency-ms 5] [--concurrency 1,8] [--no-tls]
+
+Roda contra scripts/mock_llm_server.py com TLS (certificado autoassinado),
+então o custo do handshake TCP+TLS aparece como apareceria com a API real
+(sem o RTT de rede, que só aumentaria a diferença).
+"""
+import argparse
+import http.client
+import json
+import threading
+import time
+from urllib.parse import urlsplit
+
+from app.infrastructure.http_client import PooledHttpClient
+from scripts.bench_common import percentiles, fmt
+from scripts.mock_llm_server import MockLLMServer
+
+
+def run(call, calls: int, concurrency: int):
+    lat = []
+    lock = threading.Lock()
+    per_thread = calls // concurrency
+
+    def worker():
+        local = []
+        for _ in range(per_thread):
+            t0 = time.perf_counter()
+            call()
+            local.append((time.perf_counter() - t0) * 1000)
+        with lock:
+            lat.extend(local)
+
+    t0 = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - t0
+    return len(lat) / wall, percentiles(lat)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--calls", type=int, default=200)
+    ap.add_argument("--latency-ms", type=float, default=5.0)
+    ap.add_argument("--concurrency", default="1,8")
+    ap.add_argument("--no-tls", action="store_true")
+    args = ap.parse_args()
+
+    payload = {"model": "mock", "messages": [{"role": "user", "content": "x" * 2000}]}
+    with MockLLMServer(latency_ms=args.latency_ms, tls=not args.no_tls) as srv:
+        parts = urlsplit(srv.base_url)
+
+        def new_connection_per_call():
+            if parts.scheme == "https":
+                conn = http.client.HTTPSConnection(parts.hostname, parts.port, context=srv.client_ssl_context)
+            else:
+                conn = http.client.HTTPConnection(parts.hostname, parts.port)
+            conn.request("POST", parts.path + "/chat/completions", json.dumps(payload),
+                         {"Content-Type": "application/json"})
+            json.loads(conn.getresponse().read())
+
+        for conc in (int(c) for c in args.concurrency.split(",")):
+            client = PooledHttpClient(srv.base_url, max_connections=conc, ssl_context=srv.client_ssl_context)
+            before = srv.connections
+            rps, stats = run(new_connection_per_call, args.calls, conc)
+            print(f"[conc={conc}] conexão por chamada: {rps:7.1f} req/s  {fmt(stats)}  conexões={srv.connections - before}")
+            before = srv.connections
+            rps, stats = run(lambda: client.post_json("/chat/completions", payload), args.calls, conc)
+            print(f"[conc={conc}] pool keep-alive:     {rps:7.1f} req/s  {fmt(stats)}  conexões={srv.connections - before}")
+            client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Latência por página do /logs numa tabela grande (padrão 10M linhas):
+OFFSET vs keyset (created_at, id), com e sem filtro e projeção "summary".
+A tabela é gerada dentro do SQLite (CTE recursiva) e pode ser reaproveitada
+com --db (só é criada se ainda não existir).
+
+    python -m scripts.bench_log_pagination --rows 10000000 --db /tmp/logs_10m.db
+"""
+import argparse
+import os
+import statistics
+import time
+
+from sqlalchemy import select as sa_select
+from sqlmodel import SQLModel, select
+
+from app.domain.entities import ClassificationLog, LogQuery
+from app.infrastructure.db import build_engine, init_db, session_factory
+from app.infrastructure.models import ClassificationLogModel
+from app.infrastructure.repositories.sql_log_repository import SqlLogRepository
+
+FILL_SQL = """
+WITH RECURSIVE seq(i) AS (SELECT :start UNION ALL SELECT i + 1 FROM seq WHERE i + 1 < :stop)
+INSERT INTO classification_logs (
+    created_at, source, subject, body_excerpt, sender, profile_id, category, reason, suggested_reply,
+    used_model, provider, prompt_tokens, completion_tokens, total_tokens, cost_usd, latency_ms, status, extra
+)
+SELECT
+    -- pares empatados; '000' completa o formato que o SQLAlchemy grava (microssegundos)
+    strftime('%Y-%m-%d %H:%M:%f', '2024-01-01', '+' || (i / 2) || ' seconds') || '000',
+    CASE i % 3 WHEN 0 THEN 'api' WHEN 1 THEN 'imap' ELSE 'batch' END,
+    'Assunto do email ' || i,
+    printf('%.300c', 'x'),
+    'remetente' || (i % 5000) || '@example.com',
+    'p' || (i % 20),
+    CASE WHEN i % 4 = 0 THEN 'unproductive' ELSE 'productive' END,
+    'Motivo da classificação ' || (i % 97),
+    printf('%.200c', 'y'),
+    CASE i % 3 WHEN 0 THEN 'rule-based' WHEN 1 THEN 'ml' ELSE 'gpt-4.1-nano' END,
+    'openai', 120, 30, 150, 0.00002, 5 + i % 300, 'ok',
+    '{"timings_ms": {"classify": 1.2, "respond": 0.3}, "hedge": null}'
+FROM seq
+"""
+
+
+def build(path: str, rows: int, chunk: int = 1_000_000):
+    engine = build_engine(path)
+    SQLModel.metadata.create_all(engine)
+    with engine.begin() as conn:
+        # índices depois da carga: inserir com 5 índices ativos é bem mais lento
+        for index in ClassificationLogModel.__table__.indexes:
+            conn.exec_driver_sql(f"DROP INDEX IF EXISTS {index.name}")
+    t0 = time.perf_counter()
+    for start in range(0, rows, chunk):
+        with engine.begin() as conn:
+            conn.exec_driver_sql(
+                FILL_SQL.replace(":start", str(start)).replace(":stop", str(min(rows, start + chunk)))
+            )
+        print(f"  {min(rows, start + chunk):>11,} linhas  {time.perf_counter() - t0:6.1f}s", flush=True)
+    t1 = time.perf_counter()
+    init_db(engine, log_search=False)
+    print(f"carga {t1 - t0:.1f}s, índices {time.perf_counter() - t1:.1f}s, {os.path.getsize(path) / 1e9:.2f} GB")
+    return engine
+
+
+def timed(fn, repeat: int) -> float:
+    fn()  # aquece cache de páginas
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=10_000_000)
+    ap.add_argument("--db", default="/tmp/bench_logs.db")
+    ap.add_argument("--limit", type=int, default=100)
+    ap.add_argument("--depths", type=int, nargs="+", default=[0, 10_000, 1_000_000, 5_000_000, 9_900_000])
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    if os.path.exists(args.db):
+        engine = build_engine(args.db)
+        init_db(engine, log_search=False)
+    else:
+        print(f"gerando {args.rows:,} linhas em {args.db}")
+        engine = build(args.db, args.rows)
+    Session = session_factory(engine)
+    repo = SqlLogRepository(session_factory=Session)
+    table = ClassificationLogModel.__table__
+    c = table.c
+    newest = sa_select(table).order_by(c.created_at.desc(), c.id.desc())
+
+    def offset_page(depth):
+        # mesma conversão do list_page, para comparar só a estratégia de paginação
+        with Session() as s:
+            rows = s.execute(newest.limit(args.limit).offset(depth)).mappings().all()
+        return [ClassificationLog(**row) for row in rows]
+
+    def orm_page():
+        # caminho antigo do list_recent: um ClassificationLogModel (pydantic) + to_entity por linha
+        with Session() as s:
+            stmt = select(ClassificationLogModel).order_by(ClassificationLogModel.created_at.desc())
+            return [obj.to_entity() for obj in s.exec(stmt.limit(args.limit)).all()]
+
+    print(f"página de {args.limit}, mediana de {args.repeat} (ms)")
+    print(f"ORM (list_recent antigo), 1ª página: {timed(orm_page, args.repeat):8.2f}")
+    print(f"{'profundidade':>12} {'offset':>9} {'keyset':>9} {'summary':>9} {'filtro':>9}")
+    for depth in args.depths:
+        if depth >= args.rows:
+            continue
+        t_offset = timed(lambda: offset_page(depth), args.repeat)
+        # cursor = chave da linha anterior à página (fora da medição)
+        prev = offset_page(depth - 1)[0] if depth else None
+        after = (prev.created_at, prev.id) if prev else None
+        t_keyset = timed(lambda: repo.list_page(LogQuery(limit=args.limit, after=after)), args.repeat)
+        t_summary = timed(lambda: repo.list_page(LogQuery(limit=args.limit, after=after, summary=True)), args.repeat)
+        t_filter = timed(
+            lambda: repo.list_page(LogQuery(limit=args.limit, after=after, profile_id="p7", summary=True)),
+            args.repeat,
+        )
+        print(f"{depth:>12,} {t_offset:9.2f} {t_keyset:9.2f} {t_summary:9.2f} {t_filter:9.2f}")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Busca textual nos logs (FTS5, /logs/search) num corpus sintético grande:
+
+1. custo dos triggers na escrita: save_many(500) com e sem o índice
+2. construção do índice (init_db num banco com `--rows` logs e sem índice)
+   e tamanho em disco (tabelas classification_logs_fts*, via dbstat)
+3. latência de consultas típicas (termo raro, comum, prefixo, remetente,
+   filtro, página funda; com e sem `max_ranked`) vs LIKE '%termo%' em
+   subject/sender/body/reason
+
+    python -m scripts.bench_log_search --rows 2000000 --db /tmp/bench_search.db
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+from app.domain.entities import ClassificationLog, LogSearchQuery
+from app.infrastructure.db import build_engine, init_db, session_factory
+from app.infrastructure.repositories.sql_log_repository import SqlLogRepository
+from app.infrastructure.repositories.sql_log_search_repository import FTS_TABLE, SqlLogSearchRepository
+from scripts.bench_common import synthetic_corpus
+from scripts.bench_log_pagination import timed
+
+_NAMES = "ana bruno carla diego elisa felipe gabriela hugo isabela joao karina lucas marina nuno paula rafael".split()
+_DOMAINS = ("acme.com", "loja.com.br", "banco.com", "gmail.com", "empresa.com.br", "fornecedor.net")
+_REASONS = (
+    "Pedido de reunião com prazo definido", "Cobrança de fatura em aberto", "Oferta promocional sem contexto",
+    "Solicitação de suporte técnico", "Confirmação de entrega", "Link suspeito pedindo senha",
+    "Proposta comercial anexada", "Newsletter sem ação necessária", "Atualização de contrato",
+)
+INSERT = (
+    "INSERT INTO classification_logs (created_at, source, subject, body_excerpt, sender, profile_id, category, "
+    "reason, used_model, status) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 'ok')"
+)
+
+
+def corpus(rows: int, seed: int = 42):
+    """Gera linhas (tuplas do INSERT) em blocos; corpos/assuntos vêm de pools, ids e remetentes variam."""
+    rnd = random.Random(seed)
+    bodies = [t for t, _ in synthetic_corpus(20_000, seed=seed, words=50)]
+    subjects = [t for t, _ in synthetic_corpus(5_000, seed=seed + 1, words=5)]
+    t0 = datetime(2024, 1, 1)
+    chunk = []
+    for i in range(rows):
+        name = _NAMES[i % len(_NAMES)]
+        chunk.append((
+            (t0 + timedelta(seconds=i)).strftime("%Y-%m-%d %H:%M:%S.%f"),
+            ("api", "imap", "batch")[i % 3],
+            f"{subjects[rnd.randrange(len(subjects))]} pedido {i}",
+            bodies[rnd.randrange(len(bodies))],
+            f"{name}.{_NAMES[(i // 16) % len(_NAMES)]}{i % 997}@{_DOMAINS[i % len(_DOMAINS)]}",
+            f"p{i % 20}",
+            "unproductive" if i % 4 == 0 else "productive",
+            _REASONS[i % len(_REASONS)],
+            ("rule-based", "ml", "gpt-4.1-nano")[i % 3],
+        ))
+        if len(chunk) == 100_000:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def build(path: str, rows: int):
+    engine = build_engine(path)
+    init_db(engine, log_search=False)  # carga sem triggers; o índice é medido à parte
+    t0 = time.perf_counter()
+    for chunk in corpus(rows):
+        with engine.begin() as conn:
+            conn.exec_driver_sql(INSERT, chunk)
+    print(f"carga: {rows:,} logs em {time.perf_counter() - t0:.1f}s")
+    return engine
+
+
+def fts_bytes(engine) -> int:
+    with engine.connect() as conn:
+        return conn.exec_driver_sql(
+            f"SELECT coalesce(sum(pgsize), 0) FROM dbstat WHERE name LIKE '{FTS_TABLE}%'"
+        ).scalar()
+
+
+def write_overhead(n: int, batch: int):
+    logs = [
+        ClassificationLog(created_at=datetime(2025, 1, 1) + timedelta(seconds=i), source="api", subject=s,
+                          body_excerpt=b, sender=f"x{i}@acme.com", reason="motivo")
+        for i, (b, s) in enumerate(zip(
+            (t for t, _ in synthetic_corpus(n, words=50)), (t for t, _ in synthetic_corpus(n, seed=3, words=5))
+        ))
+    ]
+    print(f"escrita ({n} logs, save_many({batch}))  logs/s")
+    for enabled in (False, True):
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = build_engine(os.path.join(tmp, "w.db"))
+            init_db(engine, log_search=enabled)
+            repo = SqlLogRepository(session_factory=session_factory(engine))
+            t0 = time.perf_counter()
+            for i in range(0, n, batch):
+                repo.save_many(logs[i:i + batch])
+            print(f"  FTS {'on ' if enabled else 'off'}                        {n / (time.perf_counter() - t0):7.0f}")
+            engine.dispose()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=2_000_000)
+    ap.add_argument("--db", default="/tmp/bench_search.db")
+    ap.add_argument("--writes", type=int, default=20_000)
+    ap.add_argument("--batch", type=int, default=500)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--max-ranked", type=int, default=10_000)
+    args = ap.parse_args()
+
+    write_overhead(args.writes, args.batch)
+
+    engine = build_engine(args.db) if os.path.exists(args.db) else build(args.db, args.rows)
+    init_db(engine, log_search=False)  # remove um índice de execução anterior
+    with engine.connect() as conn:
+        table_bytes = conn.exec_driver_sql("SELECT sum(pgsize) FROM dbstat").scalar()
+    t0 = time.perf_counter()
+    init_db(engine, log_search=True)  # banco com logs e sem índice: cria e indexa tudo ('rebuild')
+    print(f"índice FTS: {time.perf_counter() - t0:.1f}s")
+    with engine.begin() as conn:
+        conn.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+    size = fts_bytes(engine)
+    print(f"tamanho do índice: {size / 1e6:.0f} MB ({size / table_bytes:.0%} do banco sem índice, "
+          f"{size / args.rows:.0f} B/log)")
+
+    Session = session_factory(engine)
+    rnd = random.Random(7)
+    sample_id = rnd.randrange(args.rows)
+    with Session() as s:
+        sender = s.execute(text("SELECT sender FROM classification_logs WHERE id = :id"), {"id": sample_id + 1}).scalar()
+
+    def fts(q, max_ranked=args.max_ranked, **kw):
+        with Session() as s:
+            return SqlLogSearchRepository(s, max_ranked).search(LogSearchQuery(text=q, **kw))
+
+    def like(term):
+        sql = text(
+            "SELECT id, subject FROM classification_logs WHERE subject LIKE :t OR sender LIKE :t "
+            "OR body_excerpt LIKE :t OR reason LIKE :t ORDER BY created_at DESC LIMIT 20"
+        )
+        with Session() as s:
+            return s.execute(sql, {"t": f"%{term}%"}).all()
+
+    cases = [
+        ("id raro (pedido N)", lambda: fts(f"pedido {sample_id}", prefix=False), lambda: like(f"pedido {sample_id}")),
+        ("remetente exato", lambda: fts(sender, prefix=False), lambda: like(sender)),
+        ("termo comum (fatura)", lambda: fts("fatura", prefix=False), lambda: like("fatura")),
+        ("termo comum, ranking total", lambda: fts("fatura", prefix=False, max_ranked=0), None),
+        ("prefixo (contra*)", lambda: fts("contra"), lambda: like("contra")),
+        ("2 termos + perfil", lambda: fts("senha suspeito", profile_id="p7", prefix=False), None),
+        ("termo comum, offset 2000", lambda: fts("fatura", prefix=False, offset=2000), None),
+    ]
+    hits = {name: len(fast().items) for name, fast, _ in cases}
+    print(f"\nconsulta (max_ranked={args.max_ranked}, mediana de {args.repeat}, ms)   {'FTS5':>9} {'LIKE':>10}  itens")
+    for name, fast, slow in cases:
+        t_slow = f"{timed(slow, 1):10.1f}" if slow else f"{'-':>10}"
+        print(f"  {name:<30} {timed(fast, args.repeat):9.2f} {t_slow}  {hits[name]}")
+    with engine.connect() as conn:
+        for term in ("fatura", "contra*", "senha"):
+            n = conn.exec_driver_sql(f"SELECT count(*) FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH ?", (term,)).scalar()
+            print(f"  ocorrências de {term!r}: {n:,}")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Inserts/s sustentados de logs de classificação: SqlLogRepository.save (um
+commit por log) vs WriteBehindLogRepository (fila + uma transação por lote).
+Cada modo grava num SQLite novo em arquivo temporário; o tempo do write-behind
+inclui o flush final (só conta o que está commitado).
+
+    python -m scripts.bench_log_writer --logs 20000 --threads 1 8
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from sqlmodel import Session, SQLModel, create_engine
+
+from app.domain.entities import ClassificationLog
+from app.infrastructure.models import ClassificationLogModel  # noqa: F401 (registra a tabela)
+from app.infrastructure.repositories.sql_log_repository import SqlLogRepository
+from app.infrastructure.repositories.write_behind_log_repository import WriteBehindLogRepository
+from app.metrics import snapshot_all
+from scripts.bench_common import fmt, percentiles, synthetic_corpus
+
+
+def make_logs(n: int):
+    return [
+        ClassificationLog(
+            created_at=datetime.utcnow(), source="bench", subject=f"email {i}", body_excerpt=text[:500],
+            profile_id="default", category="unproductive" if label else "productive", reason="bench",
+            suggested_reply="Obrigado pelo contato.", used_model="rule-based", provider="local",
+            cost_usd=0.0, latency_ms=3, status="ok", extra={"timings_ms": {"classify": 1.2}},
+        )
+        for i, (text, label) in enumerate(synthetic_corpus(n, seed=7, words=60))
+    ]
+
+
+def run(make_repo, logs, threads: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}", connect_args={"check_same_thread": False})
+        SQLModel.metadata.create_all(engine)
+        with Session(engine) as session:
+            repo = make_repo(SqlLogRepository(session))
+            lat_ms, lock = [], threading.Lock()
+            it = iter(logs)
+
+            def worker():
+                local = []
+                while True:
+                    with lock:
+                        log = next(it, None)
+                    if log is None:
+                        break
+                    t0 = time.perf_counter()
+                    repo.save(log)
+                    local.append((time.perf_counter() - t0) * 1000.0)
+                with lock:
+                    lat_ms.extend(local)
+
+            t0 = time.perf_counter()
+            pool = [threading.Thread(target=worker) for _ in range(threads)]
+            for t in pool:
+                t.start()
+            for t in pool:
+                t.join()
+            if isinstance(repo, WriteBehindLogRepository):
+                repo.close()
+            elapsed = time.perf_counter() - t0
+            rows = session.exec(SQLModel.metadata.tables["classification_logs"].select()).all()
+        engine.dispose()
+    assert len(rows) == len(logs), f"{len(rows)} linhas gravadas de {len(logs)}"
+    return len(logs) / elapsed, percentiles(lat_ms)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--logs", type=int, default=20000)
+    ap.add_argument("--threads", type=int, nargs="+", default=[1, 8])
+    ap.add_argument("--max-batch", type=int, default=500)
+    ap.add_argument("--max-wait-ms", type=float, default=200.0)
+    args = ap.parse_args()
+
+    for threads in args.threads:
+        for name, make_repo in (
+            ("save        ", lambda repo: repo),
+            ("write-behind", lambda repo: WriteBehindLogRepository(
+                repo, max_batch=args.max_batch, max_wait_ms=args.max_wait_ms, max_queue=4 * args.logs,
+            )),
+        ):
+            rate, st = run(make_repo, make_logs(args.logs), threads)
+            print(f"[{name}] threads={threads:2d} inserts/s={rate:9.1f} save() ms: {fmt(st)}")
+
+    for name, snap in snapshot_all("log_writer_").items():
+        print(name, f"count={snap['count']} mean={snap['sum'] / max(1, snap['count']):.4f}")
+
+
+if __name__ == "__main__":
+    main()
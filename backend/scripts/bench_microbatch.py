@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Compara latência/throughput do MLClassifier com e sem MicroBatchingClassifier.
+
+    python -m scripts.bench_microbatch --concurrency 1 8 32 --requests 2000
+"""
+import argparse
+import threading
+import time
+
+from app.domain.entities import Email
+from app.infrastructure.classifiers.micro_batcher import MicroBatchingClassifier
+from app.metrics import snapshot_all
+from scripts.bench_common import load_or_train_ml, make_ml_classifier, synthetic_corpus, percentiles, fmt
+
+
+def run(clf, emails, concurrency: int):
+    lat_ms = []
+    lock = threading.Lock()
+    it = iter(emails)
+
+    def worker():
+        local = []
+        while True:
+            with lock:
+                e = next(it, None)
+            if e is None:
+                break
+            t0 = time.perf_counter()
+            clf.classify(e, [])
+            local.append((time.perf_counter() - t0) * 1000.0)
+        with lock:
+            lat_ms.extend(local)
+
+    t0 = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+    return len(lat_ms) / elapsed, percentiles(lat_ms)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--requests", type=int, default=2000)
+    ap.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    ap.add_argument("--max-batch", type=int, default=32)
+    ap.add_argument("--max-wait-ms", type=float, default=5.0)
+    args = ap.parse_args()
+
+    model, vectorizer, origin = load_or_train_ml()
+    ml = make_ml_classifier(model, vectorizer)
+    emails = [Email(subject=None, body=t) for t, _ in synthetic_corpus(args.requests, seed=1)]
+    print(f"modelo: {origin} ({type(model).__name__})")
+
+    for c in args.concurrency:
+        rps, st = run(ml, emails, c)
+        print(f"[direto ] conc={c:3d} rps={rps:8.1f} {fmt(st)}")
+        mb = MicroBatchingClassifier(ml, max_batch_size=args.max_batch, max_wait_ms=args.max_wait_ms)
+        rps, st = run(mb, emails, c)
+        mb.close()
+        print(f"[batcher] conc={c:3d} rps={rps:8.1f} {fmt(st)}")
+
+    for name, snap in snapshot_all("classifier_microbatch_").items():
+        print(name, f"count={snap['count']} mean={snap['sum'] / max(1, snap['count']):.4f}")
+
+
+if __name__ == "__main__":
+    main()
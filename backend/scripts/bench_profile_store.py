@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Resolução de perfil por requisição: expansão a cada chamada × CompiledProfileStore.
+
+    python -m scripts.bench_profile_store [--tenants 20000] [--keywords 200] [--requests 20000]
+
+Gera um profiles.json temporário com `--tenants` perfis e mede:
+- tempo de carga (boot) do store, que não compila nada antecipadamente;
+- custo por requisição (expandir + matcher) sem store, com store frio e quente;
+- tempo de uma recarga completa do arquivo.
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from app.domain.entities import CompiledProfile
+from app.infrastructure.nlp.keyword_matcher import KeywordMatcher
+from app.infrastructure.profiles.profile_store import CompiledProfileStore
+
+
+def make_profiles(tenants: int, keywords: int, rnd: random.Random):
+    def word():
+        return "".join(rnd.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rnd.randint(4, 9)))
+    out = {}
+    for i in range(tenants):
+        kws = [word() for _ in range(keywords // 2)]
+        out[f"tenant-{i}"] = {
+            "mood": "neutro",
+            "priority_keywords": kws,
+            "keyword_synonyms": {k: [word()] for k in kws},
+        }
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--tenants", type=int, default=20000)
+    ap.add_argument("--keywords", type=int, default=200)
+    ap.add_argument("--requests", type=int, default=20000)
+    ap.add_argument("--hot", type=int, default=500, help="perfis que recebem a maior parte do tráfego")
+    args = ap.parse_args()
+
+    rnd = random.Random(5)
+    profiles = make_profiles(args.tenants, args.keywords, rnd)
+    fd, path = tempfile.mkstemp(suffix=".json")
+    with os.fdopen(fd, "w") as f:
+        json.dump(profiles, f)
+    print(f"profiles.json: {args.tenants} perfis, {os.path.getsize(path) / 1e6:.1f} MB")
+
+    # 90% do tráfego em `hot` perfis, 10% espalhado
+    ids = [f"tenant-{rnd.randrange(args.hot) if rnd.random() < 0.9 else rnd.randrange(args.tenants)}"
+           for _ in range(args.requests)]
+
+    t0 = time.perf_counter()
+    for pid in ids:
+        p = CompiledProfile.from_dict(pid, profiles[pid])
+        KeywordMatcher(p.priority)
+    naive_us = (time.perf_counter() - t0) / len(ids) * 1e6
+
+    t0 = time.perf_counter()
+    store = CompiledProfileStore(path, watch=True, check_interval_s=2.0, max_compiled=10_000)
+    boot_ms = (time.perf_counter() - t0) * 1000
+
+    t0 = time.perf_counter()
+    for pid in ids:
+        store.get_compiled(pid).priority.matcher
+    cold_us = (time.perf_counter() - t0) / len(ids) * 1e6
+
+    t0 = time.perf_counter()
+    for pid in ids:
+        store.get_compiled(pid).priority.matcher
+    warm_us = (time.perf_counter() - t0) / len(ids) * 1e6
+
+    t0 = time.perf_counter()
+    store.reload()
+    reload_ms = (time.perf_counter() - t0) * 1000
+    os.unlink(path)
+
+    print(f"boot do store (sem compilar):   {boot_ms:9.1f} ms")
+    print(f"expandir a cada requisição:     {naive_us:9.1f} µs/req")
+    print(f"store, primeira passada:        {cold_us:9.1f} µs/req")
+    print(f"store, quente:                  {warm_us:9.1f} µs/req")
+    print(f"recarga completa (troca):       {reload_ms:9.1f} ms")
+    print(f"stats: {store.stats()}")
+
+
+if __name__ == "__main__":
+    main()
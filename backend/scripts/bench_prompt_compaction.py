@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Compactação do corpo antes do LLM: tamanho do prompt, latência e concordância.
+
+    python -m scripts.bench_prompt_compaction [--emails 60] [--budgets 400,200,100]
+
+Corpus fixo (seed): mensagem nova + assinatura + aviso de confidencialidade
++ 2–5 mensagens citadas ("> ..."). O mock cobra latência de prefill
+proporcional ao prompt (--base-ms + --ms-per-1k-tokens) e classifica pelo
+vocabulário produtivo/spam do corpo enviado, então "concordância" mede se
+o corpo compactado leva à mesma decisão que o corpo cortado só por
+caracteres (sem compactador).
+"""
+import argparse
+import os
+import random
+import re
+import time
+
+from app.domain.entities import Email
+from app.infrastructure.classifiers.openai_llm import OpenAIClassifier
+from app.infrastructure.http_client import PooledHttpClient
+from app.infrastructure.nlp.prompt_compactor import PromptCompactor, IdfTable, estimate_tokens
+from scripts.bench_common import _HAM, _SPAM, load_or_train_ml, synthetic_corpus
+from scripts.mock_llm_server import MockLLMServer, completion, estimate_usage
+
+PRIORITY = ["contrato", "proposta", "orçamento", "prazo", "fatura", "reunião", "contract", "invoice"]
+DISCLAIMER = ("Esta mensagem pode conter informação confidencial ou privilegiada e é destinada "
+              "exclusivamente ao destinatário. Se você a recebeu por engano, apague-a imediatamente.")
+
+
+def _sentences(text: str, rnd: random.Random) -> str:
+    words, out = text.split(), []
+    while words:
+        n = rnd.randint(6, 14)
+        out.append(" ".join(words[:n]).capitalize() + ".")
+        words = words[n:]
+    return " ".join(out)
+
+
+def build_corpus(n: int, seed: int = 11):
+    rnd = random.Random(seed)
+    pool = synthetic_corpus(n * 8, seed=seed, words=60)
+    emails = []
+    for i, (text, label) in enumerate(pool[:n]):
+        # mensagem nova de 60–240 palavras; só parte dos remetentes fecha com "Atenciosamente,"
+        text += "".join(" " + t for t, y in pool[n * 6 + i * 2: n * 6 + i * 2 + rnd.randint(0, 3)] if y == label)
+        closing = "Atenciosamente,\nFulano de Tal" if rnd.random() < 0.3 else "Fulano de Tal"
+        parts = ["Olá equipe,", _sentences(text, rnd), closing + "\nGerente de Operações"]
+        for k in range(rnd.randint(2, 5)):
+            prev, _ = pool[n + i * 5 + k]
+            parts.append(f"Em seg., {k + 1} de jun. de 2024, Contato <c{k}@exemplo.com> escreveu:")
+            parts.append("\n".join("> " + s for s in _sentences(prev, rnd).split(". ")))
+            parts.append("> " + DISCLAIMER)
+        parts.insert(3, DISCLAIMER)
+        emails.append((Email(subject=f"Re: Pedido {i}", sender="fulano@exemplo.com", body="\n\n".join(parts)), label))
+    return emails
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--emails", type=int, default=60)
+    ap.add_argument("--budgets", default="400,200,100")
+    ap.add_argument("--base-ms", type=float, default=150.0)
+    ap.add_argument("--ms-per-1k-tokens", type=float, default=200.0)
+    args = ap.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+    ham, spam = set(_HAM), set(_SPAM)
+
+    def responder(payload):
+        prompt = payload["messages"][1]["content"]
+        body = prompt.split("Body (sem assinatura):", 1)[-1].lower()
+        words = re.findall(r"\w+", body)
+        category = "productive" if sum(w in ham for w in words) >= sum(w in spam for w in words) else "unproductive"
+        usage = estimate_usage(payload, 30)
+        time.sleep((args.base_ms + args.ms_per_1k_tokens * usage["prompt_tokens"] / 1000) / 1000)
+        out = completion(category=category)
+        out["usage"] = usage
+        return out
+
+    corpus = build_corpus(args.emails)
+    model, vectorizer, origin = load_or_train_ml()
+    idf = IdfTable.from_vectorizer(vectorizer)
+    raw_tokens = sum(estimate_tokens(e.body) for e, _ in corpus) / len(corpus)
+    print(f"{len(corpus)} threads, corpo bruto médio {raw_tokens:.0f} tokens (estimados), IDF do vetorizador {origin}")
+
+    with MockLLMServer(responder=responder) as srv:
+        baseline = None
+        for budget in [0] + [int(b) for b in args.budgets.split(",")]:
+            compactor = PromptCompactor(token_budget=budget, idf=idf) if budget else None
+            clf = OpenAIClassifier(http_client=PooledHttpClient(srv.base_url), compactor=compactor)
+            t0 = time.perf_counter()
+            results = [clf.classify(e, [], priority=PRIORITY) for e, _ in corpus]
+            ms = (time.perf_counter() - t0) * 1000 / len(corpus)
+            cats = [r.category for r in results]
+            baseline = baseline or cats
+            prompt = sum(r.prompt_tokens or 0 for r in results) / len(results)
+            agree = sum(a == b for a, b in zip(cats, baseline)) / len(cats)
+            acc = sum((c.value == "unproductive") == bool(y) for c, (_, y) in zip(cats, corpus)) / len(cats)
+
+            t1 = time.perf_counter()
+            if compactor:
+                for e, _ in corpus:
+                    compactor.compact(e.body, keywords=PRIORITY)
+            compact_us = (time.perf_counter() - t1) * 1e6 / len(corpus)
+            label = f"budget={budget}" if budget else "sem compactação"
+            print(f"{label:16s} prompt={prompt:6.0f} tok/email  {ms:7.1f} ms/email  "
+                  f"concordância={agree:6.1%}  acerto={acc:6.1%}  compactar={compact_us:7.0f} µs/email")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Custo de montar o prompt do LLM por chamada e fração do prompt que é prefixo
+comum entre emails do mesmo perfil (cacheável pelo provedor).
+
+    python -m scripts.bench_prompt_prefix [--emails 300] [--keywords 50,500,2000] [--repeat 5]
+
+"Montagem" = `_prepare` com o rule-based pré-calculado; o prefixo
+comum é medido sobre tools + mensagens serializadas, na ordem em que o
+provedor as recebe, e convertido em tokens com `estimate_tokens`.
+"""
+import argparse
+import json
+import os
+import time
+
+from app.domain.entities import Email
+from app.infrastructure.classifiers.openai_llm import OpenAIClassifier
+from app.infrastructure.nlp.keyword_matcher import KeywordSet
+from app.infrastructure.nlp.prompt_compactor import estimate_tokens
+from scripts.bench_common import synthetic_corpus
+
+
+class _Precomputed:
+    def __init__(self, results):
+        self.results = results
+
+    def classify(self, email, tokens, **kwargs):
+        return self.results[id(email)]
+
+
+def _serialized(payload: dict) -> str:
+    tools = json.dumps(payload["tools"], ensure_ascii=False, sort_keys=True)
+    return tools + "".join(m["content"] for m in payload["messages"])
+
+
+def _common_prefix(a: str, b: str) -> int:
+    n = min(len(a), len(b))
+    i = 0
+    while i < n and a[i] == b[i]:
+        i += 1
+    return i
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--emails", type=int, default=300)
+    ap.add_argument("--keywords", default="50,500,2000")
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+    emails = [Email(subject=f"Pedido {i}", sender=f"c{i}@exemplo.com", body=t)
+              for i, (t, _) in enumerate(synthetic_corpus(args.emails, seed=9, words=80))]
+    clf = OpenAIClassifier(http_client=object(), async_http_client=object())
+
+    for n in (int(k) for k in args.keywords.split(",")):
+        priority = KeywordSet([f"palavra{i}" for i in range(n)] + ["contrato", "fatura", "reunião"])
+        clf._prepare(emails[0], [], "formal", priority, None)  # aquece memos
+
+        # rule-based pré-calculado: o tempo medido de `_prepare` é só a montagem do prompt
+        rbs = {id(e): clf.rule_based.classify(e, [], mood="formal", priority=priority) for e in emails}
+        rule_based, clf.rule_based = clf.rule_based, _Precomputed(rbs)
+        best = float("inf")
+        for _ in range(args.repeat):  # melhor de N: menos ruído de GC/escalonador
+            t0 = time.perf_counter()
+            reqs = [clf._prepare(e, [], "formal", priority, None)[1] for e in emails]
+            best = min(best, time.perf_counter() - t0)
+        clf.rule_based = rule_based
+        build_us = best * 1e6 / len(emails)
+
+        texts = [_serialized(r.payload) for r in reqs]
+        common = min(_common_prefix(texts[0], t) for t in texts[1:])
+        prefix_tok = estimate_tokens(texts[0][:common])
+        total_tok = sum(estimate_tokens(t) for t in texts) / len(texts)
+        print(f"keywords={n:5d}  montagem={build_us:8.1f} µs/chamada  prefixo comum={prefix_tok:6d} tok  "
+              f"prompt médio={total_tok:7.0f} tok  cacheável={prefix_tok / total_tok:6.1%}")
+
+
+if __name__ == "__main__":
+    main()
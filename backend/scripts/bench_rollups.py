@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Custo e ganho dos rollups horários (classification_rollups_hourly):
+
+1. overhead de escrita: SqlLogRepository.save (um commit por log) e
+   save_many(500) com e sem rollups, num banco temporário
+2. rebuild (backfill) sobre a tabela grande do bench_log_pagination
+3. consultas do /stats (rollups) vs o mesmo GROUP BY direto em
+   classification_logs
+
+    python -m scripts.bench_rollups --db /tmp/bench_logs.db
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+
+from app.domain.entities import ClassificationLog, StatsQuery
+from app.infrastructure.db import build_engine, init_db, session_factory
+from app.infrastructure.models import ClassificationLogModel
+from app.infrastructure.repositories.sql_log_repository import SqlLogRepository
+from app.infrastructure.repositories.sql_rollup_repository import SqlRollupRepository
+from scripts.bench_log_pagination import build, timed
+
+
+def _logs(n: int, t0: datetime):
+    return [
+        ClassificationLog(
+            created_at=t0 + timedelta(seconds=7 * i), source="api", subject=f"s{i}", profile_id=f"p{i % 20}",
+            category="productive" if i % 4 else "unproductive", used_model="rule-based",
+            total_tokens=150, cost_usd=0.00002, latency_ms=5 + i % 300,
+        )
+        for i in range(n)
+    ]
+
+
+def write_overhead(n: int, batch: int):
+    print(f"escrita ({n} logs)        {'save/s':>9} {'save_many/s':>12}")
+    for rollups in (False, True):
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = build_engine(os.path.join(tmp, "w.db"))
+            init_db(engine, log_search=False)
+            repo = SqlLogRepository(session_factory=session_factory(engine), rollups=rollups)
+            t0 = time.perf_counter()
+            for log in _logs(n, datetime(2025, 1, 1)):
+                repo.save(log)
+            single = n / (time.perf_counter() - t0)
+            logs = _logs(n * 10, datetime(2025, 2, 1))
+            t0 = time.perf_counter()
+            for i in range(0, len(logs), batch):
+                repo.save_many(logs[i:i + batch])
+            many = len(logs) / (time.perf_counter() - t0)
+            engine.dispose()
+        print(f"  rollups {'on ' if rollups else 'off'}              {single:9.0f} {many:12.0f}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--db", default="/tmp/bench_logs.db")
+    ap.add_argument("--rows", type=int, default=10_000_000, help="só se --db ainda não existir")
+    ap.add_argument("--writes", type=int, default=2000)
+    ap.add_argument("--batch", type=int, default=500)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    write_overhead(args.writes, args.batch)
+
+    if os.path.exists(args.db):
+        engine = build_engine(args.db)
+        init_db(engine, log_search=False)
+    else:
+        engine = build(args.db, args.rows)
+    Session = session_factory(engine)
+    with Session() as s:
+        rows = s.execute(select(func.count()).select_from(ClassificationLogModel)).scalar()
+    t0 = time.perf_counter()
+    with Session() as s:
+        rollup_rows = SqlRollupRepository(s).rebuild()
+    print(f"\nrebuild: {rows:,} logs → {rollup_rows:,} linhas de rollup em {time.perf_counter() - t0:.1f}s")
+
+    c = ClassificationLogModel.__table__.c
+    day = func.date(c.created_at)
+
+    def raw(*keys, where=()):
+        stmt = select(*keys, func.count(), func.sum(c.total_tokens), func.sum(c.cost_usd), func.avg(c.latency_ms))
+        stmt = stmt.where(*where)
+        if keys:
+            stmt = stmt.group_by(*keys)
+        with Session() as s:
+            return s.execute(stmt).all()
+
+    def rollup(**kw):
+        with Session() as s:
+            return SqlRollupRepository(s).stats(StatsQuery(**kw))
+
+    week = datetime(2024, 1, 8)
+    cases = [
+        ("total", lambda: rollup(granularity="total"), lambda: raw()),
+        ("dia × categoria", lambda: rollup(granularity="day", group_by=("category",)), lambda: raw(day, c.category)),
+        ("hora, p7, 1 semana",
+         lambda: rollup(profile_id="p7", since=week, until=week + timedelta(days=7)),
+         lambda: raw(func.strftime("%Y-%m-%d %H", c.created_at),
+                     where=(c.profile_id == "p7", c.created_at >= week, c.created_at < week + timedelta(days=7)))),
+    ]
+    print(f"\nconsulta (mediana de {args.repeat}, ms) {'rollups':>9} {'GROUP BY logs':>14}")
+    for name, fast, slow in cases:
+        print(f"  {name:<27} {timed(fast, args.repeat):9.2f} {timed(slow, args.repeat):14.1f}")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Rajada de newsletter: chamadas pagas ao LLM com e sem single-flight.
+
+    python -m scripts.bench_single_flight [--requests 64] [--duplicate-ratio 0.8] [--latency-ms 300]
+
+`--duplicate-ratio` dos emails são idênticos (mesma newsletter, mesmo prompt);
+o restante é único. Todos caem na zona cinza e são escalados ao mock local.
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+
+from app.domain.entities import Email
+from app.infrastructure.classifiers.openai_llm import OpenAIClassifier
+from app.infrastructure.classifiers.rule_based import RuleBasedClassifier
+from app.infrastructure.classifiers.smart_classifier import SmartClassifier
+from app.infrastructure.http_client import AsyncPooledHttpClient
+from scripts.mock_llm_server import MockLLMServer
+
+NEWSLETTER = Email(
+    subject="Novidades da semana",
+    body="Confira as novidades do nosso blog e os eventos do mês. Até a próxima edição!",
+    sender="news@exemplo.com",
+)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--requests", type=int, default=64)
+    ap.add_argument("--duplicate-ratio", type=float, default=0.8)
+    ap.add_argument("--latency-ms", type=float, default=300.0)
+    args = ap.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+    rnd = random.Random(1)
+    emails = [
+        NEWSLETTER if rnd.random() < args.duplicate_ratio
+        else Email(subject=f"Assunto {i}", body=NEWSLETTER.body, sender=f"user{i}@exemplo.com")
+        for i in range(args.requests)
+    ]
+
+    for enabled in (False, True):
+        with MockLLMServer(latency_ms=args.latency_ms) as srv:
+            llm = OpenAIClassifier(
+                async_http_client=AsyncPooledHttpClient(srv.base_url, max_connections=64),
+                single_flight=enabled,
+            )
+            smart = SmartClassifier(rule_based=RuleBasedClassifier(), llm=llm, min_conf=1.01)
+
+            async def run():
+                return await asyncio.gather(*(smart.aclassify(e, []) for e in emails))
+
+            t0 = time.perf_counter()
+            asyncio.run(run())
+            wall = time.perf_counter() - t0
+            sf = llm.stats()["single_flight"] or {}
+            print(f"single_flight={'on ' if enabled else 'off'}  chamadas ao LLM={srv.requests:3d}/{args.requests}  "
+                  f"coalescidas={sf.get('coalesced', 0):3d}  tempo={wall:5.2f} s")
+
+
+if __name__ == "__main__":
+    main()
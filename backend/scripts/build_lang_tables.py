@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Gera app/data/lang_ngrams.npz (tabelas de n-gramas 1..3 por idioma) a partir
+dos perfis que acompanham o langdetect. Só é necessário rodar de novo para
+adicionar idiomas; em produção o identificador não depende do langdetect.
+
+    python -m scripts.build_lang_tables --langs pt en es
+"""
+import argparse
+import json
+import os
+
+import numpy as np
+
+from app.infrastructure.nlp.lang_id import ALPHABET, DATA_PATH, ORDERS, ngram_ids
+
+
+def load_profile(lang: str) -> dict:
+    import langdetect
+    path = os.path.join(os.path.dirname(langdetect.__file__), "profiles", lang)
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def build(langs, out_path: str):
+    arrays = {"alphabet": np.array(ALPHABET), "langs": np.array(langs)}
+    for lang in langs:
+        profile = load_profile(lang)
+        acc = {n: {} for n in ORDERS}
+        for gram, count in profile["freq"].items():
+            n = len(gram)
+            if n not in acc:
+                continue
+            lowered = gram.lower()
+            if any(ch != " " and ch not in ALPHABET for ch in lowered):
+                continue  # n-grama com caractere fora do alfabeto (ex.: outro script)
+            codes = np.array([ALPHABET.index(ch) for ch in lowered], dtype=np.int64)
+            ids = ngram_ids(codes, n)
+            if ids.size != 1:
+                continue
+            key = int(ids[0])
+            acc[n][key] = acc[n].get(key, 0) + count
+        for n in ORDERS:
+            ids = np.array(sorted(acc[n]), dtype=np.int64)
+            arrays[f"{lang}_{n}_ids"] = ids
+            arrays[f"{lang}_{n}_counts"] = np.array([acc[n][i] for i in ids], dtype=np.float64)
+            arrays[f"{lang}_{n}_total"] = np.array(float(profile["n_words"][n - 1]))
+        print(f"✓ {lang}: " + ", ".join(f"{n}-gramas={len(acc[n])}" for n in ORDERS))
+
+    np.savez_compressed(out_path, **arrays)
+    print(f"✓ Tabelas salvas em {os.path.normpath(out_path)} ({os.path.getsize(out_path) / 1024:.1f} KB)")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--langs", nargs="+", default=["pt", "en", "es"])
+    ap.add_argument("--out", default=DATA_PATH)
+    args = ap.parse_args()
+    build(args.langs, args.out)
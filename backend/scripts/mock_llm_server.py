@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Servidor local que imita POST /v1/chat/completions da OpenAI (tool calls `emit`
+e `emit_batch`).
+
+    python -m scripts.mock_llm_server [--port 8089] [--latency-ms 300] [--tls]
+
+Uso em testes/benchmarks: `with MockLLMServer(latency_ms=50) as srv:` e
+OPENAI_BASE_URL=srv.base_url. Conta conexões TCP e requisições, e pode
+responder com status de erro nas primeiras chamadas (`fail_statuses`) para
+exercitar retries.
+"""
+import argparse
+import json
+import os
+import re
+import ssl
+import subprocess
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+
+
+def completion(category: str = "productive", reason: str = "mock", reply: str = "Ok, recebido.") -> dict:
+    args = json.dumps({"category": category, "reason": reason, "reply": reply})
+    return {
+        "id": "chatcmpl-mock",
+        "object": "chat.completion",
+        "choices": [{
+            "index": 0,
+            "message": {
+                "role": "assistant",
+                "content": None,
+                "tool_calls": [{"id": "call_0", "type": "function", "function": {"name": "emit", "arguments": args}}],
+            },
+            "finish_reason": "tool_calls",
+        }],
+        "usage": {"prompt_tokens": 120, "completion_tokens": 30, "total_tokens": 150},
+    }
+
+
+def estimate_usage(payload: dict, completion_tokens: int) -> dict:
+    """Usage aproximado (~4 caracteres por token) a partir das mensagens e do schema enviados."""
+    chars = len(json.dumps(payload.get("messages", []), ensure_ascii=False))
+    chars += len(json.dumps(payload.get("tools", []), ensure_ascii=False))
+    prompt = chars // 4
+    return {"prompt_tokens": prompt, "completion_tokens": completion_tokens,
+            "total_tokens": prompt + completion_tokens}
+
+
+def batch_completion(payload: dict, drop_ids=(), category: str = "productive") -> dict:
+    """Resposta `emit_batch` com um item por `### Email id=...` do prompt, exceto `drop_ids`."""
+    prompt = "".join(m.get("content") or "" for m in payload.get("messages", []))
+    ids = [i for i in re.findall(r"### Email id=(\S+)", prompt) if i not in drop_ids]
+    results = [{"id": i, "category": category, "reason": "mock", "reply": "Ok, recebido."} for i in ids]
+    out = completion()
+    out["choices"][0]["message"]["tool_calls"][0]["function"] = {
+        "name": "emit_batch", "arguments": json.dumps({"results": results}),
+    }
+    out["usage"] = estimate_usage(payload, 30 * len(results))
+    return out
+
+
+def metered_responder(payload: dict) -> dict:
+    """`emit` ou `emit_batch` conforme a tool pedida, com usage proporcional ao prompt."""
+    if payload.get("tool_choice", {}).get("function", {}).get("name") == "emit_batch":
+        return batch_completion(payload)
+    out = completion()
+    out["usage"] = estimate_usage(payload, 30)
+    return out
+
+
+def self_signed_context(tmpdir: str):
+    """Gera certificado autoassinado p/ 127.0.0.1 (openssl CLI); retorna (server_ctx, client_ctx)."""
+    cert, key = os.path.join(tmpdir, "cert.pem"), os.path.join(tmpdir, "key.pem")
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+         "-keyout", key, "-out", cert, "-subj", "/CN=127.0.0.1",
+         "-addext", "subjectAltName=IP:127.0.0.1"],
+        check=True, capture_output=True,
+    )
+    server_ctx = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    server_ctx.load_cert_chain(cert, key)
+    client_ctx = ssl.create_default_context(cafile=cert)
+    return server_ctx, client_ctx
+
+
+def default_responder(payload: dict) -> dict:
+    # `emit` com usage fixo (150 tokens); `emit_batch` responde todos os ids
+    if payload.get("tool_choice", {}).get("function", {}).get("name") == "emit_batch":
+        return batch_completion(payload)
+    return completion()
+
+
+class MockLLMServer:
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        fail_statuses: Optional[List[int]] = None,
+        port: int = 0,
+        tls: bool = False,
+        responder=None,
+    ):
+        self.latency_ms = latency_ms
+        self.fail_statuses = list(fail_statuses or [])
+        self.responder = responder or default_responder
+        self.requests = 0
+        self.connections = 0
+        self.payloads: List[dict] = []
+        self._lock = threading.Lock()
+        self._tmp = tempfile.TemporaryDirectory() if tls else None
+        self.client_ssl_context = None
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive
+            disable_nagle_algorithm = True  # headers e corpo saem em writes separados
+
+            def setup(self):
+                with server._lock:
+                    server.connections += 1
+                super().setup()
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                with server._lock:
+                    server.requests += 1
+                    server.payloads.append(payload)
+                    status = server.fail_statuses.pop(0) if server.fail_statuses else 200
+                if server.latency_ms:
+                    time.sleep(server.latency_ms / 1000.0)
+                body = json.dumps(
+                    server.responder(payload) if status == 200 else {"error": {"message": f"mock {status}"}}
+                ).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                if status == 429:
+                    self.send_header("Retry-After", "0")
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.httpd.daemon_threads = True
+        if tls:
+            server_ctx, self.client_ssl_context = self_signed_context(self._tmp.name)
+            self.httpd.socket = server_ctx.wrap_socket(self.httpd.socket, server_side=True)
+        scheme = "https" if tls else "http"
+        self.base_url = f"{scheme}://127.0.0.1:{self.httpd.server_address[1]}/v1"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self) -> "MockLLMServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._tmp:
+            self._tmp.cleanup()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--port", type=int, default=8089)
+    ap.add_argument("--latency-ms", type=float, default=300.0)
+    ap.add_argument("--tls", action="store_true")
+    args = ap.parse_args()
+    with MockLLMServer(latency_ms=args.latency_ms, port=args.port, tls=args.tls) as srv:
+        print(f"Mock LLM em {srv.base_url} (latência {args.latency_ms:.0f} ms) — Ctrl+C para sair")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Recalcula `classification_rollups_hourly` a partir de `classification_logs`
+(backfill de bancos anteriores aos rollups, ou correção depois de editar logs
+à mão). Um dia por transação: pode rodar com a API no ar.
+
+    python -m scripts.rebuild_rollups            # banco de DB_PATH
+    python -m scripts.rebuild_rollups --db /caminho/data.db
+"""
+import argparse
+import time
+
+from app.infrastructure.db import SessionLocal, build_engine, init_db, session_factory
+from app.infrastructure.repositories.sql_rollup_repository import SqlRollupRepository
+
+
+def rebuild_rollups(db_path: str = None) -> int:
+    engine = build_engine(db_path) if db_path else None
+    init_db(engine)
+    Session = session_factory(engine) if engine else SessionLocal
+    t0 = time.perf_counter()
+    with Session() as session:
+        rows = SqlRollupRepository(session).rebuild()
+    print(f"✅ {rows} linhas de rollup em {time.perf_counter() - t0:.1f}s")
+    if engine:
+        engine.dispose()
+    return rows
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--db", default=None, help="arquivo SQLite (padrão: DB_PATH)")
+    rebuild_rollups(ap.parse_args().db)
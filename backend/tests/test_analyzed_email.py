@@ -0,0 +1,30 @@
+from app.domain.entities import Email, Category
+from app.infrastructure.classifiers import rule_based
+from app.infrastructure.classifiers.openai_llm import OpenAIClassifier
+from app.infrastructure.classifiers.rule_based import RuleBasedClassifier
+from app.infrastructure.classifiers.smart_classifier import SmartClassifier
+from app.infrastructure.nlp import tokenizer_simple
+from app.infrastructure.nlp.tokenizer_simple import SimpleTokenizer
+from app.infrastructure.responders.simple_templates import SimpleResponder
+
+
+def test_language_is_detected_once_per_email(monkeypatch):
+    calls = []
+
+    def counting(real):
+        return lambda text, *a, **kw: calls.append(text) or real(text, *a, **kw)
+
+    monkeypatch.setattr(tokenizer_simple, "detect_lang", counting(tokenizer_simple.detect_lang))
+    monkeypatch.setattr(rule_based, "detect_lang", counting(rule_based.detect_lang))
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+
+    email = Email(subject="Meeting", body="Please send the invoice and the contract before the deadline.")
+    analysis = SimpleTokenizer(lang="auto").analyze(email)
+    clf = SmartClassifier(RuleBasedClassifier(), OpenAIClassifier(), min_conf=0.99)
+    result = clf.classify(email, analysis.tokens, priority=["invoice"], analysis=analysis)
+    SimpleResponder().suggest(result, email, analysis=analysis)
+
+    assert len(calls) == 1
+    assert analysis.lang == "en"
+    assert result.category == Category.PRODUCTIVE
+    assert "invoice" in analysis.token_set
@@ -0,0 +1,79 @@
+import asyncio
+import time
+
+from app.domain.entities import Email, Category
+from app.infrastructure.classifiers.openai_llm import OpenAIClassifier
+from app.infrastructure.classifiers.rule_based import RuleBasedClassifier
+from app.infrastructure.classifiers.smart_classifier import SmartClassifier
+from app.infrastructure.http_client import AsyncPooledHttpClient
+from scripts.mock_llm_server import MockLLMServer
+
+EMAIL = Email(subject="Dúvida", body="Podemos conversar sobre o andamento do projeto na próxima semana?")
+
+
+def _email(i):
+    return Email(subject=f"Dúvida {i}", body=EMAIL.body)  # prompts distintos: sem coalescência
+
+
+def _smart(srv, monkeypatch, **kwargs):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    llm = OpenAIClassifier(async_http_client=AsyncPooledHttpClient(srv.base_url, max_connections=64), **kwargs)
+    return SmartClassifier(rule_based=RuleBasedClassifier(), llm=llm, min_conf=1.01)  # sempre escala
+
+
+def test_concurrent_escalations_overlap(monkeypatch):
+    with MockLLMServer(latency_ms=200) as srv:
+        smart = _smart(srv, monkeypatch, max_concurrency=32)
+
+        async def run():
+            return await asyncio.gather(*[smart.aclassify(_email(i), []) for i in range(16)])
+
+        t0 = time.perf_counter()
+        results = asyncio.run(run())
+        elapsed = time.perf_counter() - t0
+
+    assert all(r.extra.get("llm") for r in results)
+    assert srv.requests == 16
+    assert elapsed < 1.6  # serializado seriam ~3.2 s
+
+
+def test_semaphore_caps_in_flight_calls(monkeypatch):
+    with MockLLMServer(latency_ms=100) as srv:
+        smart = _smart(srv, monkeypatch, max_concurrency=2)
+
+        async def run():
+            return await asyncio.gather(*[smart.aclassify(_email(i), []) for i in range(6)])
+
+        t0 = time.perf_counter()
+        asyncio.run(run())
+        assert time.perf_counter() - t0 >= 0.3  # 6 chamadas, 2 por vez
+
+
+def test_deadline_falls_back_to_rule_based(monkeypatch):
+    with MockLLMServer(latency_ms=500) as srv:
+        smart = _smart(srv, monkeypatch, deadline_s=0.1)
+        res = asyncio.run(smart.aclassify(EMAIL, []))
+
+    assert res.extra["llm_error"] == "deadline"
+    assert "llm" not in res.extra
+    assert res.category in (Category.PRODUCTIVE, Category.UNPRODUCTIVE)
+
+
+def test_port_default_aclassify_runs_sync_classifier():
+    res = asyncio.run(RuleBasedClassifier().aclassify(EMAIL, [], priority=["projeto"]))
+    assert res.extra["profile_hits"] == ["projeto"]
+
+
+def test_identical_inflight_prompts_share_one_request(monkeypatch):
+    with MockLLMServer(latency_ms=200) as srv:
+        smart = _smart(srv, monkeypatch)
+
+        async def run():
+            same = [smart.aclassify(EMAIL, []) for _ in range(8)]
+            other = smart.aclassify(Email(subject="Outro", body=EMAIL.body), [])
+            return await asyncio.gather(*same, other)
+
+        results = asyncio.run(run())
+        assert srv.requests == 2
+        assert all(r.extra.get("llm") for r in results)
+        assert smart.llm.stats()["single_flight"]["coalesced"] == 7
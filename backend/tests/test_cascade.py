@@ -0,0 +1,107 @@
+import asyncio
+
+from app.domain.entities import Email, Category, ClassificationResult, CascadeStage, CompiledProfile
+from app.domain.ports import ClassifierPort
+from app.infrastructure.classifiers.cascade import CascadeClassifier
+from app.infrastructure.classifiers.openai_llm import OpenAIClassifier
+from app.infrastructure.classifiers.rule_based import RuleBasedClassifier
+from app.infrastructure.http_client import PooledHttpClient, AsyncPooledHttpClient
+from scripts.mock_llm_server import MockLLMServer
+
+EMAIL = Email(subject="Dúvida", body="Podemos conversar sobre o andamento do projeto na próxima semana?")
+
+
+class _Stage(ClassifierPort):
+    def __init__(self, name, confidence, **extra):
+        self.name, self.confidence, self.extra = name, confidence, extra
+        self.calls = 0
+
+    def classify(self, email, tokens, mood=None, priority=None, analysis=None):
+        self.calls += 1
+        return ClassificationResult(
+            category=Category.PRODUCTIVE, reason=self.name, suggested_reply="", used_model=self.name,
+            extra={"confidence": self.confidence, **self.extra},
+        )
+
+
+def _cascade(rules=0.5, ml=0.95, **rules_extra):
+    stages = {"rules": _Stage("rules", rules, **rules_extra), "ml": _Stage("ml", ml), "llm": _Stage("llm", 0.0)}
+    plan = CascadeStage.parse_plan("rules:0.8,ml:0.9,llm")
+    return CascadeClassifier(stages, plan), stages
+
+
+def test_parse_plan_accepts_strings_and_dicts():
+    assert CascadeStage.parse_plan("rules:0.8, ml , llm") == (
+        CascadeStage("rules", 0.8), CascadeStage("ml"), CascadeStage("llm"),
+    )
+    assert CascadeStage.parse_plan([{"stage": "ML", "min_confidence": 0.7}, "llm"]) == (
+        CascadeStage("ml", 0.7), CascadeStage("llm"),
+    )
+    profile = CompiledProfile.from_dict("p", {"priority_keywords": ["x"], "cascade": ["rules:0.9", "llm"]})
+    assert [s.name for s in profile.cascade] == ["rules", "llm"]
+
+
+def test_early_exit_skips_later_stages():
+    clf, stages = _cascade(rules=0.5, ml=0.95)
+    res = clf.classify(EMAIL, [])
+
+    assert res.used_model == "ml"
+    assert stages["llm"].calls == 0
+    assert res.extra["cascade"]["ran"] == ["rules", "ml"]
+    assert res.extra["cascade"]["exit"] == "ml"
+    assert set(res.extra["cascade"]["timings_ms"]) == {"rules", "ml"}
+
+
+def test_spam_stops_at_rules_and_last_stage_always_accepts():
+    clf, stages = _cascade(rules=0.1, is_spam=True)
+    assert clf.classify(EMAIL, []).extra["cascade"]["exit"] == "rules"
+
+    clf, stages = _cascade(rules=0.1, ml=0.1)
+    res = clf.classify(EMAIL, [])
+    assert res.extra["cascade"]["ran"] == ["rules", "ml", "llm"]
+    assert [s["accepted"] for s in res.extra["cascade"]["stages"]] == [False, False, True]
+
+
+def test_profile_plan_overrides_order_and_thresholds():
+    clf, stages = _cascade(rules=0.5, ml=0.95)
+    res = clf.classify(EMAIL, [], cascade=CascadeStage.parse_plan("rules:0.4,llm"))
+    assert res.extra["cascade"]["ran"] == ["rules"]
+
+    res = clf.classify(EMAIL, [], cascade=CascadeStage.parse_plan("gpu,llm"))  # etapa desconhecida é ignorada
+    assert res.extra["cascade"]["ran"] == ["llm"]
+
+
+def test_llm_failure_falls_back_to_last_stage_that_worked():
+    # o OpenAIClassifier falha devolvendo o rule-based com `llm_error`: a resposta do ML não pode se perder
+    clf, stages = _cascade(rules=0.5, ml=0.6)
+    stages["llm"] = _Stage("rules", 0.5, llm_error="TimeoutError")
+    clf.stages["llm"] = stages["llm"]
+    for res in (clf.classify(EMAIL, []), asyncio.run(clf.aclassify(EMAIL, [])), clf.classify_batch([EMAIL], [[]])[0]):
+        assert res.used_model == "ml"
+        assert res.extra["cascade_error"] == "llm"
+        assert res.extra["cascade"]["ran"] == ["rules", "ml", "llm"]
+
+
+def test_batch_runs_each_stage_once_on_undecided_emails():
+    clf, stages = _cascade(rules=0.5, ml=0.95)
+    results = clf.classify_batch([EMAIL] * 4, [[]] * 4)
+    assert [r.extra["cascade"]["exit"] for r in results] == ["ml"] * 4
+    assert stages["rules"].calls == 4 and stages["ml"].calls == 4 and stages["llm"].calls == 0
+
+
+def test_llm_stage_reuses_rule_based_result(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    with MockLLMServer() as srv:
+        llm = OpenAIClassifier(
+            http_client=PooledHttpClient(srv.base_url), async_http_client=AsyncPooledHttpClient(srv.base_url),
+        )
+        monkeypatch.setattr(llm.rule_based, "classify", lambda *a, **k: (_ for _ in ()).throw(AssertionError))
+        clf = CascadeClassifier(
+            {"rules": RuleBasedClassifier(), "llm": llm}, CascadeStage.parse_plan("rules:0.99,llm"),
+        )
+        res = clf.classify(EMAIL, [])
+        ares = asyncio.run(clf.aclassify(EMAIL, []))
+
+    assert res.extra["llm"] is True and ares.extra["llm"] is True
+    assert res.extra["cascade"]["ran"] == ["rules", "llm"]
+    assert ares.extra["cascade"]["ran"] == ["rules", "llm"]
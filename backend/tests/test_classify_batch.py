@@ -0,0 +1,113 @@
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.svm import LinearSVC
+
+from app.application.use_cases.classify_email import ClassifyEmailUseCase
+from app.domain.entities import Email, Category
+from app.infrastructure.classifiers.ml_classifier import MLClassifier
+from app.infrastructure.nlp.tokenizer_simple import SimpleTokenizer
+from app.infrastructure.responders.simple_templates import SimpleResponder
+
+
+TRAIN = [
+    ("meeting agenda for the contract review tomorrow", 0),
+    ("please find the invoice and payment schedule attached", 0),
+    ("project deadline moved, see the updated proposal", 0),
+    ("click here to win a free prize now", 1),
+    ("verify your account password immediately or lose access", 1),
+    ("limited offer buy now huge discount click", 1),
+]
+
+
+def make_ml_classifier():
+    vec = TfidfVectorizer(ngram_range=(1, 2))
+    X = vec.fit_transform([t for t, _ in TRAIN])
+    model = LinearSVC().fit(X, [y for _, y in TRAIN])
+    clf = MLClassifier.__new__(MLClassifier)
+    clf.model, clf.vectorizer = model, vec
+    return clf
+
+
+class FakeProfiles:
+    def get_profile(self, profile_id):
+        return {"mood": "formal", "priority_keywords": ["contract"]} if profile_id == "default" else None
+
+
+class FakeRepo:
+    def __init__(self):
+        self.batches = []
+
+    def save(self, log):
+        self.batches.append([log])
+        return log
+
+    def save_many(self, logs):
+        self.batches.append(list(logs))
+        return logs
+
+
+def _baseline_single(clf, email):
+    """Pontuação antiga, um email por vez: transform([texto]) + predict + decision_function."""
+    text = f"{email.subject or ''} {email.body or ''}".strip().lower()
+    if not text:
+        return None, 0.0
+    X = clf.vectorizer.transform([text])
+    return int(clf.model.predict(X)[0]), float(abs(clf.model.decision_function(X)[0]))
+
+
+def test_ml_batch_matches_single():
+    clf = make_ml_classifier()
+    emails = [
+        Email(subject="Contract", body="meeting agenda for the contract"),
+        Email(subject=None, body=""),
+        Email(subject="Prize", body="click here to win a free prize"),
+        Email(subject="Invoice", body="payment schedule attached, limited discount"),
+        Email(subject=None, body="verify the proposal deadline"),
+    ]
+    batch = clf.classify_batch(emails, [[]] * len(emails))
+    for email, result in zip(emails, batch):
+        prediction, confidence = _baseline_single(clf, email)
+        if prediction is None:
+            assert result.reason == "Empty email content"
+            continue
+        assert result.extra["ml_prediction"] == prediction
+        assert result.extra["confidence"] == pytest.approx(confidence)
+        assert result.category == (Category.UNPRODUCTIVE if prediction == 1 else Category.PRODUCTIVE)
+    assert batch[0].category == Category.PRODUCTIVE
+    assert batch[2].category == Category.UNPRODUCTIVE
+
+
+def test_non_integer_labels_give_error_results():
+    vec = TfidfVectorizer()
+    X = vec.fit_transform([t for t, _ in TRAIN])
+    clf = MLClassifier.__new__(MLClassifier)
+    clf.model = LinearSVC().fit(X, ["spam" if y else "ham" for _, y in TRAIN])
+    clf.vectorizer = vec
+
+    results = clf.classify_batch([Email(subject="Prize", body="click here to win"), Email(subject=None, body="")], [[]] * 2)
+    assert results[0].used_model == "ml_classifier_error" and "error" in results[0].extra
+    assert results[1].reason == "Empty email content"
+
+
+def test_use_case_batch_keeps_order_and_saves_once():
+    repo = FakeRepo()
+    uc = ClassifyEmailUseCase(
+        file_facade=None,
+        tokenizer=SimpleTokenizer(lang="en"),
+        classifier=make_ml_classifier(),
+        responder=SimpleResponder(),
+        profiles=FakeProfiles(),
+        log_repo=repo,
+    )
+    emails = [
+        Email(subject="a", body="click here to win a free prize"),
+        Email(subject="b", body="invoice and payment schedule"),
+        Email(subject="c", body="meeting agenda"),
+    ]
+    out = uc.classify_batch(emails, [None, "missing", "default"])
+
+    assert [o.index for o in out] == [0, 1, 2]
+    assert out[0].result.category == Category.UNPRODUCTIVE
+    assert out[1].result is None and "missing" in out[1].error
+    assert out[2].result.category == Category.PRODUCTIVE
+    assert len(repo.batches) == 1 and len(repo.batches[0]) == 2
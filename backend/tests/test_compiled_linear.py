@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.naive_bayes import MultinomialNB
+from sklearn.svm import LinearSVC
+
+from app.infrastructure.classifiers.compiled_linear import CompiledLinearModel, compile_from_sklearn
+from scripts.bench_common import synthetic_corpus
+
+
+@pytest.mark.parametrize("model_cls", [LinearSVC, LogisticRegression, MultinomialNB])
+@pytest.mark.parametrize("vec_kwargs", [
+    {"stop_words": "english", "ngram_range": (1, 2)},
+    {"sublinear_tf": True, "norm": "l1"},
+])
+def test_compiled_matches_sklearn(tmp_path, model_cls, vec_kwargs):
+    train = synthetic_corpus(400, seed=3, words=30)
+    vec = TfidfVectorizer(**vec_kwargs)
+    X = vec.fit_transform([t for t, _ in train])
+    model = model_cls().fit(X, [y for _, y in train])
+
+    compiled = CompiledLinearModel(compile_from_sklearn(model, vec, tmp_path / "compiled"))
+
+    texts = [t for t, _ in synthetic_corpus(100, seed=11, words=25)] + ["", "zzz unknown words"]
+    Xt = vec.transform(texts)
+    preds, confs = compiled.predict(texts)
+
+    assert (preds == model.predict(Xt)).all()
+    if hasattr(model, "predict_proba"):
+        np.testing.assert_allclose(confs, model.predict_proba(Xt).max(axis=1), rtol=1e-9, atol=1e-12)
+    else:
+        np.testing.assert_allclose(confs, np.abs(model.decision_function(Xt)), rtol=1e-9, atol=1e-12)
@@ -0,0 +1,61 @@
+import sqlite3
+
+import pytest
+from sqlalchemy.exc import OperationalError
+from sqlmodel import SQLModel
+
+from app.domain.entities import ClassificationLog
+from app.infrastructure.db import build_engine, database_url, session_factory
+from app.infrastructure.models import ClassificationLogModel  # noqa: F401 (registra a tabela)
+from app.infrastructure.repositories.sql_log_repository import SqlLogRepository
+
+
+def _repo(path, **engine_kwargs):
+    engine = build_engine(str(path), busy_timeout_ms=100, **engine_kwargs)
+    SQLModel.metadata.create_all(engine)
+    return engine, SqlLogRepository(session_factory=session_factory(engine))
+
+
+def test_database_url_accepts_path_or_url():
+    assert database_url("/var/lib/app/logs.db") == "sqlite:////var/lib/app/logs.db"
+    assert database_url("postgresql://u@h/db") == "postgresql://u@h/db"
+
+
+def test_pragmas_applied_on_every_connection(tmp_path):
+    engine = build_engine(str(tmp_path / "logs.db"), mmap_mb=16, cache_mb=8)
+    with engine.connect() as conn:
+        pragma = lambda name: conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+        assert pragma("journal_mode") == "wal"
+        assert pragma("synchronous") == 1  # NORMAL
+        assert pragma("mmap_size") == 16 * 1024 * 1024
+        assert pragma("cache_size") == -8 * 1024
+        assert pragma("busy_timeout") == 5000
+    engine.dispose()
+
+
+def test_writer_commits_while_reader_transaction_is_open(tmp_path):
+    engine, repo = _repo(tmp_path / "wal.db")
+    repo.save(ClassificationLog(source="test", subject="a"))
+
+    reader = sqlite3.connect(tmp_path / "wal.db")
+    reader.execute("BEGIN")
+    assert reader.execute("SELECT count(*) FROM classification_logs").fetchone() == (1,)
+    repo.save_many([ClassificationLog(source="test", subject="b")])  # WAL: não espera o leitor
+    assert reader.execute("SELECT count(*) FROM classification_logs").fetchone() == (1,)  # snapshot
+    reader.rollback()
+    assert len(repo.list_recent()) == 2
+    reader.close()
+    engine.dispose()
+
+
+def test_rollback_journal_blocks_writer_behind_reader(tmp_path):
+    engine, repo = _repo(tmp_path / "journal.db", wal=False)
+    repo.save(ClassificationLog(source="test", subject="a"))
+
+    reader = sqlite3.connect(tmp_path / "journal.db")
+    reader.execute("BEGIN")
+    reader.execute("SELECT count(*) FROM classification_logs").fetchone()
+    with pytest.raises(OperationalError):
+        repo.save_many([ClassificationLog(source="test", subject="b")])
+    reader.close()
+    engine.dispose()
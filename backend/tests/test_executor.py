@@ -0,0 +1,86 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.domain.errors import Overloaded
+from app.infrastructure.executor import UseCaseExecutor
+
+
+class SlowUseCase:
+    def __init__(self):
+        self.release = threading.Event()
+
+    def execute_from_text(self, subject, body, sender=None, profile_id=None):
+        self.release.wait(2)
+        return body.upper()
+
+
+def test_thread_executor_runs_and_rejects_when_saturated():
+    uc = SlowUseCase()
+    ex = UseCaseExecutor(use_case=uc, kind="thread", workers=2, max_pending=2)
+
+    async def scenario():
+        first = [asyncio.create_task(ex.run("execute_from_text", None, b)) for b in ("a", "b")]
+        await asyncio.sleep(0.05)
+        with pytest.raises(Overloaded):
+            await ex.run("execute_from_text", None, "c")
+        uc.release.set()
+        return await asyncio.gather(*first)
+
+    assert asyncio.run(scenario()) == ["A", "B"]
+    ex.shutdown()
+
+
+def test_async_use_case_runs_cpu_and_db_steps_on_executor_threads():
+    from app.application.use_cases.classify_email import ClassifyEmailUseCase
+    from app.domain.entities import Category, ClassificationResult
+    from app.infrastructure.nlp.tokenizer_simple import SimpleTokenizer
+    from app.infrastructure.responders.simple_templates import SimpleResponder
+
+    threads = {}
+
+    class LLM:
+        prefers_async = True
+
+        async def aclassify(self, email, tokens, **kwargs):
+            threads["classify"] = threading.get_ident()
+            return ClassificationResult(category=Category.PRODUCTIVE, reason="llm", suggested_reply="")
+
+    class Tokenizer(SimpleTokenizer):
+        def analyze(self, email):
+            threads["analyze"] = threading.get_ident()
+            return super().analyze(email)
+
+    class Repo:
+        def save(self, log):
+            threads["persist"] = threading.get_ident()
+            return log
+
+    uc = ClassifyEmailUseCase(
+        file_facade=None,
+        tokenizer=Tokenizer(lang="pt"),
+        classifier=LLM(),
+        responder=SimpleResponder(),
+        profiles=type("P", (), {"get_profile": lambda self, pid: {"mood": None}})(),
+        log_repo=Repo(),
+    )
+    ex = UseCaseExecutor(use_case=uc, kind="thread", workers=1, max_pending=1)
+    uc.offload = ex.call
+
+    async def scenario():
+        loop_thread = threading.get_ident()
+        res = await uc.aexecute_from_text("Dúvida", "Podemos conversar amanhã?")
+        ex._slots.acquire()  # executor saturado: a requisição é recusada antes de chegar ao LLM
+        try:
+            with pytest.raises(Overloaded):
+                await uc.aexecute_from_text("Outra", "Mais uma dúvida")
+        finally:
+            ex._slots.release()
+        return loop_thread, res
+
+    loop_thread, res = asyncio.run(scenario())
+    ex.shutdown()
+    assert res.reason == "llm"
+    assert threads["classify"] == loop_thread
+    assert threads["analyze"] != loop_thread and threads["persist"] != loop_thread
@@ -0,0 +1,115 @@
+import asyncio
+import threading
+
+from app.application.use_cases.classify_email import ClassifyEmailUseCase
+from app.domain.entities import Email, Category, ClassificationResult, CascadeStage
+from app.infrastructure.classifiers.cascade import CascadeClassifier
+from app.infrastructure.classifiers.hedge import drain
+from app.infrastructure.classifiers.rule_based import RuleBasedClassifier
+from app.infrastructure.classifiers.smart_classifier import SmartClassifier
+from app.infrastructure.nlp.tokenizer_simple import SimpleTokenizer
+from app.infrastructure.responders.simple_templates import SimpleResponder
+
+EMAIL = Email(subject="Dúvida", body="Podemos conversar sobre o andamento do projeto na próxima semana?")
+
+
+class _SlowLLM:
+    prefers_async = True
+
+    def __init__(self, delay_s):
+        self.delay_s = delay_s
+
+    async def aclassify(self, email, tokens, **kwargs):
+        await asyncio.sleep(self.delay_s)
+        return ClassificationResult(
+            category=Category.UNPRODUCTIVE, reason="llm", suggested_reply="", used_model="gpt", extra={"llm": True},
+        )
+
+
+class _Repo:
+    def __init__(self):
+        self.logs = {}
+
+    def save(self, log):
+        log.id = len(self.logs) + 1
+        self.logs[log.id] = log
+        return log
+
+    def update_result(self, log_id, log):
+        self.update_thread = threading.get_ident()
+        log.id = log_id
+        self.logs[log_id] = log
+        return log
+
+
+def _smart(delay_s):
+    return SmartClassifier(RuleBasedClassifier(), _SlowLLM(delay_s), min_conf=1.01)  # sempre escala
+
+
+def test_llm_within_budget_answers():
+    res = asyncio.run(_smart(0.01).aclassify(EMAIL, [], budget_s=1.0))
+    assert res.used_model == "gpt"
+    assert res.extra["hedge"]["answered_by"] == "llm" and not res.extra["hedge"]["provisional"]
+
+
+def test_slow_llm_returns_provisional_then_completes_late():
+    late = []
+
+    async def run():
+        res = await _smart(0.2).aclassify(EMAIL, [], budget_s=0.05, on_late=late.append)
+        assert not late  # respondeu antes do LLM terminar
+        await drain()
+        return res
+
+    res = asyncio.run(run())
+    assert res.extra["hedge"] == {**res.extra["hedge"], "answered_by": "rules", "provisional": True}
+    assert res.used_model != "gpt"
+
+    final = late[0]
+    assert final.used_model == "gpt"
+    assert final.extra["hedge"]["late"] and final.extra["hedge"]["answered_by"] == "llm"
+    assert 100 < final.extra["hedge"]["llm_late_ms"] < 1000
+    assert final.extra["hedge"]["provisional_model"] == res.used_model
+
+
+def test_cascade_hedges_llm_stage_with_previous_stage():
+    clf = CascadeClassifier(
+        {"rules": RuleBasedClassifier(), "llm": _SlowLLM(0.2)}, CascadeStage.parse_plan("rules:1.01,llm"),
+    )
+    late = []
+
+    async def run():
+        res = await clf.aclassify(EMAIL, [], budget_s=0.05, on_late=late.append)
+        await drain()
+        return res
+
+    res = asyncio.run(run())
+    assert res.extra["hedge"]["answered_by"] == "rules"
+    assert res.extra["cascade"]["ran"] == ["rules"]
+    assert late[0].extra["cascade"]["ran"] == ["rules", "llm"]
+    assert late[0].extra["hedge"]["answered_by"] == "llm"
+
+
+def test_use_case_updates_log_when_llm_finishes():
+    repo = _Repo()
+    uc = ClassifyEmailUseCase(
+        file_facade=None,
+        tokenizer=SimpleTokenizer(lang="pt"),
+        classifier=_smart(0.2),
+        responder=SimpleResponder(),
+        profiles=type("P", (), {"get_profile": lambda self, pid: {"mood": None}})(),
+        log_repo=repo,
+    )
+
+    async def run():
+        res = await uc.aexecute_from_text(EMAIL.subject, EMAIL.body, budget_ms=50)
+        provisional_log = repo.logs[1]
+        await drain()
+        assert repo.update_thread != threading.get_ident()  # aplicado fora do event loop
+        return res, provisional_log
+
+    res, provisional_log = asyncio.run(run())
+    assert res.extra["hedge"]["provisional"] and provisional_log.used_model == res.used_model
+    assert len(repo.logs) == 1
+    assert repo.logs[1].used_model == "gpt" and repo.logs[1].category == "unproductive"
+    assert repo.logs[1].extra["hedge"]["llm_late_ms"] > 0
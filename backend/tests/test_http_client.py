@@ -0,0 +1,77 @@
+import socket
+import threading
+
+import pytest
+
+from app.domain.entities import Email, Category
+from app.infrastructure.classifiers.openai_llm import OpenAIClassifier
+from app.infrastructure.http_client import PooledHttpClient, HttpClientError
+from scripts.mock_llm_server import MockLLMServer
+
+
+def test_connections_are_reused_across_calls_and_threads():
+    with MockLLMServer() as srv:
+        client = PooledHttpClient(srv.base_url, max_connections=2)
+        for _ in range(5):
+            assert client.post_json("/chat/completions", {"n": 1})[0] == 200
+
+        threads = [threading.Thread(target=client.post_json, args=("/chat/completions", {})) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert srv.requests == 13
+        assert srv.connections <= 2
+        assert client.stats()["connections_opened"] == srv.connections
+
+
+def test_retries_429_and_503_then_succeeds():
+    with MockLLMServer(fail_statuses=[429, 503]) as srv:
+        client = PooledHttpClient(srv.base_url, max_retries=2, backoff_base_s=0.001)
+        status, body = client.post_json("/chat/completions", {})
+        assert status == 200 and body["choices"]
+        assert client.stats()["retries"] == 2
+
+
+def test_post_is_not_retried_when_it_may_have_been_processed():
+    with MockLLMServer(fail_statuses=[500, 500, 500]) as srv:
+        client = PooledHttpClient(srv.base_url, max_retries=2, backoff_base_s=0.001)
+        assert client.post_json("/chat/completions", {})[0] == 500
+        assert srv.requests == 1
+
+    with MockLLMServer(latency_ms=300) as srv:
+        client = PooledHttpClient(srv.base_url, read_timeout_s=0.05, max_retries=2, backoff_base_s=0.001)
+        with pytest.raises(HttpClientError):
+            client.post_json("/chat/completions", {})
+        assert client.stats()["retries"] == 0
+
+
+def test_connect_failures_are_retried():
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()  # porta livre: conexão recusada
+    client = PooledHttpClient(f"http://127.0.0.1:{port}", max_retries=2, backoff_base_s=0.001)
+    with pytest.raises(HttpClientError):
+        client.post_json("/chat/completions", {})
+    assert client.stats()["retries"] == 2
+
+
+def test_stale_keepalive_connection_is_replaced():
+    with MockLLMServer() as srv:
+        client = PooledHttpClient(srv.base_url, max_retries=0)
+        client.post_json("/chat/completions", {})
+        client._idle[0].sock.shutdown(socket.SHUT_RDWR)  # simula o servidor fechando a conexão ociosa
+        assert client.post_json("/chat/completions", {})[0] == 200
+        assert client.stats()["stale"] == 1
+
+
+def test_openai_classifier_uses_configured_base_url(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    with MockLLMServer() as srv:
+        clf = OpenAIClassifier(http_client=PooledHttpClient(srv.base_url))
+        res = clf.classify(Email(subject="Reunião", body="Podemos revisar o contrato amanhã?"), ["contrato"])
+        assert res.category == Category.PRODUCTIVE
+        assert res.extra["llm"] is True and res.total_tokens == 150
+        assert srv.payloads[0]["tool_choice"]["function"]["name"] == "emit"
@@ -0,0 +1,33 @@
+from app.domain.entities import Email, Category
+from app.infrastructure.classifiers.rule_based import RuleBasedClassifier
+from app.infrastructure.nlp.keyword_matcher import KeywordMatcher, matcher_for
+
+
+def test_multi_word_and_overlapping_keywords_are_counted():
+    m = KeywordMatcher(["Nota", "nota fiscal", "fiscal", "NF", "conteúdo textual"])
+    found = m.find("Segue a NOTA FISCAL (nf) e outra nota; conteúdo  textual em anexo.")
+    assert found == {"nota": 2, "nota fiscal": 1, "fiscal": 1, "nf": 1, "conteúdo textual": 1}
+
+
+def test_matches_respect_word_boundaries():
+    m = KeywordMatcher(["nf", "prazo"])
+    assert m.find("Informação sobre prazos e conformidade") == {}
+    assert m.find("o prazo da nf") == {"prazo": 1, "nf": 1}
+
+
+def test_fail_links_recover_partial_matches():
+    m = KeywordMatcher(["a b a", "b"])
+    assert m.find("a b a b a") == {"a b a": 2, "b": 2}
+
+
+def test_matcher_for_memoizes_by_keyword_set():
+    assert matcher_for(None) is None
+    assert matcher_for(["x", "y"]) is matcher_for(("y", "x"))
+
+
+def test_rule_based_uses_multi_word_profile_keywords():
+    email = Email(subject="Documento", body="Precisamos revisar o conteúdo textual do contrato hoje.")
+    res = RuleBasedClassifier().classify(email, [], priority=["conteúdo textual"])
+    assert res.category == Category.PRODUCTIVE
+    assert res.extra["profile_hits"] == ["conteúdo textual"]
+    assert res.extra["profile_hit_counts"] == {"conteúdo textual": 1}
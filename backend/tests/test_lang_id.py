@@ -0,0 +1,48 @@
+from app.infrastructure.nlp import lang_detect
+from app.infrastructure.nlp.lang_detect import detect_lang
+from app.infrastructure.nlp.lang_id import NgramLanguageIdentifier
+from scripts.bench_lang_id import CORPUS
+
+
+def test_ngram_identifier_matches_labels_single_and_batch():
+    ident = NgramLanguageIdentifier()
+    samples = [(lang, t) for lang, texts in CORPUS.items() for t in texts]
+    assert all(ident.identify(t)[0] == lang for lang, t in samples)
+    assert [g for g, _ in ident.identify_batch([t for _, t in samples])] == [lang for lang, _ in samples]
+    assert ident.identify("")[0] is None
+
+
+def test_restricted_to_supported_langs():
+    ident = NgramLanguageIdentifier(supported_langs=("pt", "es"))
+    assert ident.identify("Please send the invoice before the meeting")[0] in ("pt", "es")
+
+
+def test_low_confidence_falls_back_to_langdetect(monkeypatch):
+    calls = []
+    monkeypatch.setattr(lang_detect, "detect", lambda text: calls.append(text) or "es")
+    assert detect_lang("Re: 4521") == "es"
+    assert calls
+    calls.clear()
+    assert detect_lang("Segue em anexo a proposta comercial revisada com os novos valores.") == "pt"
+    assert not calls
+
+
+def test_rule_based_path_follows_configured_engine(monkeypatch):
+    from app.config import settings
+    from app.domain.entities import Email
+    from app.infrastructure.classifiers.rule_based import RuleBasedClassifier
+
+    calls = []
+    monkeypatch.setattr(lang_detect, "detect", lambda text: calls.append(text) or "es")
+    monkeypatch.setattr(settings, "LANG_ID_ENGINE", "langdetect")
+    monkeypatch.setattr(lang_detect, "_default_identifier", None)
+    email = Email(subject="Proposta", body="Segue em anexo a proposta comercial revisada com os novos valores.")
+    result = RuleBasedClassifier().classify(email, [])
+    assert result.extra["lang"] == "es"
+    assert calls
+
+    calls.clear()
+    monkeypatch.setattr(settings, "LANG_ID_ENGINE", "ngram")
+    monkeypatch.setattr(lang_detect, "_default_identifier", None)
+    assert RuleBasedClassifier().classify(email, []).extra["lang"] == "pt"
+    assert not calls
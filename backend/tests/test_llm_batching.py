@@ -0,0 +1,102 @@
+from app.domain.entities import Email, Category
+from app.application.use_cases.sync_emails import SyncEmailsUseCase
+from app.infrastructure.classifiers.openai_llm import OpenAIClassifier
+from app.infrastructure.classifiers.rule_based import RuleBasedClassifier
+from app.infrastructure.classifiers.smart_classifier import SmartClassifier
+from app.infrastructure.http_client import PooledHttpClient
+from app.infrastructure.nlp.tokenizer_simple import SimpleTokenizer
+from scripts.mock_llm_server import MockLLMServer, batch_completion
+
+
+def _email(i):
+    return Email(subject=f"Dúvida {i}", body="Podemos conversar sobre o andamento do projeto na próxima semana?")
+
+
+def _llm(srv, monkeypatch, **kwargs):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    return OpenAIClassifier(http_client=PooledHttpClient(srv.base_url), **kwargs)
+
+
+def test_batch_packs_emails_into_one_completion(monkeypatch):
+    with MockLLMServer() as srv:
+        llm = _llm(srv, monkeypatch, batch_size=8)
+        emails = [_email(i) for i in range(8)]
+        results = llm.classify_batch(emails, [[] for _ in emails])
+
+    assert srv.requests == 1
+    assert srv.payloads[0]["tools"][0]["function"]["name"] == "emit_batch"
+    assert all(r.extra["llm"] and r.extra["llm_batch_size"] == 8 for r in results)
+    assert [r.extra["llm_batch_id"] for r in results] == [f"e{n}" for n in range(1, 9)]
+    assert all(r.category == Category.PRODUCTIVE for r in results)
+
+
+def test_missing_ids_fall_back_to_single_calls(monkeypatch):
+    with MockLLMServer(responder=lambda p: batch_completion(p, drop_ids=("e2", "e4"))) as srv:
+        llm = _llm(srv, monkeypatch, batch_size=5)
+        emails = [_email(i) for i in range(5)]
+        results = llm.classify_batch(emails, [[] for _ in emails])
+
+    # 1 lote + 2 chamadas individuais (a resposta individual do mock não é emit_batch)
+    assert srv.requests == 3
+    assert [p["tools"][0]["function"]["name"] for p in srv.payloads] == ["emit_batch", "emit", "emit"]
+    assert all(r.extra.get("llm") for r in results)
+    assert "llm_batch_size" not in results[1].extra and "llm_batch_size" not in results[3].extra
+    assert results[0].extra["llm_batch_size"] == 5
+
+
+def test_batch_failure_falls_back_for_every_email(monkeypatch):
+    with MockLLMServer(fail_statuses=[400]) as srv:
+        llm = _llm(srv, monkeypatch, batch_size=4)
+        emails = [_email(i) for i in range(3)]
+        results = llm.classify_batch(emails, [[] for _ in emails])
+
+    assert srv.requests == 4
+    assert all(r.extra.get("llm") for r in results)
+
+
+def test_smart_batch_sends_only_escalations(monkeypatch):
+    with MockLLMServer() as srv:
+        llm = _llm(srv, monkeypatch, batch_size=8)
+        smart = SmartClassifier(rule_based=RuleBasedClassifier(), llm=llm, min_conf=1.01)
+        emails = [_email(i) for i in range(3)] + [
+            Email(subject="PROMOÇÃO", body="Compre agora! Desconto imperdível, clique aqui, oferta grátis, unsubscribe")
+        ]
+        analyses = SimpleTokenizer(lang="auto").analyze_batch(emails)
+        results = smart.classify_batch(emails, [a.tokens for a in analyses], analyses=analyses)
+
+    assert results[3].extra["is_spam"] is True
+    assert srv.requests == 1
+    assert all(r.extra.get("llm_batch_size") == 3 for r in results[:3])
+
+
+class _FakeSource:
+    def __init__(self, emails):
+        self.emails = emails
+        self.moved = []
+
+    def fetch_unread(self):
+        yield from ((str(i), e) for i, e in enumerate(self.emails))
+
+    def move_to_folder(self, msg_id, folder):
+        self.moved.append((msg_id, folder))
+
+
+class _FakeRepo:
+    def __init__(self):
+        self.logs = []
+
+    def save(self, log):
+        self.logs.append(log)
+        return log
+
+
+def test_sync_classifies_in_batches(monkeypatch):
+    with MockLLMServer() as srv:
+        llm = _llm(srv, monkeypatch, batch_size=4)
+        smart = SmartClassifier(rule_based=RuleBasedClassifier(), llm=llm, min_conf=1.01)
+        source, repo = _FakeSource([_email(i) for i in range(10)]), _FakeRepo()
+        SyncEmailsUseCase(source, smart, repo, "default", SimpleTokenizer(lang="auto"), batch_size=4).run()
+
+    assert srv.requests == 3  # 4 + 4 + 2
+    assert len(repo.logs) == 10 and len(source.moved) == 10
+    assert [m[0] for m in source.moved] == [str(i) for i in range(10)]
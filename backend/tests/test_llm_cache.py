@@ -0,0 +1,96 @@
+import asyncio
+import sqlite3
+import threading
+
+from app.domain.entities import Email, Category
+from app.infrastructure.cache.llm_cache import SqliteLlmResponseCache
+from app.infrastructure.classifiers.openai_llm import OpenAIClassifier, PROMPT_VERSION
+from app.infrastructure.http_client import AsyncPooledHttpClient, PooledHttpClient
+from scripts.mock_llm_server import MockLLMServer
+
+EMAIL = Email(subject="Contrato", body="Podemos revisar o contrato amanhã?")
+ARGS = {"category": "productive", "reason": "ok", "reply": "Claro."}
+USAGE = {"prompt_tokens": 100, "completion_tokens": 20, "total_tokens": 120}
+
+
+def test_survives_restart_and_invalidates_on_new_schema_version(tmp_path):
+    path = str(tmp_path / "llm.db")
+    SqliteLlmResponseCache(path, schema_version="v1").put("gpt-4o-mini", "h1", ARGS, USAGE)
+
+    again = SqliteLlmResponseCache(path, schema_version="v1")
+    assert again.get("gpt-4o-mini", "h1") == (ARGS, USAGE)
+    assert again.get("gpt-4.1-mini", "h1") is None  # modelo faz parte da chave
+    assert again.stats()["tokens_saved"] == 120
+
+    bumped = SqliteLlmResponseCache(path, schema_version="v2")
+    assert bumped.stats()["invalidated"] == 1
+    assert bumped.get("gpt-4o-mini", "h1") is None
+
+
+def test_ttl_and_size_eviction(tmp_path):
+    expired = SqliteLlmResponseCache(str(tmp_path / "a.db"), schema_version="v1", ttl_s=-1)
+    expired.put("m", "h", ARGS, USAGE)
+    assert expired.get("m", "h") is None
+
+    small = SqliteLlmResponseCache(str(tmp_path / "b.db"), schema_version="v1", max_entries=10)
+    for i in range(300):
+        small.put("m", f"h{i}", ARGS, USAGE)
+    assert small.stats()["size"] <= 10 + 256
+    assert small.get("m", "h299") is not None
+
+
+def test_classifier_serves_repeated_prompt_from_disk(tmp_path, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    path = str(tmp_path / "llm.db")
+    with MockLLMServer() as srv:
+        def make():
+            return OpenAIClassifier(
+                http_client=PooledHttpClient(srv.base_url),
+                response_cache=SqliteLlmResponseCache(path, schema_version=PROMPT_VERSION),
+            )
+
+        first = make().classify(EMAIL, [])
+        second = make().classify(EMAIL, [])  # "restart": nova instância, mesmo arquivo
+
+    assert srv.requests == 1
+    assert first.total_tokens == 150 and not first.extra.get("llm_cached")
+    assert second.category == Category.PRODUCTIVE
+    assert second.extra["llm_cached"] is True and second.extra["llm_tokens_saved"] == 150
+    assert second.total_tokens is None
+
+
+def test_hits_are_recorded_in_batch_not_on_every_get(tmp_path):
+    path = str(tmp_path / "llm.db")
+    cache = SqliteLlmResponseCache(path, schema_version="v1")
+    cache.put("m", "h1", ARGS, USAGE)
+
+    def hits():
+        with sqlite3.connect(path) as db:
+            return db.execute("SELECT hits FROM llm_cache WHERE prompt_hash = 'h1'").fetchone()[0]
+
+    assert cache.get("m", "h1") and cache.get("m", "h1")
+    assert hits() == 0  # leitura não escreve
+    cache.put("m", "h2", ARGS, USAGE)
+    assert hits() == 2
+
+
+def test_async_classifier_touches_cache_off_the_event_loop(tmp_path, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    cache = SqliteLlmResponseCache(str(tmp_path / "llm.db"), schema_version=PROMPT_VERSION)
+    threads = []
+    for name in ("get", "put"):
+        original = getattr(cache, name)
+        monkeypatch.setattr(cache, name, lambda *a, _f=original: threads.append(threading.get_ident()) or _f(*a))
+
+    async def run(clf):
+        loop_thread = threading.get_ident()
+        await clf.aclassify(EMAIL, [])
+        await clf.aclassify(EMAIL, [])
+        return loop_thread
+
+    with MockLLMServer() as srv:
+        clf = OpenAIClassifier(async_http_client=AsyncPooledHttpClient(srv.base_url), response_cache=cache)
+        loop_thread = asyncio.run(run(clf))
+
+    assert srv.requests == 1 and len(threads) == 3  # get (miss), put, get (hit)
+    assert loop_thread not in threads
@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import inspect, tuple_
+from sqlmodel import SQLModel, select
+
+from app.domain.entities import ClassificationLog, LogQuery
+from app.infrastructure.db import build_engine, init_db, session_factory
+from app.infrastructure.models import ClassificationLogModel
+from app.infrastructure.repositories.sql_log_repository import SqlLogRepository
+
+T0 = datetime(2025, 1, 1, 12, 0, 0)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    engine = build_engine(str(tmp_path / "logs.db"))
+    init_db(engine)
+    repo = SqlLogRepository(session_factory=session_factory(engine))
+    # 30 logs em 10 instantes (empates de created_at) e 3 perfis
+    repo.save_many([
+        ClassificationLog(
+            created_at=T0 + timedelta(minutes=i // 3), source="api" if i % 2 else "imap",
+            profile_id=f"p{i % 3}", category="productive" if i % 5 else "unproductive",
+            subject=f"s{i}", body_excerpt="corpo " * 50, suggested_reply="resposta", extra={"i": i},
+        )
+        for i in range(30)
+    ])
+    yield repo
+    engine.dispose()
+
+
+def _walk(repo, **filters):
+    seen, after = [], None
+    while True:
+        page = repo.list_page(LogQuery(limit=7, after=after, **filters))
+        seen.extend(page.items)
+        if page.next_after is None:
+            return seen
+        after = page.next_after
+
+
+def test_keyset_walk_has_no_gaps_or_duplicates(repo):
+    logs = _walk(repo)
+    keys = [(log.created_at, log.id) for log in logs]
+    assert len(keys) == 30 and len(set(keys)) == 30
+    assert keys == sorted(keys, reverse=True)  # (created_at, id) decrescente, inclusive nos empates
+
+
+def test_filters_and_since(repo):
+    logs = _walk(repo, profile_id="p1", category="productive")
+    assert logs and all(log.profile_id == "p1" and log.category == "productive" for log in logs)
+    assert len(logs) == sum(1 for i in range(30) if i % 3 == 1 and i % 5)
+
+    recent = repo.list_page(LogQuery(limit=100, source="imap", since=T0 + timedelta(minutes=8))).items
+    assert {log.subject for log in recent} == {f"s{i}" for i in range(24, 30) if i % 2 == 0}
+
+
+def test_summary_projection_skips_heavy_columns(repo):
+    [log] = repo.list_page(LogQuery(limit=1, summary=True)).items
+    assert log.body_excerpt is None and log.suggested_reply is None and log.extra is None
+    assert log.subject == "s29" and log.profile_id == "p2" and log.created_at == T0 + timedelta(minutes=9)
+    assert repo.list_page(LogQuery(limit=1)).items[0].extra == {"i": 29}
+
+
+def test_filtered_keyset_query_seeks_composite_index(repo):
+    c = ClassificationLogModel.__table__.c
+    stmt = (
+        select(c.id).where(c.profile_id == "p1", tuple_(c.created_at, c.id) < tuple_(T0, 10))
+        .order_by(c.created_at.desc(), c.id.desc()).limit(50)
+    )
+    with repo.session_factory() as session:
+        conn = session.connection()
+        compiled = stmt.compile(conn)
+        params = tuple(str(compiled.params[k]) for k in compiled.positiontup)
+        plan = " ".join(row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params))
+    assert "ix_logs_profile_created_id" in plan and "TEMP B-TREE" not in plan
+
+
+def test_init_db_adds_indexes_to_existing_tables(tmp_path):
+    engine = build_engine(str(tmp_path / "old.db"))
+    SQLModel.metadata.create_all(engine)
+    with engine.begin() as conn:  # banco criado antes dos índices compostos
+        for name in ("ix_logs_profile_created_id", "ix_logs_category_created_id"):
+            conn.exec_driver_sql(f"DROP INDEX {name}")
+    init_db(engine)
+    names = {ix["name"] for ix in inspect(engine).get_indexes("classification_logs")}
+    assert {"ix_logs_profile_created_id", "ix_logs_category_created_id"} <= names
+    engine.dispose()
@@ -0,0 +1,122 @@
+from dataclasses import replace
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.domain.entities import ClassificationLog, LogSearchQuery
+from app.domain.errors import BadRequest
+from app.infrastructure.db import build_engine, init_db, session_factory
+from app.infrastructure.repositories.sql_log_repository import SqlLogRepository
+from app.infrastructure.repositories.sql_log_search_repository import (
+    FTS_TABLE, SqlLogSearchRepository, match_expression,
+)
+
+T0 = datetime(2025, 1, 1, 12, 0, 0)
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = build_engine(str(tmp_path / "logs.db"))
+    init_db(engine, log_search=True)
+    Session = session_factory(engine)
+    repo = SqlLogRepository(session_factory=Session)
+    repo.save_many([
+        ClassificationLog(created_at=T0, source="api", profile_id="p1", subject="Reunião de orçamento",
+                          sender="ana@acme.com", body_excerpt="Vamos revisar a fatura de março", reason="pedido"),
+        ClassificationLog(created_at=T0 + timedelta(minutes=1), source="imap", profile_id="p2",
+                          subject="Promoção imperdível", sender="promo@loja.com",
+                          body_excerpt="Desconto na fatura, clique aqui", reason="marketing"),
+        ClassificationLog(created_at=T0 + timedelta(minutes=2), source="api", profile_id="p1",
+                          subject="Fatura atrasada", sender="financeiro@acme.com",
+                          body_excerpt="Segue a segunda via", reason="cobrança"),
+    ])
+    yield engine, Session, repo
+    engine.dispose()
+
+
+def _search(Session, text, **kw):
+    with Session() as session:
+        return SqlLogSearchRepository(session).search(LogSearchQuery(text=text, **kw))
+
+
+def test_ranks_subject_matches_first_with_snippets(db):
+    _, Session, _ = db
+    page = _search(Session, "fatura")
+    assert [hit.log.subject for hit in page.items][0] == "Fatura atrasada"  # assunto pesa mais que o corpo
+    assert len(page.items) == 3 and page.next_offset is None
+    assert page.items[0].score >= page.items[1].score
+    assert "[Fatura]" in page.items[0].snippet
+    assert page.items[0].log.body_excerpt is None  # projeção summary
+
+    # sem acento, prefixo, remetente como frase, filtros
+    assert [h.log.subject for h in _search(Session, "reuniao orcam").items] == ["Reunião de orçamento"]
+    assert [h.log.sender for h in _search(Session, "financeiro@acme.com").items] == ["financeiro@acme.com"]
+    assert [h.log.profile_id for h in _search(Session, "fatura", profile_id="p2").items] == ["p2"]
+    assert len(_search(Session, "fatura", since=T0 + timedelta(minutes=1)).items) == 2
+    assert _search(Session, "orçam", prefix=False).items == []
+
+
+def test_pagination_by_offset(db):
+    _, Session, _ = db
+    first = _search(Session, "fatura", limit=2)
+    assert len(first.items) == 2 and first.next_offset == 2
+    rest = _search(Session, "fatura", limit=2, offset=first.next_offset)
+    assert len(rest.items) == 1 and rest.next_offset is None
+    assert {h.log.id for h in first.items + rest.items} == {1, 2, 3}
+
+
+def test_max_ranked_keeps_only_newest_matches(db):
+    _, Session, _ = db
+    with Session() as session:
+        repo = SqlLogSearchRepository(session, max_ranked=2)
+        page = repo.search(LogSearchQuery(text="fatura", limit=1))
+        assert page.next_offset == 1
+        last = repo.search(LogSearchQuery(text="fatura", limit=1, offset=1))
+        assert last.next_offset is None
+        assert {h.log.id for h in page.items + last.items} == {2, 3}
+        # o log 1, mais antigo, ficou fora da janela: segue por id, sem ranking
+        assert last.next_before_id == 2
+        older = repo.search(LogSearchQuery(text="fatura", limit=1, before_id=last.next_before_id))
+        assert [h.log.id for h in older.items] == [1] and "[fatura]" in older.items[0].snippet
+        assert older.next_offset is None and older.next_before_id is None
+        assert [h.log.id for h in repo.search(LogSearchQuery(text="fatura", offset=2)).items] == [1]
+        # a janela conta só os que passam nos filtros
+        assert [h.log.id for h in repo.search(LogSearchQuery(text="fatura", profile_id="p1")).items] == [3, 1]
+
+
+def test_triggers_follow_updates_and_deletes(db):
+    engine, Session, repo = db
+    log = repo.get_by_id(2)
+    repo.update_result(2, replace(log, reason="phishing suspeito", used_model="gpt-4.1-nano"))
+    assert [h.log.id for h in _search(Session, "phishing").items] == [2]
+    assert _search(Session, "marketing").items == []
+    assert [h.log.id for h in _search(Session, "fatura", used_model="gpt-4.1-nano").items] == [2]
+
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DELETE FROM classification_logs WHERE id = 2")
+    assert _search(Session, "phishing").items == []
+    with engine.connect() as conn:  # índice íntegro em relação à tabela de conteúdo
+        conn.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rank) VALUES ('integrity-check', 1)")
+
+
+def test_init_backfills_existing_logs_and_can_be_disabled(tmp_path):
+    engine = build_engine(str(tmp_path / "old.db"))
+    init_db(engine, log_search=False)
+    SqlLogRepository(session_factory=session_factory(engine)).save(
+        ClassificationLog(created_at=T0, source="api", subject="Contrato assinado")
+    )
+    init_db(engine, log_search=True)
+    assert [h.log.subject for h in _search(session_factory(engine), "contrato").items] == ["Contrato assinado"]
+
+    init_db(engine, log_search=False)
+    with engine.connect() as conn:
+        names = {r[0] for r in conn.exec_driver_sql("SELECT name FROM sqlite_master")}
+    assert not any(name.startswith(FTS_TABLE) for name in names)
+    engine.dispose()
+
+
+def test_match_expression_neutralizes_fts_syntax():
+    assert match_expression('joao@acme.com "NEAR(a b)" -x') == '"joao acme com" "NEAR a" "b" "x"*'
+    assert match_expression("fatura", prefix=False) == '"fatura"'
+    with pytest.raises(BadRequest):
+        match_expression('" * -')
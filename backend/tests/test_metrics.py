@@ -0,0 +1,92 @@
+import pytest
+
+from app.application.use_cases.classify_email import ClassifyEmailUseCase
+from app.domain.entities import Category, ClassificationResult, Email
+from app.infrastructure.classifiers.rule_based import RuleBasedClassifier
+from app.infrastructure.nlp.tokenizer_simple import SimpleTokenizer
+from app.infrastructure.pricing import PriceTable
+from app.infrastructure.responders.simple_templates import SimpleResponder
+from app.metrics import counter, histogram, render_prometheus
+
+
+class _Repo:
+    def __init__(self):
+        self.logs = []
+
+    def save(self, log):
+        self.logs.append(log)
+        return log
+
+    def save_many(self, logs):
+        self.logs.extend(logs)
+        return logs
+
+
+class _FakeLLM(RuleBasedClassifier):
+    def classify(self, *a, **kw):
+        res = super().classify(*a, **kw)
+        return ClassificationResult(
+            category=Category.PRODUCTIVE, reason="llm", suggested_reply="", used_model="gpt-4.1-nano-2025-04-14",
+            prompt_tokens=1_000, completion_tokens=100, total_tokens=1_100, extra=res.extra,
+        )
+
+
+def _uc(classifier, repo):
+    return ClassifyEmailUseCase(
+        file_facade=None,
+        tokenizer=SimpleTokenizer(lang="auto"),
+        classifier=classifier,
+        responder=SimpleResponder(),
+        profiles=type("P", (), {"get_profile": lambda self, pid: {"mood": None}})(),
+        log_repo=repo,
+        prices=PriceTable(),
+    )
+
+
+def test_prometheus_text_format():
+    h = histogram("test_op_seconds", (0.1, 1.0), help="Operação de teste", labels={"op": 'a"b'})
+    h.observe(0.05)
+    h.observe(2.0)
+    counter("test_events_total", help="Eventos", labels={"kind": "x"}).inc(3)
+
+    text = render_prometheus()
+    assert "# TYPE test_op_seconds histogram" in text
+    assert 'test_op_seconds_bucket{op="a\\"b",le="0.1"} 1' in text
+    assert 'test_op_seconds_bucket{op="a\\"b",le="+Inf"} 2' in text
+    assert 'test_op_seconds_count{op="a\\"b"} 2' in text
+    assert '# TYPE test_events_total counter\ntest_events_total{kind="x"} 3.0' in text
+
+
+def test_price_table_prefix_match_and_override():
+    prices = PriceTable.parse("meu-modelo=1/4")
+    assert prices.cost("gpt-4.1-nano-2025-04-14", 1_000_000, 1_000_000) == pytest.approx(0.50)
+    assert prices.cost("gpt-4.1-mini", 1_000_000, 0) == pytest.approx(0.40)  # não casa com gpt-4.1
+    assert prices.cost("meu-modelo", 500_000, 250_000) == pytest.approx(1.50)
+    assert prices.cost("rule-based", 10, 10) == 0.0
+    with pytest.raises(ValueError):
+        PriceTable.parse("sem-preco")
+
+
+def test_use_case_records_latency_cost_and_stage_timings():
+    repo = _Repo()
+    res = _uc(_FakeLLM(), repo).execute_from_text("Reunião", "Segue a proposta do contrato para revisão")
+
+    log = repo.logs[0]
+    assert res.cost_usd == pytest.approx((1_000 * 0.10 + 100 * 0.40) / 1e6)
+    assert log.cost_usd == res.cost_usd
+    assert log.latency_ms is not None and res.latency_ms >= sum(log.extra["timings_ms"].values()) - 1
+    assert {"lookup", "preprocess", "lang_detect", "tokenize", "classify", "respond"} <= set(log.extra["timings_ms"])
+
+    text = render_prometheus()
+    assert 'classify_stage_seconds_bucket{stage="lang_detect",le="+Inf"}' in text
+    assert 'classify_stage_seconds_count{stage="persist"}' in text
+    assert 'llm_tokens_total{kind="prompt",model="gpt-4.1-nano-2025-04-14"}' in text
+
+
+def test_batch_logs_carry_latency():
+    repo = _Repo()
+    items = _uc(RuleBasedClassifier(), repo).classify_batch(
+        [Email(subject="a", body="reunião amanhã"), Email(subject="b", body="segue o contrato")]
+    )
+    assert all(i.result.latency_ms is not None for i in items)
+    assert all(log.latency_ms is not None and log.cost_usd == 0.0 for log in repo.logs)
@@ -0,0 +1,74 @@
+import threading
+
+from app.domain.entities import Email, ClassificationResult, Category
+from app.domain.ports import ClassifierPort
+from app.infrastructure.classifiers.micro_batcher import MicroBatchingClassifier
+
+
+class RecordingClassifier(ClassifierPort):
+    def __init__(self):
+        self.calls = []
+        self.gate = threading.Event()
+
+    def classify(self, email, tokens, mood=None, priority=None):
+        raise AssertionError("o micro-batcher deve usar classify_batch")
+
+    def classify_batch(self, emails, tokens, mood=None, priority=None, analyses=None):
+        self.gate.wait(1)
+        self.calls.append(len(emails))
+        return [
+            ClassificationResult(category=Category.PRODUCTIVE, reason=e.body, suggested_reply="")
+            for e in emails
+        ]
+
+
+def test_concurrent_calls_are_batched_and_resolved_in_order():
+    inner = RecordingClassifier()
+    mb = MicroBatchingClassifier(inner, max_batch_size=8, max_wait_ms=50)
+    results = {}
+
+    def call(i):
+        results[i] = mb.classify(Email(subject=None, body=str(i)), [])
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(10)]
+    for t in threads:
+        t.start()
+    inner.gate.set()
+    for t in threads:
+        t.join()
+    mb.close()
+
+    assert {i: r.reason for i, r in results.items()} == {i: str(i) for i in range(10)}
+    assert sum(inner.calls) == 10
+    assert max(inner.calls) > 1
+    assert all(n <= 8 for n in inner.calls)
+
+
+def test_errors_propagate_to_callers():
+    class Failing(RecordingClassifier):
+        def classify_batch(self, emails, tokens, mood=None, priority=None, analyses=None):
+            raise ValueError("boom")
+
+    mb = MicroBatchingClassifier(Failing())
+    try:
+        mb.classify(Email(subject=None, body="x"), [])
+        raised = False
+    except ValueError:
+        raised = True
+    mb.close()
+    assert raised
+
+
+def test_short_result_list_fails_callers_instead_of_hanging():
+    class Short(RecordingClassifier):
+        def classify_batch(self, emails, tokens, mood=None, priority=None, analyses=None):
+            return super().classify_batch(emails, tokens)[:-1]
+
+    mb = MicroBatchingClassifier(Short())
+    try:
+        mb.classify(Email(subject=None, body="x"), [])
+        raised = False
+    except RuntimeError:
+        raised = True
+    mb.close()
+    assert raised
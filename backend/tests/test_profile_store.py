@@ -0,0 +1,110 @@
+import json
+import os
+import threading
+import time
+
+from app.infrastructure.nlp.keyword_matcher import KeywordSet
+from app.infrastructure.profiles.profile_store import CompiledProfileStore
+
+
+def _write(path, profiles):
+    path.write_text(json.dumps(profiles), encoding="utf-8")
+
+
+def _profile(*keywords, synonyms=None):
+    return {"mood": "neutro", "priority_keywords": list(keywords), "keyword_synonyms": synonyms or {}}
+
+
+def test_compiles_once_with_expanded_keywords(tmp_path):
+    path = tmp_path / "profiles.json"
+    _write(path, {"rh": _profile("Vaga", synonyms={"vaga": ["Processo Seletivo"]})})
+    store = CompiledProfileStore(str(path), watch=False)
+
+    p = store.get_compiled("rh")
+    assert isinstance(p.priority, KeywordSet)
+    assert list(p.priority) == ["processo seletivo", "vaga"]
+    assert p.priority.matcher.find("novo processo seletivo para a vaga") == {"processo seletivo": 1, "vaga": 1}
+    assert store.get_compiled("rh") is p
+    assert store.get_compiled("missing") is None
+    assert store.stats()["compiles"] == 1
+
+
+def test_lru_evicts_least_recently_used(tmp_path):
+    path = tmp_path / "profiles.json"
+    _write(path, {f"t{i}": _profile(f"k{i}") for i in range(3)})
+    store = CompiledProfileStore(str(path), watch=False, max_compiled=2)
+
+    a = store.get_compiled("t0")
+    store.get_compiled("t1")
+    assert store.get_compiled("t0") is a  # t0 passa a ser o mais recente
+    store.get_compiled("t2")              # expulsa t1
+    assert store.stats()["compiled"] == 2
+    assert store.stats()["evictions"] == 1
+    assert store.get_compiled("t0") is a
+
+
+def test_reload_swaps_snapshot_and_changes_version(tmp_path):
+    path = tmp_path / "profiles.json"
+    _write(path, {"default": _profile("boleto")})
+    store = CompiledProfileStore(str(path), watch=True, check_interval_s=0)
+    before = store.get_compiled("default")
+
+    _write(path, {"default": _profile("fatura")})
+    store.reload()
+    after = store.get_compiled("default")
+    assert list(after.priority) == ["fatura"]
+    assert after.version != before.version
+    assert list(before.priority) == ["boleto"]  # quem segurava o snapshot antigo não é afetado
+
+
+def test_invalid_json_keeps_previous_snapshot(tmp_path):
+    path = tmp_path / "profiles.json"
+    _write(path, {"default": _profile("boleto")})
+    store = CompiledProfileStore(str(path), watch=False)
+
+    path.write_text("{ quebrado", encoding="utf-8")
+    stats = store.reload()
+    assert stats["reload_errors"] == 1 and stats["last_error"]
+    assert list(store.get_compiled("default").priority) == ["boleto"]
+
+
+def test_concurrent_readers_during_reloads(tmp_path):
+    path = tmp_path / "profiles.json"
+    _write(path, {"default": _profile("a")})
+    store = CompiledProfileStore(str(path), watch=False)
+    errors = []
+
+    def reader():
+        for _ in range(500):
+            p = store.get_compiled("default")
+            if p is None or len(p.priority) != 1:
+                errors.append(p)
+
+    threads = [threading.Thread(target=reader) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for kw in "bcdef":
+        _write(path, {"default": _profile(kw)})
+        store.reload()
+    for t in threads:
+        t.join()
+    assert not errors
+
+
+def test_watch_reloads_in_background_without_blocking_readers(tmp_path):
+    path = tmp_path / "profiles.json"
+    _write(path, {"default": _profile("boleto")})
+    store = CompiledProfileStore(str(path), watch=True, check_interval_s=0)
+    gate = threading.Event()
+    load = store._load
+    store._load = lambda: gate.wait(2) and load()
+
+    _write(path, {"default": _profile("fatura")})
+    os.utime(path, ns=(time.time_ns(), time.time_ns() + 10**9))
+    # a releitura está presa no gate: o leitor que disparou a checagem não espera por ela
+    assert list(store.get_compiled("default").priority) == ["boleto"]
+    gate.set()
+    deadline = time.monotonic() + 2
+    while store.stats()["reloads"] == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert list(store.get_compiled("default").priority) == ["fatura"]
@@ -0,0 +1,127 @@
+import asyncio
+import pstats
+
+import pytest
+
+from app.application.use_cases.sync_emails import SyncEmailsUseCase
+from app.infrastructure.executor import UseCaseExecutor
+from app.profiling import SamplingProfiler, profiler
+
+
+def _work(n=2000):
+    return sum(i * i for i in range(n))
+
+
+def test_disabled_profiler_is_a_no_op():
+    prof = SamplingProfiler(enabled=False)
+    with prof.maybe("x"):
+        _work()
+    assert prof.maybe("x") is prof.maybe("y")  # contexto nulo compartilhado
+    assert prof.samples() == [] and not prof.should_sample(forced=True)
+
+
+def test_ring_buffer_and_merged_stats_are_stable():
+    prof = SamplingProfiler(enabled=True, sample_rate=1.0, max_profiles=2)
+    for _ in range(3):
+        with prof.maybe("job"):
+            _work()
+
+    assert len(prof.samples()) == 2 and prof.stats()["sampled"] == 3
+    first = prof.merged(sort="cumulative", limit=20)
+    again = prof.merged(sort="cumulative", limit=20)
+    assert first == again  # somar não altera as amostras guardadas
+    assert any("_work" in row["function"] for row in first["functions"])
+    with pytest.raises(ValueError):
+        prof.merged(sort="bogus")
+
+
+def test_forced_sampling_and_dump(tmp_path):
+    prof = SamplingProfiler(enabled=False, allow_forced=True)
+    with prof.maybe("req", forced=True):
+        _work()
+
+    paths = prof.dump(str(tmp_path))
+    assert len(paths) == 2 and paths[0].endswith("merged.pstats")
+    stats = pstats.Stats(paths[0])
+    assert any(fn == "_work" for (_, _, fn) in stats.stats)
+
+
+def test_executor_profiles_in_worker_thread():
+    class UC:
+        def heavy(self, n):
+            return _work(n)
+
+    ex = UseCaseExecutor(use_case=UC(), kind="thread", workers=1)
+    try:
+        result, stats, ms = asyncio.run(ex.run_profiled("heavy", 500))
+    finally:
+        ex.shutdown()
+    assert result == _work(500) and ms > 0
+    assert any(fn == "heavy" for (_, _, fn) in stats)
+
+
+def test_sync_run_is_sampled(monkeypatch):
+    class Source:
+        def fetch_unread(self):
+            return []
+
+    monkeypatch.setattr(profiler, "enabled", True)
+    monkeypatch.setattr(profiler, "sample_rate", 1.0)
+    profiler.clear()
+    SyncEmailsUseCase(Source(), classifier=None, repo=None, profile_id="default", tokenizer=None).run()
+    assert [s["name"] for s in profiler.samples()] == ["sync_emails.run"]
+    profiler.clear()
+
+
+def test_nested_samples_on_one_thread_are_skipped():
+    prof = SamplingProfiler(enabled=True, sample_rate=1.0)
+    with prof.maybe("outer"):
+        with prof.maybe("inner"):
+            _work()
+    assert [s["name"] for s in prof.samples()] == ["outer"]
+    with prof.maybe("after"):  # a guarda é liberada ao sair
+        _work()
+    assert [s["name"] for s in prof.samples()] == ["outer", "after"]
+
+
+
+def test_async_classify_records_one_sample_from_executor_steps():
+    from app.application.use_cases.classify_email import ClassifyEmailUseCase
+    from app.domain.entities import Category, ClassificationResult
+    from app.infrastructure.nlp.tokenizer_simple import SimpleTokenizer
+    from app.infrastructure.responders.simple_templates import SimpleResponder
+
+    class LLM:
+        prefers_async = True
+
+        async def aclassify(self, email, tokens, **kwargs):
+            await asyncio.sleep(0.01)
+            return ClassificationResult(category=Category.PRODUCTIVE, reason="llm", suggested_reply="")
+
+    class Repo:
+        def save(self, log):
+            return log
+
+    uc = ClassifyEmailUseCase(
+        file_facade=None,
+        tokenizer=SimpleTokenizer(lang="pt"),
+        classifier=LLM(),
+        responder=SimpleResponder(),
+        profiles=type("P", (), {"get_profile": lambda self, pid: {"mood": None}})(),
+        log_repo=Repo(),
+    )
+    ex = UseCaseExecutor(use_case=uc, kind="thread", workers=1)
+    uc.offload = ex.call
+    profiler.clear()
+    try:
+        asyncio.run(uc.aexecute_from_text("Dúvida", "Podemos conversar amanhã?"))
+        assert profiler.samples() == []  # não amostrada
+        asyncio.run(uc.aexecute_from_text("Dúvida", "Podemos conversar amanhã?", sampled=True))
+    finally:
+        ex.shutdown()
+
+    samples = profiler.samples("/classify")
+    assert len(samples) == 1 and samples[0]["duration_ms"] >= 10  # o await do LLM conta na duração
+    fns = {fn for (_, _, fn) in samples[0]["stats"]}
+    assert {"_lookup_and_analyze", "_complete"} <= fns
+    profiler.clear()
@@ -0,0 +1,96 @@
+import asyncio
+import threading
+
+from app.domain.entities import Email
+from app.infrastructure.classifiers.openai_llm import OpenAIClassifier
+from app.infrastructure.http_client import AsyncPooledHttpClient, PooledHttpClient
+from app.infrastructure.nlp.prompt_compactor import (
+    IdfTable, PromptCompactor, estimate_tokens, strip_quoted,
+)
+from scripts.mock_llm_server import MockLLMServer
+
+THREAD = """Olá equipe,
+
+Precisamos aprovar o orçamento do contrato até sexta-feira.
+
+Esta mensagem pode conter informação confidencial e é destinada apenas ao destinatário.
+Se você a recebeu por engano, apague-a.
+
+Em seg., 3 de jun. de 2024 às 10:00, Fulano <fulano@exemplo.com> escreveu:
+> Segue a proposta revisada.
+> Qualquer dúvida me avise.
+"""
+
+
+def test_strip_quoted_removes_history_and_disclaimer():
+    out = strip_quoted(THREAD)
+    assert "orçamento do contrato" in out
+    assert "proposta revisada" not in out
+    assert "confidencial" not in out and "engano" not in out
+
+
+def test_strip_quoted_keeps_body_when_everything_is_quoted():
+    assert PromptCompactor().compact("> só citação aqui").text == "> só citação aqui"
+
+
+def test_estimate_tokens_grows_with_text():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("ok.") == 2
+    short, long = estimate_tokens("reunião amanhã"), estimate_tokens("reunião amanhã " * 10)
+    assert 0 < short < long
+
+
+def test_budget_keeps_keyword_sentences_in_order():
+    filler = " ".join(f"Frase de enchimento número {i} sem nada relevante." for i in range(40))
+    body = f"Bom dia. {filler} Precisamos renovar o contrato da fatura 123. {filler} Obrigado pela atenção."
+    comp = PromptCompactor(token_budget=40).compact(body, keywords=["contrato", "fatura"])
+
+    assert comp.tokens_after <= 40 < comp.tokens_before
+    assert "renovar o contrato da fatura 123" in comp.text
+    assert comp.sentences_kept < comp.sentences_total
+    assert "…" in comp.text
+
+
+def test_idf_table_weights_rare_terms_higher():
+    class _Vec:
+        vocabulary_ = {"reunião": 0, "olá": 1, "olá equipe": 2}
+        idf_ = [4.0, 1.0, 2.0]
+
+    idf = IdfTable.from_vectorizer(_Vec())
+    assert idf.weights(["reunião", "olá", "desconhecido"]) == [4.0, 1.0, 2.0]
+
+    body = "Olá olá. Olá olá. Reunião marcada."
+    comp = PromptCompactor(token_budget=8, idf=idf).compact(body)
+    assert comp.text.startswith("…") and "Reunião" in comp.text
+
+
+def test_llm_prompt_uses_compacted_body(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    with MockLLMServer() as srv:
+        llm = OpenAIClassifier(http_client=PooledHttpClient(srv.base_url), compactor=PromptCompactor(token_budget=60))
+        res = llm.classify(Email(subject="Orçamento", body=THREAD), [])
+
+    prompt = srv.payloads[0]["messages"][1]["content"]
+    assert "orçamento do contrato" in prompt and "proposta revisada" not in prompt
+    assert res.extra["prompt_compaction"]["tokens_after"] < res.extra["prompt_compaction"]["tokens_before"]
+
+
+def test_async_compaction_runs_off_the_event_loop(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    compactor = PromptCompactor(token_budget=60)
+    threads = []
+    real_compact = compactor.compact
+    monkeypatch.setattr(compactor, "compact", lambda *a, **k: threads.append(threading.get_ident()) or real_compact(*a, **k))
+
+    async def run():
+        return threading.get_ident(), await llm.aclassify(Email(subject="Orçamento", body=THREAD), [])
+
+    with MockLLMServer() as srv:
+        llm = OpenAIClassifier(
+            http_client=PooledHttpClient(srv.base_url), async_http_client=AsyncPooledHttpClient(srv.base_url),
+            compactor=compactor,
+        )
+        loop_thread, res = asyncio.run(run())
+
+    assert res.extra["prompt_compaction"] and srv.requests == 1
+    assert threads and loop_thread not in threads
@@ -0,0 +1,63 @@
+import json
+
+from app.domain.entities import Email
+from app.infrastructure.classifiers import openai_llm
+from app.infrastructure.classifiers.openai_llm import OpenAIClassifier, SYSTEM_PROMPT, profile_prompt_prefix
+from app.infrastructure.nlp.keyword_matcher import KeywordSet
+from app.infrastructure.nlp.prompt_compactor import estimate_tokens
+from app.infrastructure.profiles.profile_store import CompiledProfileStore
+
+
+def _clf(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    return OpenAIClassifier(http_client=object(), async_http_client=object())
+
+
+def test_profile_prefix_is_memoized_per_profile(monkeypatch):
+    openai_llm._profile_prefixes.clear()
+    calls = []
+    real_dumps = openai_llm.json.dumps
+    monkeypatch.setattr(openai_llm.json, "dumps", lambda *a, **k: calls.append(1) or real_dumps(*a, **k))
+
+    priority = KeywordSet(["contrato", "fatura", "prazo"])
+    first = profile_prompt_prefix(priority, "formal")
+    assert profile_prompt_prefix(priority, "formal") is first
+    assert len(calls) == 1
+    assert '"contrato", "fatura", "prazo"' in first and "formal" in first
+    assert profile_prompt_prefix(priority, "casual") != first
+
+
+def test_emails_of_same_profile_share_prompt_prefix(monkeypatch):
+    clf = _clf(monkeypatch)
+    priority = KeywordSet(["contrato", "fatura"])
+    a = clf._prepare(Email(subject="A", body="Segue o contrato."), [], "formal", priority, None)[1]
+    b = clf._prepare(Email(subject="B", body="Fatura em anexo."), [], "formal", priority, None)[1]
+
+    assert a.payload["messages"][0]["content"] == b.payload["messages"][0]["content"] == SYSTEM_PROMPT
+    prefix = profile_prompt_prefix(priority, "formal")
+    assert a.payload["messages"][1]["content"].startswith(prefix + "\n\nEmail:")
+    assert b.payload["messages"][1]["content"].startswith(prefix + "\n\nEmail:")
+    assert a.prompt_hash != b.prompt_hash
+
+    stats = clf.prompt_stats()
+    assert stats["builds"] == 2
+    assert 0.0 < stats["cacheable_prefix_ratio"] < 1.0
+
+
+def test_profile_store_precomputes_prefix_and_token_count(tmp_path, monkeypatch, capsys):
+    path = tmp_path / "profiles.json"
+    path.write_text(json.dumps({"fin": {"mood": "formal", "priority_keywords": ["fatura", "prazo"]}}), encoding="utf-8")
+    store = CompiledProfileStore(str(path), watch=False)
+
+    profile = store.get_compiled("fin")
+    expected = profile_prompt_prefix(["fatura", "prazo"], "formal")
+    assert profile.prompt_prefix == expected
+    assert profile.prompt_prefix_tokens == estimate_tokens(expected) > 0
+    assert capsys.readouterr().out.count(f"+ {profile.prompt_prefix_tokens} do perfil") == 1
+    store.get_compiled("fin")
+    assert "Prefixo do prompt" not in capsys.readouterr().out  # logado uma vez, na compilação
+
+    clf = _clf(monkeypatch)
+    req = clf._prepare(Email(subject="A", body="Fatura vence amanhã."), [], profile.mood, profile.priority, None)[1]
+    assert req.payload["messages"][1]["content"].startswith(profile.prompt_prefix + "\n\n")
+    assert clf.prompt_stats()["profile_prefix_tokens"] == {"fin": profile.prompt_prefix_tokens}
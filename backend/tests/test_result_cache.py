@@ -0,0 +1,78 @@
+from app.application.use_cases.classify_email import ClassifyEmailUseCase
+from app.domain.entities import Email, ClassificationResult, Category
+from app.infrastructure.cache.result_cache import LruTtlResultCache
+from app.infrastructure.classifiers.rule_based import RuleBasedClassifier
+from app.infrastructure.nlp.tokenizer_simple import SimpleTokenizer
+from app.infrastructure.responders.simple_templates import SimpleResponder
+
+
+def _result(reason="ok"):
+    return ClassificationResult(category=Category.PRODUCTIVE, reason=reason, suggested_reply="", total_tokens=10)
+
+
+def test_key_normalizes_whitespace_and_sender_case():
+    cache = LruTtlResultCache("v1")
+    a = cache.key_for(Email(subject=" Hi ", body="a  b\n c", sender="X@Y.com"), "default")
+    b = cache.key_for(Email(subject="Hi", body="a b c", sender="x@y.com"), "default")
+    assert a == b
+    assert a != cache.key_for(Email(subject="Hi", body="a b c", sender="x@y.com"), "rh")
+    assert a != LruTtlResultCache("v2").key_for(Email(subject="Hi", body="a b c", sender="x@y.com"), "default")
+
+
+def test_lru_eviction_and_ttl():
+    cache = LruTtlResultCache("v1", max_entries=2, ttl_s=60)
+    cache.put("a", _result("a"))
+    cache.put("b", _result("b"))
+    assert cache.get("a").reason == "a"  # "a" passa a ser o mais recente
+    cache.put("c", _result("c"))
+    assert cache.get("b") is None
+    assert cache.stats()["evictions"] == 1
+
+    expired = LruTtlResultCache("v1", ttl_s=-1)
+    expired.put("a", _result())
+    assert expired.get("a") is None
+
+
+def test_sqlite_tier_survives_restart(tmp_path):
+    path = str(tmp_path / "cache.db")
+    LruTtlResultCache("v1", sqlite_path=path).put("k", _result("from disk"))
+    fresh = LruTtlResultCache("v1", sqlite_path=path)
+    assert fresh.get("k").reason == "from disk"
+    assert fresh.stats()["disk_hits"] == 1
+
+
+class CountingClassifier(RuleBasedClassifier):
+    calls = 0
+
+    def classify(self, *a, **kw):
+        CountingClassifier.calls += 1
+        return super().classify(*a, **kw)
+
+
+class Repo:
+    def __init__(self):
+        self.logs = []
+
+    def save(self, log):
+        self.logs.append(log)
+        return log
+
+
+def test_use_case_hit_skips_classifier_and_logs_cached():
+    repo = Repo()
+    uc = ClassifyEmailUseCase(
+        file_facade=None,
+        tokenizer=SimpleTokenizer(lang="pt"),
+        classifier=CountingClassifier(),
+        responder=SimpleResponder(),
+        profiles=type("P", (), {"get_profile": lambda self, pid: {"mood": None}})(),
+        log_repo=repo,
+        cache=LruTtlResultCache("v1"),
+    )
+    first = uc.execute_from_text("Reunião", "Segue a proposta e o contrato")
+    second = uc.execute_from_text("Reunião", "Segue a proposta  e o contrato")
+
+    assert CountingClassifier.calls == 1
+    assert second.category == first.category
+    assert not (first.extra or {}).get("cached")
+    assert repo.logs[1].extra["cached"] is True and len(repo.logs) == 2
@@ -0,0 +1,135 @@
+from dataclasses import replace
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.domain.entities import ClassificationLog, StatsQuery
+from app.infrastructure.db import build_engine, init_db, session_factory
+from app.infrastructure.repositories.sql_log_repository import SqlLogRepository
+from app.infrastructure.repositories.sql_rollup_repository import SqlRollupRepository
+
+T0 = datetime(2025, 1, 1, 22, 0, 0)
+
+
+def _log(i, **kw):
+    fields = dict(
+        created_at=T0 + timedelta(minutes=20 * i), source="api" if i % 2 else "imap",
+        profile_id=f"p{i % 3}", category="productive" if i % 4 else "unproductive",
+        used_model="rule-based", prompt_tokens=10, completion_tokens=5, total_tokens=15,
+        cost_usd=0.001, latency_ms=10 * (i + 1),
+    )
+    fields.update(kw)
+    return ClassificationLog(**fields)
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = build_engine(str(tmp_path / "logs.db"))
+    init_db(engine)
+    Session = session_factory(engine)
+    yield Session
+    engine.dispose()
+
+
+def _stats(Session, **kw):
+    with Session() as session:
+        return SqlRollupRepository(session).stats(StatsQuery(**kw))
+
+
+def test_incremental_rollups_match_rebuild(db):
+    repo = SqlLogRepository(session_factory=db)
+    repo.save_many([_log(i) for i in range(12)])  # 22:00 → 01:40, atravessa a virada do dia
+    repo.save(_log(12, profile_id=None, latency_ms=None))
+
+    queries = [
+        dict(),
+        dict(granularity="day", group_by=("profile_id", "category")),
+        dict(granularity="total", group_by=("source",), since=T0 + timedelta(minutes=50)),
+    ]
+    incremental = [_stats(db, **q) for q in queries]
+    with db() as session:
+        assert SqlRollupRepository(session).rebuild() > 0
+    assert [_stats(db, **q) for q in queries] == incremental
+
+    hourly = incremental[0]
+    assert [row["bucket"] for row in hourly] == [
+        "2025-01-01T22:00:00", "2025-01-01T23:00:00", "2025-01-02T00:00:00",
+        "2025-01-02T01:00:00", "2025-01-02T02:00:00",
+    ]
+    assert [row["count"] for row in hourly] == [3, 3, 3, 3, 1]
+    assert hourly[0]["avg_latency_ms"] == 20.0 and hourly[-1]["avg_latency_ms"] is None
+
+    [total] = _stats(db, granularity="total")
+    assert total["count"] == 13 and total["total_tokens"] == 195 and total["cost_usd"] == pytest.approx(0.013)
+
+    daily = _stats(db, granularity="day", group_by=("profile_id",), until=datetime(2025, 1, 2))
+    assert daily == [
+        {"bucket": "2025-01-01", "profile_id": p, "count": 2, "prompt_tokens": 20, "completion_tokens": 10,
+         "total_tokens": 30, "cost_usd": 0.002, "avg_latency_ms": lat}
+        for p, lat in (("p0", 25.0), ("p1", 35.0), ("p2", 45.0))
+    ]
+    assert _stats(db, granularity="total", group_by=("profile_id",), profile_id=None)[0]["profile_id"] is None
+
+
+def test_update_result_moves_counts_between_keys(db):
+    repo = SqlLogRepository(session_factory=db)
+    provisional = repo.save(_log(1, used_model="rule-based", category="productive", total_tokens=0))
+    repo.update_result(provisional.id, replace(provisional, used_model="gpt-4.1-nano", category="unproductive",
+                                               total_tokens=200, latency_ms=900))
+
+    rows = _stats(db, granularity="total", group_by=("used_model", "category"))
+    assert [(r["used_model"], r["category"], r["count"], r["total_tokens"], r["avg_latency_ms"]) for r in rows] == [
+        ("gpt-4.1-nano", "unproductive", 1, 200, 900.0),  # a linha zerada do provisório não aparece
+    ]
+
+
+def test_rollups_off_and_rebuild_backfills(db):
+    SqlLogRepository(session_factory=db, rollups=False).save_many([_log(i) for i in range(4)])
+    assert _stats(db) == []
+    with db() as session:
+        assert SqlRollupRepository(session).rebuild() == 4  # 4 horas × combinações distintas
+    assert sum(row["count"] for row in _stats(db)) == 4
+
+
+def test_stats_query_rejects_unknown_dimensions():
+    with pytest.raises(ValueError):
+        StatsQuery(group_by=("subject",))
+    with pytest.raises(ValueError):
+        StatsQuery(granularity="minute")
+
+
+def test_sync_logs_land_in_the_hour_they_were_classified(db, monkeypatch):
+    from app.application.use_cases import sync_emails
+    from app.domain.entities import Email
+    from app.infrastructure.classifiers.rule_based import RuleBasedClassifier
+    from app.infrastructure.nlp.tokenizer_simple import SimpleTokenizer
+
+    clock = iter([T0 + timedelta(minutes=10), T0 + timedelta(minutes=50), T0 + timedelta(minutes=70)])
+
+    class _Clock(datetime):
+        @classmethod
+        def utcnow(cls):
+            return next(clock)
+
+    monkeypatch.setattr(sync_emails, "datetime", _Clock)
+
+    class Source:
+        def fetch_unread(self):
+            return [(str(i), Email(subject=f"s{i}", body="Podemos revisar o contrato?")) for i in range(3)]
+
+        def move_to_folder(self, msg_id, folder):
+            pass
+
+    repo = SqlLogRepository(session_factory=db)
+    sync_emails.SyncEmailsUseCase(Source(), RuleBasedClassifier(), repo, "default", SimpleTokenizer(lang="pt")).run()
+
+    hourly = _stats(db)
+    assert [(row["bucket"], row["count"]) for row in hourly] == [
+        ("2025-01-01T22:00:00", 2), ("2025-01-01T23:00:00", 1),
+    ]
+
+
+def test_log_timestamp_is_taken_per_instance():
+    first = ClassificationLog()
+    assert ClassificationLog().created_at >= first.created_at
+    assert ClassificationLog.__dataclass_fields__["created_at"].default_factory == datetime.utcnow
@@ -0,0 +1,90 @@
+import threading
+import time
+
+import pytest
+
+from app.infrastructure.single_flight import SingleFlight
+
+
+def test_threads_with_same_key_share_one_call():
+    sf = SingleFlight()
+    calls = []
+    start = threading.Barrier(5)
+    results = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.1)
+        return {"n": len(calls)}
+
+    def worker():
+        start.wait()
+        results.append(sf.do("k", slow))
+
+    threads = [threading.Thread(target=worker) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert all(r is results[0][0] for r, _ in results)
+    assert sorted(shared for _, shared in results) == [False, True, True, True, True]  # um líder
+    assert sf.stats()["coalesced"] == 4 and sf.stats()["in_flight"] == 0
+    assert sf.do("k", lambda: "new") == ("new", False)  # não é cache: chave esquecida ao terminar
+
+
+def test_exception_reaches_every_waiter():
+    sf = SingleFlight()
+    errors = []
+
+    def boom():
+        time.sleep(0.05)
+        raise RuntimeError("falhou")
+
+    def worker():
+        try:
+            sf.do("k", boom)
+        except RuntimeError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(errors) == 3
+    with pytest.raises(RuntimeError):
+        sf.do("k", boom)
+
+
+def test_coalesced_llm_calls_bill_tokens_once(monkeypatch):
+    from app.domain.entities import Email
+    from app.infrastructure.classifiers.openai_llm import OpenAIClassifier
+    from app.infrastructure.http_client import PooledHttpClient
+    from app.infrastructure.pricing import PriceTable
+    from scripts.mock_llm_server import MockLLMServer
+
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    with MockLLMServer(latency_ms=200) as srv:
+        clf = OpenAIClassifier(http_client=PooledHttpClient(srv.base_url), single_flight=True)
+        email = Email(subject="Reunião", body="Podemos revisar o contrato amanhã?")
+        start = threading.Barrier(4)
+        results = []
+
+        def worker():
+            start.wait()
+            results.append(clf.classify(email, ["contrato"]))
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    assert srv.requests == 1
+    prices = PriceTable()
+    assert sum(r.total_tokens or 0 for r in results) == 150
+    total_cost = sum(prices.cost(r.used_model, r.prompt_tokens, r.completion_tokens) for r in results)
+    assert total_cost == pytest.approx(prices.cost(results[0].used_model, 120, 30))
+    assert sum(1 for r in results if r.extra.get("llm_coalesced")) == 3
@@ -0,0 +1,179 @@
+import asyncio
+import time
+
+import pytest
+from sqlmodel import Session, SQLModel, create_engine
+
+from app.application.use_cases.classify_email import ClassifyEmailUseCase
+from app.domain.entities import Category, ClassificationLog, ClassificationResult
+from app.infrastructure.classifiers.hedge import drain
+from app.infrastructure.classifiers.rule_based import RuleBasedClassifier
+from app.infrastructure.classifiers.smart_classifier import SmartClassifier
+from app.infrastructure.models import ClassificationLogModel  # noqa: F401 (registra a tabela)
+from app.infrastructure.nlp.tokenizer_simple import SimpleTokenizer
+from app.infrastructure.repositories.sql_log_repository import SqlLogRepository
+from app.infrastructure.repositories.write_behind_log_repository import WriteBehindLogRepository
+from app.infrastructure.responders.simple_templates import SimpleResponder
+
+
+class _Recording(SqlLogRepository):
+    def __init__(self, session):
+        super().__init__(session)
+        self.batches = []
+
+    def save_many(self, logs):
+        self.batches.append(len(logs))
+        if any(log.subject == "bad" for log in logs):
+            raise ValueError("lote com log inválido")
+        return super().save_many(logs)
+
+    def save(self, log):
+        if log.subject == "bad":
+            raise ValueError("log inválido")
+        return super().save(log)
+
+
+@pytest.fixture
+def sql_repo(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'logs.db'}", connect_args={"check_same_thread": False})
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield _Recording(session)
+
+
+def _log(i):
+    return ClassificationLog(source="test", subject=str(i), category="productive")
+
+
+def test_save_acks_without_id_and_flush_writes_in_batches(sql_repo):
+    writer = WriteBehindLogRepository(sql_repo, max_batch=10, max_wait_ms=10_000)
+    logs = [writer.save(_log(i)) for i in range(25)]
+    assert all(log.id is None for log in logs)  # confirmação sem id
+
+    assert writer.flush(timeout=5)
+    assert sql_repo.batches == [10, 10, 5]  # por tamanho; o resto pelo flush
+    assert [log.id for log in logs] == list(range(1, 26))  # ids preenchidos depois do commit
+    assert len(writer.list_recent(limit=100)) == 25
+    writer.close()
+
+
+def test_time_trigger_and_close_flushes(sql_repo):
+    writer = WriteBehindLogRepository(sql_repo, max_batch=100, max_wait_ms=20)
+    for i in range(3):
+        writer.save(_log(i))
+    deadline = time.perf_counter() + 2
+    while not sql_repo.batches and time.perf_counter() < deadline:
+        time.sleep(0.01)
+    assert sql_repo.batches == [3]  # sem flush explícito
+
+    slow = WriteBehindLogRepository(sql_repo, max_batch=100, max_wait_ms=10_000)
+    future = slow.submit(_log("x"))
+    slow.close(timeout=5)
+    assert future.result(timeout=0).id == 4
+    assert slow.save(_log("y")).id == 5  # depois do close, escrita síncrona
+    writer.close()
+
+
+def test_bad_log_does_not_sink_the_batch(sql_repo):
+    writer = WriteBehindLogRepository(sql_repo, max_batch=3, max_wait_ms=10_000)
+    futures = [writer.submit(_log(s)) for s in ("a", "bad", "c")]
+    writer.flush(timeout=5)
+
+    assert futures[0].result().id is not None and futures[2].result().id is not None
+    with pytest.raises(ValueError):
+        futures[1].result()
+    assert writer.stats()["written"] == 2 and writer.stats()["failed"] == 1
+    writer.close()
+
+
+def test_update_is_queued_in_order_without_a_flush(sql_repo):
+    writer = WriteBehindLogRepository(sql_repo, max_batch=100, max_wait_ms=10_000)
+    future = writer.submit(_log("a"))
+    writer.flush(timeout=5)
+    first = future.result(timeout=0)
+    writer.save(_log("b"))
+
+    updated = ClassificationLog(source="test", subject="a", category="unproductive", used_model="gpt")
+    assert writer.update_result(first.id, updated).id == first.id
+    assert sql_repo.batches == [1]  # nem o "b" pendente nem o update foram forçados
+
+    logs = {log.subject: log for log in writer.list_recent()}  # leitura: flush dos dois, em ordem
+    assert sql_repo.batches == [1, 1]
+    assert logs["a"].used_model == "gpt" and logs["a"].category == "unproductive" and "b" in logs
+    writer.close()
+
+
+def test_sync_moves_emails_only_after_logs_are_written(sql_repo):
+    from app.application.use_cases.sync_emails import SyncEmailsUseCase
+    from app.domain.entities import Email
+
+    writer = WriteBehindLogRepository(sql_repo, max_batch=100, max_wait_ms=10_000)
+
+    class Source:
+        moved = []
+
+        def fetch_unread(self):
+            return [(str(i), Email(subject=f"s{i}", body="Podemos revisar o contrato?")) for i in range(3)]
+
+        def move_to_folder(self, msg_id, folder):
+            self.moved.append((msg_id, sql_repo.batches[:]))
+
+    source = Source()
+    SyncEmailsUseCase(source, RuleBasedClassifier(), writer, "default", SimpleTokenizer(lang="pt"), batch_size=3).run()
+    assert [m for m, _ in source.moved] == ["0", "1", "2"]
+    assert all(batches == [3] for _, batches in source.moved)  # o lote já estava gravado
+    writer.close()
+
+
+def test_sync_leaves_email_unread_when_its_log_fails(sql_repo):
+    from app.application.use_cases.sync_emails import SyncEmailsUseCase
+    from app.domain.entities import Email
+
+    writer = WriteBehindLogRepository(sql_repo, max_batch=100, max_wait_ms=10_000)
+
+    class Source:
+        moved = []
+
+        def fetch_unread(self):
+            return [(s, Email(subject=s, body="Podemos revisar o contrato?")) for s in ("a", "bad", "c")]
+
+        def move_to_folder(self, msg_id, folder):
+            self.moved.append(msg_id)
+
+    source = Source()
+    SyncEmailsUseCase(source, RuleBasedClassifier(), writer, "default", SimpleTokenizer(lang="pt"), batch_size=3).run()
+    assert source.moved == ["a", "c"]  # o flush "funcionou", mas o log de "bad" não foi gravado
+    assert writer.stats()["failed"] == 1
+    writer.close()
+
+
+def test_hedged_log_gets_late_update_through_writer(sql_repo):
+    class SlowLLM:
+        prefers_async = True
+
+        async def aclassify(self, email, tokens, **kwargs):
+            await asyncio.sleep(0.1)
+            return ClassificationResult(
+                category=Category.UNPRODUCTIVE, reason="llm", suggested_reply="", used_model="gpt",
+            )
+
+    writer = WriteBehindLogRepository(sql_repo, max_batch=100, max_wait_ms=20)
+    uc = ClassifyEmailUseCase(
+        file_facade=None,
+        tokenizer=SimpleTokenizer(lang="pt"),
+        classifier=SmartClassifier(RuleBasedClassifier(), SlowLLM(), min_conf=1.01),
+        responder=SimpleResponder(),
+        profiles=type("P", (), {"get_profile": lambda self, pid: {"mood": None}})(),
+        log_repo=writer,
+    )
+
+    async def run():
+        res = await uc.aexecute_from_text("Dúvida", "Podemos conversar sobre o projeto?", budget_ms=20)
+        await drain()
+        return res
+
+    res = asyncio.run(run())
+    assert res.extra["hedge"]["provisional"]
+    [log] = writer.list_recent()
+    assert log.used_model == "gpt" and log.category == "unproductive"
+    writer.close()
@@ -190,6 +190,7 @@ export async function fetchLogs(params?: {
     const url = buildUrl("/logs", {
       limit: params?.limit,
       since: params?.since,
+      category: params?.category,
       profile_id: params?.profileId,
     });
     const res = await fetch(url);
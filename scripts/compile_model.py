@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Script to compile the trained ML models (joblib pickles) into the flat,
+memory-mapped artifact used by the backend (NumPy arrays + hashed vocabulary).
+Run this after copy_models.py.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import joblib
+
+# Paths
+PROJECT_ROOT = Path(__file__).parent.parent
+BACKEND_DIR = PROJECT_ROOT / "backend"
+MODELS_DIR = BACKEND_DIR / "models"
+
+sys.path.insert(0, str(BACKEND_DIR))
+from app.infrastructure.classifiers.compiled_linear import compile_from_sklearn, CompiledLinearModel  # noqa: E402
+
+
+def compile_models(model_path: Path, vectorizer_path: Path, out_dir: Path, check: int):
+    """Export vectorizer + model and verify predictions against sklearn"""
+
+    print(f"Loading {model_path.name} and {vectorizer_path.name}...")
+    model = joblib.load(model_path)
+    vectorizer = joblib.load(vectorizer_path)
+
+    out = compile_from_sklearn(model, vectorizer, out_dir)
+    print(f"✓ Compiled {type(model).__name__} ({len(vectorizer.vocabulary_)} terms) to {out}")
+
+    if check:
+        compiled = CompiledLinearModel(out)
+        texts = [" ".join(list(vectorizer.vocabulary_)[i::check][:50]) for i in range(check)]
+        expected = model.predict(vectorizer.transform(texts))
+        got, _ = compiled.predict(texts)
+        mismatches = int((expected != got).sum())
+        print(f"{'✓' if not mismatches else '✗'} Parity check: {check - mismatches}/{check} predictions match")
+        if mismatches:
+            return 1
+
+    print("\n✓ Compiled model ready for deployment!")
+    return 0
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--model", type=Path, default=MODELS_DIR / "best_phishing_model.pkl")
+    ap.add_argument("--vectorizer", type=Path, default=MODELS_DIR / "tfidf_vectorizer.pkl")
+    ap.add_argument("--out", type=Path, default=MODELS_DIR / "compiled")
+    ap.add_argument("--check", type=int, default=200, help="documents used for the parity check (0 = skip)")
+    args = ap.parse_args()
+    exit(compile_models(args.model, args.vectorizer, args.out, args.check))